@@ -1,82 +1,592 @@
+"""
+Backtesting Engine
+Event-driven backtester over contiguous NumPy OHLCV arrays.
+
+Strategies receive a lightweight ``BarView`` per bar (no pandas Series is
+built per row). Orders returned from ``on_bar`` are filled at the *next*
+bar's open, open positions are marked to market every bar and stop loss /
+target levels are checked intrabar against the high/low. Strategies that
+can express themselves as a target-position array may implement
+``generate_signals(engine)`` instead, in which case the whole run is
+vectorized.
+"""
+
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Union
+
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+
+
+OHLCV_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass
+class Order:
+    """Market order submitted by a strategy, filled at the next bar's open"""
+    side: str  # BUY/SELL
+    quantity: float
+    stop_loss: Optional[float] = None
+    target: Optional[float] = None
+    tag: str = ""
+
+
+@dataclass
+class Trade:
+    """Completed round trip"""
+    symbol: str
+    direction: str  # bullish/bearish
+    quantity: float
+    entry_index: int
+    exit_index: int
+    entry_time: Any
+    exit_time: Any
+    entry_price: float
+    exit_price: float
+    pnl: float
+    exit_reason: str
+    tag: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _OpenPosition:
+    quantity: float = 0.0  # signed, +long / -short
+    entry_price: float = 0.0
+    entry_index: int = -1
+    stop_loss: Optional[float] = None
+    target: Optional[float] = None
+    tag: str = ""
+
+
+class BarView:
+    """
+    Zero-copy view of the current bar.
+
+    A single instance is reused for the whole run; only ``index`` moves.
+    ``history`` returns array views so strategies can compute indicators
+    without copying.
+    """
+    __slots__ = ("engine", "index")
+
+    def __init__(self, engine: "BacktestEngine"):
+        self.engine = engine
+        self.index = 0
+
+    @property
+    def open(self) -> float:
+        return self.engine.open[self.index]
+
+    @property
+    def high(self) -> float:
+        return self.engine.high[self.index]
+
+    @property
+    def low(self) -> float:
+        return self.engine.low[self.index]
+
+    @property
+    def close(self) -> float:
+        return self.engine.close[self.index]
+
+    @property
+    def volume(self) -> float:
+        return self.engine.volume[self.index]
+
+    @property
+    def timestamp(self):
+        return self.engine.timestamps[self.index]
+
+    @property
+    def position(self) -> float:
+        return self.engine.position.quantity
+
+    def __getitem__(self, key: str):
+        # Keeps dict/Series-style access (bar["close"]) working for old strategies
+        if key in OHLCV_FIELDS:
+            return getattr(self.engine, key)[self.index]
+        if key in ("date", "timestamp"):
+            return self.timestamp
+        raise KeyError(key)
+
+    def history(self, field_name: str, lookback: int) -> np.ndarray:
+        """Last ``lookback`` values of a field up to and including this bar"""
+        start = max(0, self.index - lookback + 1)
+        return getattr(self.engine, field_name)[start:self.index + 1]
+
+    def candles(self, lookback: int) -> List[Dict[str, Any]]:
+        """Last ``lookback`` bars as candle dicts (Kite historical_data format)"""
+        start = max(0, self.index - lookback + 1)
+        e = self.engine
+        return [
+            {
+                "date": e.timestamps[i],
+                "open": float(e.open[i]),
+                "high": float(e.high[i]),
+                "low": float(e.low[i]),
+                "close": float(e.close[i]),
+                "volume": float(e.volume[i]),
+            }
+            for i in range(start, self.index + 1)
+        ]
+
+
+class CandleStrategyAdapter:
+    """
+    Runs a ``BaseStrategy``-style strategy (``execute(symbol, candles, capital)``
+    returning a trade dict) inside the engine.
+
+    The strategy is only consulted while flat; its stop_loss/target are
+    attached to the resulting order and enforced by the engine.
+    """
+
+    def __init__(self, strategy, symbol: str = "NIFTY", lookback: int = 50,
+                 capital: float = 100000.0, min_confidence: float = 0.0):
+        self.strategy = strategy
+        self.symbol = symbol
+        self.lookback = lookback
+        self.capital = capital
+        self.min_confidence = min_confidence
+
+    def on_bar(self, bar: BarView):
+        if bar.position != 0 or bar.index + 1 < self.lookback:
+            return None
+
+        trade = self.strategy.execute(self.symbol, bar.candles(self.lookback), self.capital)
+        if not trade or not trade.get("quantity"):
+            return None
+        if trade.get("confidence", 1.0) < self.min_confidence:
+            return None
+
+        side = "BUY" if trade.get("direction", "bullish") == "bullish" else "SELL"
+        return Order(
+            side=side,
+            quantity=trade["quantity"],
+            stop_loss=trade.get("stop_loss"),
+            target=trade.get("target"),
+            tag=trade.get("strategy", ""),
+        )
+
 
 class BacktestEngine:
     """
     Core engine for running strategy backtests.
     """
-    def __init__(self, strategy, data: pd.DataFrame, initial_capital: float = 100000.0):
+    def __init__(self, strategy, data: Union[pd.DataFrame, Dict[str, np.ndarray]],
+                 initial_capital: float = 100000.0, symbol: str = "NIFTY",
+                 commission: float = 0.0, slippage: float = 0.0,
+                 periods_per_year: int = 252, verbose: bool = True):
         """
         Initializes the backtesting engine.
 
-        :param strategy: The trading strategy instance to be tested.
-        :param data: A pandas DataFrame with historical market data (OHLCV).
+        :param strategy: The trading strategy instance to be tested. Must implement
+            ``on_bar(bar)`` (returning None, an Order or a list of Orders) or
+            ``generate_signals(engine)`` (returning a target-position array).
+        :param data: OHLCV data as a pandas DataFrame or a dict of arrays.
         :param initial_capital: The starting capital for the backtest.
+        :param symbol: Symbol recorded on trades.
+        :param commission: Fractional commission charged on traded notional.
+        :param slippage: Absolute price slippage applied against each fill.
+        :param periods_per_year: Bars per year, used to annualize Sharpe.
+        :param verbose: Print progress messages.
         """
         self.strategy = strategy
-        self.data = data
+        self.symbol = symbol
         self.initial_capital = initial_capital
+        self.commission = commission
+        self.slippage = slippage
+        self.periods_per_year = periods_per_year
+        self.verbose = verbose
+
+        self._load_arrays(data)
+        self.n_bars = len(self.close)
+
         self.portfolio_value = initial_capital
         self.cash = initial_capital
-        self.positions = {} # To hold current positions
-        self.trades = [] # A log of all trades executed
-        print(f"BacktestEngine initialized with {strategy.__class__.__name__} and initial capital ${initial_capital:,.2f}")
+        self.position = _OpenPosition()
+        self.positions = {}  # symbol -> signed quantity, kept for API compatibility
+        self.trades: List[Trade] = []
+        self.fills: List[Dict[str, Any]] = []
+        self.equity_curve = np.full(self.n_bars, initial_capital, dtype=np.float64)
+        self._pending: List[Order] = []
+        self.elapsed_seconds = 0.0
+
+        self._log(f"BacktestEngine initialized with {strategy.__class__.__name__} "
+                  f"and initial capital ${initial_capital:,.2f}")
+
+    @classmethod
+    def from_store(cls, strategy, instrument, interval: str, from_date, to_date,
+                   store=None, fetch=None, **kwargs) -> "BacktestEngine":
+        """
+        Build an engine over candles held in the local candle store.
+
+        :param store: A ``CandleStore`` (the default on-disk store if omitted).
+        :param fetch: Optional ``fetch(instrument, from, to, interval)`` used to
+            fill gaps in the store before the arrays are read.
+        """
+        if store is None:
+            from runner.market_data.candle_store import CandleStore
+            store = CandleStore()
+        if fetch is not None:
+            store.get_range(instrument, interval, from_date, to_date, fetch)
+        data = store.read_arrays(instrument, interval, from_date, to_date)
+        if len(data["close"]) == 0:
+            raise ValueError(f"No stored candles for {instrument} {interval} "
+                             f"between {from_date} and {to_date}")
+        kwargs.setdefault("symbol", str(instrument))
+        return cls(strategy, data, **kwargs)
 
-    def run(self):
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def _load_arrays(self, data):
+        for name, values in self.extract_arrays(data).items():
+            setattr(self, "timestamps" if name == "timestamp" else name, values)
+
+    @staticmethod
+    def extract_arrays(data: Union[pd.DataFrame, Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """Copy OHLCV columns once into contiguous float64 arrays (plus timestamps)"""
+        if isinstance(data, pd.DataFrame):
+            columns = {c.lower(): c for c in data.columns}
+            get = lambda name: data[columns[name]].to_numpy() if name in columns else None
+        else:
+            get = lambda name: data.get(name)
+
+        arrays = {}
+        for name in OHLCV_FIELDS:
+            values = get(name)
+            if values is None:
+                if name == "volume" and get("close") is not None:
+                    values = np.zeros(len(get("close")))
+                else:
+                    raise ValueError(f"Backtest data missing '{name}' column")
+            arrays[name] = np.ascontiguousarray(values, dtype=np.float64)
+
+        timestamps = get("date")
+        if timestamps is None:
+            timestamps = get("timestamp")
+        if timestamps is None:
+            if isinstance(data, pd.DataFrame):
+                timestamps = data.index.to_numpy()
+            else:
+                timestamps = np.arange(len(arrays["close"]))
+        arrays["timestamp"] = np.asarray(timestamps)
+        return arrays
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit_order(self, order: Order):
+        """Queue an order for execution at the next bar's open"""
+        self._pending.append(order)
+
+    def run(self) -> Dict[str, Any]:
         """
         Runs the backtest from start to finish over the provided data.
         """
-        print("Starting backtest...")
-        for i, row in self.data.iterrows():
-            # In each step, we give the strategy the current market data
-            self.strategy.on_bar(row)
-            
-            # Here, we would also update portfolio value based on current prices
-            self._update_portfolio_value(row)
-
-        print("Backtest finished.")
+        self._log("Starting backtest...")
+        start = time.perf_counter()
+
+        if hasattr(self.strategy, "generate_signals"):
+            self._run_vectorized()
+        else:
+            self._run_events()
+
+        self.elapsed_seconds = time.perf_counter() - start
+        self._log("Backtest finished.")
         return self._generate_results()
 
-    def _update_portfolio_value(self, current_bar: pd.Series):
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    def _run_events(self):
+        on_bar = self.strategy.on_bar
+        bar = BarView(self)
+        if hasattr(self.strategy, "on_start"):
+            self.strategy.on_start(self)
+
+        opens, highs, lows, closes = self.open, self.high, self.low, self.close
+        equity = self.equity_curve
+
+        for i in range(self.n_bars):
+            # 1. Orders from the previous bar fill at this bar's open
+            if self._pending:
+                pending, self._pending = self._pending, []
+                for order in pending:
+                    self._execute_order(order, i, opens[i])
+
+            # 2. Intrabar stop loss / target on the open position
+            pos = self.position
+            if pos.quantity != 0 and pos.entry_index < i:
+                self._check_exit_levels(i, opens[i], highs[i], lows[i])
+
+            # 3. Strategy sees the completed bar
+            bar.index = i
+            orders = on_bar(bar)
+            if orders is not None:
+                if isinstance(orders, Order):
+                    self._pending.append(orders)
+                else:
+                    self._pending.extend(orders)
+
+            # 4. Mark to market
+            equity[i] = self.cash + self.position.quantity * closes[i]
+
+        self._finalize()
+
+    def _check_exit_levels(self, i: int, open_: float, high: float, low: float):
+        pos = self.position
+        long = pos.quantity > 0
+        stop, target = pos.stop_loss, pos.target
+
+        # Stop is evaluated before target: when both are touched in one bar we
+        # cannot know the order, so assume the adverse outcome.
+        if stop is not None and (low <= stop if long else high >= stop):
+            gap = open_ <= stop if long else open_ >= stop
+            self._close_position(i, open_ if gap else stop, "stop_loss")
+        elif target is not None and (high >= target if long else low <= target):
+            gap = open_ >= target if long else open_ <= target
+            self._close_position(i, open_ if gap else target, "target")
+
+    # ------------------------------------------------------------------
+    # Vectorized path
+    # ------------------------------------------------------------------
+
+    def _run_vectorized(self):
         """
-        Updates the total value of the portfolio based on the current market prices.
-        (Placeholder logic)
+        Target-position signals: signal[i] is the desired position after bar i
+        closes, so it is held from bar i+1's open onwards.
         """
-        # In a real implementation, we'd loop through open positions
-        # and update their value.
-        pass
+        signals = np.asarray(self.strategy.generate_signals(self), dtype=np.float64)
+        if signals.shape != self.close.shape:
+            raise ValueError("generate_signals must return one value per bar")
+
+        held = np.empty_like(signals)
+        held[0] = 0.0
+        held[1:] = signals[:-1]
+        delta = np.diff(held, prepend=0.0)
+
+        fill_price = self.open + np.sign(delta) * self.slippage
+        cash_flow = -delta * fill_price - np.abs(delta * fill_price) * self.commission
+        cash = self.initial_capital + np.cumsum(cash_flow)
+        self.equity_curve = cash + held * self.close
+
+        # Trade bookkeeping only visits the bars where the position changes
+        for i in np.flatnonzero(delta):
+            self._rebalance(int(i), held[i], self.open[i])
+        self.cash = float(cash[-1]) if self.n_bars else self.initial_capital
+        self._finalize()
+
+    def _rebalance(self, i: int, target_qty: float, price: float):
+        pos = self.position
+        current = pos.quantity
+        change = target_qty - current
+        fill_price = self._slipped(price, change)
+        self._append_fill(i, change, fill_price, "signal")
+
+        if current != 0 and (target_qty == 0 or np.sign(target_qty) != np.sign(current)):
+            self._record_close(i, fill_price, "signal")
+        elif current != 0 and abs(target_qty) < abs(current):
+            self._record_trade(i, fill_price, abs(change), "signal")
+            pos.quantity = target_qty
+            return
+        elif current != 0:
+            pos.entry_price = (pos.entry_price * current + fill_price * change) / target_qty
+            pos.quantity = target_qty
+            return
+
+        if target_qty != 0:
+            self._record_open(i, fill_price, target_qty, None, None, "")
+
+    # ------------------------------------------------------------------
+    # Fills and position accounting
+    # ------------------------------------------------------------------
+
+    def _slipped(self, price: float, signed_qty: float) -> float:
+        return price + self.slippage if signed_qty > 0 else price - self.slippage
+
+    def _execute_order(self, order: Order, i: int, price: float):
+        signed = order.quantity if order.side.upper() == "BUY" else -order.quantity
+        if signed == 0:
+            return
+        current = self.position.quantity
+        fill_price = self._slipped(price, signed)
+        self._book_fill(i, signed, fill_price, order.tag)
+
+        if current == 0:
+            self._record_open(i, fill_price, signed, order.stop_loss, order.target, order.tag)
+        elif np.sign(current) == np.sign(signed):
+            # Scale in: average the entry price
+            pos = self.position
+            total = current + signed
+            pos.entry_price = (pos.entry_price * current + fill_price * signed) / total
+            pos.quantity = total
+            if order.stop_loss is not None:
+                pos.stop_loss = order.stop_loss
+            if order.target is not None:
+                pos.target = order.target
+        else:
+            remaining = current + signed
+            if abs(signed) >= abs(current):
+                self._record_trade(i, fill_price, abs(current), "signal")
+                self.position = _OpenPosition()
+                if remaining != 0:
+                    self._record_open(i, fill_price, remaining, order.stop_loss, order.target, order.tag)
+            else:
+                self._record_trade(i, fill_price, abs(signed), "signal")
+                self.position.quantity = remaining
+
+    def _close_position(self, i: int, price: float, reason: str):
+        qty = self.position.quantity
+        fill_price = self._slipped(price, -qty)
+        self._book_fill(i, -qty, fill_price, reason)
+        self._record_trade(i, fill_price, abs(qty), reason)
+        self.position = _OpenPosition()
+
+    def _book_fill(self, i: int, signed_qty: float, price: float, tag: str):
+        notional = signed_qty * price
+        self.cash -= notional + abs(notional) * self.commission
+        self._append_fill(i, signed_qty, price, tag)
+
+    def _append_fill(self, i: int, signed_qty: float, price: float, tag: str):
+        self.fills.append({
+            "index": i,
+            "time": self.timestamps[i],
+            "side": "BUY" if signed_qty > 0 else "SELL",
+            "quantity": abs(signed_qty),
+            "price": price,
+            "tag": tag,
+        })
+
+    def _record_open(self, i: int, price: float, signed_qty: float,
+                     stop_loss: Optional[float], target: Optional[float], tag: str):
+        self.position = _OpenPosition(
+            quantity=signed_qty, entry_price=price, entry_index=i,
+            stop_loss=stop_loss, target=target, tag=tag,
+        )
+
+    def _record_close(self, i: int, price: float, reason: str):
+        self._record_trade(i, price, abs(self.position.quantity), reason)
+        self.position = _OpenPosition()
+
+    def _record_trade(self, i: int, exit_price: float, quantity: float, reason: str):
+        pos = self.position
+        direction = "bullish" if pos.quantity > 0 else "bearish"
+        sign = 1.0 if pos.quantity > 0 else -1.0
+        costs = (pos.entry_price + exit_price) * quantity * self.commission
+        pnl = sign * (exit_price - pos.entry_price) * quantity - costs
+        self.trades.append(Trade(
+            symbol=self.symbol,
+            direction=direction,
+            quantity=quantity,
+            entry_index=pos.entry_index,
+            exit_index=i,
+            entry_time=self.timestamps[pos.entry_index],
+            exit_time=self.timestamps[i],
+            entry_price=pos.entry_price,
+            exit_price=exit_price,
+            pnl=pnl,
+            exit_reason=reason,
+            tag=pos.tag,
+        ))
+
+    def _finalize(self):
+        last = self.n_bars - 1
+        self.portfolio_value = float(self.equity_curve[last]) if self.n_bars else self.initial_capital
+        self.positions = {self.symbol: self.position.quantity} if self.position.quantity else {}
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
 
     def _generate_results(self) -> Dict[str, Any]:
         """
         Generates a report of the backtest results.
-        (Placeholder logic)
         """
-        print("Generating backtest results...")
+        self._log("Generating backtest results...")
+        equity = self.equity_curve
+        pnls = np.array([t.pnl for t in self.trades], dtype=np.float64)
+        wins = int((pnls > 0).sum())
+        losses = int((pnls < 0).sum())
+
+        if self.n_bars:
+            running_max = np.maximum.accumulate(equity)
+            drawdown = running_max - equity
+            max_dd = float(drawdown.max())
+            max_dd_pct = float((drawdown / running_max).max() * 100)
+        else:
+            max_dd = max_dd_pct = 0.0
+
+        returns = np.diff(equity) / equity[:-1] if self.n_bars > 1 else np.zeros(0)
+        std = returns.std() if returns.size else 0.0
+        sharpe = float(returns.mean() / std * np.sqrt(self.periods_per_year)) if std > 0 else 0.0
+
+        unrealized = 0.0
+        if self.position.quantity and self.n_bars:
+            unrealized = float((self.close[-1] - self.position.entry_price) * self.position.quantity)
+
+        gross_profit = float(pnls[pnls > 0].sum())
+        gross_loss = float(-pnls[pnls < 0].sum())
+
         results = {
             "final_portfolio_value": self.portfolio_value,
             "total_pnl": self.portfolio_value - self.initial_capital,
+            "realized_pnl": float(pnls.sum()),
+            "unrealized_pnl": unrealized,
+            "total_return_pct": (self.portfolio_value / self.initial_capital - 1) * 100,
+            "max_drawdown": max_dd,
+            "max_drawdown_pct": max_dd_pct,
+            "sharpe_ratio": sharpe,
             "total_trades": len(self.trades),
-            "trades": self.trades
+            "winning_trades": wins,
+            "losing_trades": losses,
+            "win_rate": wins / len(self.trades) if self.trades else 0.0,
+            "profit_factor": gross_profit / gross_loss if gross_loss > 0 else float("inf") if gross_profit > 0 else 0.0,
+            "open_position": self.position.quantity,
+            "bars": self.n_bars,
+            "elapsed_seconds": self.elapsed_seconds,
+            "equity_curve": equity,
+            "trades": [t.to_dict() for t in self.trades],
+            "fills": self.fills,
         }
         return results
 
+
 if __name__ == '__main__':
-    # Example usage (requires a mock strategy and data)
+    # Example usage: a simple moving-average crossover on synthetic data
     class MockStrategy:
         def on_bar(self, bar):
-            pass # Strategy logic would go here
-    
-    # Create some sample data
+            closes = bar.history("close", 20)
+            if len(closes) < 20:
+                return None
+            fast = closes[-5:].mean()
+            slow = closes.mean()
+            if fast > slow and bar.position <= 0:
+                return Order("BUY", 5)
+            if fast < slow and bar.position > 0:
+                return Order("SELL", bar.position)
+            return None
+
+    rng = np.random.default_rng(7)
+    close = 17500 + np.cumsum(rng.normal(0, 5, 90000))
     mock_data = pd.DataFrame({
-        'open': [100, 102, 101, 103, 105],
-        'high': [103, 104, 102, 105, 106],
-        'low': [99, 101, 100, 102, 104],
-        'close': [102, 101, 102, 105, 105],
-        'volume': [1000, 1200, 1100, 1300, 1400]
+        'open': close + rng.normal(0, 1, close.size),
+        'high': close + 5,
+        'low': close - 5,
+        'close': close,
+        'volume': rng.integers(1000, 5000, close.size)
     })
-    
+
     mock_strategy = MockStrategy()
-    engine = BacktestEngine(strategy=mock_strategy, data=mock_data)
+    engine = BacktestEngine(strategy=mock_strategy, data=mock_data, periods_per_year=252 * 375)
     results = engine.run()
     print("\nResults:")
-    print(results) 
\ No newline at end of file
+    for key in ("final_portfolio_value", "total_pnl", "max_drawdown_pct", "sharpe_ratio",
+                "total_trades", "win_rate", "elapsed_seconds"):
+        print(f"  {key}: {results[key]}")
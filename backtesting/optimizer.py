@@ -0,0 +1,404 @@
+"""
+Parameter Sweep & Walk-Forward Optimizer
+Fans parameter grids for BacktestEngine out over a process pool.
+
+Price arrays are placed once in ``multiprocessing.shared_memory`` and every
+worker attaches to them in its initializer, so a job only pickles its
+strategy factory name, parameters and a bar range - never the DataFrame.
+Results come back as a ranked pandas table with per-job timing.
+"""
+
+import contextlib
+import io
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backtesting.engine import BacktestEngine, BarView, CandleStrategyAdapter, Order, OHLCV_FIELDS
+
+
+# Result fields copied from BacktestEngine results into the sweep table
+METRIC_FIELDS = (
+    "sharpe_ratio", "max_drawdown_pct", "win_rate", "total_pnl", "total_return_pct",
+    "total_trades", "profit_factor",
+)
+
+
+# ----------------------------------------------------------------------
+# Strategy factories
+#
+# Factories must be importable top-level callables so that workers can
+# resolve them by name; each returns a fresh strategy for one job.
+# ----------------------------------------------------------------------
+
+def vwap_factory(vwap_period: int = 20, confidence_threshold: float = 0.6,
+                 symbol: str = "NIFTY", capital: float = 100000.0):
+    from strategies.vwap_strategy import VWAPStrategy
+
+    strategy = VWAPStrategy(vwap_period=vwap_period, confidence_threshold=confidence_threshold)
+    return CandleStrategyAdapter(strategy, symbol=symbol, lookback=max(vwap_period, 15), capital=capital)
+
+
+class _RangeReversalRunner:
+    """Adapts the standalone range_reversal_strategy function to execute()"""
+
+    def __init__(self, lookback: int, confidence_threshold: float):
+        self.lookback = lookback
+        self.confidence_threshold = confidence_threshold
+
+    def execute(self, symbol, candles, capital):
+        from strategies.range_reversal import range_reversal_strategy
+
+        return range_reversal_strategy(symbol, candles, capital, self.lookback, self.confidence_threshold)
+
+
+def range_reversal_factory(lookback: int = 20, confidence_threshold: float = 0.6,
+                           symbol: str = "NIFTY", capital: float = 100000.0):
+    return CandleStrategyAdapter(_RangeReversalRunner(lookback, confidence_threshold),
+                                 symbol=symbol, lookback=lookback, capital=capital)
+
+
+class ScalpBacktestStrategy:
+    """
+    Bar-driven version of scalp_strategy: the live version picks a random
+    strike and reads the trend from the market monitor, so here the trend is
+    taken from a moving average of the replayed series instead. Signal, ATR
+    and stop/target rules are the live ones.
+    """
+
+    def __init__(self, atr_period: int = 10, trend_period: int = 20, capital: float = 100000.0):
+        from strategies import scalp_strategy
+
+        self._scalp = scalp_strategy
+        self.atr_period = atr_period
+        self.trend_period = trend_period
+        self.capital = capital
+        self.lookback = max(atr_period + 1, trend_period, 3)
+
+    def on_bar(self, bar: BarView):
+        if bar.position != 0 or bar.index + 1 < self.lookback:
+            return None
+
+        trend = "bullish" if bar.close >= bar.history("close", self.trend_period).mean() else "bearish"
+        candles = bar.candles(self.lookback)
+        signal = self._scalp.get_scalp_signal(candles, trend)
+        if signal["signal"] == "HOLD" or signal["confidence"] < 0.6:
+            return None
+
+        ltp = float(bar.close)
+        atr = self._scalp.calculate_simple_atr_scalp(candles[-(self.atr_period + 1):], self.atr_period)
+        quantity = self._scalp.calculate_scalp_quantity(self.capital, ltp)
+        if trend == "bullish":
+            return Order("BUY", quantity, stop_loss=ltp - min(30, atr * 2), target=ltp + min(60, atr * 3), tag="Scalp")
+        return Order("SELL", quantity, stop_loss=ltp + min(30, atr * 2), target=ltp - min(60, atr * 3), tag="Scalp")
+
+
+def scalp_factory(atr_period: int = 10, trend_period: int = 20, capital: float = 100000.0):
+    return ScalpBacktestStrategy(atr_period=atr_period, trend_period=trend_period, capital=capital)
+
+
+STRATEGY_FACTORIES: Dict[str, Callable[..., Any]] = {
+    "vwap": vwap_factory,
+    "range_reversal": range_reversal_factory,
+    "scalp": scalp_factory,
+}
+
+
+def parameter_grid(grid: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of a {param: values} mapping"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+# ----------------------------------------------------------------------
+# Walk-forward splits
+# ----------------------------------------------------------------------
+
+@dataclass
+class WalkForwardSplit:
+    """Bar ranges ``[start, stop)`` for one train/test fold"""
+    fold: int
+    train_start: int
+    train_stop: int
+    test_start: int
+    test_stop: int
+
+
+def walk_forward_splits(n_bars: int, n_splits: int = 5, train_size: Optional[int] = None,
+                        test_size: Optional[int] = None, anchored: bool = False) -> List[WalkForwardSplit]:
+    """
+    Consecutive train/test folds. With ``anchored`` every train window starts
+    at bar 0 (expanding window); otherwise it rolls forward with the test
+    window.
+    """
+    if test_size is None:
+        test_size = n_bars // (n_splits + 1)
+    if train_size is None:
+        train_size = n_bars - n_splits * test_size
+    if test_size <= 0 or train_size <= 0 or train_size + n_splits * test_size > n_bars:
+        raise ValueError(f"Cannot fit {n_splits} folds of train={train_size}/test={test_size} into {n_bars} bars")
+
+    splits = []
+    for fold in range(n_splits):
+        train_stop = train_size + fold * test_size
+        splits.append(WalkForwardSplit(
+            fold=fold,
+            train_start=0 if anchored else train_stop - train_size,
+            train_stop=train_stop,
+            test_start=train_stop,
+            test_stop=train_stop + test_size,
+        ))
+    return splits
+
+
+# ----------------------------------------------------------------------
+# Shared-memory price arrays
+# ----------------------------------------------------------------------
+
+class SharedOHLCV:
+    """
+    OHLCV (+ int64 timestamps) packed into one shared memory block.
+
+    ``descriptor`` is the small picklable handle that workers use to attach.
+    """
+
+    FIELDS = OHLCV_FIELDS + ("timestamp",)
+
+    def __init__(self, data: Union[pd.DataFrame, Dict[str, np.ndarray]]):
+        arrays = BacktestEngine.extract_arrays(data)
+        n_bars = len(arrays["close"])
+        timestamps = arrays["timestamp"]
+        if np.issubdtype(timestamps.dtype, np.datetime64):
+            self.time_unit = np.datetime_data(timestamps.dtype)[0]
+            timestamps = timestamps.view(np.int64)
+        elif np.issubdtype(timestamps.dtype, np.integer):
+            self.time_unit = None
+        else:
+            self.time_unit = None
+            timestamps = np.arange(n_bars, dtype=np.int64)
+        arrays["timestamp"] = timestamps
+
+        self.n_bars = n_bars
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, 8 * n_bars * len(self.FIELDS)))
+        block = np.ndarray((len(self.FIELDS), n_bars), dtype=np.float64, buffer=self._shm.buf)
+        for row, name in enumerate(self.FIELDS):
+            if name == "timestamp":
+                block[row].view(np.int64)[:] = arrays[name]
+            else:
+                block[row] = arrays[name]
+
+    @property
+    def descriptor(self) -> Tuple[str, int, Optional[str]]:
+        return self._shm.name, self.n_bars, self.time_unit
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_arrays(descriptor: Tuple[str, int, Optional[str]]) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    """Map a SharedOHLCV block into zero-copy numpy views"""
+    name, n_bars, time_unit = descriptor
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(SharedOHLCV.FIELDS), n_bars), dtype=np.float64, buffer=shm.buf)
+    arrays = {field: block[row] for row, field in enumerate(SharedOHLCV.FIELDS)}
+    timestamps = arrays["timestamp"].view(np.int64)
+    arrays["timestamp"] = timestamps.view(f"datetime64[{time_unit}]") if time_unit else timestamps
+    return shm, arrays
+
+
+# Per-process state populated by the pool initializer
+_worker_shm = None
+_worker_arrays: Optional[Dict[str, np.ndarray]] = None
+
+
+def _init_worker(descriptor):
+    global _worker_shm, _worker_arrays
+    _worker_shm, _worker_arrays = attach_arrays(descriptor)
+
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one backtest over a slice of the shared arrays"""
+    start, stop = job["start"], job["stop"]
+    data = {field: values[start:stop] for field, values in _worker_arrays.items()}
+    factory = job["factory"]
+    if isinstance(factory, str):
+        factory = STRATEGY_FACTORIES[factory]
+
+    began = time.perf_counter()
+    row = {"job_id": job["job_id"], "fold": job.get("fold"), "phase": job.get("phase", "sweep"),
+           "start": start, "stop": stop, **job["params"]}
+    try:
+        # Strategies print per signal; swallow it so workers do not flood the console
+        with contextlib.redirect_stdout(io.StringIO()):
+            strategy = factory(**job["params"])
+            results = BacktestEngine(strategy, data, verbose=False, **job["engine_kwargs"]).run()
+        row.update({field: results[field] for field in METRIC_FIELDS})
+        row["error"] = None
+    except Exception as e:
+        row.update({field: np.nan for field in METRIC_FIELDS})
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["elapsed_seconds"] = time.perf_counter() - began
+    row["worker_pid"] = os.getpid()
+    return row
+
+
+# ----------------------------------------------------------------------
+# Optimizer
+# ----------------------------------------------------------------------
+
+class ParameterSweep:
+    """
+    Grid search / walk-forward optimizer for BacktestEngine strategies.
+
+    Example::
+
+        sweep = ParameterSweep(df, "vwap", {"vwap_period": [10, 20, 30],
+                                            "confidence_threshold": [0.5, 0.6, 0.7]})
+        table = sweep.run()
+        wf = sweep.walk_forward(n_splits=4)
+    """
+
+    def __init__(self, data: Union[pd.DataFrame, Dict[str, np.ndarray]],
+                 strategy_factory: Union[str, Callable[..., Any]],
+                 param_grid: Union[Dict[str, Iterable[Any]], List[Dict[str, Any]]],
+                 max_workers: Optional[int] = None, rank_by: str = "sharpe_ratio",
+                 engine_kwargs: Optional[Dict[str, Any]] = None, logger=None):
+        """
+        :param data: OHLCV DataFrame or dict of arrays.
+        :param strategy_factory: Name in STRATEGY_FACTORIES or a picklable
+            top-level callable returning a strategy for ``**params``.
+        :param param_grid: {param: values} grid or an explicit list of param dicts.
+        :param max_workers: Pool size; 0 or 1 runs in-process.
+        :param rank_by: Metric column to sort descending.
+        :param engine_kwargs: Extra BacktestEngine arguments (commission, slippage, ...).
+        """
+        if isinstance(strategy_factory, str) and strategy_factory not in STRATEGY_FACTORIES:
+            raise ValueError(f"Unknown strategy factory '{strategy_factory}'")
+        self.data = data
+        self.strategy_factory = strategy_factory
+        self.param_sets = param_grid if isinstance(param_grid, list) else parameter_grid(param_grid)
+        self.max_workers = os.cpu_count() if max_workers is None else max_workers
+        self.rank_by = rank_by
+        self.engine_kwargs = engine_kwargs or {}
+        self.logger = logger
+        self.n_bars = len(BacktestEngine.extract_arrays(data)["close"])
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.log_event(message)
+
+    def _jobs(self, ranges: List[Tuple[Optional[int], str, int, int]], param_sets=None) -> List[Dict[str, Any]]:
+        jobs = []
+        for fold, phase, start, stop in ranges:
+            for params in (param_sets or self.param_sets):
+                jobs.append({
+                    "job_id": len(jobs), "fold": fold, "phase": phase, "start": start, "stop": stop,
+                    "factory": self.strategy_factory, "params": params, "engine_kwargs": self.engine_kwargs,
+                })
+        return jobs
+
+    def _execute(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        began = time.perf_counter()
+        with SharedOHLCV(self.data) as shared:
+            if self.max_workers and self.max_workers > 1 and len(jobs) > 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(shared.descriptor,)) as pool:
+                    futures = [pool.submit(_run_job, job) for job in jobs]
+                    rows = [future.result() for future in as_completed(futures)]
+            else:
+                _init_worker(shared.descriptor)
+                try:
+                    rows = [_run_job(job) for job in jobs]
+                finally:
+                    self._release_local_worker()
+        self._log(f"[SWEEP] {len(jobs)} jobs finished in {time.perf_counter() - began:.2f}s "
+                  f"with {self.max_workers or 1} workers")
+        return rows
+
+    @staticmethod
+    def _release_local_worker():
+        global _worker_shm, _worker_arrays
+        _worker_arrays = None
+        if _worker_shm is not None:
+            _worker_shm.close()
+            _worker_shm = None
+
+    def _rank(self, rows: List[Dict[str, Any]]) -> pd.DataFrame:
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        table = table.sort_values(self.rank_by, ascending=False, na_position="last", kind="stable")
+        return table.reset_index(drop=True)
+
+    def run(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """Evaluate every parameter set over bars ``[start, stop)``; best first"""
+        stop = self.n_bars if stop is None else stop
+        return self._rank(self._execute(self._jobs([(None, "sweep", start, stop)])))
+
+    def walk_forward(self, n_splits: int = 5, train_size: Optional[int] = None,
+                     test_size: Optional[int] = None, anchored: bool = False) -> Dict[str, Any]:
+        """
+        Optimize on each train window, then score the winning parameters on
+        the following out-of-sample window.
+
+        :return: {"splits", "train" (full ranked table), "test" (one row per fold),
+                  "summary" (out-of-sample aggregates)}
+        """
+        splits = walk_forward_splits(self.n_bars, n_splits, train_size, test_size, anchored)
+        train_rows = self._execute(self._jobs([(s.fold, "train", s.train_start, s.train_stop) for s in splits]))
+        train = self._rank(train_rows)
+
+        test_jobs = []
+        for split in splits:
+            fold_rows = train[(train["fold"] == split.fold) & train["error"].isna()]
+            if fold_rows.empty:
+                continue
+            best = {key: fold_rows.iloc[0][key] for key in self.param_sets[0]}
+            best = {key: value.item() if hasattr(value, "item") else value for key, value in best.items()}
+            test_jobs.extend(self._jobs([(split.fold, "test", split.test_start, split.test_stop)], [best]))
+        for job_id, job in enumerate(test_jobs):
+            job["job_id"] = job_id
+
+        test = pd.DataFrame(self._execute(test_jobs)) if test_jobs else pd.DataFrame()
+        if not test.empty:
+            test = test.sort_values("fold").reset_index(drop=True)
+
+        summary = {}
+        if not test.empty:
+            summary = {
+                "folds": len(test),
+                "mean_sharpe_ratio": float(test["sharpe_ratio"].mean()),
+                "total_pnl": float(test["total_pnl"].sum()),
+                "worst_drawdown_pct": float(test["max_drawdown_pct"].max()),
+                "mean_win_rate": float(test["win_rate"].mean()),
+            }
+        return {"splits": splits, "train": train, "test": test, "summary": summary}
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(11)
+    close = 250 * np.exp(np.cumsum(rng.normal(0, 0.004, 20000)))
+    sample = pd.DataFrame({
+        "open": close * (1 + rng.normal(0, 0.001, close.size)),
+        "high": close * (1 + rng.uniform(0, 0.003, close.size)),
+        "low": close * (1 - rng.uniform(0, 0.003, close.size)),
+        "close": close,
+        "volume": rng.integers(1000, 5000, close.size),
+    })
+    sweep = ParameterSweep(sample, "vwap", {"vwap_period": [10, 20, 30], "confidence_threshold": [0.5, 0.7]})
+    print(sweep.run().head(10).to_string())
+    print(sweep.walk_forward(n_splits=3)["summary"])
@@ -22,6 +22,17 @@ async def get_gcs_log_content(
     """Get the content of a specific log file from GCS."""
     return await log_service.get_gcs_log_content(file_path=file_path)
 
+@router.get("/archive/trades")
+async def get_archived_trades(
+    log_service: LogService = Depends(get_log_service),
+    days: int = 30,
+    bot_type: Optional[str] = None,
+    strategy: Optional[str] = None,
+    limit: int = 1000
+) -> List[Dict[str, Any]]:
+    """Query archived trades, e.g. last 30 days for one bot and strategy."""
+    return await log_service.query_archived_trades(days=days, bot_type=bot_type, strategy=strategy, limit=limit)
+
 @router.get("/firestore")
 async def get_firestore_logs(
     log_service: LogService = Depends(get_log_service),
@@ -1,9 +1,12 @@
 import os
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from google.cloud import storage, firestore
 from kubernetes import client, config
 
+from runner.enhanced_logging.parquet_archive import ParquetArchive
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,8 @@ class LogService:
             self.firestore_db = None
 
         self.gcs_bucket_name = os.getenv("GCS_LOG_BUCKET", "tron-trade-logs")
+        self.analytics_bucket_name = os.getenv("GCS_ANALYTICS_BUCKET", "tron-analytics-data")
+        self._parquet_archive = None
 
         try:
             # Load K8s config. In-cluster config for production, kubeconfig for local dev.
@@ -57,6 +62,23 @@ class LogService:
             logger.error(f"Error fetching GCS file content for {file_path}: {e}")
             return {"error": str(e)}
 
+    async def query_archived_trades(self, days: int = 30, bot_type: Optional[str] = None,
+                                    strategy: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Scans the compacted Parquet trade archive with partition and statistics pruning."""
+        if not self.gcs_client:
+            return [{"error": "GCS client not initialized."}]
+        try:
+            if self._parquet_archive is None:
+                self._parquet_archive = ParquetArchive.for_client(self.gcs_client, self.analytics_bucket_name)
+            filters = {"strategy": strategy} if strategy else {}
+            rows = await asyncio.to_thread(
+                self._parquet_archive.scan, "trades", days=days, bot_type=bot_type, **filters
+            )
+            return rows[:limit]
+        except Exception as e:
+            logger.error(f"Error scanning archived trades: {e}")
+            return [{"error": str(e)}]
+
     async def get_firestore_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Retrieves recent logs from the 'system_logs_realtime' collection in Firestore."""
         if not self.firestore_db:
@@ -11,12 +11,14 @@ import pytz
 from runner.config import PAPER_TRADE
 from runner.firestore_client import FirestoreClient
 from runner.kiteconnect_manager import KiteConnectManager
+from runner.market_data.instrument_master import get_instrument_master
 from runner.logger import TradingLogger, LogLevel, LogCategory
 from runner.strategy_factory import load_strategy
 from runner.trade_manager import simulate_exit, execute_trade, create_trade_manager
 from runner.enhanced_logging import create_trading_logger
 from runner.risk_governor import RiskGovernor
 from runner.position_monitor import PositionMonitor
+from runner.trading_loop import BotPipeline, run_trading_loop
 
 def create_enhanced_logger(*args, **kwargs):
     """Wrapper for backward compatibility"""
@@ -103,13 +105,12 @@ def graceful_exit_if_off_hours(kite):
 
 
 def get_realtime_futures_data(kite):
-    instruments = kite.instruments(exchange="NFO")
-    for ins in instruments:
-        if ins["name"] == "NIFTY" and ins["instrument_type"] == "FUT":
-            return {
-                "symbol": ins["tradingsymbol"],
-                "token": ins["instrument_token"],
-            }
+    ins = get_instrument_master(kite, "NFO").future("NIFTY")
+    if ins:
+        return {
+            "symbol": ins["tradingsymbol"],
+            "token": ins["instrument_token"],
+        }
     return None
 
 
@@ -138,7 +139,7 @@ def wait_for_daily_plan(firestore_client, today_date, logger, max_wait_minutes=1
 
 
 class FuturesTrader:
-    def __init__(self, strategy_name: str, paper_trade: bool = False):
+    def __init__(self, strategy_name: str, paper_trade: bool = False, position_monitor: PositionMonitor = None):
         self.strategy_name = strategy_name
         self.paper_trade = paper_trade
         
@@ -149,12 +150,15 @@ class FuturesTrader:
         self.risk_governor = RiskGovernor(self.logger)
         self.trade_manager = create_trade_manager(
             logger=self.logger, 
-            kite_manager=self.kite_manager
+            kite_manager=self.kite_manager,
+            position_monitor=position_monitor
         )
-        self.position_monitor = PositionMonitor(
+        # Bots run together share one monitor for all their open positions
+        self.position_monitor = position_monitor or PositionMonitor(
             logger=self.logger,
             kite_manager=self.kite_manager
         )
+        self.strategy = self._get_strategy(strategy_name)
         
         self.logger.log_info(f"FuturesTrader for '{self.strategy_name}' initialized.")
 
@@ -168,36 +172,47 @@ class FuturesTrader:
             return None
         return load_strategy(strategy_name, self.kite_manager.get_kite_client(), self.logger)
 
+    def build_pipeline(self) -> BotPipeline:
+        """Futures bot as a TradingLoop pipeline (one analyze() per cycle)"""
+        return BotPipeline(
+            name="futures-trader",
+            evaluate=self._analyze,
+            execute=self._execute_signal,
+            interval=60,
+            is_active=is_market_open,
+        )
+
+    def _analyze(self):
+        strategy = getattr(self, "strategy", None)
+        if not strategy:
+            self.logger.log_event("[ERROR] Strategy object not loaded.")
+            return None
+        trade_signal = strategy.analyze()
+        if not trade_signal:
+            self.logger.log_event("[WAIT] No valid trade signal.")
+        return trade_signal
+
+    def _execute_signal(self, trade_signal):
+        self.logger.log_event(f"[TRADE] Executing trade: {trade_signal}")
+        # Execute trade in both paper and live mode
+        try:
+            result = execute_trade(trade_signal, paper_mode=self.paper_trade)
+            if result:
+                self.logger.log_event(f"[SUCCESS] Futures trade executed successfully: {result}")
+            else:
+                self.logger.log_event(f"[FAILED] Futures trade execution failed")
+            return result
+        except Exception as trade_error:
+            self.logger.log_event(f"[ERROR] Futures trade execution exception: {trade_error}")
+
     def run(self):
         """Main loop for the futures trader."""
         self.logger.log_info(f"Starting FuturesTrader with strategy: {self.strategy_name}")
         
-        while True:
-            try:
-                if self.strategy:
-                    trade_signal = self.strategy.analyze()
-                    if trade_signal:
-                        self.logger.log_event(f"[TRADE] Executing trade: {trade_signal}")
-                        # Execute trade in both paper and live mode
-                        try:
-                            result = execute_trade(trade_signal, paper_mode=self.paper_trade)
-                            if result:
-                                self.logger.log_event(f"[SUCCESS] Futures trade executed successfully: {result}")
-                            else:
-                                self.logger.log_event(f"[FAILED] Futures trade execution failed")
-                        except Exception as trade_error:
-                            self.logger.log_event(f"[ERROR] Futures trade execution exception: {trade_error}")
-                    else:
-                        self.logger.log_event("[WAIT] No valid trade signal.")
-                else:
-                    self.logger.log_event("[ERROR] Strategy object not loaded.")
-            except KeyboardInterrupt:
-                self.logger.log_info("FuturesTrader stopped by user.")
-                break
-            except Exception as e:
-                self.logger.log_error(f"An unexpected error occurred in FuturesTrader: {e}", exc_info=True)
-                # Wait longer after an error
-                time.sleep(60)
+        try:
+            run_trading_loop([self.build_pipeline()], self.position_monitor, logger=self.logger)
+        except KeyboardInterrupt:
+            self.logger.log_info("FuturesTrader stopped by user.")
 
 
 def run_futures_trader(strategy_name: str, paper_trade: bool = False):
@@ -5,21 +5,18 @@ Provides text embedding functionality for the TRON trading system.
 
 from typing import List
 import numpy as np
-import os
 
-# Try to import OpenAI for real embeddings
-try:
-    import openai
-    from runner.openai_manager import OpenAIManager
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+from .embedding_service import DEFAULT_MODEL, get_embedding_service
 
 
-def get_embedding(text: str, model: str = "text-embedding-ada-002") -> List[float]:
+def get_embedding(text: str, model: str = DEFAULT_MODEL) -> List[float]:
     """
     Get embedding for a text using OpenAI's embedding API
     
+    Goes through the shared embedding service, so repeated texts are served
+    from the on-disk cache. Without an OpenAI key (or if the API keeps
+    failing) the deterministic local backend is used instead.
+    
     Args:
         text: Text to embed
         model: OpenAI model to use for embedding
@@ -27,30 +24,10 @@ def get_embedding(text: str, model: str = "text-embedding-ada-002") -> List[floa
     Returns:
         List of floats representing the embedding
     """
-    if OPENAI_AVAILABLE:
-        try:
-            # Try to use OpenAI for real embeddings
-            openai_manager = OpenAIManager()
-            client = openai_manager.get_client()
-            
-            if client:
-                response = client.embeddings.create(
-                    input=text,
-                    model=model
-                )
-                return response.data[0].embedding
-        except Exception as e:
-            print(f"Warning: OpenAI embedding failed, using fallback: {e}")
-
-    # Fallback implementation that returns a random embedding
-    # In a real implementation, this would call the OpenAI API
-    # Create a random embedding of the correct dimension (1536 for text-embedding-ada-002)
-    dimension = 1536
-    random_embedding = np.random.normal(0, 1, dimension).tolist()
-    return random_embedding
+    return get_embedding_service(model).embed_one(text).tolist()
 
 
-def embed_text(text: str, logger=None, model: str = "text-embedding-ada-002") -> List[float]:
+def embed_text(text: str, logger=None, model: str = DEFAULT_MODEL) -> List[float]:
     """
     Embed text with logging support (alias for get_embedding with logging)
     
@@ -84,11 +61,14 @@ def embed_text(text: str, logger=None, model: str = "text-embedding-ada-002") ->
         return []
 
 
-def embed_batch(texts: List[str], model: str = "text-embedding-ada-002", 
+def embed_batch(texts: List[str], model: str = DEFAULT_MODEL, 
                 logger=None) -> List[List[float]]:
     """
     Embed multiple texts in batch for efficiency
     
+    Identical texts are embedded once, cached texts are not re-embedded and
+    the rest go out as batched requests (see ``embedding_service``).
+    
     Args:
         texts: List of texts to embed
         model: OpenAI model to use for embedding
@@ -101,10 +81,7 @@ def embed_batch(texts: List[str], model: str = "text-embedding-ada-002",
         if logger:
             logger.log_event(f"[RAG] Batch embedding {len(texts)} texts")
         
-        embeddings = []
-        for text in texts:
-            embedding = get_embedding(text, model)
-            embeddings.append(embedding)
+        embeddings = get_embedding_service(model).embed(texts).tolist()
         
         if logger:
             logger.log_event(f"[RAG] Generated {len(embeddings)} embeddings")
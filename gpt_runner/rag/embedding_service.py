@@ -0,0 +1,312 @@
+"""
+Embedding service for RAG (Retrieval Augmented Generation).
+
+All embedding in the RAG pipeline goes through ``EmbeddingService.embed``:
+
+- identical texts in a call are embedded once
+- vectors already computed for a text are read from ``EmbeddingCache``, a
+  SQLite table keyed by a hash of (backend name, text), so re-embedding a
+  log that only grew costs one request for the new content
+- the remaining texts are sent in batches (many inputs per request, up to
+  ``batch_size`` texts / ``max_batch_chars`` characters) with at most
+  ``max_concurrency`` requests in flight; failed batches are retried with
+  backoff and then, if a ``fallback`` backend is set, embedded by it
+  (fallback vectors are not cached)
+
+Backends expose ``name`` (part of the cache key), ``dimension`` and
+``embed(texts) -> float32 array``. ``LocalHashEmbeddingBackend`` is a
+deterministic bag-of-words hashing embedder that needs no network; it is
+the fallback when OpenAI is unavailable and the backend for offline tests
+(``EMBEDDING_BACKEND=local``).
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "text-embedding-ada-002"
+DEFAULT_DIMENSION = 1536
+DEFAULT_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("vector_store", "embedding_cache.sqlite"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class LocalHashEmbeddingBackend:
+    """Deterministic embeddings from hashed word unigrams and bigrams"""
+
+    def __init__(self, dimension: int = DEFAULT_DIMENSION):
+        self.dimension = dimension
+        self.name = f"local-hash:{dimension}"
+
+    def _features(self, text: str):
+        tokens = _TOKEN_RE.findall(text.lower()) or [text]
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        digests = [int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest(), 'little')
+                   for f in features]
+        digests = np.array(digests, dtype=np.uint64)
+        slots = (digests % np.uint64(self.dimension)).astype(np.int64)
+        signs = np.where((digests >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32)
+        return slots, signs
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            slots, signs = self._features(text)
+            np.add.at(vectors[row], slots, signs)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class OpenAIEmbeddingBackend:
+    """OpenAI embeddings, one request per batch of inputs"""
+
+    def __init__(self, model: str = DEFAULT_MODEL, client=None, dimension: int = DEFAULT_DIMENSION):
+        self.model = model
+        self.client = client
+        self.dimension = dimension
+        self.name = f"openai:{model}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self.client is not None:
+            response = self.client.embeddings.create(input=texts, model=self.model)
+            data = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        else:
+            # Module-level API of openai < 1.0
+            response = openai.Embedding.create(input=texts, model=self.model)
+            data = [item['embedding'] for item in sorted(response['data'], key=lambda item: item['index'])]
+        return np.asarray(data, dtype=np.float32)
+
+
+class SentenceTransformerBackend:
+    """Local SentenceTransformer model"""
+
+    def __init__(self, model, model_name: str):
+        self.model = model
+        self.name = f"sentence-transformers:{model_name}"
+        self.dimension = model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, batch_size=64), dtype=np.float32)
+
+
+class EmbeddingCache:
+    """Persistent content-hash -> float32 vector map"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL) "
+                        "WITHOUT ROWID")
+
+    @staticmethod
+    def key(backend_name: str, text: str) -> bytes:
+        return hashlib.blake2b(f"{backend_name}\0{text}".encode('utf-8'), digest_size=16).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self.db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Iterable) -> None:
+        with self._lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                                ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
+
+
+class EmbeddingService:
+    """Deduplicated, cached, batched and concurrent embedding"""
+
+    def __init__(self, backend, cache: Optional[EmbeddingCache] = None, batch_size: int = 256,
+                 max_batch_chars: int = 400_000, max_concurrency: int = 4, max_attempts: int = 3,
+                 fallback=None):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_batch_chars = max_batch_chars
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.fallback = fallback
+        self._pool = None
+
+        self.stats = {
+            'texts': 0,
+            'unique_texts': 0,
+            'cache_hits': 0,
+            'embedded': 0,
+            'requests': 0,
+            'retries': 0,
+            'fallback': 0,
+        }
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        batches, batch, chars = [], [], 0
+        for text in texts:
+            if batch and (len(batch) >= self.batch_size or chars + len(text) > self.max_batch_chars):
+                batches.append(batch)
+                batch, chars = [], 0
+            batch.append(text)
+            chars += len(text)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _embed_batch(self, batch: List[str]):
+        """(vectors, from primary backend, requests made) for one batch; runs on pool threads"""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                vectors = self.backend.embed(batch)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"backend returned {len(vectors)} vectors for {len(batch)} texts")
+                return vectors, True, attempt
+            except Exception as e:
+                if attempt < self.max_attempts:
+                    time.sleep(0.5 * 2 ** (attempt - 1))
+                    continue
+                if self.fallback is None:
+                    raise
+                logger.warning(f"Embedding {len(batch)} texts with {self.backend.name} failed, "
+                               f"using {self.fallback.name}: {e}")
+                return self.fallback.embed(batch), False, attempt
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed ``texts``; row i of the result is the vector of ``texts[i]``"""
+        texts = list(texts)
+        self.stats['texts'] += len(texts)
+        unique = list(dict.fromkeys(texts))
+        self.stats['unique_texts'] += len(unique)
+
+        vectors: Dict[str, np.ndarray] = {}
+        keys = {}
+        if self.cache is not None and unique:
+            keys = {text: EmbeddingCache.key(self.backend.name, text) for text in unique}
+            cached = self.cache.get_many(list(keys.values()))
+            for text, key in keys.items():
+                if key in cached:
+                    vectors[text] = cached[key]
+            self.stats['cache_hits'] += len(vectors)
+
+        missing = [text for text in unique if text not in vectors]
+        if missing:
+            batches = self._batches(missing)
+            if len(batches) > 1 and self.max_concurrency > 1:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix="embedding")
+                results = list(self._pool.map(self._embed_batch, batches))
+            else:
+                results = [self._embed_batch(batch) for batch in batches]
+
+            new_entries = []
+            for batch, (batch_vectors, cacheable, requests) in zip(batches, results):
+                self.stats['requests'] += requests
+                self.stats['retries'] += requests - 1
+                if not cacheable:
+                    self.stats['fallback'] += len(batch)
+                for text, vector in zip(batch, batch_vectors):
+                    vectors[text] = vector
+                    if cacheable and self.cache is not None:
+                        new_entries.append((keys[text], vector))
+            if new_entries:
+                self.cache.put_many(new_entries)
+            self.stats['embedded'] += len(missing)
+
+        if not texts:
+            return np.empty((0, self.backend.dimension), dtype=np.float32)
+        return np.stack([vectors[text] for text in texts]).astype(np.float32, copy=False)
+
+    def embed_one(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, 'backend': self.backend.name,
+                'cached_vectors': len(self.cache) if self.cache is not None else 0}
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self.cache is not None:
+            self.cache.close()
+
+
+def _openai_api_key() -> Optional[str]:
+    key = os.getenv("OPENAI_API_KEY") or getattr(openai, "api_key", None)
+    if key:
+        return key
+    try:
+        from runner.openai_manager import get_openai_manager
+        return get_openai_manager().api_key
+    except Exception:
+        return None
+
+
+def default_backend(model: str = DEFAULT_MODEL):
+    """OpenAI when a key is available (and ``EMBEDDING_BACKEND`` is not ``local``), else the local backend"""
+    if os.getenv("EMBEDDING_BACKEND", "").lower() != "local" and OPENAI_AVAILABLE:
+        api_key = _openai_api_key()
+        if api_key:
+            client = openai.OpenAI(api_key=api_key) if hasattr(openai, "OpenAI") else None
+            return OpenAIEmbeddingBackend(model, client=client)
+    return LocalHashEmbeddingBackend(DEFAULT_DIMENSION)
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model: str = DEFAULT_MODEL, cache_path: Optional[str] = None) -> EmbeddingService:
+    """Shared service per model, cached at ``cache_path`` (``EMBEDDING_CACHE_PATH``)"""
+    with _services_lock:
+        service = _services.get(model)
+        if service is None:
+            backend = default_backend(model)
+            fallback = None
+            if not isinstance(backend, LocalHashEmbeddingBackend):
+                fallback = LocalHashEmbeddingBackend(backend.dimension)
+            service = EmbeddingService(backend, cache=EmbeddingCache(cache_path or DEFAULT_CACHE_PATH),
+                                       fallback=fallback)
+            _services[model] = service
+        return service
+
+
+def close_embedding_services() -> None:
+    with _services_lock:
+        for service in _services.values():
+            service.close()
+        _services.clear()
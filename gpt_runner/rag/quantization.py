@@ -0,0 +1,253 @@
+"""
+Compressed FAISS indexes for RAG embeddings.
+
+A compressed index keeps short codes per vector in RAM instead of the
+float32 rows (``4 * dimension`` bytes, 6 KB for 1536-d embeddings):
+
+- ``fp16``: 16-bit scalar quantizer, 2x smaller, near-exact scores
+- ``int8``: 8-bit scalar quantizer trained on per-dimension ranges, 4x
+- ``pq``: IVF-PQ with ``dimension / 4`` 8-bit sub-quantizers, ~16x
+  (codes plus an 8-byte id per vector), searching ``nprobe`` of
+  ``~4 * sqrt(n)`` inverted lists; corpora under 256 vectors get fewer
+  bits per code
+
+Scores from the codes are approximate, so callers fetch ``rerank_factor``
+times more candidates than asked for and ``rerank`` them against the
+exact vectors, which stay on disk and are read through a memory map
+(``VectorFile``); only the candidate rows are paged in.
+
+``python -m gpt_runner.rag.quantization`` prints a recall-versus-latency
+comparison of these indexes against the exact flat index.
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+QUANTIZATIONS = ("fp16", "int8", "pq")
+DEFAULT_RERANK_FACTOR = 4
+PQ_NPROBE = 16
+MAX_TRAINING_VECTORS = 100_000
+
+_SCALAR_TYPES = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+def normalize_quantization(quantization: Optional[str]) -> Optional[str]:
+    """``None`` for an exact index, else one of ``QUANTIZATIONS``"""
+    if quantization is None or quantization.lower() in ("", "none", "flat"):
+        return None
+    quantization = quantization.lower()
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization {quantization!r}, expected one of {QUANTIZATIONS}")
+    return quantization
+
+
+def pq_subquantizers(dimension: int) -> int:
+    """Largest divisor of ``dimension`` up to ``dimension / 4`` (one code byte per 4+ floats)"""
+    for m in range(max(1, dimension // 4), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+
+def new_compressed_index(dimension: int, quantization: str, size: int) -> faiss.Index:
+    """Untrained inner-product index of kind ``quantization`` sized for ``size`` vectors"""
+    if quantization in _SCALAR_TYPES:
+        return faiss.IndexScalarQuantizer(dimension, _SCALAR_TYPES[quantization], faiss.METRIC_INNER_PRODUCT)
+
+    # At least 39 training points per list, as FAISS recommends, and no
+    # more sub-quantizer centroids than training points
+    nlist = max(1, min(int(4 * np.sqrt(size)), size // 39))
+    nbits = int(min(8, max(1, np.log2(max(size, 2)))))
+    quantizer = faiss.IndexFlatIP(dimension)
+    index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_subquantizers(dimension), nbits,
+                             faiss.METRIC_INNER_PRODUCT)
+    index.nprobe = min(PQ_NPROBE, nlist)
+    return index
+
+
+def train_and_add(index: faiss.Index, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> faiss.Index:
+    """Train ``index`` on (a sample of) ``vectors`` if needed, then add them"""
+    if not index.is_trained:
+        sample = vectors
+        if len(vectors) > MAX_TRAINING_VECTORS:
+            picks = np.random.default_rng(0).choice(len(vectors), MAX_TRAINING_VECTORS, replace=False)
+            sample = vectors[np.sort(picks)]
+        index.train(np.ascontiguousarray(sample, dtype="float32"))
+    if ids is None:
+        index.add(vectors)
+    else:
+        index.add_with_ids(vectors, ids)
+    return index
+
+
+def is_compressed(index: faiss.Index) -> bool:
+    """True for indexes whose scores come from codes rather than the stored floats"""
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    return isinstance(index, (faiss.IndexScalarQuantizer, faiss.IndexIVFPQ))
+
+
+def bytes_per_vector(index: faiss.Index) -> float:
+    """Approximate resident bytes per vector (codes plus stored ids)"""
+    ids = 0
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+        ids = 8
+    if isinstance(index, faiss.IndexIVF):
+        return index.code_size + 8 + ids
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return index.code_size + ids
+    if hasattr(index, "hnsw"):
+        return 4 * index.d + 4 * 2 * index.hnsw.nb_neighbors(1) + ids  # floats + level-0 links
+    return 4 * index.d + ids
+
+
+def rerank(queries: np.ndarray, candidates: np.ndarray, exact_rows: Callable[[np.ndarray], np.ndarray],
+           top_k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Re-score ``candidates`` (one row of ids per query, -1 for none) with
+    the exact vectors and keep the ``top_k`` best, as ``(ids, scores)``
+    """
+    results = []
+    for query, ids in zip(queries, candidates):
+        ids = ids[ids >= 0]
+        if not len(ids):
+            results.append((ids, np.empty(0, dtype="float32")))
+            continue
+        order = np.argsort(ids)  # sequential reads from the memory map
+        scores = np.empty(len(ids), dtype="float32")
+        scores[order] = exact_rows(ids[order]) @ query
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        results.append((ids[best], scores[best]))
+    return results
+
+
+class VectorFile:
+    """Append-only float32 rows on disk, read back through a memory map"""
+
+    def __init__(self, path: str, dimension: int, truncate: bool = False):
+        self.path = path
+        self.dimension = dimension
+        self._row_bytes = 4 * dimension
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "wb" if truncate else "ab")
+        self._map = None
+
+    def __len__(self) -> int:
+        return self._file.tell() // self._row_bytes
+
+    def append(self, rows: np.ndarray) -> int:
+        """Write ``rows``; returns the row number of the first one"""
+        first = len(self)
+        self._file.write(np.ascontiguousarray(rows, dtype="float32").tobytes())
+        self._file.flush()
+        return first
+
+    def rows(self, ids: np.ndarray) -> np.ndarray:
+        count = len(self)
+        if self._map is None or len(self._map) < count:
+            self._map = np.memmap(self.path, dtype="float32", mode="r", shape=(count, self.dimension))
+        return np.asarray(self._map[ids])
+
+    def reopen(self):
+        """Pick up a file replaced on disk (e.g. downloaded)"""
+        self._map = None
+        self._file.close()
+        self._file = open(self.path, "ab")
+
+    def close(self):
+        self._map = None
+        self._file.close()
+
+
+# Benchmark
+
+def _embedding_like_vectors(n: int, rng: np.random.Generator, centers: np.ndarray,
+                           basis: np.ndarray) -> np.ndarray:
+    """Unit vectors with a low intrinsic dimension: clustered latent points, projected, plus noise"""
+    latent = centers[rng.integers(len(centers), size=n)] + rng.standard_normal((n, basis.shape[0]), dtype="float32")
+    vectors = latent @ basis + 0.5 * rng.standard_normal((n, basis.shape[1]), dtype="float32")
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def benchmark(n: int = 100_000, dimension: int = 384, queries: int = 200, top_k: int = 10,
+              rerank_factor: int = DEFAULT_RERANK_FACTOR, seed: int = 0) -> List[Dict[str, float]]:
+    """
+    Recall@``top_k`` (against exact search) and single-query latency of
+    each compressed index, with and without re-ranking
+    """
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((48, dimension), dtype="float32")
+    centers = 2 * rng.standard_normal((max(8, n // 400), 48), dtype="float32")
+    data = _embedding_like_vectors(n, rng, centers, basis)
+    query_vectors = _embedding_like_vectors(queries, rng, centers, basis)
+
+    flat = faiss.IndexFlatIP(dimension)
+    flat.add(data)
+    _, truth = flat.search(query_vectors, top_k)
+
+    def exact_rows(ids):
+        return data[ids]
+
+    def run(name, index, rerank_with=None):
+        started = time.perf_counter()
+        found = []
+        for query in query_vectors:
+            query = query[None, :]
+            if rerank_with is None:
+                _, ids = index.search(query, top_k)
+                found.append(ids[0])
+            else:
+                _, ids = index.search(query, top_k * rerank_with)
+                found.append(rerank(query, ids, exact_rows, top_k)[0][0])
+        elapsed = time.perf_counter() - started
+        recall = np.mean([len(np.intersect1d(f, t)) / top_k for f, t in zip(found, truth)])
+        size = bytes_per_vector(index)
+        return {
+            'index': name,
+            'bytes_per_vector': size,
+            'compression': 4 * dimension / size,
+            'recall': float(recall),
+            'ms_per_query': 1000 * elapsed / queries,
+        }
+
+    results = [run("flat", flat)]
+    for quantization in QUANTIZATIONS:
+        started = time.perf_counter()
+        index = train_and_add(new_compressed_index(dimension, quantization, n), data)
+        build_seconds = time.perf_counter() - started
+        for rerank_with in (None, rerank_factor):
+            name = quantization if rerank_with is None else f"{quantization}+rerank{rerank_with}"
+            results.append({**run(name, index, rerank_with), 'build_seconds': build_seconds})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recall vs latency of compressed FAISS indexes")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=DEFAULT_RERANK_FACTOR)
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.vectors, args.dimension, args.queries, args.top_k, args.rerank_factor)
+    print(f"{'index':<16}{'bytes/vec':>10}{'compress':>10}{'recall@' + str(args.top_k):>11}{'ms/query':>10}")
+    for row in results:
+        print(f"{row['index']:<16}{row['bytes_per_vector']:>10.0f}{row['compression']:>9.1f}x"
+              f"{row['recall']:>11.3f}{row['ms_per_query']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 RAG Worker module for embedding logs and other data for retrieval.
 """
 
+import json
 import logging
 import os
 from datetime import datetime
@@ -10,7 +11,7 @@ from typing import Any, Dict, List, Optional
 from runner.firestore_client import FirestoreClient, fetch_recent_trades
 from runner.logger import Logger
 
-from .embedder import embed_text
+from .embedder import embed_batch, embed_text
 from .vector_store import save_to_vector_store
 
 # Configure logging
@@ -77,11 +78,11 @@ def embed_trades(bot_name: str, trades: List[Dict[str, Any]]) -> None:
         bot_name: Name of the bot
         trades: List of trade data to embed
     """
-    vector_data = []
+    trade_texts = []
 
     for trade in trades:
         # Create a text representation of the trade
-        trade_text = f"""
+        trade_texts.append(f"""
 Bot: {bot_name}
 Symbol: {trade.get('symbol', 'unknown')}
 Strategy: {trade.get('strategy', 'unknown')}
@@ -92,12 +93,13 @@ Exit Price: {trade.get('exit_price', 0)}
 PnL: {trade.get('pnl', 0)}
 Status: {trade.get('status', 'unknown')}
 Notes: {trade.get('notes', '')}
-"""
+""")
 
-        # Embed the text
-        embedding = embed_text(trade_text)
+    # Embed all trades in one batch
+    embeddings = embed_batch(trade_texts)
 
-        # Add to vector data
+    vector_data = []
+    for trade, trade_text, embedding in zip(trades, trade_texts, embeddings):
         vector_data.append(
             {
                 "text": trade_text,
@@ -120,14 +122,32 @@ def embed_log_file(bot_name: str, log_path: str, chunk_size: int = 1000) -> None
     """
     Embed log file content and save to vector store.
 
+    Only the lines appended since the previous run are embedded: the byte
+    offset reached is kept in ``<log_path>.embedded``. A trailing line
+    without a newline is still being written and is left for the next run.
+
     Args:
         bot_name: Name of the bot
         log_path: Path to the log file
         chunk_size: Size of chunks to split the log file into
     """
     try:
-        with open(log_path, "r") as f:
-            log_content = f.read()
+        progress_path = f"{log_path}.embedded"
+        progress = {"offset": 0, "chunks": 0}
+        if os.path.exists(progress_path):
+            with open(progress_path, "r") as f:
+                progress.update(json.load(f))
+
+        with open(log_path, "rb") as f:
+            if progress["offset"] > os.fstat(f.fileno()).st_size:
+                progress = {"offset": 0, "chunks": 0}  # file was truncated or replaced
+            f.seek(progress["offset"])
+            new_bytes = f.read()
+
+        end = new_bytes.rfind(b"\n") + 1
+        if end == 0:
+            return
+        log_content = new_bytes[:end].decode("utf-8", errors="replace")
 
         # Split into chunks
         chunks = [
@@ -135,12 +155,11 @@ def embed_log_file(bot_name: str, log_path: str, chunk_size: int = 1000) -> None
             for i in range(0, len(log_content), chunk_size)
         ]
 
-        vector_data = []
-        for i, chunk in enumerate(chunks):
-            # Embed the chunk
-            embedding = embed_text(chunk)
+        # Embed all chunks in one batch
+        embeddings = embed_batch(chunks)
 
-            # Add to vector data
+        vector_data = []
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
             vector_data.append(
                 {
                     "text": chunk,
@@ -148,15 +167,17 @@ def embed_log_file(bot_name: str, log_path: str, chunk_size: int = 1000) -> None
                     "metadata": {
                         "type": "log",
                         "bot": bot_name,
-                        "chunk": i,
+                        "chunk": progress["chunks"] + i,
                         "timestamp": datetime.now().isoformat(),
                     },
                 }
             )
 
         # Save to vector store
-        if vector_data:
-            save_to_vector_store(bot_name, vector_data)
+        if vector_data and save_to_vector_store(bot_name, vector_data):
+            progress = {"offset": progress["offset"] + end, "chunks": progress["chunks"] + len(chunks)}
+            with open(progress_path, "w") as f:
+                json.dump(progress, f)
 
     except Exception as e:
         logger.error(f"Error embedding log file {log_path}: {e}")
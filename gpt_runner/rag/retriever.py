@@ -5,12 +5,13 @@ Enhanced with comprehensive logging for tracking and analysis.
 
 import logging
 import time
+from datetime import datetime
 from typing import Any, Dict, List, Tuple
 
 import numpy as np
 
 from .embedder import embed_text
-from .vector_store import load_from_vector_store
+from .vector_store import find_vector_store
 
 # Import enhanced RAG logging
 try:
@@ -25,6 +26,19 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _timestamp_seconds(value) -> float:
+    """Epoch seconds of an ISO string or number; 0 if unparseable"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return 0.0
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
 def retrieve_similar_context(
     query: str,
     limit: int = 5,
@@ -73,9 +87,9 @@ def retrieve_similar_context(
             )
         
         # Load vector store
-        documents, embeddings = load_from_vector_store(bot_name)
+        store = find_vector_store(bot_name)
 
-        if not documents or len(documents) == 0:
+        if store is None or len(store) == 0:
             logger.warning(f"No documents found in vector store for {bot_name}")
             
             if rag_logger and trace_id:
@@ -92,20 +106,11 @@ def retrieve_similar_context(
             
             return []
 
-        # Calculate similarities
-        similarities = []
-        for i, doc_embedding in enumerate(embeddings):
-            # Calculate cosine similarity
-            similarity = np.dot(query_embedding, doc_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding)
-            )
-            similarities.append((documents[i], similarity))
-
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
-
-        # Filter by threshold and limit
-        result = [item for item in similarities if item[1] >= threshold][:limit]
+        # Top-k cosine similarity in the index, threshold applied by the search
+        result = [
+            ({'text': hit['text'], 'metadata': hit['metadata']}, hit['score'])
+            for hit in store.search(query_embedding, top_k=limit, threshold=threshold)
+        ]
         
         retrieval_time_ms = (time.time() - start_time) * 1000
         
@@ -120,7 +125,7 @@ def retrieve_similar_context(
                 retrieved_docs=retrieved_docs,
                 similarity_scores=similarity_scores,
                 retrieval_time_ms=retrieval_time_ms,
-                total_searched=len(documents),
+                total_searched=len(store),
                 threshold=threshold,
                 strategy="semantic"
             )
@@ -175,6 +180,9 @@ def retrieve_with_hybrid_strategy(
 ) -> List[Tuple[Dict[str, Any], float]]:
     """
     Retrieve using hybrid strategy combining semantic similarity and temporal relevance.
+    Candidates are read from the index best-semantic first, in pages, until no
+    unread document could rank in the top ``limit``; with an exact index the
+    result matches scoring every document.
     
     Args:
         query: The query text
@@ -213,43 +221,46 @@ def retrieve_with_hybrid_strategy(
                 }
             )
         
-        # Load documents
-        documents, embeddings = load_from_vector_store(bot_name)
+        store = find_vector_store(bot_name)
         
-        if not documents or len(documents) == 0:
+        if store is None or len(store) == 0:
             logger.warning(f"No documents found for hybrid retrieval: {bot_name}")
             return []
         
-        current_time = time.time()
-        hybrid_scores = []
+        # Temporal relevance is at most 1, so only documents with
+        # (1 - w) * semantic + w >= threshold can qualify; let the index
+        # return just those candidates
+        if temporal_weight < 1:
+            min_semantic = (threshold - temporal_weight) / (1 - temporal_weight)
+        else:
+            min_semantic = -1.0
         
-        for i, (doc, doc_embedding) in enumerate(zip(documents, embeddings)):
-            # Semantic similarity
-            semantic_sim = np.dot(query_embedding, doc_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding)
-            )
-            
-            # Temporal relevance (more recent = higher score)
-            doc_timestamp = doc.get('metadata', {}).get('timestamp', 0)
-            if isinstance(doc_timestamp, str):
-                try:
-                    from datetime import datetime
-                    doc_time = datetime.fromisoformat(doc_timestamp.replace('Z', '+00:00')).timestamp()
-                except:
-                    doc_time = 0
-            else:
-                doc_time = doc_timestamp
+        # Candidates come from the index best-semantic first. A document left
+        # out scores at most (1 - w) * lowest fetched semantic + w, so keep
+        # widening the page until that bound cannot beat the limit-th result
+        current_time = time.time()
+        page = max(limit * 50, 1000)
+        while True:
+            ids, semantic = store.search_ids([query_embedding], top_k=page, threshold=min_semantic)[0]
+            documents = store.get_documents(ids)
             
-            time_diff_hours = (current_time - doc_time) / 3600
-            temporal_score = max(0, 1 - (time_diff_hours / 168))  # Decay over 1 week
+            # Temporal relevance (more recent = higher score), decaying over 1 week
+            doc_times = np.array([_timestamp_seconds(documents[int(i)].get('timestamp', 0)) for i in ids],
+                                 dtype="float64")
+            temporal = np.clip(1 - (current_time - doc_times) / 3600 / 168, 0, 1)
             
-            # Hybrid score
-            hybrid_score = (1 - temporal_weight) * semantic_sim + temporal_weight * temporal_score
-            hybrid_scores.append((doc, hybrid_score))
-        
-        # Sort and filter
-        hybrid_scores.sort(key=lambda x: x[1], reverse=True)
-        result = [item for item in hybrid_scores if item[1] >= threshold][:limit]
+            hybrid = (1 - temporal_weight) * semantic + temporal_weight * temporal
+            order = np.argsort(-hybrid, kind="stable")
+            if len(ids) < page or page >= len(store):
+                break
+            unseen_bound = (1 - temporal_weight) * float(semantic.min()) + temporal_weight
+            if len(order) >= limit and hybrid[order[limit - 1]] >= unseen_bound:
+                break
+            page *= 4
+        result = [
+            ({'text': documents[int(ids[k])]['text'], 'metadata': documents[int(ids[k])]}, float(hybrid[k]))
+            for k in order if hybrid[k] >= threshold
+        ][:limit]
         
         retrieval_time_ms = (time.time() - start_time) * 1000
         
@@ -264,7 +275,7 @@ def retrieve_with_hybrid_strategy(
                 retrieved_docs=retrieved_docs,
                 similarity_scores=scores,
                 retrieval_time_ms=retrieval_time_ms,
-                total_searched=len(documents),
+                total_searched=len(store),
                 threshold=threshold,
                 strategy="hybrid"
             )
@@ -303,24 +314,13 @@ def retrieve_by_category(
         rag_logger = get_rag_logger(session_id, bot_name)
     
     try:
-        documents, _ = load_from_vector_store(bot_name)
+        store = find_vector_store(bot_name)
         
-        if not documents:
+        if store is None:
             return []
         
-        # Filter by category
-        category_docs = [
-            doc for doc in documents 
-            if doc.get('metadata', {}).get('type') == category
-        ]
-        
-        # Sort by timestamp (most recent first)
-        category_docs.sort(
-            key=lambda x: x.get('metadata', {}).get('timestamp', ''),
-            reverse=True
-        )
-        
-        result = category_docs[:limit]
+        # Indexed type filter, most recent first
+        result = store.query_documents(doc_type=category, limit=limit)
         
         # Log category retrieval
         if rag_logger:
@@ -331,7 +331,7 @@ def retrieve_by_category(
                 retrieved_docs=result,
                 similarity_scores=[1.0] * len(result),  # Category match = 100%
                 retrieval_time_ms=(time.time() - start_time) * 1000,
-                total_searched=len(documents),
+                total_searched=len(store),
                 threshold=1.0,
                 strategy="category_filter"
             )
@@ -1,119 +1,583 @@
 """
 Vector Store implementation for RAG (Retrieval Augmented Generation).
-This is a placeholder file to satisfy import requirements.
+
+Each store is a directory ``<base_dir>/<index_name>/`` holding:
+
+- ``index.faiss``: the last snapshot of the FAISS index
+- ``vectors_<base>.log``: raw float32 rows appended since that snapshot,
+  ``<base>`` being the number of vectors before its first row
+- ``metadata.sqlite``: one row per vector (id = FAISS position) with the
+  text, indexed ``type``/``bot``/``timestamp`` columns and the remaining
+  metadata as JSON
+
+Adding vectors appends to the log and inserts their metadata rows, so
+ingest cost is proportional to the new vectors. The index is rewritten
+only when the log passes ``snapshot_every`` rows (or on ``snapshot()`` /
+``close()``); on open, the snapshot is loaded and the log replayed.
+Stores are long-lived: use ``get_vector_store`` instead of constructing
+one per call.
+
+Vectors are L2-normalized on the way in and searched by inner product,
+so scores are cosine similarities. Below ``ann_threshold`` vectors the
+index is exact (``IndexFlatIP``, with similarity thresholds applied by
+``range_search``); above it the store switches to an HNSW graph, or,
+with ``quantization`` set (``VECTOR_STORE_QUANTIZATION``: ``fp16``,
+``int8`` or ``pq``), to a compressed index (see ``quantization.py``).
+Compressed stores never rotate their log: ``vectors_0.log`` is the exact
+copy of every vector, memory-mapped to re-rank the ``rerank_factor *
+top_k`` candidates the compressed index returns.
 """
 
+import glob
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
+from typing import Any, Dict, Iterable, List
 
 import faiss
 import numpy as np
 
+from .quantization import (
+    DEFAULT_RERANK_FACTOR, is_compressed, new_compressed_index, normalize_quantization, rerank, train_and_add
+)
+
+DEFAULT_BASE_DIR = os.getenv("VECTOR_STORE_DIR", "vector_store")
+ANN_THRESHOLD = int(os.getenv("VECTOR_STORE_ANN_THRESHOLD", "50000"))
+QUANTIZATION = os.getenv("VECTOR_STORE_QUANTIZATION", "")
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64
+
+_INDEXED_FIELDS = ("type", "bot", "timestamp")
+_REPLAY_CHUNK_ROWS = 65536
+
 
 class VectorStore:
     """
     Vector Store implementation using FAISS
     """
 
-    def __init__(self, index_name="bot_index", dimension=1536):
+    def __init__(self, index_name="bot_index", dimension=1536, base_dir=None,
+                 snapshot_every=50000, fsync=False, ann_threshold=None, ef_search=HNSW_EF_SEARCH,
+                 quantization=None, rerank_factor=DEFAULT_RERANK_FACTOR):
         self.index_name = index_name
         self.dimension = dimension
+        self.base_dir = base_dir or DEFAULT_BASE_DIR
+        self.path = os.path.join(self.base_dir, index_name)
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.ann_threshold = ANN_THRESHOLD if ann_threshold is None else ann_threshold
+        self.ef_search = ef_search
+        self.quantization = normalize_quantization(QUANTIZATION if quantization is None else quantization)
+        self.rerank_factor = rerank_factor
         self.index = None
-        self.metadata = []
+        self.db = None
+        self._log = None
+        self._log_base = 0
+        self._snapshot_total = 0
+        self._exact = None
+        self._lock = threading.RLock()
         self.initialize()
 
+    # Setup
+
     def initialize(self):
         """
-        Initialize the vector store
+        Open (or create) the store: load the snapshot, replay the vector log
+        and reconcile it with the metadata table
         """
-        # Create a new index if it doesn't exist
-        self.index = faiss.IndexFlatL2(self.dimension)
-        self.metadata = []
+        os.makedirs(self.path, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(self.path, "metadata.sqlite"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "id INTEGER PRIMARY KEY, text TEXT, type TEXT, bot TEXT, timestamp TEXT, metadata TEXT)"
+        )
+        for field in _INDEXED_FIELDS:
+            self.db.execute(f"CREATE INDEX IF NOT EXISTS idx_documents_{field} ON documents({field})")
+        self.db.commit()
+
+        snapshot_path = os.path.join(self.path, "index.faiss")
+        migrate = False
+        if os.path.exists(snapshot_path):
+            self.index = faiss.read_index(snapshot_path)
+            self.dimension = self.index.d
+            if self.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+                # Raw-vector L2 snapshot from before normalized storage
+                self._rebuild(self._as_matrix(self.index.reconstruct_n(0, self.index.ntotal)))
+                migrate = True
+            elif self._is_ann():
+                self.index.hnsw.efSearch = self.ef_search
+        else:
+            self.index = self._new_index(0)
+        self._snapshot_total = self.index.ntotal
+
+        self._replay_logs()
+        if self.quantization and self._log_base != 0:
+            # Rotated logs only hold the rows since the last snapshot
+            self._write_full_log()
+        rebuild = self._is_exact() and self.index.ntotal >= self.ann_threshold
+        if is_compressed(self.index) and not self.quantization:
+            rebuild = True  # quantization was switched off; the full log has the exact rows
+        elif self.quantization and not self._is_exact() and not is_compressed(self.index):
+            rebuild = True  # HNSW store being compressed
+        if rebuild:
+            self._rebuild(self._exact_rows(0, self.index.ntotal))
+        if migrate or rebuild:
+            self._write_snapshot()
 
-        # Load existing index if available
-        if os.path.exists(f"{self.index_name}.faiss"):
+        # A crash between the vector append and the metadata commit leaves
+        # extra vectors; drop them (and any metadata rows without a vector)
+        documents = self._count_documents()
+        if self.index.ntotal > documents:
+            self._truncate_vectors(documents)
+        elif documents > self.index.ntotal:
+            self.db.execute("DELETE FROM documents WHERE id >= ?", (self.index.ntotal,))
+            self.db.commit()
+
+        if self.index.ntotal == 0:
+            self._import_legacy_files()
+
+    def _log_files(self):
+        logs = []
+        for path in glob.glob(os.path.join(self.path, "vectors_*.log")):
             try:
-                self.index = faiss.read_index(f"{self.index_name}.faiss")
-                with open(f"{self.index_name}_metadata.json", "r") as f:
-                    self.metadata = json.load(f)
-            except Exception as e:
-                print(f"Error loading index: {e}")
+                logs.append((int(os.path.basename(path)[len("vectors_"):-len(".log")]), path))
+            except ValueError:
+                continue
+        return sorted(logs)
+
+    def _replay_logs(self):
+        row_bytes = self.dimension * 4
+        for base, path in self._log_files():
+            size = os.path.getsize(path)
+            if size % row_bytes:  # torn last row
+                with open(path, "r+b") as f:
+                    f.truncate(size - size % row_bytes)
+            if base > self.index.ntotal:
+                print(f"Vector log {path} starts past the index ({self.index.ntotal} vectors), ignoring it")
+                continue
+            if size < row_bytes:
+                continue
+            rows = np.memmap(path, dtype="float32", mode="r").reshape(-1, self.dimension)
+            # Rows already in the snapshot (crash between snapshot and log rotation)
+            for start in range(self.index.ntotal - base, len(rows), _REPLAY_CHUNK_ROWS):
+                self.index.add(self._as_matrix(rows[start:start + _REPLAY_CHUNK_ROWS]))
+            del rows
+
+        logs = self._log_files()
+        self._log_base = logs[-1][0] if logs and logs[-1][0] <= self.index.ntotal else self.index.ntotal
+        self._open_log()
+
+    def _open_log(self):
+        if self._log is not None:
+            self._log.close()
+        self._log = open(os.path.join(self.path, f"vectors_{self._log_base}.log"), "ab")
+
+    def _count_documents(self) -> int:
+        return self.db.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM documents").fetchone()[0]
+
+    def _write_full_log(self):
+        """Replace the logs with one ``vectors_0.log`` holding every vector"""
+        tmp_path = os.path.join(self.path, "vectors_0.log.tmp")
+        with open(tmp_path, "wb") as f:
+            for start in range(0, self.index.ntotal, _REPLAY_CHUNK_ROWS):
+                count = min(_REPLAY_CHUNK_ROWS, self.index.ntotal - start)
+                f.write(self.index.reconstruct_n(start, count).tobytes())
+        old_logs = self._log_files()
+        self._log.close()
+        os.replace(tmp_path, os.path.join(self.path, "vectors_0.log"))
+        for base, path in old_logs:
+            if base != 0:
+                os.remove(path)
+        self._log_base = 0
+        self._exact = None
+        self._open_log()
+
+    def _exact_rows(self, start: int, stop: int) -> np.ndarray:
+        """Exact (normalized) vectors of positions ``start:stop``"""
+        if stop <= start:
+            return np.empty((0, self.dimension), "float32")
+        if self.quantization or is_compressed(self.index):
+            return np.array(self._exact_log()[start:stop])
+        return self.index.reconstruct_n(start, stop - start)
+
+    def _exact_log(self) -> np.ndarray:
+        """Memory map of the full vector log (compressed stores only)"""
+        rows = self.index.ntotal
+        if self._exact is None or len(self._exact) < rows:
+            self._exact = np.memmap(os.path.join(self.path, "vectors_0.log"), dtype="float32", mode="r",
+                                    shape=(rows, self.dimension))
+        return self._exact
+
+    def _truncate_vectors(self, count: int):
+        self._rebuild(self._exact_rows(0, count))
+        if self.quantization:
+            self._exact = None
+            self._log.truncate(count * self.dimension * 4)
+        self._write_snapshot()
+
+    def _new_index(self, size: int):
+        if size >= self.ann_threshold:
+            if self.quantization:
+                return new_compressed_index(self.dimension, self.quantization, size)
+            index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = self.ef_search
+            return index
+        return faiss.IndexFlatIP(self.dimension)
+
+    def _rebuild(self, vectors: np.ndarray):
+        """Replace the index with one sized for ``vectors`` (already normalized)"""
+        index = self._new_index(len(vectors))
+        if len(vectors):
+            train_and_add(index, vectors)
+        self.index = index
+
+    def _is_ann(self) -> bool:
+        return hasattr(self.index, "hnsw")
+
+    def _is_exact(self) -> bool:
+        return isinstance(self.index, faiss.IndexFlat)
+
+    def _as_matrix(self, vectors) -> np.ndarray:
+        """Unit-length float32 copy of ``vectors``, one row per vector"""
+        matrix = np.array(vectors, dtype="float32").reshape(-1, self.dimension)
+        faiss.normalize_L2(matrix)
+        return matrix
+
+    def _import_legacy_files(self):
+        # Pre-directory layout: <base_dir>/<index_name>.faiss + one JSON metadata list
+        legacy_index = os.path.join(self.base_dir, f"{self.index_name}.faiss")
+        legacy_metadata = os.path.join(self.base_dir, f"{self.index_name}_metadata.json")
+        if not (os.path.exists(legacy_index) and os.path.exists(legacy_metadata)):
+            return
+        try:
+            index = faiss.read_index(legacy_index)
+            with open(legacy_metadata, "r") as f:
+                metadata = json.load(f)
+            count = min(index.ntotal, len(metadata))
+            if count:
+                texts = [item.get("text", "") for item in metadata[:count]]
+                self.add_embeddings(index.reconstruct_n(0, count), texts, metadata[:count])
+                self.snapshot()
+        except Exception as e:
+            print(f"Error importing legacy index {legacy_index}: {e}")
+
+    # Writes
 
     def add_embeddings(self, embeddings, texts, metadata_list=None):
         """
         Add embeddings to the vector store
         """
+        embeddings_np = self._as_matrix(embeddings)
+        if len(embeddings_np) != len(texts):
+            raise ValueError(f"{len(embeddings_np)} embeddings for {len(texts)} texts")
         if metadata_list is None:
-            metadata_list = [{"timestamp": datetime.now().isoformat()} for _ in texts]
+            metadata_list = [None] * len(texts)
+        if not len(texts):
+            return []
 
-        # Convert embeddings to numpy array
-        embeddings_np = np.array(embeddings).astype("float32")
+        now = datetime.now().isoformat()
+        rows = []
+        for i, text in enumerate(texts):
+            metadata = dict(metadata_list[i] or {"timestamp": now})
+            metadata.pop("text", None)
+            rows.append([
+                text,
+                *(None if metadata.get(field) is None else str(metadata.get(field)) for field in _INDEXED_FIELDS),
+                json.dumps(metadata, default=str),
+            ])
 
-        # Add to index
-        self.index.add(embeddings_np)
+        with self._lock:
+            start = self.index.ntotal
+            log_size = self._log.tell()
 
-        # Add metadata
-        for i, text in enumerate(texts):
-            metadata = metadata_list[i]
+            # Vectors first: on a crash before the metadata commit, the
+            # orphaned rows are dropped again on open
+            self._log.write(embeddings_np.tobytes())
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self.index.add(embeddings_np)
+
+            try:
+                with self.db:
+                    self.db.executemany(
+                        "INSERT OR REPLACE INTO documents (id, text, type, bot, timestamp, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                        [(start + i, *row) for i, row in enumerate(rows)],
+                    )
+            except Exception:
+                if self._is_ann():
+                    self._rebuild(self.index.reconstruct_n(0, start))
+                else:
+                    self.index.remove_ids(faiss.IDSelectorRange(start, self.index.ntotal))
+                self._exact = None
+                self._log.truncate(log_size)
+                raise
+
+            if self._is_exact() and self.index.ntotal >= self.ann_threshold:
+                self._rebuild(self._exact_rows(0, self.index.ntotal))
+                self._write_snapshot()
+            elif self.index.ntotal - self._snapshot_total >= self.snapshot_every:
+                self.snapshot()
+
+        return list(range(start, start + len(texts)))
+
+    def snapshot(self):
+        """
+        Write the index and start a new, empty vector log
+        """
+        with self._lock:
+            if self.index.ntotal == self._snapshot_total and os.path.exists(os.path.join(self.path, "index.faiss")):
+                return
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        snapshot_path = os.path.join(self.path, "index.faiss")
+        tmp_path = snapshot_path + ".tmp"
+        faiss.write_index(self.index, tmp_path)
+        os.replace(tmp_path, snapshot_path)
+        self._snapshot_total = self.index.ntotal
+        if self.quantization:
+            return  # the log is the exact copy used for re-ranking
+
+        old_logs = self._log_files()
+        self._exact = None
+        self._log_base = self.index.ntotal
+        self._open_log()
+        for base, path in old_logs:
+            if base != self._log_base:
+                os.remove(path)
+
+    def save(self):
+        """
+        Persist everything added so far (kept for compatibility; adds are already durable)
+        """
+        self.snapshot()
+
+    def close(self):
+        with self._lock:
+            if self.db is None:
+                return
+            self.snapshot()
+            self._exact = None
+            self._log.close()
+            self.db.close()
+            self.db = None
+
+    # Reads
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def get_documents(self, ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Metadata rows for FAISS positions ``ids``, keyed by position
+        """
+        ids = [int(i) for i in ids if i >= 0]
+        rows = []
+        with self._lock:
+            for start in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+                chunk = ids[start:start + 500]
+                rows += self.db.execute(
+                    f"SELECT id, text, metadata FROM documents WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+        documents = {}
+        for doc_id, text, metadata in rows:
+            metadata = json.loads(metadata) if metadata else {}
             metadata["text"] = text
-            self.metadata.append(metadata)
+            documents[doc_id] = metadata
+        return documents
 
-        # Save index
-        self.save()
+    def get_vectors(self) -> np.ndarray:
+        """
+        All stored (normalized) vectors as an ``(n, dimension)`` matrix, row = position
+        """
+        with self._lock:
+            return self._exact_rows(0, self.index.ntotal)
 
-    def search(self, query_embedding, top_k=5):
+    def query_documents(self, doc_type: str = None, bot: str = None, limit: int = None,
+                        newest_first: bool = True) -> List[Dict[str, Any]]:
         """
-        Search for similar embeddings
+        Documents filtered on the indexed metadata columns, ordered by timestamp
         """
-        # Convert query to numpy array
-        query_np = np.array([query_embedding]).astype("float32")
+        clauses, params = [], []
+        if doc_type is not None:
+            clauses.append("type = ?")
+            params.append(doc_type)
+        if bot is not None:
+            clauses.append("bot = ?")
+            params.append(bot)
+        sql = "SELECT id, text, metadata FROM documents"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY timestamp {'DESC' if newest_first else 'ASC'}, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self.db.execute(sql, params).fetchall()
+        documents = []
+        for _, text, metadata in rows:
+            metadata = json.loads(metadata) if metadata else {}
+            metadata["text"] = text
+            documents.append({"text": text, "metadata": metadata})
+        return documents
 
-        # Search
-        distances, indices = self.index.search(query_np, top_k)
+    def search_ids(self, query_embeddings, top_k=5, threshold=None):
+        """
+        Nearest neighbours for a matrix of queries
 
-        # Get results
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.metadata) and idx >= 0:
-                result = {
-                    "text": self.metadata[idx]["text"],
-                    "metadata": self.metadata[idx],
-                    "score": float(distances[0][i]),
-                }
-                results.append(result)
+        Returns one ``(positions, scores)`` pair of arrays per query, best
+        first. Scores are cosine similarities; with ``threshold`` only hits
+        scoring at least that much are returned.
+        """
+        queries = self._as_matrix(query_embeddings)
+        empty = (np.empty(0, dtype="int64"), np.empty(0, dtype="float32"))
 
+        with self._lock:
+            total = self.index.ntotal
+            if total == 0 or top_k <= 0:
+                return [empty for _ in range(len(queries))]
+
+            if threshold is not None and self._is_exact():
+                # Exact: only hits above the threshold come back from FAISS
+                lims, scores, ids = self.index.range_search(queries, float(threshold))
+                results = []
+                for q in range(len(queries)):
+                    q_scores, q_ids = scores[lims[q]:lims[q + 1]], ids[lims[q]:lims[q + 1]]
+                    if len(q_scores) > top_k:
+                        keep = np.argpartition(-q_scores, top_k - 1)[:top_k]
+                        q_scores, q_ids = q_scores[keep], q_ids[keep]
+                    order = np.argsort(-q_scores, kind="stable")
+                    results.append((q_ids[order], q_scores[order]))
+                return results
+
+            if self._is_ann():
+                self.index.hnsw.efSearch = max(self.ef_search, top_k)
+            if is_compressed(self.index):
+                # Approximate candidates from the codes, exact scores from the log
+                _, candidates = self.index.search(queries, min(top_k * self.rerank_factor, total))
+                exact = self._exact_log()
+                results = rerank(queries, candidates, lambda ids: np.asarray(exact[ids]), top_k)
+                if threshold is not None:
+                    results = [(ids[scores >= threshold], scores[scores >= threshold]) for ids, scores in results]
+                return results
+            scores, ids = self.index.search(queries, min(top_k, total))
+
+        results = []
+        for q_scores, q_ids in zip(scores, ids):
+            keep = q_ids >= 0
+            if threshold is not None:
+                keep &= q_scores >= threshold
+            results.append((q_ids[keep], q_scores[keep]))
         return results
 
-    def save(self):
+    def search(self, query_embedding, top_k=5, threshold=None):
         """
-        Save the index and metadata
+        Search for similar embeddings; ``score`` is the cosine similarity
         """
-        faiss.write_index(self.index, f"{self.index_name}.faiss")
-        with open(f"{self.index_name}_metadata.json", "w") as f:
-            json.dump(self.metadata, f)
+        ids, scores = self.search_ids([query_embedding], top_k, threshold)[0]
+        documents = self.get_documents(ids)
+
+        results = []
+        for idx, score in zip(ids, scores):
+            metadata = documents.get(int(idx))
+            if metadata is not None:
+                results.append({
+                    "text": metadata["text"],
+                    "metadata": metadata,
+                    "score": float(score),
+                })
+        return results
+
+
+_stores: Dict[str, VectorStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store(index_name="bot_index", dimension=1536, base_dir=None) -> VectorStore:
+    """
+    Long-lived store for ``index_name``, opened once per process
+    """
+    key = os.path.join(base_dir or DEFAULT_BASE_DIR, index_name)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store.db is None:
+            store = _stores[key] = VectorStore(index_name=index_name, dimension=dimension, base_dir=base_dir)
+        return store
+
+
+def find_vector_store(index_name="bot_index", base_dir=None):
+    """
+    Store for ``index_name`` if one exists on disk, without creating it
+    """
+    base_dir = base_dir or DEFAULT_BASE_DIR
+    with _stores_lock:
+        store = _stores.get(os.path.join(base_dir, index_name))
+        if store is not None and store.db is not None:
+            return store
+    if not os.path.exists(os.path.join(base_dir, index_name, "metadata.sqlite")) and \
+            not os.path.exists(os.path.join(base_dir, f"{index_name}.faiss")):
+        return None
+    return get_vector_store(index_name=index_name, base_dir=base_dir)
+
+
+def close_vector_stores():
+    """
+    Snapshot and close every store opened through get_vector_store
+    """
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
 
 
 # Standalone functions for backward compatibility
-def save_to_vector_store(embeddings, texts, metadata_list=None, index_name="bot_index"):
+def save_to_vector_store(bot_name: str, vector_data: List[Dict[str, Any]], logger=None) -> bool:
     """
-    Save embeddings to vector store
+    Append ``vector_data`` items (``{"text", "embedding", "metadata"?}``) to the bot's store
     """
-    vector_store = VectorStore(index_name=index_name)
-    vector_store.add_embeddings(embeddings, texts, metadata_list)
-    return True
+    if not vector_data:
+        return True
+    try:
+        store = get_vector_store(index_name=bot_name, dimension=len(vector_data[0]["embedding"]))
+        store.add_embeddings(
+            [item["embedding"] for item in vector_data],
+            [item.get("text", "") for item in vector_data],
+            [item.get("metadata") for item in vector_data],
+        )
+        return True
+    except Exception as e:
+        message = f"[RAG][ERROR] Failed to save {len(vector_data)} vectors for {bot_name}: {e}"
+        if logger:
+            logger.log_event(message)
+        else:
+            print(message)
+        return False
 
 
 def load_vector_index(index_name="bot_index"):
     """
     Load vector index from disk
     """
-    vector_store = VectorStore(index_name=index_name)
-    return vector_store
+    return get_vector_store(index_name=index_name)
 
 
-def load_from_vector_store(query: str):
+def load_from_vector_store(bot_name: str):
     """
-    Dummy placeholder for vector retrieval
+    All documents of the bot's store and their normalized embedding matrix
+
+    Prefer ``find_vector_store(bot_name).search(...)`` for similarity
+    queries; this materializes the whole store.
     """
-    return []
+    store = find_vector_store(bot_name)
+    if store is None or len(store) == 0:
+        return [], np.empty((0, 0), dtype="float32")
+    vectors = store.get_vectors()
+    documents = store.get_documents(range(len(vectors)))
+    return [{"text": documents[i]["text"], "metadata": documents[i]} for i in range(len(vectors))], vectors
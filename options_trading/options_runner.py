@@ -17,6 +17,7 @@ from runner.trade_manager import simulate_exit, execute_trade, create_trade_mana
 from runner.enhanced_logging import create_trading_logger
 from runner.risk_governor import RiskGovernor
 from runner.position_monitor import PositionMonitor
+from runner.trading_loop import BotPipeline, run_trading_loop
 
 def create_enhanced_logger(*args, **kwargs):
     """Wrapper for backward compatibility"""
@@ -123,7 +124,7 @@ def wait_for_daily_plan(firestore_client, today_date, logger, max_wait_minutes=1
 
 
 class OptionsTrader:
-    def __init__(self, strategy_name: str, paper_trade: bool = False):
+    def __init__(self, strategy_name: str, paper_trade: bool = False, position_monitor: PositionMonitor = None):
         self.strategy_name = strategy_name
         self.paper_trade = paper_trade
         
@@ -134,12 +135,15 @@ class OptionsTrader:
         self.risk_governor = RiskGovernor(self.logger)
         self.trade_manager = create_trade_manager(
             logger=self.logger, 
-            kite_manager=self.kite_manager
+            kite_manager=self.kite_manager,
+            position_monitor=position_monitor
         )
-        self.position_monitor = PositionMonitor(
+        # Bots run together share one monitor for all their open positions
+        self.position_monitor = position_monitor or PositionMonitor(
             logger=self.logger,
             kite_manager=self.kite_manager
         )
+        self.strategy = self._get_strategy(strategy_name)
         
         self.logger.log_info(f"OptionsTrader for '{self.strategy_name}' initialized.")
 
@@ -148,24 +152,36 @@ class OptionsTrader:
         return MarketDataFetcher(self.logger, self.kite_manager)
 
     def _get_strategy(self, strategy_name: str):
-        # Implement strategy loading logic here
-        return None
+        return load_strategy(strategy_name, self.kite_manager.get_kite_client(), self.logger)
+
+    def build_pipeline(self) -> BotPipeline:
+        """Options bot as a TradingLoop pipeline (one analyze() per cycle)"""
+        return BotPipeline(
+            name="options-trader",
+            evaluate=self._analyze,
+            execute=self._execute_signal,
+            interval=10,
+            is_active=is_market_open,
+        )
+
+    def _analyze(self):
+        strategy = getattr(self, "strategy", None)
+        if not strategy:
+            return None
+        return strategy.analyze()
+
+    def _execute_signal(self, trade_signal):
+        self.logger.log_event(f"[TRADE] Executing trade: {trade_signal}")
+        return execute_trade(trade_signal, paper_mode=self.paper_trade)
 
     def run(self):
         """Main loop for the options trader."""
         self.logger.log_info(f"Starting OptionsTrader with strategy: {self.strategy_name}")
         
-        while True:
-            try:
-                # Add a small delay to avoid rapid looping
-                time.sleep(10)
-            except KeyboardInterrupt:
-                self.logger.log_info("OptionsTrader stopped by user.")
-                break
-            except Exception as e:
-                self.logger.log_error(f"An unexpected error occurred in OptionsTrader: {e}", exc_info=True)
-                # Wait longer after an error
-                time.sleep(60)
+        try:
+            run_trading_loop([self.build_pipeline()], self.position_monitor, logger=self.logger)
+        except KeyboardInterrupt:
+            self.logger.log_info("OptionsTrader stopped by user.")
 
 
 def run_options_trader(strategy_name: str, paper_trade: bool = False):
@@ -256,6 +272,7 @@ def run_options_trader(strategy_name: str, paper_trade: bool = False):
             strategy = load_strategy("scalp", kite, logger)
 
         trader = OptionsTrader(strategy_name=strategy_name, paper_trade=paper_trade_mode)
+        trader.strategy = strategy
         trader.run()
 
         logger.log_event("[CLOSE] Market closed. Sleeping to prevent CrashLoop.")
@@ -2,11 +2,37 @@
 
 
 class DailyReportGenerator:
-    def __init__(self, logger):
+    def __init__(self, logger, gcs_logger=None):
         self.logger = logger
+        self.gcs_logger = gcs_logger
 
     def generate(self, today_date):
-        # Dummy implementation for now
+        if self.gcs_logger is None:
+            self.logger.log_event(
+                f"DailyReportGenerator: Report created for {today_date} (placeholder)."
+            )
+            return {}
+
+        # Compact the day's archives, then read only the columns the report needs
+        date = str(today_date)
+        self.gcs_logger.compact_archives(date)
+        trades = self.gcs_logger.get_parquet_archive().scan(
+            "trades",
+            start_date=date,
+            end_date=date,
+            columns=["bot_type", "strategy", "status", "pnl"],
+        )
+
+        report = {}
+        for trade in trades:
+            key = f"{trade['bot_type']}/{trade['strategy']}"
+            row = report.setdefault(key, {"trades": 0, "closed": 0, "pnl": 0.0})
+            row["trades"] += 1
+            if trade["status"] != "open":
+                row["closed"] += 1
+                row["pnl"] += trade["pnl"] or 0.0
+
         self.logger.log_event(
-            f"DailyReportGenerator: Report created for {today_date} (placeholder)."
+            f"DailyReportGenerator: Report for {date}: {len(trades)} trades, {report}"
         )
+        return report
@@ -26,10 +26,15 @@ Usage:
     logger.log_cognitive(...)
 """
 
+from .archive_writer import RollingArchiveWriter
 from .core_logger import TradingLogger, create_trading_logger
 from .firestore_logger import FirestoreLogger
 from .gcs_logger import GCSLogger
+from .gcs_uploader import GCSUploader, LocalBucketClient
 from .lifecycle_manager import LogLifecycleManager
+from .log_shipper import LogShipper
+from .log_spool import LogSpool, iter_spool
+from .write_coalescer import FirestoreWriteCoalescer
 from .log_types import (
     LogLevel,
     LogCategory,
@@ -45,8 +50,15 @@ __all__ = [
     "TradingLogger",
     "create_trading_logger",
     "FirestoreLogger",
+    "FirestoreWriteCoalescer",
     "GCSLogger",
+    "GCSUploader",
+    "LocalBucketClient",
     "LogLifecycleManager",
+    "LogShipper",
+    "LogSpool",
+    "iter_spool",
+    "RollingArchiveWriter",
     "LogLevel",
     "LogCategory",
     "LogType",
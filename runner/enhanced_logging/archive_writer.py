@@ -0,0 +1,305 @@
+"""
+Archive Writer - Rolling NDJSON.gz segments spooled to local disk
+=================================================================
+
+Each archive stream (bucket + file type + bot) appends records as one
+JSON object per line to a gzip segment in the spool directory, so
+memory stays flat however many entries a session logs. The compressor
+is sync-flushed after every append: a segment cut short by a crash ends
+on a decodable block boundary and loses at most a partial last line.
+
+Segments roll once they reach ``max_segment_bytes`` on disk or
+``max_segment_age`` seconds. A rolled segment is sealed (gzip trailer
+written, ``.part`` suffix dropped) and handed back for upload.
+
+The spool mirrors the bucket layout,
+``<spool>/<bucket>/logs/YYYY/MM/DD/<bot_type>/<segment>.ndjson.gz``, so a
+segment's blob path is its path relative to the bucket directory.
+``recover_spool`` repairs and returns segments left by processes that
+are no longer running. Liveness is not judged by PID (a restarted
+container usually gets the crashed run's PID back): every process holds
+an exclusive ``flock`` on its own session lock file under
+``<spool>/.sessions`` for as long as it runs, and its segment names carry
+that session token, so a segment is live only while its lock is held.
+"""
+
+import datetime
+import gzip
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: fall back to the PID recorded in the lock file
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+MB = 1024 * 1024
+PART_SUFFIX = ".part"
+SEGMENT_SUFFIX = ".ndjson.gz"
+SESSION_DIR = ".sessions"
+LOCK_SUFFIX = ".lock"
+
+_SESSION_RE = re.compile(r"_s([0-9a-f]{12})_")
+_LEGACY_PID_RE = re.compile(r"_p(\d+)_")  # segments spooled before session tokens
+
+# spool_dir -> (pid, session token, open lock file) of this process
+_sessions: Dict[str, Tuple[int, str, Any]] = {}
+_sessions_lock = threading.Lock()
+
+
+def segment_blob_path(spool_dir: str, bucket_name: str, path: str) -> str:
+    """Blob path of a spooled segment"""
+    return os.path.relpath(path, os.path.join(spool_dir, bucket_name)).replace(os.sep, "/")
+
+
+def _lock_path(spool_dir: str, token: str) -> str:
+    return os.path.join(spool_dir, SESSION_DIR, token + LOCK_SUFFIX)
+
+
+def spool_session(spool_dir: str) -> str:
+    """This process's session token for ``spool_dir``; its lock is held until the process exits"""
+    with _sessions_lock:
+        held = _sessions.get(spool_dir)
+        if held is not None and held[0] == os.getpid():
+            return held[1]
+        # First use, or a forked child that must not pass for its parent
+        token = uuid.uuid4().hex[:12]
+        path = _lock_path(spool_dir, token)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Locked before it appears under its final name, so it is never seen unheld
+        lock_file = open(path + ".new", "w")
+        if FCNTL_AVAILABLE:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        os.replace(path + ".new", path)
+        _sessions[spool_dir] = (os.getpid(), token, lock_file)
+        return token
+
+
+def _session_alive(spool_dir: str, token: str) -> bool:
+    try:
+        with open(_lock_path(spool_dir, token), "r") as lock_file:
+            if not FCNTL_AVAILABLE:
+                pid = lock_file.read().strip()
+                return pid.isdigit() and int(pid) > 0 and _pid_alive(int(pid))
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return False
+    except FileNotFoundError:
+        return False
+
+
+class RollingArchiveWriter:
+    """Append-only NDJSON.gz writer for one archive stream"""
+
+    def __init__(self, spool_dir: str, bucket_name: str, file_type: str, bot_type: str = None,
+                 max_segment_bytes: int = 32 * MB, max_segment_age: float = 900, compresslevel: int = 6):
+        self.spool_dir = spool_dir
+        self.bucket_name = bucket_name
+        self.file_type = file_type
+        self.bot_type = bot_type
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compresslevel = compresslevel
+
+        self._token = uuid.uuid4().hex[:6]
+        self._seq = 0
+        self._raw = None
+        self._gz = None
+        self._path = None
+        self._opened_at = 0.0
+
+        self.records_written = 0
+        self.segments_sealed = 0
+
+    def _open_segment(self):
+        now = datetime.datetime.now()
+        parts = [self.spool_dir, self.bucket_name, "logs", now.strftime("%Y"), now.strftime("%m"), now.strftime("%d")]
+        if self.bot_type:
+            parts.append(self.bot_type)
+        directory = os.path.join(*parts)
+        os.makedirs(directory, exist_ok=True)
+
+        self._seq += 1
+        session = spool_session(self.spool_dir)
+        filename = f"{self.file_type}_{now.strftime('%H%M%S')}_s{session}_{self._token}_v{self._seq}{SEGMENT_SUFFIX}"
+        self._path = os.path.join(directory, filename + PART_SUFFIX)
+        self._raw = open(self._path, "wb")
+        self._gz = gzip.GzipFile(filename=filename, mode="wb", fileobj=self._raw, compresslevel=self.compresslevel)
+        self._opened_at = time.time()
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Write records as NDJSON lines; returns the number written"""
+        count = 0
+        for record in records:
+            if self._gz is None:
+                self._open_segment()
+            self._gz.write(json.dumps(record, default=str, separators=(',', ':')).encode('utf-8'))
+            self._gz.write(b"\n")
+            count += 1
+        if count:
+            self._gz.flush()  # Z_SYNC_FLUSH: everything so far is recoverable
+            self.records_written += count
+        return count
+
+    @property
+    def segment_bytes(self) -> int:
+        return self._raw.tell() if self._raw is not None else 0
+
+    def should_roll(self) -> bool:
+        return self._gz is not None and (
+            self.segment_bytes >= self.max_segment_bytes or
+            time.time() - self._opened_at >= self.max_segment_age
+        )
+
+    def maybe_roll(self) -> Optional[str]:
+        return self.roll() if self.should_roll() else None
+
+    def roll(self) -> Optional[str]:
+        """Seal the open segment; returns its path, or None if nothing was open"""
+        if self._gz is None:
+            return None
+        self._gz.close()
+        self._raw.close()
+        sealed = self._path[:-len(PART_SUFFIX)]
+        os.replace(self._path, sealed)
+        self._gz = self._raw = self._path = None
+        self.segments_sealed += 1
+        return sealed
+
+    def close(self) -> Optional[str]:
+        return self.roll()
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _decompress_until_error(decompressor, chunk: bytes, step: int = 4096) -> Tuple[bytes, bool]:
+    """Decompress as much of ``chunk`` as is valid; returns (output, hit_corruption)"""
+    saved = decompressor.copy()
+    try:
+        return decompressor.decompress(chunk), False
+    except zlib.error:
+        pass
+
+    # Torn block at the crash point: replay in shrinking steps to keep the valid prefix
+    out = []
+    decompressor = saved
+    offset = 0
+    while offset < len(chunk) and step:
+        piece = chunk[offset:offset + step]
+        checkpoint = decompressor.copy()
+        try:
+            out.append(decompressor.decompress(piece))
+            offset += len(piece)
+        except zlib.error:
+            decompressor = checkpoint
+            step //= 2
+    return b"".join(out), True
+
+
+def repair_segment(part_path: str) -> Optional[str]:
+    """Seal a truncated segment up to its last complete line; None if nothing survived"""
+    sealed = part_path[:-len(PART_SUFFIX)]
+    tmp_path = sealed + ".tmp"
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    tail = b""
+    lines = 0
+
+    with open(part_path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        while not decompressor.eof:
+            chunk = src.read(MB)
+            if not chunk:
+                break
+            data, torn = _decompress_until_error(decompressor, chunk)
+            data = tail + data
+            cut = data.rfind(b"\n") + 1
+            if cut:
+                dst.write(data[:cut])
+                lines += data.count(b"\n", 0, cut)
+            tail = data[cut:]
+            if torn:
+                break
+
+    os.remove(part_path)
+    if not lines:
+        os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, sealed)
+    return sealed
+
+
+def recover_spool(spool_dir: str) -> List[Tuple[str, str, str]]:
+    """Segments left by dead processes as ``(bucket, blob_path, path)``
+
+    Unsealed segments are repaired first; segments of live sessions are
+    left alone. Lock files of dead sessions are removed afterwards.
+    """
+    recovered = []
+    if not os.path.isdir(spool_dir):
+        return recovered
+
+    alive: Dict[str, bool] = {}
+    for bucket_name in sorted(os.listdir(spool_dir)):
+        bucket_dir = os.path.join(spool_dir, bucket_name)
+        if bucket_name == SESSION_DIR or not os.path.isdir(bucket_dir):
+            continue
+        for dirpath, _, filenames in os.walk(bucket_dir):
+            for filename in sorted(filenames):
+                match = _SESSION_RE.search(filename)
+                if match:
+                    token = match.group(1)
+                    if token not in alive:
+                        alive[token] = _session_alive(spool_dir, token)
+                    if alive[token]:
+                        continue
+                else:
+                    legacy = _LEGACY_PID_RE.search(filename)
+                    if not legacy or _pid_alive(int(legacy.group(1))):
+                        continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    if filename.endswith(SEGMENT_SUFFIX + PART_SUFFIX):
+                        path = repair_segment(path)
+                    elif not filename.endswith(SEGMENT_SUFFIX):
+                        continue
+                except (OSError, EOFError) as e:
+                    print(f"Could not recover archive segment {path}: {e}")
+                    continue
+                if path:
+                    recovered.append((bucket_name, segment_blob_path(spool_dir, bucket_name, path), path))
+
+    session_dir = os.path.join(spool_dir, SESSION_DIR)
+    for filename in os.listdir(session_dir) if os.path.isdir(session_dir) else ():
+        token = filename[:-len(LOCK_SUFFIX)]
+        if not filename.endswith(LOCK_SUFFIX):
+            continue
+        if not (alive[token] if token in alive else _session_alive(spool_dir, token)):
+            try:
+                os.remove(os.path.join(session_dir, filename))
+            except OSError:
+                pass
+    return recovered
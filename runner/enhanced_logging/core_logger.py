@@ -6,16 +6,47 @@ Main logger that automatically routes logs to the appropriate storage:
 - Real-time data -> Firestore for dashboards
 - Bulk/archival data -> GCS for long-term storage
 - Intelligent routing based on log type and urgency
+
+log_* calls only build an entry and enqueue it on a LogShipper; routing,
+Firestore writes and GCS archival run on the shipper's writer thread.
+Entries carry an epoch timestamp and a message template; formatting
+happens on the writer thread, and only for entries that are routed.
+With a spool directory every entry is also appended to a local binary
+LogSpool there, before routing.
 """
 
 import datetime
+import functools
+import os
 import time
-import threading
 from typing import Dict, Any, List, Optional, Union
 from .log_types import LogEntry, LogLevel, LogCategory, LogType, TradeLogData, CognitiveLogData, ErrorLogData
 from .firestore_logger import FirestoreLogger
 from .gcs_logger import GCSLogger
 from .lifecycle_manager import LogLifecycleManager
+from .log_shipper import LogShipper
+from .log_spool import LogSpool
+
+
+def _merge_fields(pending: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of ``pending`` updated by ``update`` the way Firestore's set(merge=True) does"""
+    merged = dict(pending)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge_fields(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def _merge_entries(pending: LogEntry, entry: LogEntry) -> LogEntry:
+    """The newer entry, carrying the data fields of both"""
+    entry.data = _merge_fields(pending.data or {}, entry.data or {})
+    return entry
+
+
+def _merge_writes(pending: functools.partial, write: functools.partial) -> functools.partial:
+    """The newer deferred write, with the data fields of both"""
+    return functools.partial(write.func, _merge_fields(pending.args[0], write.args[0]))
 
 
 class TradingLogger:
@@ -23,7 +54,8 @@ class TradingLogger:
     Main trading logger that intelligently routes logs to Firestore and GCS
     """
     
-    def __init__(self, session_id: str = None, bot_type: str = None, project_id: str = None, enable_firestore: bool = True, enable_gcs: bool = True):
+    def __init__(self, session_id: str = None, bot_type: str = None, project_id: str = None, enable_firestore: bool = True, enable_gcs: bool = True,
+                 spool_dir: str = None):
         self.session_id = session_id or f"session_{int(time.time())}"
         self.bot_type = bot_type or "unknown"
         self.project_id = project_id
@@ -35,16 +67,16 @@ class TradingLogger:
         self.gcs_logger = GCSLogger(project_id) if self.enable_gcs else None
         self.lifecycle_manager = LogLifecycleManager(project_id) if self.enable_gcs else None
         
+        # Local binary record of every entry (TRADING_LOG_SPOOL_DIR to enable from the environment)
+        spool_dir = spool_dir or os.getenv('TRADING_LOG_SPOOL_DIR')
+        self.spool = LogSpool(os.path.join(spool_dir, self.bot_type), prefix=self.session_id) if spool_dir else None
+        
         # Buffering for efficient batch operations
         self.gcs_buffer = []
         self.buffer_size = 50
         self.last_gcs_flush = time.time()
         self.gcs_flush_interval = 300  # 5 minutes
         
-        # Background thread for periodic tasks
-        self.background_thread = threading.Thread(target=self._background_tasks, daemon=True)
-        self.background_thread.start()
-        
         # Performance metrics
         self.metrics = {
             'firestore_writes': 0,
@@ -53,31 +85,79 @@ class TradingLogger:
             'start_time': datetime.datetime.now()
         }
         
+        # Writer thread: routing and all storage I/O happen off the caller's thread
+        self.shipper = LogShipper(
+            self._ship_batch,
+            capacity=10000,
+            flush_interval=5,  # Firestore batch interval
+            on_idle=self._periodic_flush,
+            name=f"log-shipper-{self.bot_type}"
+        )
+        
         # Log initialization
         self.log_system_event("Trading logger initialized", {
             'session_id': self.session_id,
             'bot_type': self.bot_type
         })
     
-    def _background_tasks(self):
-        """Background thread for periodic maintenance tasks"""
-        while True:
+    def _periodic_flush(self):
+        """Periodic maintenance, run by the shipper's writer thread when idle"""
+        # Flush GCS buffer periodically
+        if self.gcs_logger and (time.time() - self.last_gcs_flush > self.gcs_flush_interval or 
+            len(self.gcs_buffer) >= self.buffer_size):
+            self._flush_gcs_buffer()
+        
+        # Flush Firestore batch
+        if self.firestore_logger:
+            self.firestore_logger.flush_batch()
+        
+        if self.spool:
+            self.spool.flush()
+    
+    def _flush_buffers(self):
+        """Flush Firestore batch, GCS buffer and spool (writer thread)"""
+        if self.spool:
+            self.spool.flush()
+        if self.firestore_logger:
+            self.firestore_logger.flush_batch()
+        if self.gcs_logger:
+            self._flush_gcs_buffer()
+    
+    def _enqueue(self, entry: LogEntry):
+        """Hand an entry to the writer thread"""
+        self.shipper.put(
+            entry,
+            level=entry.level,
+            coalesce_key=self._coalesce_key(entry),
+            critical=entry.category == LogCategory.TRADE,
+            merge=_merge_entries
+        )
+    
+    def _coalesce_key(self, entry: LogEntry):
+        # System events only merge fields into the bot's status document, so
+        # pending ones can be folded into the latest
+        if (entry.category == LogCategory.SYSTEM and entry.log_type == LogType.DASHBOARD and
+                entry.level not in (LogLevel.ERROR, LogLevel.CRITICAL)):
+            return ('system_status', self.bot_type)
+        return None
+    
+    def _ship_batch(self, items: List[Any]):
+        """Shipper sink: spool and route entries, run deferred writes"""
+        if self.spool:
             try:
-                # Flush GCS buffer periodically
-                if self.gcs_logger and (time.time() - self.last_gcs_flush > self.gcs_flush_interval or 
-                    len(self.gcs_buffer) >= self.buffer_size):
-                    self._flush_gcs_buffer()
-                
-                # Flush Firestore batch
-                if self.firestore_logger:
-                    self.firestore_logger.flush_batch()
-                
-                # Sleep before next check
-                time.sleep(30)
-                
-            except Exception as e:
-                print(f"Error in background tasks: {e}")
-                time.sleep(60)  # Wait longer on error
+                self.spool.write([item for item in items if isinstance(item, LogEntry)])
+            except OSError as e:
+                print(f"Error writing log spool: {e}")
+                self.metrics['errors'] += 1
+        for item in items:
+            if callable(item):
+                try:
+                    item()
+                except Exception as e:
+                    print(f"Error in deferred log write: {e}")
+                    self.metrics['errors'] += 1
+            else:
+                self._route_log(item)
     
     def _flush_gcs_buffer(self):
         """Flush buffered entries to GCS"""
@@ -214,21 +294,22 @@ class TradingLogger:
         log_type = LogType.REAL_TIME if urgent else LogType.DASHBOARD
         
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=LogLevel.INFO,
             category=LogCategory.TRADE,
             log_type=log_type,
-            message=f"Trade entry: {trade_data.symbol}",
+            message="Trade entry: %s",
             data=trade_data.to_dict(),
             source="trade_manager",
             session_id=self.session_id,
             bot_type=self.bot_type,
             trade_id=trade_data.trade_id,
             symbol=trade_data.symbol,
-            strategy=trade_data.strategy
+            strategy=trade_data.strategy,
+            args=(trade_data.symbol,)
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_trade_exit(self, trade_data: Union[Dict, TradeLogData], exit_reason: str = None):
         """Log trade exit"""
@@ -236,21 +317,22 @@ class TradingLogger:
             trade_data = TradeLogData(**trade_data)
         
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=LogLevel.INFO,
             category=LogCategory.TRADE,
             log_type=LogType.REAL_TIME,  # Exits are always urgent for dashboards
-            message=f"Trade exit: {trade_data.symbol} - {exit_reason or 'Unknown reason'}",
+            message="Trade exit: %s - %s",
             data={**trade_data.to_dict(), 'exit_reason': exit_reason},
             source="trade_manager",
             session_id=self.session_id,
             bot_type=self.bot_type,
             trade_id=trade_data.trade_id,
             symbol=trade_data.symbol,
-            strategy=trade_data.strategy
+            strategy=trade_data.strategy,
+            args=(trade_data.symbol, exit_reason or 'Unknown reason')
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_cognitive_decision(self, decision_data: Union[Dict, CognitiveLogData]):
         """Log cognitive system decision"""
@@ -258,18 +340,19 @@ class TradingLogger:
             decision_data = CognitiveLogData(**decision_data)
         
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=LogLevel.INFO,
             category=LogCategory.COGNITIVE,
             log_type=LogType.COGNITIVE_LIVE,
-            message=f"Cognitive decision: {decision_data.decision_type}",
+            message="Cognitive decision: %s",
             data=decision_data.to_dict(),
             source="cognitive_system",
             session_id=self.session_id,
-            bot_type=self.bot_type
+            bot_type=self.bot_type,
+            args=(decision_data.decision_type,)
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_error(self, error: Exception, context: Dict[str, Any] = None, 
                   source: str = "unknown", urgent: bool = True):
@@ -287,24 +370,25 @@ class TradingLogger:
         log_type = LogType.REAL_TIME if urgent else LogType.ARCHIVAL
         
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=LogLevel.ERROR,
             category=LogCategory.ERROR,
             log_type=log_type,
-            message=f"Error: {error_data.error_type} - {error_data.error_message}",
+            message="Error: %s - %s",
             data=error_data.to_dict(),
             source=source,
             session_id=self.session_id,
-            bot_type=self.bot_type
+            bot_type=self.bot_type,
+            args=(error_data.error_type, error_data.error_message)
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_system_event(self, message: str, data: Dict[str, Any] = None, 
                         level: LogLevel = LogLevel.INFO):
         """Log system events"""
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=level,
             category=LogCategory.SYSTEM,
             log_type=LogType.DASHBOARD,
@@ -315,17 +399,17 @@ class TradingLogger:
             bot_type=self.bot_type
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_performance_metric(self, metric_name: str, metric_value: Any, 
                               metadata: Dict[str, Any] = None):
         """Log performance metrics"""
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=LogLevel.INFO,
             category=LogCategory.PERFORMANCE,
             log_type=LogType.ANALYTICS,
-            message=f"Performance metric: {metric_name} = {metric_value}",
+            message="Performance metric: %s = %s",
             data={
                 'metric_name': metric_name,
                 'metric_value': metric_value,
@@ -333,47 +417,56 @@ class TradingLogger:
             },
             source="performance_monitor",
             session_id=self.session_id,
-            bot_type=self.bot_type
+            bot_type=self.bot_type,
+            args=(metric_name, metric_value)
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_strategy_signal(self, strategy: str, symbol: str, signal_data: Dict[str, Any]):
         """Log strategy signals"""
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=LogLevel.INFO,
             category=LogCategory.STRATEGY,
             log_type=LogType.DASHBOARD,
-            message=f"Strategy signal: {strategy} for {symbol}",
+            message="Strategy signal: %s for %s",
             data=signal_data,
             source="strategy_engine",
             session_id=self.session_id,
             bot_type=self.bot_type,
             strategy=strategy,
-            symbol=symbol
+            symbol=symbol,
+            args=(strategy, symbol)
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_market_data(self, data_type: str, data: Dict[str, Any]):
         """Log market data updates"""
         entry = LogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=time.time(),
             level=LogLevel.DEBUG,
             category=LogCategory.MARKET_DATA,
             log_type=LogType.BULK,  # Market data goes to GCS
-            message=f"Market data: {data_type}",
+            message="Market data: %s",
             data=data,
             source="market_data",
             session_id=self.session_id,
-            bot_type=self.bot_type
+            bot_type=self.bot_type,
+            args=(data_type,)
         )
         
-        self._route_log(entry)
+        self._enqueue(entry)
     
     def log_daily_reflection(self, reflection_text: str):
         """Log GPT daily reflection"""
+        self.shipper.put(
+            functools.partial(self._write_daily_reflection, reflection_text),
+            coalesce_key=('daily_reflection', self.bot_type)
+        )
+    
+    def _write_daily_reflection(self, reflection_text: str):
         # Store in Firestore for current day dashboard
         if self.firestore_logger:
             self.firestore_logger.log_daily_reflection(self.bot_type, reflection_text)
@@ -391,6 +484,13 @@ class TradingLogger:
     
     def log_daily_summary(self, summary_data: Dict[str, Any]):
         """Log daily performance summary"""
+        self.shipper.put(
+            functools.partial(self._write_daily_summary, summary_data),
+            coalesce_key=('daily_summary', self.bot_type),
+            merge=_merge_writes
+        )
+    
+    def _write_daily_summary(self, summary_data: Dict[str, Any]):
         if self.firestore_logger:
             self.firestore_logger.log_daily_summary(self.bot_type, summary_data)
         
@@ -414,7 +514,15 @@ class TradingLogger:
     
     def get_performance_history(self, days: int = 30) -> List[Dict]:
         """Get historical performance data from GCS"""
-        return self.gcs_logger.get_performance_history(days) if self.gcs_logger else []
+        return self.gcs_logger.get_performance_history(self.bot_type, days) if self.gcs_logger else []
+    
+    def get_archived_trades(self, days: int = 30, strategy: str = None, **filters) -> List[Dict]:
+        """Get this bot's compacted trade history from the Parquet archive"""
+        if not self.gcs_logger:
+            return []
+        if strategy:
+            filters['strategy'] = strategy
+        return self.gcs_logger.query_archive('trades', days=days, bot_type=self.bot_type, **filters)
     
     def get_cost_report(self) -> Dict[str, Any]:
         """Get GCS cost report for a given period"""
@@ -441,28 +549,36 @@ class TradingLogger:
             'uptime_seconds': uptime.total_seconds(),
             'gcs_buffer_size': len(self.gcs_buffer),
             'firestore_batch_size': len(self.firestore_logger.pending_writes) if self.firestore_logger else 0,
-            'gcs_pending_uploads': sum(len(uploads) for uploads in self.gcs_logger.pending_uploads.values()) if self.gcs_logger else 0
+            'firestore_coalescing': self.firestore_logger.get_write_stats() if self.firestore_logger else {},
+            'gcs_pending_uploads': self.gcs_logger.pending_count if self.gcs_logger else 0,
+            'gcs_uploads': self.gcs_logger.get_upload_stats() if self.gcs_logger else {},
+            'spool': self.spool.get_stats() if self.spool else {},
+            'shipper': self.shipper.get_stats()
         }
     
-    def flush_all(self):
-        """Manually flush all buffers"""
-        if self.firestore_logger:
-            self.firestore_logger.flush_batch()
-        if self.gcs_logger:
-            self._flush_gcs_buffer()
+    def flush_all(self, timeout: float = 30):
+        """Ship everything logged so far and flush all buffers (blocks up to ``timeout``)"""
+        self.shipper.put(self._flush_buffers, critical=True)
+        return self.shipper.flush(timeout=timeout)
 
     def force_upload_to_gcs(self):
         """Forces an immediate upload of the current GCS buffer."""
         if self.gcs_logger:
-            self._flush_gcs_buffer()
+            self.shipper.put(self._flush_gcs_buffer, critical=True)
+            self.shipper.flush(timeout=30)
 
     def shutdown(self):
         """Gracefully shutdown the logger, flushing all buffers"""
         try:
-            # Flush all pending data
-            self.flush_all()
+            # Drain pending entries, flush all buffers and stop the writer thread
+            self.shipper.put(self._flush_buffers, critical=True)
+            self.shipper.close()
+            if self.spool:
+                self.spool.close()
             
-            # Stop background thread gracefully (note: daemon thread will stop with main program)
+            # Seal open archive segments and upload what is left
+            if self.gcs_logger:
+                self.gcs_logger.close()
             
             # Final cleanup
             self.run_cleanup()
@@ -476,7 +592,7 @@ class TradingLogger:
     def __del__(self):
         """Cleanup on destruction"""
         try:
-            if hasattr(self, 'gcs_buffer'):
+            if hasattr(self, 'shipper') and not self.shipper.closed:
                 self.shutdown()
         except Exception:
             pass  # Ignore errors during shutdown
@@ -14,6 +14,8 @@ Cost optimization:
 - Minimal document writes
 - Efficient indexing
 - Batch operations where possible
+- Batched writes are coalesced per document and send only changed
+  fields (see write_coalescer)
 """
 
 import datetime
@@ -22,6 +24,7 @@ import time
 import uuid
 from typing import Dict, Any, List, Optional
 from google.cloud import firestore
+from .write_coalescer import FirestoreWriteCoalescer
 from .log_types import LogEntry, LogType, LogLevel, LogCategory, TradeLogData, CognitiveLogData, ErrorLogData
 
 
@@ -53,52 +56,37 @@ class FirestoreLogger:
         self.db = firestore.Client(project=project_id)
         self.today = datetime.datetime.now().strftime("%Y-%m-%d")
         
-        # Batch operations
-        self.batch_size = 10
-        self.pending_writes = []
+        # Batch operations: one pending write per document, flushed as field deltas
+        self.batch_size = 100  # distinct documents
+        self.coalescer = FirestoreWriteCoalescer(self.db)
         self.last_batch_time = time.time()
         self.batch_interval = 5  # seconds
     
+    @property
+    def pending_writes(self) -> Dict:
+        """Pending writes keyed by (collection, doc_id)"""
+        return self.coalescer.pending
+    
     def _add_to_batch(self, collection: str, doc_id: str, data: Dict[str, Any]):
         """Add write to batch for efficiency"""
-        self.pending_writes.append({
-            'collection': collection,
-            'doc_id': doc_id,
-            'data': data
-        })
+        self.coalescer.put(collection, doc_id, data)
         
         # Auto-flush batch if needed
-        if (len(self.pending_writes) >= self.batch_size or 
+        if (len(self.coalescer) >= self.batch_size or 
             time.time() - self.last_batch_time > self.batch_interval):
             self.flush_batch()
     
     def flush_batch(self):
-        """Flush pending writes to Firestore"""
-        if not self.pending_writes:
+        """Flush pending writes to Firestore; failed batches stay pending for the next flush"""
+        self.last_batch_time = time.time()
+        if not self.coalescer.pending:
             return
         
-        try:
-            batch = self.db.batch()
-            
-            for write in self.pending_writes:
-                doc_ref = self.db.collection(write['collection']).document(write['doc_id'])
-                batch.set(doc_ref, write['data'], merge=True)
-            
-            batch.commit()
-            self.pending_writes.clear()
-            self.last_batch_time = time.time()
-            
-        except Exception as e:
-            # Don't lose data on batch failure - write individually
-            for write in self.pending_writes:
-                try:
-                    doc_ref = self.db.collection(write['collection']).document(write['doc_id'])
-                    doc_ref.set(write['data'], merge=True)
-                except Exception as individual_error:
-                    print(f"Failed to write to Firestore: {individual_error}")
-            
-            self.pending_writes.clear()
-            print(f"Batch write failed, wrote individually: {e}")
+        self.coalescer.flush()
+    
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Coalescing and write amplification metrics"""
+        return self.coalescer.get_stats()
     
     def log_trade_status(self, trade_data: TradeLogData, urgent: bool = False):
         """
@@ -116,9 +104,9 @@ class FirestoreLogger:
         }
         
         if urgent:
-            # Write immediately for critical updates
-            doc_ref = self.db.collection(FirestoreCollections.LIVE_TRADES).document(trade_data.trade_id)
-            doc_ref.set(doc_data, merge=True)
+            # Write immediately for critical updates (with anything else pending)
+            self.coalescer.put(FirestoreCollections.LIVE_TRADES, trade_data.trade_id, doc_data)
+            self.flush_batch()
         else:
             # Add to batch for efficiency
             self._add_to_batch(FirestoreCollections.LIVE_TRADES, trade_data.trade_id, doc_data)
@@ -156,8 +144,8 @@ class FirestoreLogger:
         
         # High severity alerts write immediately
         if severity in ['high', 'critical']:
-            doc_ref = self.db.collection(FirestoreCollections.LIVE_ALERTS).document(alert_id)
-            doc_ref.set(doc_data)
+            self.coalescer.put(FirestoreCollections.LIVE_ALERTS, alert_id, doc_data)
+            self.flush_batch()
         else:
             self._add_to_batch(FirestoreCollections.LIVE_ALERTS, alert_id, doc_data)
     
@@ -285,11 +273,13 @@ class FirestoreLogger:
         """Mark an alert as acknowledged"""
         doc_ref = self.db.collection(FirestoreCollections.LIVE_ALERTS).document(alert_id)
         doc_ref.update({'acknowledged': True, 'acknowledged_at': firestore.SERVER_TIMESTAMP})
+        self.coalescer.forget(FirestoreCollections.LIVE_ALERTS, alert_id)
     
     def resolve_alert(self, alert_id: str):
         """Mark an alert as resolved"""
         doc_ref = self.db.collection(FirestoreCollections.LIVE_ALERTS).document(alert_id)
         doc_ref.update({'resolved': True, 'resolved_at': firestore.SERVER_TIMESTAMP})
+        self.coalescer.forget(FirestoreCollections.LIVE_ALERTS, alert_id)
     
     def cleanup_expired_data(self):
         """Manual cleanup of expired TTL data (in case automatic TTL isn't enabled)"""
@@ -319,6 +309,7 @@ class FirestoreLogger:
                     batch = self.db.batch()
                     for doc in expired_docs:
                         batch.delete(doc.reference)
+                        self.coalescer.forget(collection_name, doc.id)
                     
                     batch.commit()
                     print(f"Cleaned up {len(expired_docs)} expired documents from {collection_name}")
@@ -3,17 +3,24 @@ GCS Logger - Bulk storage and archival for long-term analysis
 =============================================================
 
 Optimized for:
-- Trade entry/exit logs (JSON/CSV)
+- Trade entry/exit logs (NDJSON/CSV)
 - Historical GPT reflections and system performance metrics
 - Archived detailed logs and debug traces
 - Long-term data analysis and compliance
 
 Cost optimization:
 - Batched uploads to minimize operations
+- Concurrent uploads over a pooled connection (see gcs_uploader)
 - Compressed storage (gzip)
+- Trade, cognitive and system logs stream into rolling NDJSON.gz segments
+  on a local spool (see archive_writer); only sealed segments are uploaded
 - Structured folder organization
 - Lifecycle policies for automatic cleanup
 - Version tagging for deduplication
+
+Analysis:
+- Daily compaction of trade, cognitive and performance archives into
+  partitioned Parquet (see parquet_archive) for predicate-pushdown scans
 """
 
 import datetime
@@ -24,8 +31,10 @@ import io
 import os
 import time
 import uuid
-from typing import Dict, Any, List, Optional, Union
-from google.cloud import storage
+from typing import Dict, Any, Iterable, List, Optional, Union
+from .archive_writer import RollingArchiveWriter, recover_spool, segment_blob_path
+from .gcs_uploader import GCSUploader, LocalBucketClient, pooled_storage_client
+from .parquet_archive import PARQUET_PREFIX, PYARROW_AVAILABLE, ParquetArchive
 from .log_types import LogEntry, LogType, TradeLogData, CognitiveLogData, ErrorLogData
 
 
@@ -39,12 +48,30 @@ class GCSBuckets:
     COMPLIANCE_LOGS = "tron-compliance-logs"          # Regulatory compliance data
 
 
+# Parquet dataset -> (source bucket, archive file type)
+ARCHIVE_DATASETS = {
+    'trades': (GCSBuckets.TRADE_LOGS, "trades_detailed"),
+    'cognitive': (GCSBuckets.COGNITIVE_ARCHIVES, "cognitive_decisions"),
+    'performance': (GCSBuckets.ANALYTICS_DATA, "performance_metrics"),
+}
+
+
 class GCSLogger:
     """Optimized GCS logger for bulk storage and archival"""
     
-    def __init__(self, project_id: str = None):
+    def __init__(self, project_id: str = None, client=None, upload_workers: int = None):
         self.project_id = project_id
-        self.client = storage.Client(project=project_id)
+        upload_workers = upload_workers or int(os.getenv("GCS_UPLOAD_WORKERS", "8"))
+        
+        # GCS_LOCAL_ROOT swaps the bucket for a local directory (offline runs and benchmarks)
+        local_root = os.getenv("GCS_LOCAL_ROOT")
+        if client is not None:
+            self.client = client
+        elif local_root:
+            self.client = LocalBucketClient(local_root)
+        else:
+            self.client = pooled_storage_client(project_id, pool_size=max(10, upload_workers))
+        self.uploader = GCSUploader(self.client, max_workers=upload_workers)
         self.today = datetime.datetime.now().strftime("%Y-%m-%d")
         self.year = datetime.datetime.now().strftime("%Y")
         self.month = datetime.datetime.now().strftime("%m")
@@ -53,14 +80,30 @@ class GCSLogger:
         # Batch operations for efficiency
         self.batch_size = 100
         self.pending_uploads = {}  # bucket -> [data]
+        self.pending_count = 0
+        self.pending_bytes = 0
+        self.retry_count = 0  # failed uploads waiting for the next flush
         self.last_flush_time = time.time()
         self.flush_interval = 60  # seconds
         
+        # Rolling NDJSON.gz archive streams: (bucket, file_type, bot_type) -> writer
+        self.spool_dir = os.getenv("GCS_SPOOL_DIR", os.path.join("logs", "gcs_spool"))
+        self.max_segment_bytes = 32 * 1024 * 1024
+        self.max_segment_age = 900  # seconds
+        self.archive_writers = {}
+        
+        # Columnar copy of the archives, created on first use
+        self._parquet_archive = None
+        
         # Version tracking for deduplication
         self.version_tracker = {}
         
         # Ensure buckets exist with lifecycle policies
         self._ensure_buckets_with_lifecycle()
+        
+        # Queue segments left behind by crashed sessions
+        for bucket_name, blob_path, path in recover_spool(self.spool_dir):
+            self._add_to_batch(bucket_name, blob_path, path=path)
     
     def _ensure_buckets_with_lifecycle(self):
         """Ensure buckets exist with proper lifecycle policies in asia-south1 region"""
@@ -313,61 +356,118 @@ echo "🧹 You can delete the backup after verifying: rm -rf '$BACKUP_DIR'"
         
         return gzip.compress(json_str.encode('utf-8'))
     
-    def _add_to_batch(self, bucket_name: str, blob_path: str, data: bytes):
-        """Add upload to batch for efficiency"""
-        if bucket_name not in self.pending_uploads:
-            self.pending_uploads[bucket_name] = []
+    def _add_to_batch(self, bucket_name: str, blob_path: str, data: bytes = None, path: str = None):
+        """Add upload to batch for efficiency; ``path`` uploads a spooled file and deletes it once stored"""
+        self._queue_upload(bucket_name, blob_path, data=data, path=path)
         
-        self.pending_uploads[bucket_name].append({
-            'blob_path': blob_path,
-            'data': data
-        })
-        
-        # Auto-flush if batch is full or time interval exceeded
-        total_pending = sum(len(uploads) for uploads in self.pending_uploads.values())
-        if (total_pending >= self.batch_size or 
+        # Auto-flush if batch is full or time interval exceeded; failed uploads
+        # do not count towards a full batch, they wait for the next flush
+        if (self.pending_count - self.retry_count >= self.batch_size or 
             time.time() - self.last_flush_time > self.flush_interval):
             self.flush_batch()
     
+    def _queue_upload(self, bucket_name: str, blob_path: str, data: bytes = None, path: str = None):
+        """Append an upload to the pending batch without flushing"""
+        if bucket_name not in self.pending_uploads:
+            self.pending_uploads[bucket_name] = []
+        
+        upload = {'blob_path': blob_path}
+        if path is not None:
+            upload['path'] = path
+            self.pending_bytes += os.path.getsize(path)
+        else:
+            upload['data'] = data
+            self.pending_bytes += len(data)
+        self.pending_uploads[bucket_name].append(upload)
+        self.pending_count += 1
+    
     def flush_batch(self):
-        """Flush all pending uploads to GCS"""
+        """Upload all pending files concurrently; blocks until every upload finished or failed"""
+        self._roll_archive_segments()
         if not self.pending_uploads:
             return
         
-        for bucket_name, uploads in self.pending_uploads.items():
-            try:
-                bucket = self.client.bucket(bucket_name)
-                
-                for upload in uploads:
-                    blob = bucket.blob(upload['blob_path'])
-                    blob.upload_from_string(
-                        upload['data'],
-                        content_type='application/gzip',
-                        content_encoding='gzip'
-                    )
-                
-                print(f"Uploaded {len(uploads)} files to {bucket_name}")
-                
-            except Exception as e:
-                print(f"Error uploading to {bucket_name}: {e}")
-        
-        self.pending_uploads.clear()
+        pending, self.pending_uploads = self.pending_uploads, {}
+        self.pending_count = 0
+        self.pending_bytes = 0
+        self.retry_count = 0
         self.last_flush_time = time.time()
-    
-    def archive_trade_logs(self, trades: List[TradeLogData], bot_type: str):
-        """Archive trade logs in both JSON and CSV formats"""
-        # JSON format for detailed data
-        json_data = [trade.to_dict() for trade in trades]
-        compressed_json = self._compress_data(json_data)
         
-        json_path = self._get_blob_path(
-            GCSBuckets.TRADE_LOGS, 
-            "trades_detailed", 
-            bot_type,
-            self._get_version("trades", bot_type)
+        report = self.uploader.upload_many(
+            {'bucket': bucket_name, **upload}
+            for bucket_name, uploads in pending.items()
+            for upload in uploads
         )
         
-        self._add_to_batch(GCSBuckets.TRADE_LOGS, json_path, compressed_json)
+        for bucket_name, count in report['uploaded'].items():
+            print(f"Uploaded {count} files to {bucket_name}")
+        failed_paths = set()
+        for failed in report['failed']:
+            print(f"Error uploading {failed['blob_path']} to {failed['bucket']}: {failed['error']}")
+            if 'path' in failed:
+                failed_paths.add(failed['path'])
+        
+        # Spooled segments are removed once stored; failed ones stay on disk and are retried
+        for bucket_name, uploads in pending.items():
+            for upload in uploads:
+                path = upload.get('path')
+                if path is None:
+                    continue
+                if path in failed_paths:
+                    self._queue_upload(bucket_name, upload['blob_path'], path=path)
+                    self.retry_count += 1
+                else:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+    
+    def _archive_records(self, bucket_name: str, file_type: str, bot_type: Optional[str],
+                         records: Iterable[Dict[str, Any]]):
+        """Append records to the stream's open segment and queue it if it rolled"""
+        key = (bucket_name, file_type, bot_type)
+        writer = self.archive_writers.get(key)
+        if writer is None:
+            writer = self.archive_writers[key] = RollingArchiveWriter(
+                self.spool_dir, bucket_name, file_type, bot_type,
+                max_segment_bytes=self.max_segment_bytes,
+                max_segment_age=self.max_segment_age
+            )
+        writer.append(records)
+        sealed = writer.maybe_roll()
+        if sealed:
+            self._add_to_batch(bucket_name, segment_blob_path(self.spool_dir, bucket_name, sealed), path=sealed)
+    
+    def _roll_archive_segments(self, force: bool = False):
+        """Seal segments that are due (all open ones with ``force``) and queue them"""
+        for (bucket_name, _, _), writer in self.archive_writers.items():
+            sealed = writer.roll() if force else writer.maybe_roll()
+            if sealed:
+                self._add_to_batch(bucket_name, segment_blob_path(self.spool_dir, bucket_name, sealed), path=sealed)
+    
+    def seal_archives(self):
+        """Seal every open archive segment and upload it (end of day / shutdown)"""
+        self._roll_archive_segments(force=True)
+        self.flush_batch()
+    
+    def close(self):
+        """Seal open segments, upload everything pending and stop the upload workers"""
+        self.seal_archives()
+        self.uploader.close()
+    
+    def get_upload_stats(self) -> Dict[str, Any]:
+        """Uploader counters plus what is still waiting for the next flush"""
+        return {
+            **self.uploader.get_stats(),
+            'pending_count': self.pending_count,
+            'pending_bytes': self.pending_bytes
+        }
+    
+    def archive_trade_logs(self, trades: List[TradeLogData], bot_type: str):
+        """Archive trade logs in both NDJSON and CSV formats"""
+        # NDJSON stream for detailed data
+        self._archive_records(GCSBuckets.TRADE_LOGS, "trades_detailed", bot_type,
+                              (trade.to_dict() for trade in trades))
         
         # CSV format for easy analysis
         csv_buffer = io.StringIO()
@@ -392,31 +492,13 @@ echo "🧹 You can delete the backup after verifying: rm -rf '$BACKUP_DIR'"
     
     def archive_cognitive_data(self, cognitive_logs: List[CognitiveLogData], bot_type: str):
         """Archive cognitive decision logs"""
-        json_data = [log.to_dict() for log in cognitive_logs]
-        compressed_data = self._compress_data(json_data)
-        
-        blob_path = self._get_blob_path(
-            GCSBuckets.COGNITIVE_ARCHIVES,
-            "cognitive_decisions",
-            bot_type,
-            self._get_version("cognitive", bot_type)
-        )
-        
-        self._add_to_batch(GCSBuckets.COGNITIVE_ARCHIVES, blob_path, compressed_data)
+        self._archive_records(GCSBuckets.COGNITIVE_ARCHIVES, "cognitive_decisions", bot_type,
+                              (log.to_dict() for log in cognitive_logs))
     
     def archive_system_logs(self, log_entries: List[LogEntry], bot_type: str = None):
         """Archive system logs and debug traces"""
-        json_data = [entry.to_dict() for entry in log_entries]
-        compressed_data = self._compress_data(json_data)
-        
-        blob_path = self._get_blob_path(
-            GCSBuckets.SYSTEM_LOGS,
-            "system_logs",
-            bot_type,
-            self._get_version("system", bot_type or "all")
-        )
-        
-        self._add_to_batch(GCSBuckets.SYSTEM_LOGS, blob_path, compressed_data)
+        self._archive_records(GCSBuckets.SYSTEM_LOGS, "system_logs", bot_type,
+                              (entry.to_dict() for entry in log_entries))
     
     def archive_performance_metrics(self, metrics: Dict[str, Any], bot_type: str):
         """Archive performance metrics for analysis"""
@@ -503,8 +585,8 @@ echo "🧹 You can delete the backup after verifying: rm -rf '$BACKUP_DIR'"
         blobs = bucket.list_blobs(prefix=prefix)
         return [blob.name for blob in blobs if 'trades' in blob.name]
     
-    def download_archived_data(self, bucket_name: str, blob_path: str) -> Dict[str, Any]:
-        """Download and decompress archived data"""
+    def download_archived_data(self, bucket_name: str, blob_path: str) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Download and decompress archived data (NDJSON segments come back as a list of records)"""
         try:
             bucket = self.client.bucket(bucket_name)
             blob = bucket.blob(blob_path)
@@ -512,6 +594,8 @@ echo "🧹 You can delete the backup after verifying: rm -rf '$BACKUP_DIR'"
             compressed_data = blob.download_as_bytes()
             decompressed_data = gzip.decompress(compressed_data)
             
+            if blob_path.endswith('.ndjson.gz'):
+                return [json.loads(line) for line in decompressed_data.decode('utf-8').splitlines() if line]
             return json.loads(decompressed_data.decode('utf-8'))
             
         except Exception as e:
@@ -519,7 +603,23 @@ echo "🧹 You can delete the backup after verifying: rm -rf '$BACKUP_DIR'"
             return {}
     
     def get_performance_history(self, bot_type: str, days: int = 30) -> List[Dict[str, Any]]:
-        """Get performance metrics history"""
+        """Get performance metrics history, newest first
+        
+        Reads the compacted Parquet archive when there is one and falls
+        back to downloading the JSON archives otherwise.
+        """
+        if PYARROW_AVAILABLE:
+            try:
+                rows = self.query_archive('performance', days=days, bot_type=bot_type,
+                                          columns=['date', 'bot_type', 'timestamp', 'metrics'])
+                if rows:
+                    rows.sort(key=lambda r: r['timestamp'] or '', reverse=True)
+                    for row in rows:
+                        row['metrics'] = json.loads(row['metrics']) if row['metrics'] else {}
+                    return rows
+            except Exception as e:
+                print(f"Error scanning Parquet performance archive, reading JSON archives: {e}")
+        
         bucket = self.client.bucket(GCSBuckets.ANALYTICS_DATA)
         
         # List performance metric files for the bot
@@ -549,6 +649,9 @@ echo "🧹 You can delete the backup after verifying: rm -rf '$BACKUP_DIR'"
                 # Group blobs by base name (without version)
                 blob_groups = {}
                 for blob in bucket.list_blobs():
+                    if blob.name.startswith(PARQUET_PREFIX + "/"):
+                        continue  # compacted datasets are replaced per partition, not versioned
+                    
                     # Extract base name without version
                     base_name = blob.name.split('_v')[0] if '_v' in blob.name else blob.name
                     
@@ -570,16 +673,87 @@ echo "🧹 You can delete the backup after verifying: rm -rf '$BACKUP_DIR'"
             except Exception as e:
                 print(f"Error cleaning up {bucket_name}: {e}")
     
+    # Columnar analysis
+    
+    def get_parquet_archive(self) -> ParquetArchive:
+        """Parquet datasets in the analytics bucket"""
+        if self._parquet_archive is None:
+            self._parquet_archive = ParquetArchive.for_client(self.client, GCSBuckets.ANALYTICS_DATA)
+        return self._parquet_archive
+    
+    def _iter_day_records(self, bucket_name: str, file_type: str, date: datetime.date):
+        """Records of every ``file_type`` archive written on ``date``, tagged with the archiving bot"""
+        bucket = self.client.bucket(bucket_name)
+        for blob in bucket.list_blobs(prefix=f"logs/{date.strftime('%Y/%m/%d')}/"):
+            parts = blob.name.split("/")
+            if not parts[-1].startswith(file_type + "_"):
+                continue
+            bot_type = parts[4] if len(parts) == 6 else None
+            
+            data = self.download_archived_data(bucket_name, blob.name)
+            for record in (data if isinstance(data, list) else [data] if data else []):
+                if bot_type:
+                    record['bot_type'] = bot_type
+                yield record
+    
+    def compact_archives(self, date: Union[datetime.date, str] = None) -> Dict[str, int]:
+        """Rewrite one day's trade, cognitive and performance archives as Parquet (default: yesterday)
+        
+        Re-running for a date replaces its partitions. Returns rows written per dataset.
+        """
+        if date is None:
+            date = datetime.date.today() - datetime.timedelta(days=1)
+        elif isinstance(date, str):
+            date = datetime.date.fromisoformat(date)
+        
+        archive = self.get_parquet_archive()
+        counts = {}
+        for dataset, (bucket_name, file_type) in ARCHIVE_DATASETS.items():
+            try:
+                counts[dataset] = archive.write_day(
+                    dataset, date.isoformat(), self._iter_day_records(bucket_name, file_type, date)
+                )
+            except Exception as e:
+                print(f"Error compacting {dataset} archives for {date}: {e}")
+        return counts
+    
+    def query_archive(self, dataset: str, days: int = 30, bot_type: str = None,
+                      columns: List[str] = None, **equals) -> List[Dict[str, Any]]:
+        """Scan a compacted dataset, e.g. ``query_archive('trades', 30, 'options-trader', strategy='scalp')``"""
+        return self.get_parquet_archive().scan(dataset, days=days, bot_type=bot_type, columns=columns, **equals)
+    
     def export_data_for_analysis(self, output_format: str = "csv", 
                                 date_range: tuple = None) -> str:
-        """Export data in analysis-friendly format"""
-        # This would implement data export functionality
-        # for external analysis tools like BigQuery, Pandas, etc.
-        pass
+        """Compact ``date_range`` (inclusive, default yesterday) and export its trades
+        
+        Returns the Parquet trades dataset path for ``parquet``, otherwise
+        the path of a local CSV with the range's trades.
+        """
+        start, end = date_range or (None, None)
+        start = datetime.date.fromisoformat(start) if isinstance(start, str) else start
+        end = datetime.date.fromisoformat(end) if isinstance(end, str) else end
+        start = start or datetime.date.today() - datetime.timedelta(days=1)
+        end = end or start
+        
+        day = start
+        while day <= end:
+            self.compact_archives(day)
+            day += datetime.timedelta(days=1)
+        
+        archive = self.get_parquet_archive()
+        if output_format == "parquet":
+            return archive.dataset_path('trades')
+        
+        import pyarrow.csv as pacsv
+        table = archive.scan_table('trades', start_date=start.isoformat(), end_date=end.isoformat())
+        os.makedirs("exports", exist_ok=True)
+        output_path = os.path.join("exports", f"trades_{start.isoformat()}_{end.isoformat()}.csv")
+        pacsv.write_csv(table, output_path)
+        return output_path
     
     def __del__(self):
         """Cleanup on destruction"""
         try:
-            self.flush_batch()
+            self.close()
         except:
             pass 
\ No newline at end of file
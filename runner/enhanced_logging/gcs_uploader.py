@@ -0,0 +1,291 @@
+"""
+GCS Uploader - Concurrent archive uploads for GCSLogger
+=======================================================
+
+Uploads run on a small thread pool sharing one storage client, so a
+flush of hundreds of gzipped archives overlaps their round trips and is
+bounded by bandwidth instead of latency. The client's HTTP session is
+given a connection pool at least as large as the worker count, otherwise
+urllib3 discards connections beyond its default of 10 and every extra
+worker pays a fresh TLS handshake.
+
+Objects above ``resumable_threshold`` are streamed as resumable uploads
+in ``chunk_size`` pieces; the client library retries a failed chunk from
+the last committed offset. Whole-object failures are retried here with
+exponential backoff, except for client errors (4xx) that cannot succeed
+on a second attempt.
+
+LocalBucketClient is a filesystem stand-in for ``storage.Client`` that
+implements the subset GCSLogger uses, with an optional per-request
+latency to benchmark upload strategies offline.
+"""
+
+import datetime
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from google.cloud.storage.retry import DEFAULT_RETRY
+except ImportError:
+    DEFAULT_RETRY = None
+
+MB = 1024 * 1024
+NON_RETRYABLE_CODES = frozenset({400, 401, 403, 404, 409, 412})
+
+
+def pooled_storage_client(project_id: str = None, pool_size: int = 16):
+    """storage.Client whose HTTP session keeps ``pool_size`` connections per host"""
+    from google.cloud import storage
+    from requests.adapters import HTTPAdapter
+
+    client = storage.Client(project=project_id)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    client._http.mount("https://", adapter)
+    return client
+
+
+class GCSUploader:
+    """Thread-pool uploader with retries and resumable uploads for large objects"""
+
+    def __init__(self, client, max_workers: int = 8, max_retries: int = 3, retry_backoff: float = 0.5,
+                 resumable_threshold: int = 8 * MB, chunk_size: int = 4 * MB):
+        self.client = client
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.resumable_threshold = resumable_threshold
+        self.chunk_size = chunk_size  # must be a multiple of 256 KiB for GCS
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.stats = {
+            'uploaded': 0,
+            'failed': 0,
+            'retries': 0,
+            'resumable': 0,
+            'bytes': 0,
+        }
+
+    def _bucket(self, bucket_name: str):
+        bucket = self._buckets.get(bucket_name)
+        if bucket is None:
+            bucket = self._buckets[bucket_name] = self.client.bucket(bucket_name)
+        return bucket
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="gcs-upload")
+        return self._executor
+
+    def upload_many(self, uploads: Iterable[Dict[str, Any]], content_type: str = 'application/gzip',
+                    content_encoding: str = 'gzip') -> Dict[str, Any]:
+        """Upload ``{'bucket', 'blob_path', 'data' | 'path'}`` items concurrently and wait for all of them
+
+        Returns per-bucket success counts and the uploads that failed after
+        all retries, each with its ``error``.
+        """
+        uploads = list(uploads)
+        report = {'uploaded': {}, 'failed': []}
+        if not uploads:
+            return report
+
+        started = time.perf_counter()
+        if len(uploads) == 1 or self.max_workers <= 1:
+            results = [(upload, self._upload_with_retry(upload, content_type, content_encoding))
+                       for upload in uploads]
+        else:
+            pool = self._pool()
+            futures = {pool.submit(self._upload_with_retry, upload, content_type, content_encoding): upload
+                       for upload in uploads}
+            results = [(futures[future], future.result()) for future in as_completed(futures)]
+
+        for upload, error in results:
+            if error is None:
+                report['uploaded'][upload['bucket']] = report['uploaded'].get(upload['bucket'], 0) + 1
+            else:
+                report['failed'].append({**upload, 'error': error})
+        report['seconds'] = time.perf_counter() - started
+        return report
+
+    def _upload_with_retry(self, upload: Dict[str, Any], content_type: str,
+                           content_encoding: str) -> Optional[Exception]:
+        """Upload one object; returns the last error, or None on success"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                size = self._upload(upload, content_type, content_encoding)
+                with self._lock:
+                    self.stats['uploaded'] += 1
+                    self.stats['bytes'] += size
+                return None
+            except Exception as e:
+                if attempt == self.max_retries or getattr(e, 'code', None) in NON_RETRYABLE_CODES:
+                    with self._lock:
+                        self.stats['failed'] += 1
+                    return e
+                with self._lock:
+                    self.stats['retries'] += 1
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+    def _upload(self, upload: Dict[str, Any], content_type: str, content_encoding: str) -> int:
+        blob = self._bucket(upload['bucket']).blob(upload['blob_path'])
+        blob.content_encoding = content_encoding
+        data = upload.get('data')
+        size = len(data) if data is not None else os.path.getsize(upload['path'])
+
+        if size < self.resumable_threshold:
+            if data is None:
+                with open(upload['path'], 'rb') as f:
+                    data = f.read()
+            blob.upload_from_string(data, content_type=content_type)
+            return size
+
+        # Stream large archives in chunks over a resumable session
+        blob.chunk_size = self.chunk_size
+        kwargs = {'retry': DEFAULT_RETRY} if DEFAULT_RETRY is not None else {}
+        with (io.BytesIO(data) if data is not None else open(upload['path'], 'rb')) as f:
+            blob.upload_from_file(f, size=size, content_type=content_type, rewind=True, **kwargs)
+        with self._lock:
+            self.stats['resumable'] += 1
+        return size
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'max_workers': self.max_workers}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Local filesystem stand-in
+
+class LocalBlob:
+    """Object stored as ``<root>/<bucket>/<name>``"""
+
+    def __init__(self, bucket: 'LocalBucket', name: str):
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = None
+        self.content_type = None
+        self.content_encoding = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.bucket.path, *self.name.split("/"))
+
+    @property
+    def size(self) -> Optional[int]:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else None
+
+    @property
+    def time_created(self) -> Optional[datetime.datetime]:
+        if not os.path.exists(self.path):
+            return None
+        return datetime.datetime.fromtimestamp(os.path.getmtime(self.path), tz=datetime.timezone.utc)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def upload_from_string(self, data, content_type: str = None, **kwargs):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.upload_from_file(io.BytesIO(data), size=len(data), content_type=content_type)
+
+    def upload_from_file(self, file_obj, size: int = None, content_type: str = None, rewind: bool = False, **kwargs):
+        if rewind:
+            file_obj.seek(0)
+        self.content_type = content_type
+        self.bucket.client._round_trip()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.part"
+        chunk_size = self.chunk_size or MB
+        remaining = size
+        with open(tmp_path, 'wb') as f:
+            while remaining is None or remaining > 0:
+                chunk = file_obj.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+                if self.chunk_size:
+                    self.bucket.client._round_trip()  # one request per resumable chunk
+        os.replace(tmp_path, self.path)
+
+    def download_as_bytes(self, **kwargs) -> bytes:
+        self.bucket.client._round_trip()
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def delete(self, **kwargs):
+        os.remove(self.path)
+
+
+class LocalBucket:
+    """Directory acting as a bucket"""
+
+    def __init__(self, client: 'LocalBucketClient', name: str, location: str = 'ASIA-SOUTH1'):
+        self.client = client
+        self.name = name
+        self.location = location
+        self.labels = {}
+        self.lifecycle_rules = []
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.client.root, self.name)
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.path)
+
+    def reload(self):
+        pass
+
+    def patch(self):
+        pass
+
+    def blob(self, blob_name: str) -> LocalBlob:
+        return LocalBlob(self, blob_name)
+
+    def list_blobs(self, prefix: str = None) -> List[LocalBlob]:
+        blobs = []
+        for dirpath, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                if filename.endswith('.part'):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.path).replace(os.sep, "/")
+                if not prefix or name.startswith(prefix):
+                    blobs.append(LocalBlob(self, name))
+        return sorted(blobs, key=lambda b: b.name)
+
+
+class LocalBucketClient:
+    """Filesystem stand-in for ``storage.Client``
+
+    ``latency`` seconds are slept per request to model network round trips.
+    """
+
+    def __init__(self, root: str, latency: float = 0.0):
+        self.root = root
+        self.latency = latency
+        os.makedirs(root, exist_ok=True)
+
+    def _round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def bucket(self, bucket_name: str) -> LocalBucket:
+        return LocalBucket(self, bucket_name)
+
+    def create_bucket(self, bucket_name: str, location: str = None, **kwargs) -> LocalBucket:
+        bucket = LocalBucket(self, bucket_name, (location or 'ASIA-SOUTH1').upper())
+        os.makedirs(bucket.path, exist_ok=True)
+        return bucket
@@ -65,6 +65,9 @@ class LogLifecycleManager:
         # Cleanup Firestore
         self._cleanup_firestore()
         
+        # Compact yesterday's archives to Parquet
+        self._compact_archives()
+        
         # Cleanup GCS versions
         self._cleanup_gcs_versions()
         
@@ -113,6 +116,16 @@ class LogLifecycleManager:
         except Exception as e:
             print(f"Error cleaning system status: {e}")
     
+    def _compact_archives(self):
+        """Convert yesterday's trade, cognitive and performance archives to Parquet"""
+        print("Compacting archives to Parquet...")
+        
+        try:
+            counts = self.gcs_logger.compact_archives()
+            print(f"Compacted archive rows: {counts}")
+        except Exception as e:
+            print(f"Error compacting archives: {e}")
+    
     def _cleanup_gcs_versions(self):
         """Clean up old GCS file versions"""
         print("Cleaning up GCS versions...")
@@ -0,0 +1,224 @@
+"""
+Log Shipper - Non-blocking hand-off from the trading path to storage
+====================================================================
+
+Callers enqueue items into a bounded buffer and return immediately; one
+writer thread drains whatever has accumulated in batches and hands them
+to a sink (the Firestore/GCS routing in TradingLogger). All network I/O
+and periodic flushing happen on that thread, so a trade entry never
+waits on a Firestore commit.
+
+Backpressure when the buffer is full:
+- DEBUG entries are shed early, once the buffer passes a high watermark
+- ERROR/CRITICAL (and anything marked critical, e.g. trades) block until
+  there is room, up to ``block_timeout``
+- everything else is dropped and counted
+
+Items with a coalesce key replace a still-pending item with the same key
+instead of taking a new slot, so repeated updates of one document (bot
+status heartbeats, daily summaries) ship only their latest state. A
+``merge`` callback combines the pending item with the new one instead,
+for updates that only carry some of the document's fields.
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional
+
+from .log_types import LogLevel
+
+DEFAULT_BLOCK_LEVELS = frozenset({LogLevel.ERROR, LogLevel.CRITICAL})
+DEFAULT_SHED_LEVELS = frozenset({LogLevel.DEBUG})
+
+
+class _Slot:
+    """Buffer slot; coalesced updates replace ``item`` in place"""
+
+    __slots__ = ("item", "key")
+
+    def __init__(self, item: Any, key: Optional[Hashable]):
+        self.item = item
+        self.key = key
+
+
+class LogShipper:
+    """Bounded buffer drained by a dedicated writer thread"""
+
+    def __init__(self, sink: Callable[[List[Any]], None], capacity: int = 10000, batch_size: int = 200,
+                 flush_interval: float = 5.0, on_idle: Callable[[], None] = None,
+                 block_levels=DEFAULT_BLOCK_LEVELS, shed_levels=DEFAULT_SHED_LEVELS,
+                 shed_watermark: float = 0.8, block_timeout: float = 2.0, name: str = "log-shipper"):
+        self.sink = sink
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_idle = on_idle
+        self.block_levels = frozenset(block_levels)
+        self.shed_levels = frozenset(shed_levels)
+        self.shed_threshold = int(capacity * shed_watermark)
+        self.block_timeout = block_timeout
+
+        self._buffer: Deque[_Slot] = deque()
+        self._pending_keys: Dict[Hashable, _Slot] = {}
+        self._cond = threading.Condition()
+        self._closing = False
+        self._flush_requests = 0
+        self._flushes_done = 0
+
+        self.stats = {
+            'enqueued': 0,
+            'shipped': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'shed': 0,
+            'blocked': 0,
+            'sink_errors': 0,
+            'max_depth': 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # Hot path
+
+    def put(self, item: Any, level: LogLevel = LogLevel.INFO, coalesce_key: Hashable = None,
+            critical: bool = False, merge: Callable[[Any, Any], Any] = None) -> bool:
+        """
+        Enqueue ``item``; returns False if it was dropped
+
+        A pending item with the same ``coalesce_key`` is replaced by
+        ``item``, or by ``merge(pending, item)`` when ``merge`` is given.
+        """
+        with self._cond:
+            if self._closing:
+                self.stats['dropped'] += 1
+                return False
+
+            if coalesce_key is not None:
+                slot = self._pending_keys.get(coalesce_key)
+                if slot is not None:
+                    slot.item = merge(slot.item, item) if merge else item
+                    self.stats['coalesced'] += 1
+                    return True
+
+            depth = len(self._buffer)
+            if level in self.shed_levels and depth >= self.shed_threshold:
+                self.stats['shed'] += 1
+                return False
+
+            if depth >= self.capacity:
+                if not (critical or level in self.block_levels):
+                    self.stats['dropped'] += 1
+                    return False
+                self.stats['blocked'] += 1
+                self._cond.notify_all()
+                if not self._cond.wait_for(lambda: len(self._buffer) < self.capacity or self._closing,
+                                           timeout=self.block_timeout) or self._closing:
+                    self.stats['dropped'] += 1
+                    return False
+
+            slot = _Slot(item, coalesce_key)
+            self._buffer.append(slot)
+            if coalesce_key is not None:
+                self._pending_keys[coalesce_key] = slot
+            self.stats['enqueued'] += 1
+            if len(self._buffer) > self.stats['max_depth']:
+                self.stats['max_depth'] = len(self._buffer)
+            if len(self._buffer) == 1:
+                self._cond.notify_all()  # writer may be idle
+        return True
+
+    # Control
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything enqueued so far has been shipped and flushed"""
+        with self._cond:
+            if not self._thread.is_alive():
+                return False
+            self._flush_requests += 1
+            target = self._flush_requests
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._flushes_done >= target, timeout=timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Drain the buffer, run a final flush and stop the writer thread"""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    @property
+    def closed(self) -> bool:
+        return self._closing
+
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self.stats, 'depth': len(self._buffer), 'capacity': self.capacity}
+
+    # Writer thread
+
+    def _take_batch(self) -> List[Any]:
+        # Caller holds the lock
+        batch = []
+        while self._buffer and len(batch) < self.batch_size:
+            slot = self._buffer.popleft()
+            if slot.key is not None:
+                self._pending_keys.pop(slot.key, None)
+            batch.append(slot.item)
+        if batch:
+            self._cond.notify_all()  # wake producers blocked on a full buffer
+        return batch
+
+    def _run(self):
+        last_idle = time.monotonic()
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._buffer or self._closing or self._flushes_done < self._flush_requests,
+                    timeout=max(0.0, self.flush_interval - (time.monotonic() - last_idle)),
+                )
+                batch = self._take_batch()
+                flush_target = self._flush_requests
+                closing = self._closing
+                more = bool(self._buffer)
+
+            if batch:
+                self._ship(batch)
+            if more:
+                continue
+
+            if closing or flush_target > self._flushes_done or time.monotonic() - last_idle >= self.flush_interval:
+                self._idle()
+                last_idle = time.monotonic()
+                with self._cond:
+                    self._flushes_done = max(self._flushes_done, flush_target)
+                    self._cond.notify_all()
+                if closing:
+                    return
+
+    def _ship(self, batch: List[Any]):
+        try:
+            self.sink(batch)
+            self.stats['shipped'] += len(batch)
+        except Exception as e:
+            self.stats['sink_errors'] += 1
+            print(f"Log shipper sink failed for {len(batch)} entries: {e}")
+
+    def _idle(self):
+        if self.on_idle is None:
+            return
+        try:
+            self.on_idle()
+        except Exception as e:
+            self.stats['sink_errors'] += 1
+            print(f"Log shipper flush failed: {e}")
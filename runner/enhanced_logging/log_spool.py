@@ -0,0 +1,179 @@
+"""
+Log Spool - Local binary record of every log entry
+==================================================
+
+Every entry the shipper hands to TradingLogger is appended here before
+routing, including the DEBUG/market-data volume that never reaches
+Firestore. Each entry is serialized exactly once, as its flat
+``LogEntry.to_record()`` list (orjson when installed, stdlib json
+otherwise), and written as a length-prefixed frame to a file kept open
+between batches:
+
+    <u32 little-endian payload length><payload>
+
+Messages stay as template + args and timestamps as epoch floats; turning
+them into text is left to whoever reads the spool (``iter_spool``, or
+``python -m runner.enhanced_logging.log_spool <file>`` for NDJSON).
+
+Segments roll over at ``max_segment_bytes``. A frame torn by a crash
+ends iteration of that segment; everything before it is readable.
+"""
+
+import datetime
+import json
+import os
+import struct
+import sys
+import time
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .log_types import LogEntry
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+SPOOL_SUFFIX = ".spool"
+
+_FRAME_HEADER = struct.Struct('<I')
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    return str(value)
+
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def encode_record(record: list) -> bytes:
+        return orjson.dumps(record, default=_default, option=_ORJSON_OPTIONS)
+
+    decode_record = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(',', ':'))
+
+    def encode_record(record: list) -> bytes:
+        return _encoder.encode(record).encode('utf-8')
+
+    def decode_record(payload: bytes) -> list:
+        return json.loads(payload)
+
+
+class LogSpool:
+    """Append-only, length-prefixed spool of log entries"""
+
+    def __init__(self, spool_dir: str, prefix: str = "entries", max_segment_bytes: int = 64 * 1024 * 1024,
+                 buffer_size: int = 256 * 1024):
+        self.spool_dir = spool_dir
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.buffer_size = buffer_size
+
+        self.path: Optional[str] = None
+        self._file = None
+        self._segment_bytes = 0
+        self._seq = 0
+
+        self.stats = {
+            'entries': 0,
+            'bytes': 0,
+            'segments': 0,
+            'encode_errors': 0,
+            'write_seconds': 0.0,
+        }
+
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def _open_segment(self):
+        self._seq += 1
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(self.spool_dir, f"{self.prefix}_{stamp}_p{os.getpid()}_{self._seq:04d}{SPOOL_SUFFIX}")
+        self._file = open(self.path, 'ab', buffering=self.buffer_size)
+        self._segment_bytes = 0
+        self.stats['segments'] += 1
+
+    def write(self, entries: Iterable[LogEntry]) -> int:
+        """Append ``entries`` as one write; returns the number spooled"""
+        started = time.perf_counter()
+        frames = []
+        size = 0
+        for entry in entries:
+            try:
+                payload = encode_record(entry.to_record())
+            except Exception as e:
+                self.stats['encode_errors'] += 1
+                print(f"Could not spool log entry {entry!r}: {e}")
+                continue
+            frames.append(_FRAME_HEADER.pack(len(payload)))
+            frames.append(payload)
+            size += _FRAME_HEADER.size + len(payload)
+
+        if not frames:
+            return 0
+        if self._file is None or self._segment_bytes >= self.max_segment_bytes:
+            self._roll()
+        self._file.write(b''.join(frames))
+        self._segment_bytes += size
+
+        count = len(frames) // 2
+        self.stats['entries'] += count
+        self.stats['bytes'] += size
+        self.stats['write_seconds'] += time.perf_counter() - started
+        return count
+
+    def _roll(self):
+        if self._file is not None:
+            self._file.close()
+        self._open_segment()
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'path': self.path}
+
+
+def iter_spool(path: str) -> Iterator[LogEntry]:
+    """Entries of one spool segment, in write order"""
+    header_size = _FRAME_HEADER.size
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(header_size)
+            if len(header) < header_size:
+                return
+            (length,) = _FRAME_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return  # torn tail
+            yield LogEntry.from_record(decode_record(payload))
+
+
+def main(argv=None):
+    """Print spool segments as NDJSON, one ``LogEntry.to_dict()`` per line"""
+    out = sys.stdout
+    for path in (argv if argv is not None else sys.argv[1:]):
+        for entry in iter_spool(path):
+            out.write(json.dumps(entry.to_dict(), default=str))
+            out.write("\n")
+
+
+if __name__ == "__main__":
+    main()
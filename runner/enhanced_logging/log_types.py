@@ -3,8 +3,9 @@ Logging types and enums for the TRON Trading System
 """
 
 import datetime
+import time
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from dataclasses import dataclass
 
 
@@ -45,23 +46,66 @@ class LogType(Enum):
     ANALYTICS = "analytics"           # Performance metrics, analysis
 
 
-@dataclass
 class LogEntry:
-    """Structured log entry"""
-    timestamp: datetime.datetime
-    level: LogLevel
-    category: LogCategory
-    log_type: LogType
-    message: str
-    data: Dict[str, Any]
-    source: str
-    session_id: str
-    bot_type: Optional[str] = None
-    trade_id: Optional[str] = None
-    position_id: Optional[str] = None
-    strategy: Optional[str] = None
-    symbol: Optional[str] = None
-    
+    """Structured log entry
+
+    Built on every log call, so it stays cheap: slots instead of a
+    ``__dict__``, the creation time kept as an epoch float, and the
+    message kept as a ``%``-style template plus ``args``. The datetime and
+    the formatted message are produced on first access, which happens on
+    the shipper's writer thread (or never, for entries that only reach the
+    binary spool).
+    """
+
+    __slots__ = ('created', 'level', 'category', 'log_type', 'template', 'args', 'data', 'source',
+                 'session_id', 'bot_type', 'trade_id', 'position_id', 'strategy', 'symbol', '_message')
+
+    def __init__(self, timestamp: Union[datetime.datetime, float, None], level: LogLevel, category: LogCategory,
+                 log_type: LogType, message: str, data: Dict[str, Any], source: str, session_id: str,
+                 bot_type: Optional[str] = None, trade_id: Optional[str] = None, position_id: Optional[str] = None,
+                 strategy: Optional[str] = None, symbol: Optional[str] = None, args: tuple = ()):
+        if timestamp is None:
+            timestamp = time.time()
+        elif isinstance(timestamp, datetime.datetime):
+            timestamp = timestamp.timestamp()
+        self.created = timestamp
+        self.level = level
+        self.category = category
+        self.log_type = log_type
+        self.template = message
+        self.args = args
+        self.data = data
+        self.source = source
+        self.session_id = session_id
+        self.bot_type = bot_type
+        self.trade_id = trade_id
+        self.position_id = position_id
+        self.strategy = strategy
+        self.symbol = symbol
+        self._message = None if args else message
+
+    @property
+    def timestamp(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.created)
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            try:
+                self._message = self.template % self.args
+            except (TypeError, ValueError):
+                self._message = f"{self.template} {self.args!r}"
+        return self._message
+
+    def __repr__(self) -> str:
+        return (f"LogEntry({self.timestamp.isoformat()}, {self.level.value}, {self.category.value}, "
+                f"{self.log_type.value}, {self.message!r})")
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_record() == other.to_record()
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
         def serialize_value(value):
@@ -92,6 +136,19 @@ class LogEntry:
             'strategy': self.strategy,
             'symbol': self.symbol
         }
+
+    def to_record(self) -> list:
+        """Flat, unformatted field list for the binary spool (see ``from_record``)"""
+        return [self.created, self.level.value, self.category.value, self.log_type.value, self.template,
+                self.args, self.data, self.source, self.session_id, self.bot_type, self.trade_id,
+                self.position_id, self.strategy, self.symbol]
+
+    @classmethod
+    def from_record(cls, record: list) -> 'LogEntry':
+        (created, level, category, log_type, template, args, data, source, session_id,
+         bot_type, trade_id, position_id, strategy, symbol) = record
+        return cls(created, LogLevel(level), LogCategory(category), LogType(log_type), template, data, source,
+                   session_id, bot_type, trade_id, position_id, strategy, symbol, args=tuple(args or ()))
     
     def get_firestore_ttl(self) -> Optional[datetime.datetime]:
         """Get TTL for Firestore documents based on log type"""
@@ -0,0 +1,237 @@
+"""
+Parquet Archive - Columnar copy of archived logs for analysis
+=============================================================
+
+A nightly compaction turns one day's gzipped JSON/NDJSON archives into
+Parquet, hive-partitioned as ``<dataset>/date=YYYY-MM-DD/bot_type=<bot>/``.
+Rows are sorted by strategy and symbol before writing, so row-group
+min/max statistics are tight on the columns reports filter by.
+
+Scans prune partitions on date and bot and skip row groups by
+statistics, so "last 30 days, bot=options-trader, strategy=scalp" reads
+a few column chunks instead of downloading and decoding every JSON file.
+
+Schemas are fixed per dataset; nested values (metadata, market context,
+tags) are stored as JSON strings so files from different days always
+line up.
+"""
+
+import datetime
+import json
+import os
+from typing import Any, Dict, Iterable, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+PARQUET_PREFIX = "parquet"
+
+if PYARROW_AVAILABLE:
+    PARTITION_SCHEMA = pa.schema([("date", pa.string()), ("bot_type", pa.string())])
+
+    DATASET_SCHEMAS = {
+        'trades': pa.schema([
+            ("trade_id", pa.string()),
+            ("symbol", pa.string()),
+            ("strategy", pa.string()),
+            ("direction", pa.string()),
+            ("quantity", pa.int64()),
+            ("entry_price", pa.float64()),
+            ("stop_loss", pa.float64()),
+            ("target", pa.float64()),
+            ("exit_price", pa.float64()),
+            ("status", pa.string()),
+            ("pnl", pa.float64()),
+            ("entry_time", pa.string()),
+            ("exit_time", pa.string()),
+            ("exit_reason", pa.string()),
+            ("confidence_level", pa.float64()),
+            ("metadata", pa.string()),
+        ]),
+        'cognitive': pa.schema([
+            ("decision_id", pa.string()),
+            ("decision_type", pa.string()),
+            ("confidence_level", pa.float64()),
+            ("reasoning", pa.string()),
+            ("market_context", pa.string()),
+            ("outcome", pa.string()),
+            ("tags", pa.string()),
+            ("metadata", pa.string()),
+        ]),
+        'performance': pa.schema([
+            ("timestamp", pa.string()),
+            ("metrics", pa.string()),
+            ("metric_values", pa.map_(pa.string(), pa.float64())),
+        ]),
+    }
+
+    SORT_KEYS = {
+        'trades': [("strategy", "ascending"), ("symbol", "ascending"), ("entry_time", "ascending")],
+        'cognitive': [("decision_type", "ascending")],
+        'performance': [("timestamp", "ascending")],
+    }
+else:
+    PARTITION_SCHEMA = None
+    DATASET_SCHEMAS = {}
+    SORT_KEYS = {}
+
+
+def _coerce(value: Any, field_type) -> Any:
+    if value is None:
+        return None
+    try:
+        if pa.types.is_string(field_type):
+            if isinstance(value, (dict, list, tuple)):
+                return json.dumps(value, default=str, separators=(',', ':'))
+            return value if isinstance(value, str) else str(value)
+        if pa.types.is_floating(field_type):
+            return float(value)
+        if pa.types.is_integer(field_type):
+            return int(value)
+    except (TypeError, ValueError):
+        return None
+    return value
+
+
+def _performance_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    metrics = doc.get('metrics', {})
+    numbers = {}
+    if isinstance(metrics, dict):
+        for key, value in metrics.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers[key] = float(value)
+    return {
+        'timestamp': doc.get('timestamp'),
+        'metrics': metrics,
+        'metric_values': list(numbers.items()),
+    }
+
+
+def _latest_trades(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One row per (bot, trade_id): the last record archived, a closed one over an open one
+
+    A trade is archived on entry and again on exit, so the raw archive holds
+    every state it went through.
+    """
+    latest: Dict[Any, tuple] = {}
+    for order, row in enumerate(rows):
+        trade_id = row.get('trade_id')
+        key = (row.get('bot_type'), trade_id) if trade_id else ('', order)
+        rank = (bool(row.get('exit_time')), order)
+        if key not in latest or rank > latest[key][0]:
+            latest[key] = (rank, row)
+    return [row for _, row in latest.values()]
+
+
+class ParquetArchive:
+    """Hive-partitioned Parquet datasets on GCS or a local directory"""
+
+    def __init__(self, filesystem, base_dir: str, max_rows_per_group: int = 64 * 1024):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for ParquetArchive")
+        self.filesystem = filesystem
+        self.base_dir = base_dir.rstrip("/")
+        self.max_rows_per_group = max_rows_per_group
+
+    @classmethod
+    def for_client(cls, client, bucket_name: str) -> 'ParquetArchive':
+        """Archive in ``bucket_name`` for a storage client (or its local stand-in)"""
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for ParquetArchive")
+        root = getattr(client, 'root', None)
+        if root is not None:  # LocalBucketClient
+            return cls(pafs.LocalFileSystem(), os.path.join(root, bucket_name, PARQUET_PREFIX))
+        return cls(pafs.GcsFileSystem(), f"{bucket_name}/{PARQUET_PREFIX}")
+
+    def dataset_path(self, dataset: str) -> str:
+        return f"{self.base_dir}/{dataset}"
+
+    def _partitioning(self):
+        return ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+    def write_day(self, dataset: str, date: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Replace ``date``'s partitions of ``dataset`` with ``rows``; returns the row count
+
+        Each row needs a ``bot_type``; performance rows are the archived
+        ``{'timestamp', 'metrics', ...}`` documents. Trades keep only their
+        latest state, one row per ``trade_id``.
+        """
+        schema = DATASET_SCHEMAS[dataset]
+        if dataset == 'trades':
+            rows = _latest_trades(rows)
+        columns = {name: [] for name in schema.names}
+        bot_types = []
+        for row in rows:
+            bot_types.append(str(row.get('bot_type') or "unknown"))
+            if dataset == 'performance':
+                row = _performance_row(row)
+            for field in schema:
+                value = row.get(field.name)
+                columns[field.name].append(value if pa.types.is_map(field.type) else _coerce(value, field.type))
+
+        if not bot_types:
+            return 0
+
+        table = pa.Table.from_pydict(columns, schema=schema)
+        table = table.append_column("date", pa.array([date] * len(bot_types), pa.string()))
+        table = table.append_column("bot_type", pa.array(bot_types, pa.string()))
+        table = table.sort_by([("bot_type", "ascending")] + SORT_KEYS[dataset])
+
+        ds.write_dataset(
+            table,
+            self.dataset_path(dataset),
+            format="parquet",
+            partitioning=self._partitioning(),
+            filesystem=self.filesystem,
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="delete_matching",
+            max_rows_per_group=self.max_rows_per_group,
+            min_rows_per_group=min(self.max_rows_per_group, len(bot_types)),
+            file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+        )
+        return len(bot_types)
+
+    def dataset(self, dataset: str):
+        """pyarrow Dataset, or None if nothing was compacted yet"""
+        try:
+            return ds.dataset(
+                self.dataset_path(dataset),
+                schema=pa.unify_schemas([DATASET_SCHEMAS[dataset], PARTITION_SCHEMA]),
+                format="parquet",
+                partitioning=self._partitioning(),
+                filesystem=self.filesystem,
+            )
+        except (FileNotFoundError, OSError):
+            return None
+
+    def scan_table(self, dataset: str, days: int = None, start_date: str = None, end_date: str = None,
+                   bot_type: str = None, columns: List[str] = None, **equals):
+        """Filtered Arrow table; ``equals`` are column == value predicates"""
+        data = self.dataset(dataset)
+        if data is None:
+            return DATASET_SCHEMAS[dataset].empty_table()
+
+        if days is not None and start_date is None:
+            start_date = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+
+        predicate = None
+        for expr in (
+            ds.field("date") >= start_date if start_date else None,
+            ds.field("date") <= end_date if end_date else None,
+            ds.field("bot_type") == bot_type if bot_type else None,
+            *(ds.field(name) == value for name, value in equals.items()),
+        ):
+            if expr is not None:
+                predicate = expr if predicate is None else predicate & expr
+
+        return data.to_table(columns=columns, filter=predicate)
+
+    def scan(self, dataset: str, **kwargs) -> List[Dict[str, Any]]:
+        """Like scan_table, as a list of row dicts"""
+        return self.scan_table(dataset, **kwargs).to_pylist()
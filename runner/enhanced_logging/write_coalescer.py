@@ -0,0 +1,160 @@
+"""
+Write Coalescer - Last-state, changed-fields-only Firestore writes
+=================================================================
+
+Live collections see many updates per document between flushes (a
+position on every tick, a trade on every status change). The coalescer
+keeps one pending write per document, newer fields overriding older
+ones, so a flush sends each document at most once.
+
+It also remembers the fields last committed per document (bounded LRU)
+and sends only the ones that changed. A write with no changed fields is
+suppressed. Bookkeeping fields (``last_updated``, ``ttl``, ...) are
+never compared. They are sent along with any real change.
+
+Flushes are split into batches of at most 500 writes (Firestore's commit
+limit). A failed batch is requeued under any newer pending state and
+retried on the next flush. A document is dropped after
+``max_attempts`` failures.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple
+
+MAX_BATCH_OPS = 500
+DEFAULT_VOLATILE_FIELDS = frozenset({'last_updated', 'ttl', 'timestamp', 'last_heartbeat'})
+
+_MISSING = object()
+
+DocKey = Tuple[str, str]
+
+
+class FirestoreWriteCoalescer:
+    """Per-document write coalescing with field-level deltas"""
+
+    def __init__(self, db, max_batch_ops: int = MAX_BATCH_OPS, volatile_fields: Iterable[str] = DEFAULT_VOLATILE_FIELDS,
+                 max_tracked_docs: int = 10000, max_attempts: int = 3):
+        self.db = db
+        self.max_batch_ops = min(max_batch_ops, MAX_BATCH_OPS)
+        self.volatile_fields = frozenset(volatile_fields)
+        self.max_tracked_docs = max_tracked_docs
+        self.max_attempts = max_attempts
+
+        self.pending: 'OrderedDict[DocKey, Dict[str, Any]]' = OrderedDict()
+        self._attempts: Dict[DocKey, int] = {}
+        self._committed: 'OrderedDict[DocKey, Dict[str, Any]]' = OrderedDict()
+
+        self.stats = {
+            'requested_writes': 0,   # put() calls
+            'requested_fields': 0,
+            'coalesced': 0,          # merged into a pending write of the same document
+            'suppressed': 0,         # nothing changed since the last commit
+            'written_docs': 0,
+            'written_fields': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'dropped': 0,
+        }
+
+    def put(self, collection: str, doc_id: str, data: Dict[str, Any]):
+        """Queue a merge-write of ``data``; later fields for the same document win"""
+        key = (collection, doc_id)
+        self.stats['requested_writes'] += 1
+        self.stats['requested_fields'] += len(data)
+
+        pending = self.pending.get(key)
+        if pending is None:
+            self.pending[key] = dict(data)
+        else:
+            pending.update(data)
+            self.stats['coalesced'] += 1
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def _delta(self, key: DocKey, fields: Dict[str, Any]) -> Dict[str, Any]:
+        committed = self._committed.get(key)
+        if committed is None:
+            return fields
+        changed = {name: value for name, value in fields.items()
+                   if name not in self.volatile_fields and committed.get(name, _MISSING) != value}
+        if not changed:
+            return {}
+        for name in self.volatile_fields:
+            if name in fields:
+                changed[name] = fields[name]
+        return changed
+
+    def _remember(self, key: DocKey, fields: Dict[str, Any]):
+        committed = self._committed.get(key)
+        if committed is None:
+            committed = self._committed[key] = {}
+        else:
+            self._committed.move_to_end(key)
+        committed.update((name, value) for name, value in fields.items() if name not in self.volatile_fields)
+        while len(self._committed) > self.max_tracked_docs:
+            self._committed.popitem(last=False)
+
+    def forget(self, collection: str, doc_id: str):
+        """Drop the committed state of a document changed outside the coalescer"""
+        self._committed.pop((collection, doc_id), None)
+
+    def flush(self) -> Dict[str, int]:
+        """Commit pending writes in batches of at most ``max_batch_ops``"""
+        pending, self.pending = self.pending, OrderedDict()
+        writes = []
+        for key, fields in pending.items():
+            delta = self._delta(key, fields)
+            if delta:
+                writes.append((key, delta))
+            else:
+                self.stats['suppressed'] += 1
+                self._attempts.pop(key, None)
+
+        report = {'written': 0, 'failed': 0}
+        for start in range(0, len(writes), self.max_batch_ops):
+            shard = writes[start:start + self.max_batch_ops]
+            try:
+                batch = self.db.batch()
+                for (collection, doc_id), delta in shard:
+                    batch.set(self.db.collection(collection).document(doc_id), delta, merge=True)
+                batch.commit()
+            except Exception as e:
+                self.stats['failed_batches'] += 1
+                report['failed'] += len(shard)
+                print(f"Firestore batch of {len(shard)} writes failed, will retry: {e}")
+                self._requeue(shard, pending)
+                continue
+
+            self.stats['batches'] += 1
+            for key, delta in shard:
+                self._remember(key, delta)
+                self._attempts.pop(key, None)
+                self.stats['written_docs'] += 1
+                self.stats['written_fields'] += len(delta)
+            report['written'] += len(shard)
+        return report
+
+    def _requeue(self, shard, pending: Dict[DocKey, Dict[str, Any]]):
+        for key, _ in shard:
+            attempts = self._attempts.get(key, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(key, None)
+                self.stats['dropped'] += 1
+                print(f"Dropping Firestore write to {key[0]}/{key[1]} after {attempts} failed attempts")
+                continue
+            self._attempts[key] = attempts
+            # Full pending state, not the delta: the committed baseline did not move
+            newer = self.pending.get(key)
+            self.pending[key] = {**pending[key], **newer} if newer else pending[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        requested_writes = self.stats['requested_writes']
+        requested_fields = self.stats['requested_fields']
+        return {
+            **self.stats,
+            'pending_docs': len(self.pending),
+            # Documents / fields sent per document / field the callers asked to write
+            'write_amplification': self.stats['written_docs'] / requested_writes if requested_writes else 0.0,
+            'field_amplification': self.stats['written_fields'] / requested_fields if requested_fields else 0.0,
+        }
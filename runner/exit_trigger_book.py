@@ -0,0 +1,142 @@
+"""
+Exit Trigger Book
+
+Price-level index of exit triggers (stop losses, targets, trailing stops,
+partial exits, ...) keyed by symbol. Each symbol keeps two sorted
+ladders: triggers that fire when the price rises to/through a level and
+triggers that fire when it falls to/through one. A new price locates the
+crossed range with a binary search, so the cost of a price update is
+O(log n + fired) rather than a scan over every open position.
+
+Triggers are one-shot: a fired trigger is removed and the owner re-arms
+it if it should stay active (e.g. a trailing stop's new level).
+"""
+
+import bisect
+import itertools
+import math
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+ABOVE = "above"  # fires when price >= level
+BELOW = "below"  # fires when price <= level
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """An armed price level for one owner (position/trade)"""
+    owner: str
+    name: str
+    symbol: str
+    level: float
+    side: str
+
+
+class _Ladder:
+    """Ascending (level, seq, key) entries for one symbol and side"""
+
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries: List[Tuple[float, int, Tuple[str, str]]] = []
+
+    def insert(self, level: float, seq: int, key):
+        bisect.insort(self.entries, (level, seq, key))
+
+    def remove(self, level: float, seq: int):
+        i = bisect.bisect_left(self.entries, (level, seq))
+        if i < len(self.entries) and self.entries[i][1] == seq:
+            del self.entries[i]
+
+    def pop_crossed(self, side: str, price: float):
+        if side == ABOVE:
+            i = bisect.bisect_right(self.entries, (price, math.inf))
+            crossed, self.entries[:i] = self.entries[:i], []
+        else:
+            i = bisect.bisect_left(self.entries, (price, -math.inf))
+            crossed, self.entries[i:] = self.entries[i:], []
+        return crossed
+
+
+class ExitTriggerBook:
+    """Symbol-indexed, sorted exit triggers"""
+
+    def __init__(self):
+        self._ladders: Dict[Tuple[str, str], _Ladder] = {}
+        self._armed: Dict[Tuple[str, str], Tuple[Trigger, int]] = {}
+        self._owner_names: Dict[str, set] = {}
+        self._seq = itertools.count()
+        self._lock = Lock()
+        self.fired_count = 0
+
+    def set(self, owner: str, name: str, symbol: str, level: float, side: str) -> Trigger:
+        """Arm (or move) the owner's trigger ``name``"""
+        if side not in (ABOVE, BELOW):
+            raise ValueError(f"side must be '{ABOVE}' or '{BELOW}', got {side!r}")
+        key = (owner, name)
+        trigger = Trigger(owner, name, symbol, float(level), side)
+        with self._lock:
+            self._disarm(key)
+            seq = next(self._seq)
+            ladder = self._ladders.get((symbol, side))
+            if ladder is None:
+                ladder = self._ladders[(symbol, side)] = _Ladder()
+            ladder.insert(trigger.level, seq, key)
+            self._armed[key] = (trigger, seq)
+            self._owner_names.setdefault(owner, set()).add(name)
+        return trigger
+
+    def cancel(self, owner: str, name: str):
+        with self._lock:
+            self._disarm((owner, name))
+
+    def cancel_owner(self, owner: str):
+        """Remove every trigger of an owner (e.g. when its position closes)"""
+        with self._lock:
+            for name in list(self._owner_names.get(owner, ())):
+                self._disarm((owner, name))
+
+    def cross(self, symbol: str, price: float) -> List[Trigger]:
+        """Pop and return every trigger of ``symbol`` crossed by ``price``"""
+        fired = []
+        with self._lock:
+            for side in (ABOVE, BELOW):
+                ladder = self._ladders.get((symbol, side))
+                if ladder is None or not ladder.entries:
+                    continue
+                for _, _, key in ladder.pop_crossed(side, price):
+                    trigger, _ = self._armed.pop(key)
+                    self._forget_name(key)
+                    fired.append(trigger)
+            self.fired_count += len(fired)
+        return fired
+
+    def triggers(self, owner: str) -> Dict[str, Trigger]:
+        with self._lock:
+            return {name: self._armed[(owner, name)][0] for name in self._owner_names.get(owner, ())}
+
+    def get(self, owner: str, name: str) -> Optional[Trigger]:
+        with self._lock:
+            armed = self._armed.get((owner, name))
+            return armed[0] if armed else None
+
+    def __len__(self) -> int:
+        return len(self._armed)
+
+    # Callers hold the lock
+    def _disarm(self, key):
+        armed = self._armed.pop(key, None)
+        if armed is None:
+            return
+        trigger, seq = armed
+        self._ladders[(trigger.symbol, trigger.side)].remove(trigger.level, seq)
+        self._forget_name(key)
+
+    def _forget_name(self, key):
+        owner, name = key
+        names = self._owner_names.get(owner)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self._owner_names[owner]
@@ -10,12 +10,22 @@ import datetime
 import numpy as np
 import faiss
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_for_futures
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from google.cloud import storage
 from google.cloud import firestore
 import logging
 
+from gpt_runner.rag.embedding_service import (
+    DEFAULT_CACHE_PATH, EmbeddingCache, EmbeddingService, OpenAIEmbeddingBackend, SentenceTransformerBackend
+)
+from gpt_runner.rag.quantization import (
+    DEFAULT_RERANK_FACTOR, VectorFile, bytes_per_vector, is_compressed, new_compressed_index,
+    normalize_quantization, rerank, train_and_add
+)
+
 # Try importing OpenAI for embeddings, fallback to sentence-transformers
 try:
     import openai
@@ -60,11 +70,22 @@ class GCPMemoryClient:
     """
     
     def __init__(self, project_id: str = None, logger: logging.Logger = None, 
-                 openai_api_key: str = None, embedding_dimension: int = 1536):
+                 openai_api_key: str = None, embedding_dimension: int = 1536,
+                 index_quantization: str = None):
         self.project_id = project_id
         self.logger = logger or logging.getLogger(__name__)
         self.embedding_dimension = embedding_dimension
         
+        # 🆕 Compressed FAISS indices ('fp16', 'int8' or 'pq') once a type has
+        # quantize_threshold documents; exact vectors stay on local disk for re-ranking
+        self.index_quantization = normalize_quantization(
+            os.getenv("GCP_MEMORY_QUANTIZATION", "") if index_quantization is None else index_quantization
+        )
+        self.quantize_threshold = int(os.getenv("GCP_MEMORY_QUANTIZE_THRESHOLD", "10000"))
+        self.rerank_factor = DEFAULT_RERANK_FACTOR
+        self.vector_dir = os.getenv("GCP_MEMORY_VECTOR_DIR", "/tmp/faiss_vectors")
+        self.exact_vectors = {}  # doc_type -> VectorFile, row = faiss id
+        
         # Initialize clients
         self._init_clients()
         self._init_embedding_system(openai_api_key)
@@ -96,8 +117,15 @@ class GCPMemoryClient:
         }
         
         # 🆕 FAISS indices for different document types
+        # Each index is an IndexIDMap2 keyed by a per-type sequential id;
+        # faiss_id_to_doc[doc_type][id] is the doc_id stored under it (None once removed)
         self.faiss_indices = {}
         self.embedding_metadata = {}  # Maps doc_id to metadata
+        self.faiss_id_to_doc = {}
+        self._index_lock = threading.RLock()
+        self._search_pool = None
+        self._compress_pool = None
+        self._compressions = {}  # doc_type -> Future of its background compression
         
         # Initialize storage buckets and FAISS system
         self._ensure_buckets_exist()
@@ -115,19 +143,27 @@ class GCPMemoryClient:
     
     def _init_embedding_system(self, openai_api_key: str = None):
         """🆕 Initialize embedding system (OpenAI or SentenceTransformers)"""
+        self.embedding_service = None
         try:
             if OPENAI_AVAILABLE and openai_api_key:
                 openai.api_key = openai_api_key
+                client = openai.OpenAI(api_key=openai_api_key) if hasattr(openai, "OpenAI") else None
+                backend = OpenAIEmbeddingBackend("text-embedding-ada-002", client=client)
                 self.embedding_model = "openai"
                 self.logger.info("Initialized OpenAI embeddings")
             elif SENTENCE_TRANSFORMERS_AVAILABLE:
                 self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+                backend = SentenceTransformerBackend(self.sentence_model, 'all-MiniLM-L6-v2')
                 self.embedding_model = "sentence_transformers"
                 self.embedding_dimension = 384  # all-MiniLM-L6-v2 dimension
                 self.logger.info("Initialized SentenceTransformers embeddings")
             else:
                 self.embedding_model = None
                 self.logger.warning("No embedding model available. Install openai or sentence-transformers")
+                return
+            
+            # Batched requests, deduplicated texts and an on-disk content-hash cache
+            self.embedding_service = EmbeddingService(backend, cache=EmbeddingCache(DEFAULT_CACHE_PATH))
         except Exception as e:
             self.logger.error(f"Failed to initialize embedding system: {e}")
             self.embedding_model = None
@@ -139,9 +175,7 @@ class GCPMemoryClient:
             
             for doc_type in document_types:
                 # Create FAISS index with inner product similarity
-                index = faiss.IndexFlatIP(self.embedding_dimension)
-                self.faiss_indices[doc_type] = index
-                self.embedding_metadata[doc_type] = {}
+                self._reset_faiss_index(doc_type)
                 
                 # Try to load existing index from GCS
                 self._load_faiss_index(doc_type)
@@ -150,25 +184,95 @@ class GCPMemoryClient:
         except Exception as e:
             self.logger.error(f"Failed to initialize FAISS indices: {e}")
     
-    def _generate_embedding(self, text: str) -> Optional[List[float]]:
-        """🆕 Generate embedding for text using available model"""
+    def _new_faiss_index(self):
+        """Empty inner-product index addressed by explicit ids"""
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedding_dimension))
+    
+    def _reset_faiss_index(self, doc_type: str):
+        self.faiss_indices[doc_type] = self._new_faiss_index()
+        self.embedding_metadata[doc_type] = {}
+        self.faiss_id_to_doc[doc_type] = []
+        if self.index_quantization:
+            if doc_type in self.exact_vectors:
+                self.exact_vectors[doc_type].close()
+            self.exact_vectors[doc_type] = VectorFile(
+                os.path.join(self.vector_dir, f"{doc_type}.f32"), self.embedding_dimension, truncate=True
+            )
+    
+    def _compress_faiss_index(self, doc_type: str) -> bool:
+        """
+        Replace a flat doc-type index with a compressed one trained on its exact vectors
+        
+        Training runs without the index lock, so inserts and searches carry on
+        against the flat index; documents added or removed meanwhile are
+        applied to the compressed index before it is swapped in.
+        """
         try:
-            if self.embedding_model == "openai":
-                response = openai.Embedding.create(
-                    input=text,
-                    model="text-embedding-ada-002"
-                )
-                return response['data'][0]['embedding']
-            elif self.embedding_model == "sentence_transformers":
-                embedding = self.sentence_model.encode(text)
-                return embedding.tolist()
-            else:
+            with self._index_lock:
+                flat = self.faiss_indices[doc_type]
+                ids = faiss.vector_to_array(flat.id_map).astype(np.int64)
+                vectors = self.exact_vectors[doc_type].rows(ids)
+            
+            compressed = faiss.IndexIDMap(new_compressed_index(self.embedding_dimension, self.index_quantization,
+                                                               len(ids)))
+            train_and_add(compressed, vectors, ids)
+            
+            with self._index_lock:
+                if self.faiss_indices.get(doc_type) is not flat:
+                    return False  # Reset or reloaded while training
+                current = faiss.vector_to_array(flat.id_map).astype(np.int64)
+                added = np.setdiff1d(current, ids)
+                if len(added):
+                    compressed.add_with_ids(self.exact_vectors[doc_type].rows(added), added)
+                removed = np.setdiff1d(ids, current)
+                if len(removed):
+                    compressed.remove_ids(removed)
+                self.faiss_indices[doc_type] = compressed
+            
+            self.logger.info(f"Compressed FAISS index for {doc_type} to {self.index_quantization} "
+                             f"({bytes_per_vector(compressed):.0f} bytes/vector)")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to compress FAISS index for {doc_type}, keeping it flat: {e}")
+            return False
+        finally:
+            with self._index_lock:
+                self._compressions.pop(doc_type, None)
+    
+    def wait_for_index_compression(self, timeout: float = None):
+        """Block until background index compressions have been swapped in"""
+        with self._index_lock:
+            pending = list(self._compressions.values())
+        wait_for_futures(pending, timeout=timeout)
+    
+    def _write_exact_vectors(self, doc_type: str):
+        """Rebuild the exact-vector file from an uncompressed index"""
+        index = self.faiss_indices[doc_type]
+        rows = np.zeros((len(self.faiss_id_to_doc[doc_type]), self.embedding_dimension), dtype=np.float32)
+        if index.ntotal:
+            ids = faiss.vector_to_array(index.id_map)
+            rows[ids] = faiss.downcast_index(index.index).reconstruct_n(0, index.ntotal)
+        self.exact_vectors[doc_type].close()
+        self.exact_vectors[doc_type] = VectorFile(self.exact_vectors[doc_type].path, self.embedding_dimension,
+                                                  truncate=True)
+        self.exact_vectors[doc_type].append(rows)
+    
+    def _generate_embeddings(self, texts: List[str]) -> Optional[np.ndarray]:
+        """🆕 Generate embeddings for texts (one row each) using available model"""
+        try:
+            if self.embedding_service is None:
                 self.logger.warning("No embedding model available")
                 return None
+            return self.embedding_service.embed(texts)
         except Exception as e:
-            self.logger.error(f"Failed to generate embedding: {e}")
+            self.logger.error(f"Failed to generate embeddings: {e}")
             return None
     
+    def _generate_embedding(self, text: str) -> Optional[List[float]]:
+        """🆕 Generate embedding for text using available model"""
+        embeddings = self._generate_embeddings([text])
+        return embeddings[0].tolist() if embeddings is not None else None
+    
     def _ensure_buckets_exist(self):
         """Ensure all required Cloud Storage buckets exist"""
         buckets = [
@@ -302,7 +406,8 @@ class GCPMemoryClient:
     
     # === 🆕 ENHANCED EMBEDDING OPERATIONS ===
     
-    def store_embedding_document(self, content: str, doc_type: str, metadata: Dict[str, Any] = None) -> Optional[str]:
+    def store_embedding_document(self, content: str, doc_type: str, metadata: Dict[str, Any] = None,
+                                 ttl_hours: Optional[int] = None) -> Optional[str]:
         """
         🆕 Store document with embedding in FAISS and metadata in Firestore
         
@@ -310,6 +415,7 @@ class GCPMemoryClient:
             content: Text content to embed and store
             doc_type: Type of document ('trade_log', 'market_sentiment', 'decision', etc.)
             metadata: Additional metadata to store with the document
+            ttl_hours: Expire the document (index entry and Firestore record) after this many hours
             
         Returns:
             Document ID if successful, None otherwise
@@ -321,61 +427,112 @@ class GCPMemoryClient:
                 self.logger.error("Failed to generate embedding")
                 return None
             
-            # Generate unique document ID
-            doc_id = f"{doc_type}_{datetime.datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}"
-            
-            # Create embedding document
-            embed_doc = EmbeddingDocument(
-                doc_id=doc_id,
-                content=content,
-                embedding=embedding,
-                metadata=metadata or {},
-                timestamp=datetime.datetime.utcnow(),
-                document_type=doc_type
-            )
+            return self._index_embedding_document(content, embedding, doc_type, metadata, ttl_hours)
             
-            # Add to FAISS index
+        except Exception as e:
+            self.logger.error(f"Failed to store embedding document: {e}")
+            return None
+    
+    def store_embedding_documents(self, contents: List[str], doc_type: str,
+                                  metadatas: Optional[List[Dict[str, Any]]] = None,
+                                  ttl_hours: Optional[int] = None) -> List[Optional[str]]:
+        """
+        🆕 Store several documents of one type, embedding them in batched requests
+        
+        Returns:
+            Document ID (or None) per content
+        """
+        embeddings = self._generate_embeddings(contents)
+        if embeddings is None:
+            self.logger.error("Failed to generate embeddings")
+            return [None] * len(contents)
+        
+        metadatas = metadatas or [None] * len(contents)
+        doc_ids = []
+        for content, embedding, metadata in zip(contents, embeddings, metadatas):
+            try:
+                doc_ids.append(self._index_embedding_document(content, embedding.tolist(), doc_type,
+                                                              metadata, ttl_hours))
+            except Exception as e:
+                self.logger.error(f"Failed to store embedding document: {e}")
+                doc_ids.append(None)
+        return doc_ids
+    
+    def _index_embedding_document(self, content: str, embedding: List[float], doc_type: str,
+                                  metadata: Optional[Dict[str, Any]], ttl_hours: Optional[int]) -> str:
+        """Add one embedded document to the FAISS index and Firestore"""
+        # Generate unique document ID
+        doc_id = f"{doc_type}_{datetime.datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}"
+        
+        # Create embedding document
+        embed_doc = EmbeddingDocument(
+            doc_id=doc_id,
+            content=content,
+            embedding=embedding,
+            metadata=metadata or {},
+            timestamp=datetime.datetime.utcnow(),
+            document_type=doc_type
+        )
+        
+        # Add embedding to FAISS
+        embedding_array = np.array([embedding], dtype=np.float32)
+        # Normalize for cosine similarity
+        faiss.normalize_L2(embedding_array)
+        
+        with self._index_lock:
             if doc_type not in self.faiss_indices:
-                self.faiss_indices[doc_type] = faiss.IndexFlatIP(self.embedding_dimension)
-                self.embedding_metadata[doc_type] = {}
-            
-            # Add embedding to FAISS
-            embedding_array = np.array([embedding], dtype=np.float32)
-            # Normalize for cosine similarity
-            faiss.normalize_L2(embedding_array)
-            self.faiss_indices[doc_type].add(embedding_array)
+                self._reset_faiss_index(doc_type)
+            
+            # Documents stored within the same microsecond
+            suffix = 1
+            while embed_doc.doc_id in self.embedding_metadata[doc_type]:
+                embed_doc.doc_id = f"{doc_id}_{suffix}"
+                suffix += 1
+            doc_id = embed_doc.doc_id
+            
+            id_to_doc = self.faiss_id_to_doc[doc_type]
+            faiss_id = len(id_to_doc)
+            self.faiss_indices[doc_type].add_with_ids(embedding_array, np.array([faiss_id], dtype=np.int64))
+            id_to_doc.append(doc_id)
+            if doc_type in self.exact_vectors:
+                self.exact_vectors[doc_type].append(embedding_array)
             
             # Store metadata
             self.embedding_metadata[doc_type][doc_id] = {
                 'content': content,
                 'metadata': metadata or {},
                 'timestamp': embed_doc.timestamp,
-                'index_position': self.faiss_indices[doc_type].ntotal - 1
-            }
-            
-            # Store in Firestore
-            firestore_data = {
-                'doc_id': doc_id,
-                'content': content,
-                'document_type': doc_type,
-                'metadata': metadata or {},
-                'timestamp': embed_doc.timestamp,
-                'embedding_dimension': len(embedding)
+                'index_position': faiss_id,
+                'expires_at': embed_doc.timestamp + datetime.timedelta(hours=ttl_hours) if ttl_hours else None
             }
             
-            collection_name = f"{doc_type}_embeddings"
-            self.store_memory_item(collection_name, doc_id, firestore_data)
-            
-            # Periodically save FAISS index to GCS
-            if self.faiss_indices[doc_type].ntotal % 100 == 0:  # Save every 100 documents
-                self._save_faiss_index(doc_type)
-            
-            self.logger.info(f"Stored embedding document: {doc_id} of type {doc_type}")
-            return doc_id
-            
-        except Exception as e:
-            self.logger.error(f"Failed to store embedding document: {e}")
-            return None
+            if (doc_type in self.exact_vectors and not is_compressed(self.faiss_indices[doc_type])
+                    and self.faiss_indices[doc_type].ntotal >= self.quantize_threshold
+                    and doc_type not in self._compressions):
+                # Training takes seconds at this size, so it runs on a background thread
+                if self._compress_pool is None:
+                    self._compress_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="faiss-compress")
+                self._compressions[doc_type] = self._compress_pool.submit(self._compress_faiss_index, doc_type)
+        
+        # Store in Firestore
+        firestore_data = {
+            'doc_id': doc_id,
+            'content': content,
+            'document_type': doc_type,
+            'metadata': metadata or {},
+            'timestamp': embed_doc.timestamp,
+            'embedding_dimension': len(embedding)
+        }
+        
+        collection_name = f"{doc_type}_embeddings"
+        self.store_memory_item(collection_name, doc_id, firestore_data, ttl_hours=ttl_hours)
+        
+        # Periodically save FAISS index to GCS
+        if self.faiss_indices[doc_type].ntotal % 100 == 0:  # Save every 100 documents
+            self._save_faiss_index(doc_type)
+        
+        self.logger.info(f"Stored embedding document: {doc_id} of type {doc_type}")
+        return doc_id
     
     def search_similar_documents(self, query_text: str, doc_type: str = None, 
                                top_k: int = 5, similarity_threshold: float = 0.7) -> List[Dict[str, Any]]:
@@ -401,37 +558,23 @@ class GCPMemoryClient:
             query_array = np.array([query_embedding], dtype=np.float32)
             faiss.normalize_L2(query_array)
             
-            results = []
             search_types = [doc_type] if doc_type else list(self.faiss_indices.keys())
             
-            for search_type in search_types:
-                if search_type not in self.faiss_indices or self.faiss_indices[search_type].ntotal == 0:
-                    continue
-                
-                # Search in FAISS index
-                scores, indices = self.faiss_indices[search_type].search(query_array, top_k)
-                
-                for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-                    if score < similarity_threshold:
-                        continue
-                    
-                    # Find document by index position
-                    doc_data = None
-                    for doc_id, meta in self.embedding_metadata[search_type].items():
-                        if meta['index_position'] == idx:
-                            doc_data = {
-                                'doc_id': doc_id,
-                                'content': meta['content'],
-                                'metadata': meta['metadata'],
-                                'timestamp': meta['timestamp'],
-                                'document_type': search_type,
-                                'similarity_score': float(score),
-                                'rank': i + 1
-                            }
-                            break
-                    
-                    if doc_data:
-                        results.append(doc_data)
+            with self._index_lock:
+                search_types = [t for t in search_types if t in self.faiss_indices and self.faiss_indices[t].ntotal > 0]
+                if len(search_types) > 1:
+                    # FAISS releases the GIL while searching, so per-type searches overlap
+                    if self._search_pool is None:
+                        self._search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="faiss-search")
+                    per_type = list(self._search_pool.map(
+                        lambda t: self._search_faiss_index(t, query_array, top_k, similarity_threshold),
+                        search_types
+                    ))
+                else:
+                    per_type = [self._search_faiss_index(t, query_array, top_k, similarity_threshold)
+                                for t in search_types]
+            
+            results = [doc for docs in per_type for doc in docs]
             
             # Sort by similarity score
             results.sort(key=lambda x: x['similarity_score'], reverse=True)
@@ -443,6 +586,82 @@ class GCPMemoryClient:
             self.logger.error(f"Failed to search similar documents: {e}")
             return []
     
+    def _search_faiss_index(self, search_type: str, query_array: np.ndarray, top_k: int,
+                            similarity_threshold: float) -> List[Dict[str, Any]]:
+        """Top hits of one doc-type index, resolved to documents by id (caller holds the index lock)"""
+        index = self.faiss_indices[search_type]
+        exact = self.exact_vectors.get(search_type)
+        if is_compressed(index) and exact is not None and len(exact) >= len(self.faiss_id_to_doc[search_type]):
+            # Approximate candidates from the codes, exact scores from the vector file
+            _, candidates = index.search(query_array, min(top_k * self.rerank_factor, index.ntotal))
+            ids, scores = rerank(query_array, candidates, exact.rows, top_k)[0]
+        else:
+            scores, ids = index.search(query_array, min(top_k, index.ntotal))
+            scores, ids = scores[0], ids[0]
+        id_to_doc = self.faiss_id_to_doc[search_type]
+        metadata = self.embedding_metadata[search_type]
+        
+        results = []
+        for rank, (score, faiss_id) in enumerate(zip(scores, ids)):
+            if faiss_id < 0 or score < similarity_threshold:
+                break  # hits come back best first
+            doc_id = id_to_doc[faiss_id] if faiss_id < len(id_to_doc) else None
+            meta = metadata.get(doc_id) if doc_id is not None else None
+            if meta is None:
+                continue
+            results.append({
+                'doc_id': doc_id,
+                'content': meta['content'],
+                'metadata': meta['metadata'],
+                'timestamp': meta['timestamp'],
+                'document_type': search_type,
+                'similarity_score': float(score),
+                'rank': rank + 1
+            })
+        return results
+    
+    def remove_embedding_documents(self, doc_type: str, doc_ids: List[str], delete_records: bool = True) -> int:
+        """
+        🆕 Remove documents from a doc-type index (and their Firestore records)
+        
+        Returns:
+            Number of documents removed from the index
+        """
+        with self._index_lock:
+            if doc_type not in self.faiss_indices:
+                return 0
+            metadata = self.embedding_metadata[doc_type]
+            id_to_doc = self.faiss_id_to_doc[doc_type]
+            
+            faiss_ids = []
+            for doc_id in doc_ids:
+                meta = metadata.pop(doc_id, None)
+                if meta is not None:
+                    faiss_ids.append(meta['index_position'])
+                    id_to_doc[meta['index_position']] = None
+            if faiss_ids:
+                self.faiss_indices[doc_type].remove_ids(np.array(faiss_ids, dtype=np.int64))
+        
+        # Persist now: the periodic save only runs on inserts, so a restart would bring them back
+        if faiss_ids:
+            self._save_faiss_index(doc_type)
+        
+        if delete_records:
+            for doc_id in doc_ids:
+                self.delete_memory_item(f"{doc_type}_embeddings", doc_id)
+        return len(faiss_ids)
+    
+    def _expire_embedding_documents(self, now: datetime.datetime) -> int:
+        """Remove index entries whose TTL has passed"""
+        removed = 0
+        for doc_type in list(self.faiss_indices.keys()):
+            with self._index_lock:
+                expired = [doc_id for doc_id, meta in self.embedding_metadata[doc_type].items()
+                           if meta.get('expires_at') and meta['expires_at'] < now]
+            if expired:
+                removed += self.remove_embedding_documents(doc_type, expired)
+        return removed
+    
     def store_trade_log_embedding(self, trade_data: Dict[str, Any]) -> Optional[str]:
         """
         🆕 Store trade log with semantic embedding for future analysis
@@ -602,12 +821,11 @@ class GCPMemoryClient:
             index_file = f"/tmp/faiss_index_{doc_type}.bin"
             metadata_file = f"/tmp/metadata_{doc_type}.pkl"
             
-            # Save FAISS index
-            faiss.write_index(self.faiss_indices[doc_type], index_file)
-            
-            # Save metadata
-            with open(metadata_file, 'wb') as f:
-                pickle.dump(self.embedding_metadata[doc_type], f)
+            # Save FAISS index and metadata
+            with self._index_lock:
+                faiss.write_index(self.faiss_indices[doc_type], index_file)
+                with open(metadata_file, 'wb') as f:
+                    pickle.dump(self.embedding_metadata[doc_type], f)
             
             # Upload to GCS
             bucket = self.storage_client.bucket(self.embeddings_bucket)
@@ -620,6 +838,11 @@ class GCPMemoryClient:
             metadata_blob = bucket.blob(f"faiss_indices/{doc_type}_metadata.pkl")
             metadata_blob.upload_from_filename(metadata_file)
             
+            # Upload exact vectors used to re-rank compressed search results
+            if doc_type in self.exact_vectors:
+                vectors_blob = bucket.blob(f"faiss_indices/{doc_type}_vectors.f32")
+                vectors_blob.upload_from_filename(self.exact_vectors[doc_type].path)
+            
             # Cleanup temp files
             os.remove(index_file)
             os.remove(metadata_file)
@@ -649,12 +872,36 @@ class GCPMemoryClient:
             metadata_file = f"/tmp/metadata_{doc_type}.pkl"
             metadata_blob.download_to_filename(metadata_file)
             
-            # Load FAISS index
-            self.faiss_indices[doc_type] = faiss.read_index(index_file)
-            
-            # Load metadata
+            # Load FAISS index and metadata
+            index = faiss.read_index(index_file)
             with open(metadata_file, 'rb') as f:
-                self.embedding_metadata[doc_type] = pickle.load(f)
+                metadata = pickle.load(f)
+            
+            if not isinstance(index, faiss.IndexIDMap):
+                # Positional index from before id mapping: ids = positions
+                id_map = self._new_faiss_index()
+                if index.ntotal:
+                    id_map.add_with_ids(index.reconstruct_n(0, index.ntotal), np.arange(index.ntotal, dtype=np.int64))
+                index = id_map
+            
+            id_to_doc = [None] * (max((meta['index_position'] for meta in metadata.values()), default=-1) + 1)
+            for doc_id, meta in metadata.items():
+                id_to_doc[meta['index_position']] = doc_id
+            
+            with self._index_lock:
+                self.faiss_indices[doc_type] = index
+                self.embedding_metadata[doc_type] = metadata
+                self.faiss_id_to_doc[doc_type] = id_to_doc
+                
+                if doc_type in self.exact_vectors:
+                    vectors_blob = bucket.blob(f"faiss_indices/{doc_type}_vectors.f32")
+                    if vectors_blob.exists():
+                        vectors_blob.download_to_filename(self.exact_vectors[doc_type].path)
+                        self.exact_vectors[doc_type].reopen()
+                    elif not is_compressed(index):
+                        self._write_exact_vectors(doc_type)
+                    # Ids past the last surviving document were used by removed ones
+                    id_to_doc.extend([None] * (len(self.exact_vectors[doc_type]) - len(id_to_doc)))
             
             # Cleanup temp files
             os.remove(index_file)
@@ -682,6 +929,10 @@ class GCPMemoryClient:
                 stats['by_type'][doc_type] = count
                 stats['total_documents'] += count
             
+            # 🆕 Resident index size
+            stats['index_quantization'] = self.index_quantization
+            stats['index_bytes'] = sum(bytes_per_vector(index) * index.ntotal for index in self.faiss_indices.values())
+            
             return stats
             
         except Exception as e:
@@ -706,7 +957,11 @@ class GCPMemoryClient:
                     if self.delete_memory_item(collection_name, doc['id']):
                         cleanup_count += 1
             
-            self.logger.info(f"Cleaned up {cleanup_count} expired memory items")
+            # Drop expired documents from the FAISS indices as well
+            expired_embeddings = self._expire_embedding_documents(current_time)
+            cleanup_count += expired_embeddings
+            
+            self.logger.info(f"Cleaned up {cleanup_count} expired memory items ({expired_embeddings} embeddings)")
             return cleanup_count
         except Exception as e:
             self.logger.error(f"Failed to cleanup expired memories: {e}")
@@ -0,0 +1,426 @@
+"""
+Batch Technical Indicators
+Vectorized indicators over an aligned (symbols x bars) price matrix.
+
+Every function works along the last axis, so a whole universe is computed
+in one set of NumPy passes instead of one DataFrame per symbol. Formulas
+mirror the single-symbol implementations they replace:
+
+- VWAP/RSI/ATR/MACD/Bollinger: ``TechnicalEngine`` (rolling means, adjusted
+  EMAs, sample standard deviation)
+- ADX: ``TechnicalIndicators.calculate_adx`` (alpha = 1/period smoothing
+  seeded with the first value)
+
+Recursive smoothers use ``scipy.signal.lfilter`` when scipy is installed and
+fall back to a loop over bars (still vectorized across symbols).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter
+
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+# ----------------------------------------------------------------------
+# Primitives (all operate along the last axis)
+# ----------------------------------------------------------------------
+
+def _shift(values: np.ndarray, fill: float = np.nan) -> np.ndarray:
+    shifted = np.empty_like(values, dtype=np.float64)
+    shifted[..., 0] = fill
+    shifted[..., 1:] = values[..., :-1]
+    return shifted
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window sum; the first ``window - 1`` positions are NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if window <= 0 or values.shape[-1] < window:
+        return out
+    csum = np.cumsum(values, axis=-1)
+    out[..., window - 1] = csum[..., window - 1]
+    out[..., window:] = csum[..., window:] - csum[..., :-window]
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    return rolling_sum(values, window) / window
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """Trailing window standard deviation (pandas ``rolling().std()`` for ddof=1)"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=-1)
+    out[..., window - 1:] = windows.std(axis=-1, ddof=ddof)
+    return out
+
+
+def linear_recurrence(values: np.ndarray, decay: float, gain: float = 1.0,
+                      initial: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    y[t] = gain * x[t] + decay * y[t-1], with y[-1] = ``initial`` (default 0).
+
+    This first-order IIR filter is the kernel of every EMA/Wilder smoother.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1] == 0:
+        return values.copy()
+    init = np.zeros(values.shape[:-1]) if initial is None else np.asarray(initial, dtype=np.float64)
+
+    if SCIPY_AVAILABLE:
+        zi = (decay * init)[..., np.newaxis]
+        out, _ = lfilter([gain], [1.0, -decay], values, axis=-1, zi=zi)
+        return out
+
+    out = np.empty_like(values)
+    prev = init
+    for t in range(values.shape[-1]):
+        prev = gain * values[..., t] + decay * prev
+        out[..., t] = prev
+    return out
+
+
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """Equivalent of ``pandas.Series.ewm(span=span, adjust=True).mean()``"""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    numerator = linear_recurrence(values, decay)
+    denominator = linear_recurrence(np.ones(np.shape(values)[-1]), decay)
+    return numerator / denominator
+
+
+def wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    y[0] = x[0]; y[t] = x[t] / period + (1 - 1/period) * y[t-1]
+
+    Matches the smoothing used by ``TechnicalIndicators.calculate_adx``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[-1] == 0:
+        return values.copy()
+    alpha = 1.0 / period
+    # Choosing y[-1] = x[0] makes y[0] = alpha*x[0] + (1-alpha)*x[0] = x[0]
+    return linear_recurrence(values, 1.0 - alpha, alpha, initial=values[..., 0])
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; the first bar has no previous close and uses high - low"""
+    prev_close = _shift(close)
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+# ----------------------------------------------------------------------
+# Indicators (full series)
+# ----------------------------------------------------------------------
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+         period: Optional[int] = None, session_ids: Optional[Sequence[Any]] = None) -> np.ndarray:
+    """
+    Rolling VWAP when ``period`` is given, otherwise cumulative VWAP that
+    resets whenever ``session_ids`` (one label per bar, e.g. trade date)
+    changes.
+    """
+    price_volume = (high + low + close) / 3 * volume
+    if period:
+        pv, vol = rolling_sum(price_volume, period), rolling_sum(volume, period)
+    else:
+        pv, vol = np.cumsum(price_volume, axis=-1), np.cumsum(np.asarray(volume, dtype=np.float64), axis=-1)
+        if session_ids is not None:
+            labels = np.asarray(session_ids)
+            starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+            # Index of the first bar of each bar's session
+            first = starts[np.searchsorted(starts, np.arange(labels.size), side="right") - 1]
+            pv_before = np.where(first > 0, np.take(pv, first - 1, axis=-1), 0.0)
+            vol_before = np.where(first > 0, np.take(vol, first - 1, axis=-1), 0.0)
+            pv, vol = pv - pv_before, vol - vol_before
+    vol = np.where(vol == 0, 1, vol)
+    return pv / vol
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Simple-average RSI as computed by ``TechnicalEngine.calculate_adaptive_rsi``"""
+    delta = np.diff(close, axis=-1, prepend=np.nan)
+    gain = rolling_mean(np.where(delta > 0, delta, 0.0), period)
+    loss = rolling_mean(np.where(delta < 0, -delta, 0.0), period)
+    loss = np.where(loss == 0, 0.0001, loss)
+    return 100 - 100 / (1 + gain / loss)
+
+
+def adaptive_rsi_periods(close: np.ndarray, period: int = 14):
+    """Return (per-symbol RSI periods, volatility) using the TechnicalEngine rules"""
+    returns = np.diff(close, axis=-1) / close[..., :-1]
+    if close.shape[-1] >= 20 and returns.shape[-1] >= 20:
+        volatility = returns[..., -20:].std(axis=-1, ddof=1)
+    else:
+        volatility = np.full(close.shape[:-1], 0.02)
+    return np.select(
+        [volatility > 0.03, volatility < 0.01],
+        [max(period - 4, 9), min(period + 6, 21)],
+        default=period,
+    ), volatility
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Return (macd_line, signal_line, histogram)"""
+    macd_line = ewm_mean(close, fast) - ewm_mean(close, slow)
+    signal_line = ewm_mean(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger(close: np.ndarray, period: int = 20, std_dev: float = 2):
+    """Return (upper, middle, lower) with sample standard deviation"""
+    middle = rolling_mean(close, period)
+    width = rolling_std(close, period) * std_dev
+    return middle + width, middle, middle - width
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14):
+    """
+    Return (adx, di_plus, di_minus) series aligned to the input bars.
+
+    The first bar has no directional movement and is NaN.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    shape = high.shape
+    if shape[-1] < 2:
+        nan = np.full(shape, np.nan)
+        return nan, nan.copy(), nan.copy()
+
+    tr = true_range(high, low, close)[..., 1:]
+    up_move = high[..., 1:] - high[..., :-1]
+    down_move = low[..., :-1] - low[..., 1:]
+    dm_plus = np.where(up_move > down_move, np.maximum(up_move, 0), 0.0)
+    dm_minus = np.where(down_move > up_move, np.maximum(down_move, 0), 0.0)
+
+    atr = wilder_smooth(tr, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        di_plus = 100 * wilder_smooth(dm_plus, period) / atr
+        di_minus = 100 * wilder_smooth(dm_minus, period) / atr
+    dx = 100 * np.abs(di_plus - di_minus) / (di_plus + di_minus + 1e-10)
+    adx_line = wilder_smooth(dx, period)
+
+    pad = np.full(shape[:-1] + (1,), np.nan)
+    return (np.concatenate([pad, adx_line], axis=-1),
+            np.concatenate([pad, di_plus], axis=-1),
+            np.concatenate([pad, di_minus], axis=-1))
+
+
+# ----------------------------------------------------------------------
+# Vectorized signal rules (same thresholds as technical_engine helpers)
+# ----------------------------------------------------------------------
+
+def _vwap_signals(price, value):
+    deviation = (price - value) / value * 100
+    above, below = price > value * 1.002, price < value * 0.998
+    signal = np.select([above, below], ["BUY", "SELL"], "HOLD")
+    confidence = np.where(above | below, np.minimum(np.abs(deviation) / 2, 1.0), 0.5)
+    return signal, confidence, deviation
+
+
+def _rsi_signals(current, prev):
+    conditions = [current > 75, current < 25, (current > 55) & (prev <= 55), (current < 45) & (prev >= 45)]
+    signal = np.select(conditions, ["SELL", "BUY", "BUY", "SELL"], "HOLD")
+    confidence = np.select(
+        conditions,
+        [np.minimum((current - 70) / 20, 1.0), np.minimum((30 - current) / 20, 1.0), 0.7, 0.7],
+        0.5,
+    )
+    return signal, confidence
+
+
+def _atr_signals(ratio):
+    conditions = [ratio > 1.5, ratio < 0.6]
+    regime = np.select(conditions, ["HIGH_VOLATILITY", "LOW_VOLATILITY"], "NORMAL")
+    signal = np.select(conditions, ["REDUCE_SIZE", "INCREASE_SIZE"], "HOLD")
+    confidence = np.select(conditions, [np.minimum((ratio - 1.5) / 0.5, 1.0), np.minimum((0.6 - ratio) / 0.4, 1.0)], 0.5)
+    return regime, signal, confidence
+
+
+def _macd_signals(line, signal_line, hist, prev_hist):
+    conditions = [(hist > 0) & (prev_hist <= 0), (hist < 0) & (prev_hist >= 0), line > signal_line, line < signal_line]
+    signal = np.select(conditions, ["BUY", "SELL", "BUY", "SELL"], "HOLD")
+    confidence = np.select(conditions, [0.8, 0.8, 0.6, 0.6], 0.5)
+    return signal, confidence
+
+
+def _bollinger_signals(price, upper, middle, lower):
+    conditions = [price > upper, price < lower, price > middle]
+    signal = np.select(conditions, ["SELL", "BUY", "BUY"], "SELL")
+    confidence = np.select(
+        conditions,
+        [np.minimum((price - upper) / (upper * 0.01), 1.0), np.minimum((lower - price) / (lower * 0.01), 1.0), 0.6],
+        0.6,
+    )
+    return signal, confidence
+
+
+# ----------------------------------------------------------------------
+# Columnar result
+# ----------------------------------------------------------------------
+
+@dataclass
+class BatchIndicatorResult:
+    """
+    Latest indicator values for a symbol universe, stored column-wise.
+
+    ``columns[name]`` is a length-S array aligned with ``symbols``;
+    ``series[name]`` holds full (S x T) arrays when requested.
+    """
+    symbols: List[str]
+    columns: Dict[str, np.ndarray]
+    series: Dict[str, np.ndarray] = field(default_factory=dict)
+    is_mock: bool = False
+
+    def __post_init__(self):
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def __getitem__(self, symbol: str) -> Dict[str, Any]:
+        i = self._index[symbol]
+        return {name: values[i].item() for name, values in self.columns.items()}
+
+    def column(self, name: str) -> Dict[str, Any]:
+        """One indicator for every symbol"""
+        return dict(zip(self.symbols, self.columns[name].tolist()))
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {symbol: self[symbol] for symbol in self.symbols}
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.columns, index=pd.Index(self.symbols, name="symbol"))
+
+
+def stack_candles(candles_by_symbol: Dict[str, List[Dict]], bars: Optional[int] = None):
+    """
+    Align per-symbol candle lists into (S x T) arrays.
+
+    Lists are right-aligned on their most recent candle and truncated to the
+    shortest history (or ``bars``). Symbols without candles are dropped.
+
+    :return: (symbols, {"open", "high", "low", "close", "volume"} arrays)
+    """
+    symbols = [s for s, candles in candles_by_symbol.items() if candles]
+    if not symbols:
+        return [], {name: np.empty((0, 0)) for name in ("open", "high", "low", "close", "volume")}
+    length = min(len(candles_by_symbol[s]) for s in symbols)
+    if bars:
+        length = min(length, bars)
+
+    arrays = {name: np.empty((len(symbols), length)) for name in ("open", "high", "low", "close", "volume")}
+    for row, symbol in enumerate(symbols):
+        window = candles_by_symbol[symbol][-length:]
+        for name, out in arrays.items():
+            default = 1 if name == "volume" else np.nan
+            out[row] = [candle.get(name, default) for candle in window]
+    return symbols, arrays
+
+
+def compute_batch(symbols: Sequence[str], high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                  volume: np.ndarray, vwap_period: Optional[int] = None,
+                  session_ids: Optional[Sequence[Any]] = None, rsi_period: int = 14,
+                  atr_period: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                  macd_signal_period: int = 9, bb_period: int = 20, bb_std_dev: float = 2,
+                  adx_period: int = 14, full_series: bool = False) -> BatchIndicatorResult:
+    """Compute every indicator for an aligned (S x T) universe"""
+    high, low, close, volume = (np.atleast_2d(np.asarray(a, dtype=np.float64)) for a in (high, low, close, volume))
+    if not (high.shape == low.shape == close.shape == volume.shape):
+        raise ValueError("OHLCV arrays must share the same (symbols, bars) shape")
+    if high.shape[0] != len(symbols):
+        raise ValueError(f"Got {len(symbols)} symbols for {high.shape[0]} rows")
+    if high.shape[1] < 2:
+        raise ValueError("At least two bars are required")
+
+    price = close[:, -1]
+    columns: Dict[str, np.ndarray] = {"close": price}
+    series: Dict[str, np.ndarray] = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # VWAP
+        vwap_line = vwap(high, low, close, volume, vwap_period, session_ids)
+        columns["vwap"] = vwap_line[:, -1]
+        columns["vwap_signal"], columns["vwap_confidence"], columns["vwap_deviation_pct"] = \
+            _vwap_signals(price, columns["vwap"])
+
+        # RSI with per-symbol adaptive period
+        periods, volatility = adaptive_rsi_periods(close, rsi_period)
+        rsi_line = np.full(close.shape, np.nan)
+        for p in np.unique(periods):
+            rows = periods == p
+            rsi_line[rows] = rsi(close[rows], int(p))
+        columns["rsi"] = rsi_line[:, -1]
+        columns["rsi_period"] = periods
+        columns["rsi_volatility"] = volatility
+        columns["rsi_signal"], columns["rsi_confidence"] = _rsi_signals(rsi_line[:, -1], rsi_line[:, -2])
+
+        # ATR (rolling mean of true range) and volatility regime
+        tr = true_range(high, low, close)
+        atr_line = rolling_mean(tr, atr_period)
+        short_atr = rolling_mean(tr, min(5, atr_period // 2))[:, -1]
+        columns["atr"] = atr_line[:, -1]
+        columns["atr_ratio"] = short_atr / columns["atr"]
+        columns["atr_regime"], columns["atr_signal"], columns["atr_confidence"] = _atr_signals(columns["atr_ratio"])
+
+        # MACD
+        macd_line, signal_line, histogram = macd(close, macd_fast, macd_slow, macd_signal_period)
+        columns["macd"] = macd_line[:, -1]
+        columns["macd_signal_line"] = signal_line[:, -1]
+        columns["macd_histogram"] = histogram[:, -1]
+        columns["macd_signal"], columns["macd_confidence"] = _macd_signals(
+            macd_line[:, -1], signal_line[:, -1], histogram[:, -1], histogram[:, -2])
+
+        # Bollinger Bands
+        upper, middle, lower = bollinger(close, bb_period, bb_std_dev)
+        columns["bb_upper"], columns["bb_middle"], columns["bb_lower"] = upper[:, -1], middle[:, -1], lower[:, -1]
+        columns["bb_width"] = (upper[:, -1] - lower[:, -1]) / middle[:, -1] * 100
+        columns["bb_signal"], columns["bb_confidence"] = _bollinger_signals(
+            price, upper[:, -1], middle[:, -1], lower[:, -1])
+
+        # ADX
+        adx_line, di_plus, di_minus = adx(high, low, close, adx_period)
+        columns["adx"], columns["di_plus"], columns["di_minus"] = adx_line[:, -1], di_plus[:, -1], di_minus[:, -1]
+
+    # Indicators without enough history are reported as NaN
+    insufficient = {
+        "rsi": close.shape[1] < rsi_period + 1,
+        "atr": close.shape[1] < atr_period + 1,
+        "macd": close.shape[1] < macd_slow + macd_signal_period,
+        "bb": close.shape[1] < bb_period,
+        "adx": close.shape[1] < adx_period + 1,
+    }
+    for prefix, short in insufficient.items():
+        if short:
+            for name in columns:
+                if not name.startswith(prefix):
+                    continue
+                if columns[name].dtype.kind == "f":
+                    columns[name] = np.full(len(symbols), np.nan)
+                elif columns[name].dtype.kind == "U":
+                    columns[name] = np.full(len(symbols), "HOLD" if name.endswith("_signal") else "UNKNOWN")
+
+    if full_series:
+        series = {
+            "vwap": vwap_line, "rsi": rsi_line, "atr": atr_line,
+            "macd": macd_line, "macd_signal_line": signal_line, "macd_histogram": histogram,
+            "bb_upper": upper, "bb_middle": middle, "bb_lower": lower,
+            "adx": adx_line, "di_plus": di_plus, "di_minus": di_minus,
+        }
+    return BatchIndicatorResult(symbols=list(symbols), columns=columns, series=series)
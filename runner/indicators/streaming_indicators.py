@@ -0,0 +1,413 @@
+"""
+Streaming Technical Indicators
+Per-symbol indicator state updated in O(1) per new candle.
+
+TechnicalEngine rebuilds a DataFrame and recomputes every rolling window on
+each call. For strategies that poll every minute across many symbols,
+``StreamingIndicators`` keeps running accumulators instead and produces the
+same ``IndicatorResult`` objects:
+
+- VWAP: session accumulators (reset on date change) or a rolling window
+- RSI / ATR: Wilder smoothing, seeded with a simple average of the first
+  ``period`` values
+- MACD: adjusted EMAs, numerically identical to ``pandas.ewm(span=...)``
+- Bollinger Bands: sliding-window mean/variance (sample std, like pandas)
+"""
+
+import math
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from runner.indicators.technical_engine import (
+    IndicatorResult,
+    atr_regime,
+    bollinger_signal,
+    macd_signal,
+    rsi_signal,
+    vwap_signal,
+)
+
+
+class RollingWindow:
+    """Fixed-size window with O(1) sum, mean and sample variance"""
+
+    __slots__ = ("size", "values", "total", "mean", "m2")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+
+    def push(self, value: float):
+        values = self.values
+        if len(values) < self.size:
+            values.append(value)
+            self.total += value
+            n = len(values)
+            delta = value - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (value - self.mean)
+        else:
+            old = values.popleft()
+            values.append(value)
+            self.total += value - old
+            old_mean = self.mean
+            self.mean += (value - old) / self.size
+            self.m2 += (value - old) * (value - self.mean + old - old_mean)
+            if self.m2 < 0:  # guard against round-off
+                self.m2 = 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    @property
+    def variance(self) -> float:
+        n = len(self.values)
+        return self.m2 / (n - 1) if n > 1 else float("nan")
+
+    @property
+    def std(self) -> float:
+        variance = self.variance
+        return math.sqrt(variance) if variance == variance else variance
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class AdjustedEMA:
+    """EMA matching ``pandas.Series.ewm(span=span, adjust=True).mean()``"""
+
+    __slots__ = ("decay", "numerator", "denominator")
+
+    def __init__(self, span: int):
+        self.decay = 1.0 - 2.0 / (span + 1.0)
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def push(self, value: float) -> float:
+        self.numerator = value + self.decay * self.numerator
+        self.denominator = 1.0 + self.decay * self.denominator
+        return self.numerator / self.denominator
+
+    @property
+    def value(self) -> float:
+        return self.numerator / self.denominator if self.denominator else float("nan")
+
+
+class WilderAverage:
+    """Wilder's smoothed moving average, seeded with an SMA of the first ``period`` values"""
+
+    __slots__ = ("period", "value", "_seed_sum", "_count")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.value: Optional[float] = None
+        self._seed_sum = 0.0
+        self._count = 0
+
+    def push(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self._seed_sum += x
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._seed_sum / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + x) / self.period
+        return self.value
+
+
+def _session_date(timestamp: Any) -> Optional[date]:
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, datetime):
+        return timestamp.date()
+    if isinstance(timestamp, date):
+        return timestamp
+    try:
+        return datetime.fromisoformat(str(timestamp)).date()
+    except ValueError:
+        return None
+
+
+class StreamingIndicators:
+    """
+    Incremental VWAP/RSI/ATR/MACD/Bollinger state for one symbol.
+
+    Feed candles with ``update`` (one candle) or ``sync`` (a polled candle
+    list; only candles newer than the last one seen are applied), then read
+    the latest values as ``IndicatorResult`` objects.
+    """
+
+    def __init__(self, symbol: str, vwap_period: Optional[int] = None, rsi_period: int = 14,
+                 atr_period: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_signal_period: int = 9, bb_period: int = 20, bb_std_dev: float = 2,
+                 volatility_window: int = 20):
+        self.symbol = symbol
+        self.vwap_period = vwap_period
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal_period = macd_signal_period
+        self.bb_period = bb_period
+        self.bb_std_dev = bb_std_dev
+
+        self.bars = 0
+        self.last_timestamp = None
+        self.last_close: Optional[float] = None
+        self.prev_close: Optional[float] = None
+
+        # VWAP
+        self._session: Optional[date] = None
+        self._session_pv = 0.0
+        self._session_volume = 0.0
+        self._session_bars = 0
+        self._rolling_pv = RollingWindow(vwap_period) if vwap_period else None
+        self._rolling_volume = RollingWindow(vwap_period) if vwap_period else None
+        self._last_volume = 0.0
+
+        # RSI
+        self._avg_gain = WilderAverage(rsi_period)
+        self._avg_loss = WilderAverage(rsi_period)
+        self._rsi: Optional[float] = None
+        self._prev_rsi: Optional[float] = None
+        self._returns = RollingWindow(volatility_window)
+
+        # ATR
+        self._atr = WilderAverage(atr_period)
+        self._short_tr = RollingWindow(min(5, atr_period // 2) or 1)
+        self._recent_tr = deque(maxlen=atr_period)
+
+        # MACD
+        self._ema_fast = AdjustedEMA(macd_fast)
+        self._ema_slow = AdjustedEMA(macd_slow)
+        self._ema_signal = AdjustedEMA(macd_signal_period)
+        self._macd: Optional[float] = None
+        self._macd_signal: Optional[float] = None
+        self._histogram: Optional[float] = None
+        self._prev_histogram: Optional[float] = None
+
+        # Bollinger
+        self._closes = RollingWindow(bb_period)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update(self, candle: Dict[str, Any]):
+        """Apply one completed candle"""
+        high = float(candle["high"])
+        low = float(candle["low"])
+        close = float(candle["close"])
+        volume = float(candle.get("volume", 0) or 0)
+        timestamp = candle.get("date")
+
+        self._update_vwap(high, low, close, volume, timestamp)
+
+        prev_close = self.last_close
+        if prev_close is not None:
+            delta = close - prev_close
+            self._avg_gain.push(delta if delta > 0 else 0.0)
+            self._avg_loss.push(-delta if delta < 0 else 0.0)
+            if self._avg_gain.value is not None:
+                self._prev_rsi = self._rsi
+                loss = self._avg_loss.value or 0.0001
+                self._rsi = 100 - 100 / (1 + self._avg_gain.value / loss)
+            if prev_close:
+                self._returns.push(delta / prev_close)
+
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            self._atr.push(tr)
+            self._short_tr.push(tr)
+            self._recent_tr.append(tr)
+
+        fast = self._ema_fast.push(close)
+        slow = self._ema_slow.push(close)
+        self._macd = fast - slow
+        self._macd_signal = self._ema_signal.push(self._macd)
+        self._prev_histogram = self._histogram
+        self._histogram = self._macd - self._macd_signal
+
+        self._closes.push(close)
+
+        self.prev_close = prev_close
+        self.last_close = close
+        self.last_timestamp = timestamp
+        self.bars += 1
+
+    def sync(self, candles: List[Dict[str, Any]]) -> int:
+        """
+        Apply the candles in a polled list that are newer than the last one
+        seen. Without timestamps only the tail beyond ``bars`` is applied.
+
+        :return: number of candles applied
+        """
+        if not candles:
+            return 0
+        if self.last_timestamp is None or candles[0].get("date") is None:
+            new = candles[self.bars:] if self.bars else candles
+        else:
+            start = len(candles)
+            while start > 0 and candles[start - 1].get("date") > self.last_timestamp:
+                start -= 1
+            new = candles[start:]
+        for candle in new:
+            self.update(candle)
+        return len(new)
+
+    def _update_vwap(self, high: float, low: float, close: float, volume: float, timestamp):
+        typical = (high + low + close) / 3
+        self._last_volume = volume
+        if self._rolling_pv is not None:
+            self._rolling_pv.push(typical * volume)
+            self._rolling_volume.push(volume)
+            return
+
+        session = _session_date(timestamp)
+        if session != self._session:
+            self._session = session
+            self._session_pv = 0.0
+            self._session_volume = 0.0
+            self._session_bars = 0
+        self._session_pv += typical * volume
+        self._session_volume += volume
+        self._session_bars += 1
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def _timestamp(self) -> str:
+        return self.last_timestamp if self.last_timestamp is not None else datetime.now().isoformat()
+
+    def vwap(self) -> Optional[IndicatorResult]:
+        if not self.bars:
+            return None
+        if self._rolling_pv is not None:
+            if not self._rolling_pv.full:
+                return None
+            pv, volume, points = self._rolling_pv.total, self._rolling_volume.total, len(self._rolling_pv)
+        else:
+            pv, volume, points = self._session_pv, self._session_volume, self._session_bars
+
+        current_vwap = pv / (volume or 1)
+        signal, confidence, deviation_pct = vwap_signal(self.last_close, current_vwap)
+        mean_volume = volume / points if points else 0.0
+        return IndicatorResult(
+            value=current_vwap,
+            signal=signal,
+            confidence=confidence,
+            timestamp=self._timestamp(),
+            metadata={
+                "deviation_pct": deviation_pct,
+                "volume_ratio": self._last_volume / mean_volume if mean_volume else 0.0,
+                "period": self.vwap_period,
+                "data_points": points,
+            },
+            is_mock=False,
+        )
+
+    def rsi(self) -> Optional[IndicatorResult]:
+        if self._rsi is None:
+            return None
+        prev_rsi = self._prev_rsi if self._prev_rsi is not None else self._rsi
+        signal, confidence = rsi_signal(self._rsi, prev_rsi)
+        return IndicatorResult(
+            value=self._rsi,
+            signal=signal,
+            confidence=confidence,
+            timestamp=self._timestamp(),
+            metadata={
+                "adjusted_period": self.rsi_period,
+                "volatility": self._returns.std if self._returns.full else 0.02,
+                "momentum": self._rsi - prev_rsi,
+                "overbought_level": 75,
+                "oversold_level": 25,
+                "smoothing": "wilder",
+            },
+            is_mock=False,
+        )
+
+    def atr(self) -> Optional[IndicatorResult]:
+        long_atr = self._atr.value
+        if long_atr is None or long_atr == 0:
+            return None
+        short_atr = self._short_tr.mean
+        ratio = short_atr / long_atr
+        regime, signal, confidence = atr_regime(ratio)
+        current_tr = self._recent_tr[-1]
+        percentile = sum(1 for tr in self._recent_tr if tr < current_tr) / len(self._recent_tr) * 100
+        return IndicatorResult(
+            value=long_atr,
+            signal=signal,
+            confidence=confidence,
+            timestamp=self._timestamp(),
+            metadata={
+                "regime": regime,
+                "short_atr": short_atr,
+                "ratio": ratio,
+                "period": self.atr_period,
+                "volatility_percentile": percentile,
+                "smoothing": "wilder",
+            },
+            is_mock=False,
+        )
+
+    def macd(self) -> Optional[IndicatorResult]:
+        if self.bars < self.macd_slow + self.macd_signal_period:
+            return None
+        prev_histogram = self._prev_histogram if self._prev_histogram is not None else self._histogram
+        signal, confidence = macd_signal(self._macd, self._macd_signal, self._histogram, prev_histogram)
+        return IndicatorResult(
+            value=self._macd,
+            signal=signal,
+            confidence=confidence,
+            timestamp=self._timestamp(),
+            metadata={
+                "macd": self._macd,
+                "signal": self._macd_signal,
+                "histogram": self._histogram,
+                "fast_period": self.macd_fast,
+                "slow_period": self.macd_slow,
+                "signal_period": self.macd_signal_period,
+            },
+            is_mock=False,
+        )
+
+    def bollinger(self) -> Optional[IndicatorResult]:
+        if not self._closes.full:
+            return None
+        middle = self._closes.mean
+        width = self._closes.std * self.bb_std_dev
+        upper, lower = middle + width, middle - width
+        signal, confidence = bollinger_signal(self.last_close, upper, middle, lower)
+        return IndicatorResult(
+            value=middle,
+            signal=signal,
+            confidence=confidence,
+            timestamp=self._timestamp(),
+            metadata={
+                "upper_band": upper,
+                "middle_band": middle,
+                "lower_band": lower,
+                "band_width": (upper - lower) / middle * 100,
+                "position_in_bands": (self.last_close - lower) / (upper - lower) if upper != lower else 0.5,
+                "period": self.bb_period,
+                "std_dev": self.bb_std_dev,
+            },
+            is_mock=False,
+        )
+
+    def snapshot(self) -> Dict[str, Optional[IndicatorResult]]:
+        """All indicators; an entry is None until enough bars have been seen"""
+        return {
+            "vwap": self.vwap(),
+            "rsi": self.rsi(),
+            "atr": self.atr(),
+            "macd": self.macd(),
+            "bollinger": self.bollinger(),
+        }
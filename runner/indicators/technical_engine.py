@@ -23,6 +23,74 @@ class IndicatorResult:
     is_mock: bool = False
 
 
+# Signal rules shared by the batch methods below and the streaming
+# indicators in runner.indicators.streaming_indicators
+
+
+def vwap_signal(current_price: float, current_vwap: float) -> Tuple[str, float, float]:
+    """Return (signal, confidence, deviation_pct) for price vs VWAP"""
+    deviation_pct = (current_price - current_vwap) / current_vwap * 100
+
+    if current_price > current_vwap * 1.002:  # 0.2% above
+        signal = "BUY"
+        confidence = min(abs(deviation_pct) / 2, 1.0)
+    elif current_price < current_vwap * 0.998:  # 0.2% below
+        signal = "SELL"
+        confidence = min(abs(deviation_pct) / 2, 1.0)
+    else:
+        signal = "HOLD"
+        confidence = 0.5
+    return signal, confidence, deviation_pct
+
+
+def rsi_signal(current_rsi: float, prev_rsi: float) -> Tuple[str, float]:
+    """Return (signal, confidence) for RSI level and momentum shift"""
+    if current_rsi > 75:
+        return "SELL", min((current_rsi - 70) / 20, 1.0)
+    if current_rsi < 25:
+        return "BUY", min((30 - current_rsi) / 20, 1.0)
+    if current_rsi > 55 and prev_rsi <= 55:  # Momentum shift
+        return "BUY", 0.7
+    if current_rsi < 45 and prev_rsi >= 45:
+        return "SELL", 0.7
+    return "HOLD", 0.5
+
+
+def atr_regime(atr_ratio: float) -> Tuple[str, str, float]:
+    """Return (regime, signal, confidence) for short/long ATR ratio"""
+    if atr_ratio > 1.5:
+        return "HIGH_VOLATILITY", "REDUCE_SIZE", min((atr_ratio - 1.5) / 0.5, 1.0)
+    if atr_ratio < 0.6:
+        return "LOW_VOLATILITY", "INCREASE_SIZE", min((0.6 - atr_ratio) / 0.4, 1.0)
+    return "NORMAL", "HOLD", 0.5
+
+
+def macd_signal(current_macd: float, current_signal: float,
+                current_histogram: float, prev_histogram: float) -> Tuple[str, float]:
+    """Return (signal, confidence) for MACD crossovers"""
+    if current_histogram > 0 and prev_histogram <= 0:
+        return "BUY", 0.8
+    if current_histogram < 0 and prev_histogram >= 0:
+        return "SELL", 0.8
+    if current_macd > current_signal:
+        return "BUY", 0.6
+    if current_macd < current_signal:
+        return "SELL", 0.6
+    return "HOLD", 0.5
+
+
+def bollinger_signal(current_price: float, upper_band: float,
+                     middle_band: float, lower_band: float) -> Tuple[str, float]:
+    """Return (signal, confidence) for price position within the bands"""
+    if current_price > upper_band:
+        return "SELL", min((current_price - upper_band) / (upper_band * 0.01), 1.0)  # Overbought
+    if current_price < lower_band:
+        return "BUY", min((lower_band - current_price) / (lower_band * 0.01), 1.0)  # Oversold
+    if current_price > middle_band:
+        return "BUY", 0.6  # Above middle
+    return "SELL", 0.6  # Below middle
+
+
 class TechnicalEngine:
     """Enterprise-grade technical analysis engine with paper trade support"""
 
@@ -36,6 +104,7 @@ class TechnicalEngine:
         self._cache = {}
         self._cache_lock = Lock()
         self.max_cache_size = cache_size
+        self._streams = {}  # symbol -> StreamingIndicators
 
         # Paper trading mock data
         self.mock_values = {
@@ -91,17 +160,7 @@ class TechnicalEngine:
             current_price = df["close"].iloc[-1]
 
             # Signal generation
-            deviation_pct = (current_price - current_vwap) / current_vwap * 100
-
-            if current_price > current_vwap * 1.002:  # 0.2% above
-                signal = "BUY"
-                confidence = min(abs(deviation_pct) / 2, 1.0)
-            elif current_price < current_vwap * 0.998:  # 0.2% below
-                signal = "SELL"
-                confidence = min(abs(deviation_pct) / 2, 1.0)
-            else:
-                signal = "HOLD"
-                confidence = 0.5
+            signal, confidence, deviation_pct = vwap_signal(current_price, current_vwap)
 
             return IndicatorResult(
                 value=current_vwap,
@@ -167,22 +226,7 @@ class TechnicalEngine:
 
             # Advanced signal logic
             prev_rsi = rsi.iloc[-2] if len(rsi) > 1 else current_rsi
-
-            if current_rsi > 75:
-                signal = "SELL"
-                confidence = min((current_rsi - 70) / 20, 1.0)
-            elif current_rsi < 25:
-                signal = "BUY"
-                confidence = min((30 - current_rsi) / 20, 1.0)
-            elif current_rsi > 55 and prev_rsi <= 55:  # Momentum shift
-                signal = "BUY"
-                confidence = 0.7
-            elif current_rsi < 45 and prev_rsi >= 45:
-                signal = "SELL"
-                confidence = 0.7
-            else:
-                signal = "HOLD"
-                confidence = 0.5
+            signal, confidence = rsi_signal(current_rsi, prev_rsi)
 
             return IndicatorResult(
                 value=current_rsi,
@@ -237,19 +281,7 @@ class TechnicalEngine:
                 return self._mock_atr_result(candles, period)
 
             atr_ratio = short_atr / long_atr
-
-            if atr_ratio > 1.5:
-                regime = "HIGH_VOLATILITY"
-                signal = "REDUCE_SIZE"
-                confidence = min((atr_ratio - 1.5) / 0.5, 1.0)
-            elif atr_ratio < 0.6:
-                regime = "LOW_VOLATILITY"
-                signal = "INCREASE_SIZE"
-                confidence = min((0.6 - atr_ratio) / 0.4, 1.0)
-            else:
-                regime = "NORMAL"
-                signal = "HOLD"
-                confidence = 0.5
+            regime, signal, confidence = atr_regime(atr_ratio)
 
             return IndicatorResult(
                 value=long_atr,
@@ -301,22 +333,9 @@ class TechnicalEngine:
             prev_histogram = (
                 histogram.iloc[-2] if len(histogram) > 1 else current_histogram
             )
-
-            if current_histogram > 0 and prev_histogram <= 0:
-                trade_signal = "BUY"
-                confidence = 0.8
-            elif current_histogram < 0 and prev_histogram >= 0:
-                trade_signal = "SELL"
-                confidence = 0.8
-            elif current_macd > current_signal:
-                trade_signal = "BUY"
-                confidence = 0.6
-            elif current_macd < current_signal:
-                trade_signal = "SELL"
-                confidence = 0.6
-            else:
-                trade_signal = "HOLD"
-                confidence = 0.5
+            trade_signal, confidence = macd_signal(
+                current_macd, current_signal, current_histogram, prev_histogram
+            )
 
             return IndicatorResult(
                 value=current_macd,
@@ -364,22 +383,9 @@ class TechnicalEngine:
             lower_band = df["lower_band"].iloc[-1]
 
             # Signal generation based on band position
-            if current_price > upper_band:
-                trade_signal = "SELL"  # Overbought
-                confidence = min(
-                    (current_price - upper_band) / (upper_band * 0.01), 1.0
-                )
-            elif current_price < lower_band:
-                trade_signal = "BUY"  # Oversold
-                confidence = min(
-                    (lower_band - current_price) / (lower_band * 0.01), 1.0
-                )
-            elif current_price > middle_band:
-                trade_signal = "BUY"  # Above middle
-                confidence = 0.6
-            else:
-                trade_signal = "SELL"  # Below middle
-                confidence = 0.6
+            trade_signal, confidence = bollinger_signal(
+                current_price, upper_band, middle_band, lower_band
+            )
 
             # Band width for volatility assessment
             band_width = (upper_band - lower_band) / middle_band * 100
@@ -406,6 +412,93 @@ class TechnicalEngine:
             print(f"Bollinger Bands calculation error: {e}, falling back to mock data")
             return self._mock_bollinger_result(candles, period, std_dev)
 
+    def calculate_batch(
+        self,
+        symbols: List[str],
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        **params,
+    ):
+        """
+        VWAP/RSI/ATR/MACD/Bollinger/ADX for a whole universe at once.
+
+        Takes aligned (symbols x bars) arrays and returns a columnar
+        BatchIndicatorResult keyed by symbol. Use ``stack_candles`` from
+        runner.indicators.batch_indicators to build the arrays from
+        per-symbol candle lists. See ``compute_batch`` for ``params``.
+        """
+        from runner.indicators.batch_indicators import BatchIndicatorResult, compute_batch
+
+        if self.paper_trade:
+            n = len(symbols)
+            macd, signal, histogram = self.mock_values["macd"]
+            mock_columns = {
+                "close": np.asarray(close, dtype=float)[:, -1] if n else np.empty(0),
+                "vwap": self.mock_values["vwap"],
+                "rsi": self.mock_values["rsi"],
+                "atr": self.mock_values["atr"],
+                "macd": macd,
+                "macd_signal_line": signal,
+                "macd_histogram": histogram,
+                "bb_upper": self.mock_values["bb_upper"],
+                "bb_middle": self.mock_values["bb_middle"],
+                "bb_lower": self.mock_values["bb_lower"],
+            }
+            columns = {k: np.broadcast_to(np.asarray(v, dtype=float), (n,)).copy() for k, v in mock_columns.items()}
+            return BatchIndicatorResult(symbols=list(symbols), columns=columns, is_mock=True)
+
+        return compute_batch(symbols, high, low, close, volume, **params)
+
+    def get_stream(self, symbol: str, **params):
+        """Get (or create) the incremental indicator state for a symbol"""
+        from runner.indicators.streaming_indicators import StreamingIndicators
+
+        with self._cache_lock:
+            stream = self._streams.get(symbol)
+            if stream is None:
+                stream = StreamingIndicators(symbol, **params)
+                self._streams[symbol] = stream
+            return stream
+
+    def update_stream(self, symbol: str, candles: List[Dict], **params) -> Dict[str, IndicatorResult]:
+        """
+        Streaming counterpart of the calculate_* methods for polling loops.
+
+        Only candles newer than the last one seen for ``symbol`` are applied,
+        each in O(1). Returns vwap/rsi/atr/macd/bollinger results; indicators
+        without enough history yet fall back to mock results, as the batch
+        methods do.
+        """
+        if self.paper_trade:
+            return self._mock_stream_results(candles)
+
+        stream = self.get_stream(symbol, **params)
+        with self._cache_lock:
+            stream.sync(candles)
+            results = stream.snapshot()
+
+        fallback = self._mock_stream_results(candles)
+        return {name: result or fallback[name] for name, result in results.items()}
+
+    def reset_stream(self, symbol: Optional[str] = None):
+        """Drop incremental state for one symbol, or for all symbols"""
+        with self._cache_lock:
+            if symbol is None:
+                self._streams.clear()
+            else:
+                self._streams.pop(symbol, None)
+
+    def _mock_stream_results(self, candles: List[Dict]) -> Dict[str, IndicatorResult]:
+        return {
+            "vwap": self._mock_vwap_result(candles),
+            "rsi": self._mock_rsi_result(candles, 14),
+            "atr": self._mock_atr_result(candles, 14),
+            "macd": self._mock_macd_result(candles),
+            "bollinger": self._mock_bollinger_result(candles, 20, 2),
+        }
+
     # Mock data methods for paper trading
     def _mock_vwap_result(self, candles: List[Dict]) -> IndicatorResult:
         """Mock VWAP result for paper trading"""
@@ -566,6 +659,7 @@ class TechnicalEngine:
         return {
             "paper_trade": self.paper_trade,
             "cache_size": len(self._cache),
+            "streaming_symbols": len(self._streams),
             "max_cache_size": self.max_cache_size,
             "available_indicators": [
                 "vwap_advanced",
@@ -573,6 +667,8 @@ class TechnicalEngine:
                 "smart_atr",
                 "macd",
                 "bollinger_bands",
+                "batch",
+                "stream",
             ],
             "mock_values": self.mock_values if self.paper_trade else None,
         }
@@ -57,21 +57,57 @@ class LegacyLogCategory(Enum):
     RECOVERY = "recovery"
 
 
-@dataclass
+# Legacy -> new enum maps, built once. Resolved here because LogLevel and
+# LogCategory are rebound to the legacy enums at the bottom of this module.
+if NEW_LOGGING_AVAILABLE:
+    _LEVEL_MAP = {legacy: LogLevel[legacy.name] for legacy in LegacyLogLevel}
+    _CATEGORY_MAP = {legacy: LogCategory[legacy.name] for legacy in LegacyLogCategory}
+else:
+    _LEVEL_MAP = {legacy: legacy for legacy in LegacyLogLevel}
+    _CATEGORY_MAP = {legacy: legacy for legacy in LegacyLogCategory}
+
+_LOG_FILE_KEYS = {
+    LegacyLogCategory.TRADE: 'trades',
+    LegacyLogCategory.POSITION: 'positions',
+    LegacyLogCategory.ERROR: 'errors',
+    LegacyLogCategory.PERFORMANCE: 'performance',
+    LegacyLogCategory.SYSTEM: 'system',
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+_JSON_ENCODER = json.JSONEncoder(default=_json_default)
+
+
 class LegacyLogEntry:
     """Structured log entry for backward compatibility"""
-    timestamp: datetime.datetime
-    level: LegacyLogLevel
-    category: LegacyLogCategory
-    message: str
-    data: Dict[str, Any]
-    source: str
-    session_id: str
-    trade_id: Optional[str] = None
-    position_id: Optional[str] = None
-    strategy: Optional[str] = None
-    symbol: Optional[str] = None
-    bot_type: Optional[str] = None
+
+    __slots__ = ('timestamp', 'level', 'category', 'message', 'data', 'source', 'session_id',
+                 'trade_id', 'position_id', 'strategy', 'symbol', 'bot_type')
+
+    def __init__(self, timestamp: datetime.datetime, level: LegacyLogLevel, category: LegacyLogCategory,
+                 message: str, data: Dict[str, Any], source: str, session_id: str,
+                 trade_id: Optional[str] = None, position_id: Optional[str] = None,
+                 strategy: Optional[str] = None, symbol: Optional[str] = None, bot_type: Optional[str] = None):
+        self.timestamp = timestamp
+        self.level = level
+        self.category = category
+        self.message = message
+        self.data = data
+        self.source = source
+        self.session_id = session_id
+        self.trade_id = trade_id
+        self.position_id = position_id
+        self.strategy = strategy
+        self.symbol = symbol
+        self.bot_type = bot_type
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -101,6 +137,23 @@ class LegacyLogEntry:
             'bot_type': self.bot_type
         }
 
+    def to_json(self) -> str:
+        """One-pass JSON line; nested datetimes are encoded by the encoder, not pre-walked"""
+        return _JSON_ENCODER.encode({
+            'timestamp': self.timestamp,
+            'level': self.level.value,
+            'category': self.category.value,
+            'message': self.message,
+            'data': self.data,
+            'source': self.source,
+            'session_id': self.session_id,
+            'trade_id': self.trade_id,
+            'position_id': self.position_id,
+            'strategy': self.strategy,
+            'symbol': self.symbol,
+            'bot_type': self.bot_type
+        })
+
 
 class EnhancedLogger:
     """Enhanced logging system with optimized Firestore and GCS integration"""
@@ -173,6 +226,7 @@ class EnhancedLogger:
             'performance': f"{self.log_folder}/performance_log.jsonl",
             'system': f"{self.log_folder}/system_log.jsonl"
         }
+        self._log_handles = {}
     
     def _setup_gcs_client(self):
         """Setup Google Cloud Storage client"""
@@ -215,9 +269,7 @@ class EnhancedLogger:
                            trade_id: str, position_id: str, strategy: str, 
                            symbol: str, source: str):
         """Log using the new optimized system"""
-        # Convert legacy enums to new enums
-        new_level = self._convert_level(level)
-        new_category = self._convert_category(category)
+        new_level = _LEVEL_MAP.get(level, _LEVEL_MAP[LegacyLogLevel.INFO])
         
         if category == LegacyLogCategory.TRADE:
             # Use specialized trade logging
@@ -263,8 +315,9 @@ class EnhancedLogger:
                               trade_id: str, position_id: str, strategy: str, 
                               symbol: str, source: str):
         """Log using the legacy system"""
+        now = datetime.datetime.now()
         entry = LegacyLogEntry(
-            timestamp=datetime.datetime.now(),
+            timestamp=now,
             level=level,
             category=category,
             message=message,
@@ -282,63 +335,36 @@ class EnhancedLogger:
         self._write_to_local_file(entry)
         
         # Write to console
-        timestamp = datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
-        print(f"{timestamp} [{level.value}] [{category.value}] {message}")
+        print(f"[{now:%Y-%m-%d %H:%M:%S}] [{level.value}] [{category.value}] {message}")
     
     def _write_to_local_file(self, entry: LegacyLogEntry):
         """Write log entry to local file"""
         try:
-            # Determine which file to write to
-            file_key = 'main'
-            if entry.category == LegacyLogCategory.TRADE:
-                file_key = 'trades'
-            elif entry.category == LegacyLogCategory.POSITION:
-                file_key = 'positions'
-            elif entry.category == LegacyLogCategory.ERROR:
-                file_key = 'errors'
-            elif entry.category == LegacyLogCategory.PERFORMANCE:
-                file_key = 'performance'
-            elif entry.category == LegacyLogCategory.SYSTEM:
-                file_key = 'system'
-            
-            with open(self.log_files[file_key], 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry.to_dict()) + '\n')
+            file_key = _LOG_FILE_KEYS.get(entry.category, 'main')
+            handle = self._log_handles.get(file_key)
+            if handle is None:
+                # Kept open and line-buffered: one write per entry, no reopen
+                handle = self._log_handles[file_key] = open(self.log_files[file_key], 'a', encoding='utf-8', buffering=1)
+            handle.write(entry.to_json() + '\n')
                 
         except Exception as e:
             print(f"Error writing to local file: {e}")
     
+    def _close_local_files(self):
+        for handle in self._log_handles.values():
+            try:
+                handle.close()
+            except Exception:
+                pass
+        self._log_handles.clear()
+    
     def _convert_level(self, legacy_level: LegacyLogLevel) -> LogLevel:
         """Convert legacy log level to new log level"""
-        if not NEW_LOGGING_AVAILABLE:
-            return legacy_level
-        
-        mapping = {
-            LegacyLogLevel.DEBUG: LogLevel.DEBUG,
-            LegacyLogLevel.INFO: LogLevel.INFO,
-            LegacyLogLevel.WARNING: LogLevel.WARNING,
-            LegacyLogLevel.ERROR: LogLevel.ERROR,
-            LegacyLogLevel.CRITICAL: LogLevel.CRITICAL
-        }
-        return mapping.get(legacy_level, LogLevel.INFO)
+        return _LEVEL_MAP.get(legacy_level, _LEVEL_MAP[LegacyLogLevel.INFO])
     
     def _convert_category(self, legacy_category: LegacyLogCategory) -> LogCategory:
         """Convert legacy log category to new log category"""
-        if not NEW_LOGGING_AVAILABLE:
-            return legacy_category
-        
-        mapping = {
-            LegacyLogCategory.SYSTEM: LogCategory.SYSTEM,
-            LegacyLogCategory.TRADE: LogCategory.TRADE,
-            LegacyLogCategory.POSITION: LogCategory.POSITION,
-            LegacyLogCategory.STRATEGY: LogCategory.STRATEGY,
-            LegacyLogCategory.RISK: LogCategory.RISK,
-            LegacyLogCategory.PERFORMANCE: LogCategory.PERFORMANCE,
-            LegacyLogCategory.ERROR: LogCategory.ERROR,
-            LegacyLogCategory.COGNITIVE: LogCategory.COGNITIVE,
-            LegacyLogCategory.MARKET_DATA: LogCategory.MARKET_DATA,
-            LegacyLogCategory.RECOVERY: LogCategory.RECOVERY
-        }
-        return mapping.get(legacy_category, LogCategory.SYSTEM)
+        return _CATEGORY_MAP.get(legacy_category, _CATEGORY_MAP[LegacyLogCategory.SYSTEM])
     
     # Specialized logging methods for backward compatibility
     
@@ -487,6 +513,7 @@ class EnhancedLogger:
             self.trading_logger.shutdown()
         else:
             self.log_event("Enhanced logger shutdown", LegacyLogLevel.INFO, LegacyLogCategory.SYSTEM)
+            self._close_local_files()
     
     def __del__(self):
         """Cleanup on destruction"""
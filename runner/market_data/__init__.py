@@ -7,14 +7,30 @@ monolithic market_monitor.py for better organization and maintainability.
 Components:
 - MarketDataFetcher: Live market data fetching from multiple APIs
 - TechnicalIndicators: Technical analysis calculations (ADX, Bollinger Bands, etc.)
+- InstrumentMaster: Indexed, disk-persisted Kite instrument dump
+- CandleCache: Byte-bounded LRU cache of historical candle ranges
+- CandleStore: On-disk Arrow IPC candle warehouse
+- TickSubscriptionManager: Fans streaming ticks (KiteTicker / replay) out to subscribers
 - CorrelationMonitor: Cross-market correlation analysis
 - MarketRegimeClassifier: Market regime classification logic
 """
 
 from .market_data_fetcher import MarketDataFetcher
 from .technical_indicators import TechnicalIndicators
+from .instrument_master import InstrumentMaster, get_instrument_master
+from .candle_cache import CandleCache
+from .candle_store import CandleStore
+from .tick_feed import Tick, TickSubscriptionManager, KiteTickerFeed, ReplayFeed
 
 __all__ = [
     'MarketDataFetcher',
-    'TechnicalIndicators'
+    'TechnicalIndicators',
+    'InstrumentMaster',
+    'get_instrument_master',
+    'CandleCache',
+    'CandleStore',
+    'Tick',
+    'TickSubscriptionManager',
+    'KiteTickerFeed',
+    'ReplayFeed'
 ] 
\ No newline at end of file
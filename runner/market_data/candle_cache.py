@@ -0,0 +1,351 @@
+"""
+Candle Cache
+
+Byte-bounded LRU cache for historical candles. Data is stored per
+(instrument, interval) series as non-overlapping time segments, so a
+request for any range is answered from the cached segments and only the
+uncovered gaps (typically the newest tail of a sliding window) are
+fetched. Each interval has its own TTL, which applies only to the newest
+bar of a segment (the one that may still be forming): once it elapses that
+bar is dropped and refetched with the next tail, while the closed bars stay
+cached until LRU eviction. A segment ends at its newest bar, so every tail
+fetch starts at that bar and refreshes it; the TTL runs from the fetch that
+produced the newest bar.
+"""
+
+import bisect
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Default TTL per Kite interval: one bar, so a partially formed tail bar is not served for long
+DEFAULT_INTERVAL_TTLS = {
+    "minute": 60,
+    "3minute": 180,
+    "5minute": 300,
+    "10minute": 600,
+    "15minute": 900,
+    "30minute": 1800,
+    "60minute": 3600,
+}
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _naive(value) -> datetime:
+    """Comparable timestamp: tz-aware Kite datetimes and dates become naive datetimes"""
+    if hasattr(value, "to_pydatetime"):
+        value = value.to_pydatetime()
+    if not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, datetime.min.time())
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return value
+
+
+def estimate_bytes(candles) -> int:
+    """Approximate memory held by a candle list (or DataFrame)"""
+    if hasattr(candles, "memory_usage"):
+        return int(candles.memory_usage(deep=True).sum())
+    if not candles:
+        return sys.getsizeof(candles)
+    first = candles[0]
+    per_candle = sys.getsizeof(first)
+    if isinstance(first, dict):
+        per_candle += sum(sys.getsizeof(v) for v in first.values())
+    return sys.getsizeof(candles) + per_candle * len(candles)
+
+
+@dataclass
+class _Segment:
+    start: datetime
+    end: datetime
+    candles: List[Dict[str, Any]]
+    dates: List[datetime]
+    stored_at: float
+    nbytes: int = 0
+    settled: bool = False  # tail already dropped, every remaining bar is closed
+
+    def slice(self, lo: datetime, hi: datetime) -> List[Dict[str, Any]]:
+        i = bisect.bisect_left(self.dates, lo)
+        j = bisect.bisect_right(self.dates, hi)
+        return self.candles[i:j]
+
+
+@dataclass
+class _Series:
+    segments: List[_Segment] = field(default_factory=list)
+    nbytes: int = 0
+
+
+class CandleCache:
+    """LRU (by bytes) cache of candle segments with per-interval TTLs"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, default_ttl: float = 900,
+                 interval_ttls: Optional[Dict[str, float]] = None, logger=None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.interval_ttls = dict(DEFAULT_INTERVAL_TTLS if interval_ttls is None else interval_ttls)
+        self.logger = logger
+
+        self._series: "OrderedDict[Tuple[Any, str], _Series]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self._counters = {
+            "hits": 0,
+            "partial_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "fetches": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def ttl_for(self, interval: str) -> float:
+        return min(self.interval_ttls.get(interval, self.default_ttl), self.default_ttl)
+
+    def set_ttl(self, seconds: float, interval: Optional[str] = None):
+        """Set the TTL of one interval, or the ceiling for every interval"""
+        if interval is None:
+            self.default_ttl = seconds
+        else:
+            self.interval_ttls[interval] = seconds
+
+    # ------------------------------------------------------------------
+    # Range queries
+    # ------------------------------------------------------------------
+
+    def get_range(self, instrument_token, interval: str, from_date, to_date,
+                  fetch: Callable[[Any, datetime, datetime, str], Any]):
+        """
+        Candles for [from_date, to_date], fetching only what is not cached
+
+        ``fetch(instrument_token, from_date, to_date, interval)`` is called
+        once per uncovered gap and must return a list of candle dicts with
+        a ``date`` key; anything else is passed through uncached.
+        """
+        key = (instrument_token, interval)
+        try:
+            hash(key)
+        except TypeError:
+            return fetch(instrument_token, from_date, to_date, interval)
+
+        lo, hi = _naive(from_date), _naive(to_date)
+        with self._lock:
+            segments = self._live_segments(key)
+            gaps = self._gaps(segments, lo, hi)
+            if not gaps:
+                self._counters["hits"] += 1
+                self._series.move_to_end(key)
+                return self._collect(segments, lo, hi)
+            cached = self._collect(segments, lo, hi)
+
+        fetched = []
+        for gap_lo, gap_hi in gaps:
+            data = fetch(instrument_token, gap_lo, gap_hi, interval)
+            with self._lock:
+                self._counters["fetches"] += 1
+                if not self._is_candle_list(data):
+                    self._counters["misses"] += 1
+                    return data
+            fetched.append((gap_lo, gap_hi, data))
+
+        with self._lock:
+            full_miss = len(gaps) == 1 and gaps[0] == (lo, hi)
+            self._counters["misses" if full_miss else "partial_hits"] += 1
+            for gap_lo, gap_hi, data in fetched:
+                self._insert(key, gap_lo, gap_hi, data)
+
+        return self._stitch(cached, [data for _, _, data in fetched], lo, hi)
+
+    def get(self, instrument_token, interval: str, from_date, to_date) -> Optional[List[Dict[str, Any]]]:
+        """Cached candles for the range, or None unless it is fully covered"""
+        key = (instrument_token, interval)
+        lo, hi = _naive(from_date), _naive(to_date)
+        with self._lock:
+            segments = self._live_segments(key)
+            if self._gaps(segments, lo, hi):
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._series.move_to_end(key)
+            return self._collect(segments, lo, hi)
+
+    def put(self, instrument_token, interval: str, from_date, to_date, candles):
+        """Record ``candles`` as the full content of [from_date, to_date]"""
+        if self._is_candle_list(candles):
+            with self._lock:
+                self._insert((instrument_token, interval), _naive(from_date), _naive(to_date), candles)
+
+    # ------------------------------------------------------------------
+    # Maintenance and statistics
+    # ------------------------------------------------------------------
+
+    def purge_expired(self) -> int:
+        """Drop expired tail bars now; returns how many segments were trimmed"""
+        with self._lock:
+            before = self._counters["expirations"]
+            for key in list(self._series):
+                self._live_segments(key)
+            return self._counters["expirations"] - before
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return sum(len(series.segments) for series in self._series.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            lookups = counters["hits"] + counters["partial_hits"] + counters["misses"]
+            return {
+                **counters,
+                "lookups": lookups,
+                "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+                "partial_hit_ratio": counters["partial_hits"] / lookups if lookups else 0.0,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "series": len(self._series),
+                "segments": len(self),
+            }
+
+    # ------------------------------------------------------------------
+    # Internals (callers hold the lock)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _is_candle_list(data) -> bool:
+        return isinstance(data, list) and all(isinstance(c, dict) and "date" in c for c in data[:1])
+
+    def _live_segments(self, key) -> List[_Segment]:
+        series = self._series.get(key)
+        if series is None:
+            return []
+        ttl = self.ttl_for(key[1])
+        now = time.monotonic()
+        live = []
+        for seg in series.segments:
+            if seg.settled or now - seg.stored_at < ttl:
+                live.append(seg)
+                continue
+            # Only the newest bar can be stale; the segment now ends at the
+            # bar before it, so the next request refetches from there
+            self._counters["expirations"] += 1
+            freed = seg.nbytes
+            if len(seg.candles) > 1:
+                seg.candles, seg.dates = seg.candles[:-1], seg.dates[:-1]
+                seg.end = seg.dates[-1]
+                seg.settled = True
+                seg.nbytes = estimate_bytes(seg.candles)
+                freed -= seg.nbytes
+                live.append(seg)
+            series.nbytes -= freed
+            self._bytes -= freed
+        series.segments = live
+        if not live:
+            del self._series[key]
+        return live
+
+    @staticmethod
+    def _gaps(segments: List[_Segment], lo: datetime, hi: datetime) -> List[Tuple[datetime, datetime]]:
+        gaps = []
+        cursor = lo
+        for seg in segments:
+            if seg.end < cursor:
+                continue
+            if seg.start > hi:
+                break
+            if seg.start > cursor:
+                gaps.append((cursor, seg.start))
+            cursor = seg.end
+            if cursor >= hi:
+                return gaps
+        # The gap starts at the last cached bar so a still-forming bar is refreshed
+        gaps.append((cursor, hi))
+        return gaps
+
+    @staticmethod
+    def _collect(segments: List[_Segment], lo: datetime, hi: datetime) -> List[Dict[str, Any]]:
+        out = []
+        for seg in segments:
+            if seg.end >= lo and seg.start <= hi:
+                out.extend(seg.slice(lo, hi))
+        return out
+
+    @staticmethod
+    def _stitch(cached, fetched_parts, lo: datetime, hi: datetime) -> List[Dict[str, Any]]:
+        by_date = {_naive(c["date"]): c for c in cached}
+        for part in fetched_parts:
+            for candle in part:
+                stamp = _naive(candle["date"])
+                if lo <= stamp <= hi:
+                    by_date[stamp] = candle
+        return [by_date[stamp] for stamp in sorted(by_date)]
+
+    def _insert(self, key, lo: datetime, hi: datetime, candles: List[Dict[str, Any]]):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        self._series.move_to_end(key)
+
+        new = sorted(candles, key=lambda c: _naive(c["date"]))
+        keep, merged_lo = [], lo
+        left, right = [], []
+        tail = None  # existing segment whose bars end the merged one
+        for seg in series.segments:
+            if seg.end < lo or seg.start > hi:
+                keep.append(seg)
+                continue
+            # Overlapping/adjacent: the fresh fetch wins inside [lo, hi]
+            merged_lo = min(merged_lo, seg.start)
+            left.extend(c for c, d in zip(seg.candles, seg.dates) if d < lo)
+            later = [c for c, d in zip(seg.candles, seg.dates) if d > hi]
+            if later:
+                right.extend(later)
+                tail = seg
+            series.nbytes -= seg.nbytes
+            self._bytes -= seg.nbytes
+
+        merged = left + [c for c in new if lo <= _naive(c["date"]) <= hi] + right
+        if not merged:
+            series.segments = keep
+            if not keep:
+                del self._series[key]
+            return
+        dates = [_naive(c["date"]) for c in merged]
+        # The segment ends at its last bar, not at the requested end, so the
+        # next request refetches that bar; its age is that of whichever fetch
+        # produced it
+        segment = _Segment(
+            start=merged_lo,
+            end=dates[-1],
+            candles=merged,
+            dates=dates,
+            stored_at=tail.stored_at if tail is not None else time.monotonic(),
+            settled=tail.settled if tail is not None else False,
+        )
+        segment.nbytes = estimate_bytes(segment.candles)
+        series.segments = sorted(keep + [segment], key=lambda seg: seg.start)
+        series.nbytes += segment.nbytes
+        self._bytes += segment.nbytes
+        self._evict()
+
+    def _evict(self):
+        # Least recently used series go first; a series larger than the
+        # whole budget ends up evicted as well
+        while self._bytes > self.max_bytes and self._series:
+            key, series = self._series.popitem(last=False)
+            self._bytes -= series.nbytes
+            self._counters["evictions"] += len(series.segments)
+            if self.logger:
+                self.logger.log_event(f"[CACHE EVICT] {key} ({series.nbytes} bytes)")
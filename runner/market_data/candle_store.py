@@ -0,0 +1,251 @@
+"""
+Candle Store
+
+Local, columnar warehouse for historical candles so restarts and
+backtests read from disk instead of rate-limited APIs. Candles are kept
+as Arrow IPC files partitioned by instrument / interval / date
+(intraday intervals get one file per trading day, ``day`` candles one
+file per year) and read through memory maps.
+
+Writes only ever touch the partitions that received new bars; each is
+rewritten atomically with the new bars merged in (new values win for a
+repeated timestamp). A per-series coverage list records which time
+ranges have been fetched, so only gaps go to the network.
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from runner.market_data.candle_cache import _naive
+
+DEFAULT_STORE_DIR = os.getenv("CANDLE_STORE_DIR", os.path.join("data", "candles"))
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+COVERAGE_FILE = "_coverage.json"
+
+
+def _partition_key(interval: str, stamp: datetime) -> str:
+    return stamp.strftime("%Y") if interval == "day" else stamp.strftime("%Y-%m-%d")
+
+
+def _merge_ranges(ranges: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class CandleStore:
+    """Arrow IPC candle warehouse with coverage tracking"""
+
+    def __init__(self, root: Optional[str] = None, logger=None):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for CandleStore")
+        self.root = root or DEFAULT_STORE_DIR
+        self.logger = logger
+        self._lock = Lock()
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def series_dir(self, instrument, interval: str) -> str:
+        return os.path.join(self.root, str(instrument).replace(os.sep, "_"), interval)
+
+    def _partitions(self, instrument, interval: str, lo: datetime, hi: datetime) -> List[str]:
+        directory = self.series_dir(instrument, interval)
+        if not os.path.isdir(directory):
+            return []
+        first, last = _partition_key(interval, lo), _partition_key(interval, hi)
+        return [
+            os.path.join(directory, name)
+            for name in sorted(os.listdir(directory))
+            if name.endswith(".arrow") and first <= name[:-6] <= last
+        ]
+
+    # ------------------------------------------------------------------
+    # Coverage
+    # ------------------------------------------------------------------
+
+    def coverage(self, instrument, interval: str) -> List[Tuple[datetime, datetime]]:
+        path = os.path.join(self.series_dir(instrument, interval), COVERAGE_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [
+                (datetime.fromisoformat(lo), datetime.fromisoformat(hi))
+                for lo, hi in json.load(f)
+            ]
+
+    def _save_coverage(self, instrument, interval: str, ranges):
+        directory = self.series_dir(instrument, interval)
+        payload = [[lo.isoformat(), hi.isoformat()] for lo, hi in _merge_ranges(ranges)]
+        self._atomic_write(directory, COVERAGE_FILE, lambda f: f.write(json.dumps(payload).encode()))
+
+    def missing(self, instrument, interval: str, from_date, to_date) -> List[Tuple[datetime, datetime]]:
+        """Sub-ranges of [from_date, to_date] that have not been stored yet"""
+        lo, hi = _naive(from_date), _naive(to_date)
+        gaps, cursor = [], lo
+        for start, end in self.coverage(instrument, interval):
+            if end < cursor:
+                continue
+            if start > hi:
+                break
+            if start > cursor:
+                gaps.append((cursor, start))
+            cursor = end
+            if cursor >= hi:
+                return gaps
+        gaps.append((cursor, hi))
+        return gaps
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def read_arrays(self, instrument, interval: str, from_date, to_date) -> Dict[str, np.ndarray]:
+        """OHLCV arrays plus ``date`` (datetime64[ns]) for the range"""
+        lo = np.datetime64(_naive(from_date), "ns")
+        hi = np.datetime64(_naive(to_date), "ns")
+        pieces = []
+        for path in self._partitions(instrument, interval, _naive(from_date), _naive(to_date)):
+            with pa.memory_map(path, "r") as source:
+                table = ipc.open_file(source).read_all()
+                stamps = table.column("date").to_numpy()
+                keep = (stamps >= lo) & (stamps <= hi)
+                if keep.any():
+                    pieces.append({name: table.column(name).to_numpy()[keep] for name in table.column_names})
+
+        names = ("date",) + PRICE_FIELDS + ("volume",)
+        if not pieces:
+            return {
+                name: np.empty(0, dtype="datetime64[ns]" if name == "date" else np.float64)
+                for name in names
+            }
+        return {name: np.concatenate([p[name] for p in pieces]) for name in names}
+
+    def read(self, instrument, interval: str, from_date, to_date) -> List[Dict[str, Any]]:
+        """Candles for the range as Kite-style dicts"""
+        arrays = self.read_arrays(instrument, interval, from_date, to_date)
+        dates = arrays["date"].astype("datetime64[us]").tolist()
+        columns = [arrays[name].tolist() for name in PRICE_FIELDS + ("volume",)]
+        return [
+            {"date": stamp, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for stamp, o, h, l, c, v in zip(dates, *columns)
+        ]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def write(self, instrument, interval: str, candles: List[Dict[str, Any]],
+              covered_from=None, covered_to=None):
+        """
+        Merge candles into their partitions and mark the range as covered
+
+        The covered range defaults to the first/last candle timestamps.
+        """
+        if not candles:
+            return
+        stamps = np.array([np.datetime64(_naive(c["date"]), "ns") for c in candles])
+        order = np.argsort(stamps, kind="stable")
+        stamps = stamps[order]
+        columns = {
+            name: np.array([candles[i][name] for i in order], dtype=np.float64)
+            for name in PRICE_FIELDS + ("volume",)
+        }
+        columns["volume"] = np.round(columns["volume"]).astype(np.int64)
+
+        keys = np.array([_partition_key(interval, s) for s in stamps.astype("datetime64[us]").tolist()])
+        directory = self.series_dir(instrument, interval)
+        with self._lock:
+            for key in np.unique(keys):
+                mask = keys == key
+                self._write_partition(directory, f"{key}.arrow", stamps[mask],
+                                      {name: values[mask] for name, values in columns.items()})
+
+            lo = _naive(covered_from) if covered_from is not None else stamps[0].astype("datetime64[us]").item()
+            hi = _naive(covered_to) if covered_to is not None else stamps[-1].astype("datetime64[us]").item()
+            self._save_coverage(instrument, interval, self.coverage(instrument, interval) + [(lo, hi)])
+
+    def _write_partition(self, directory: str, name: str, stamps: np.ndarray, columns: Dict[str, np.ndarray]):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with pa.memory_map(path, "r") as source:
+                existing = ipc.open_file(source).read_all()
+                old_stamps = existing.column("date").to_numpy()
+                # Fresh bars replace stored ones with the same timestamp
+                keep = ~np.isin(old_stamps, stamps)
+                stamps = np.concatenate([old_stamps[keep], stamps])
+                columns = {
+                    field: np.concatenate([existing.column(field).to_numpy()[keep], values])
+                    for field, values in columns.items()
+                }
+            order = np.argsort(stamps, kind="stable")
+            stamps = stamps[order]
+            columns = {field: values[order] for field, values in columns.items()}
+
+        table = pa.table({"date": pa.array(stamps, type=pa.timestamp("ns")), **columns})
+
+        def dump(f):
+            with ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+
+        self._atomic_write(directory, name, dump)
+
+    @staticmethod
+    def _atomic_write(directory: str, name: str, dump: Callable):
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                dump(f)
+            os.replace(tmp, os.path.join(directory, name))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    # ------------------------------------------------------------------
+    # Read-through
+    # ------------------------------------------------------------------
+
+    def get_range(self, instrument, interval: str, from_date, to_date,
+                  fetch: Callable[[Any, datetime, datetime, str], Any]) -> List[Dict[str, Any]]:
+        """
+        Candles for [from_date, to_date], calling ``fetch`` only for gaps
+
+        A gap is marked covered up to its last returned bar, so the newest
+        (possibly still forming) bar is fetched again next time. Gaps for
+        which ``fetch`` returns nothing are left uncovered.
+        """
+        for gap_lo, gap_hi in self.missing(instrument, interval, from_date, to_date):
+            data = fetch(instrument, gap_lo, gap_hi, interval)
+            if not data or not isinstance(data, list):
+                continue
+            try:
+                last = max(_naive(c["date"]) for c in data)
+                covered_to = max(gap_lo, min(gap_hi, last))
+                self.write(instrument, interval, data, covered_from=gap_lo, covered_to=covered_to)
+            except (KeyError, TypeError, ValueError) as e:
+                if self.logger:
+                    self.logger.log_event(f"[CANDLE STORE] Could not store {instrument} {interval}: {e}")
+                return data
+        return self.read(instrument, interval, from_date, to_date)
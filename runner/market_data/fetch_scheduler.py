@@ -0,0 +1,165 @@
+"""
+Fetch Scheduler
+
+Thread-pool scheduler for historical data requests. Every data source
+gets a token-bucket rate limit (requests per second plus a burst) and a
+concurrency cap, so a batch of instruments runs as fast as the source's
+quota allows instead of sleeping a fixed delay between sequential calls.
+Retries use capped exponential backoff with full jitter.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type
+
+
+@dataclass
+class SourceLimit:
+    """Rate and concurrency budget for one data source"""
+    rate_per_second: float
+    burst: int = 1
+    max_concurrency: int = 1
+
+
+# Kite historical API allows 3 requests/second; Alpha Vantage's free tier 5/minute
+DEFAULT_SOURCE_LIMITS = {
+    "kite": SourceLimit(rate_per_second=3.0, burst=3, max_concurrency=3),
+    "yfinance": SourceLimit(rate_per_second=4.0, burst=4, max_concurrency=4),
+    "alpha_vantage": SourceLimit(rate_per_second=5 / 60.0, burst=1, max_concurrency=1),
+    "investpy": SourceLimit(rate_per_second=1.0, burst=1, max_concurrency=1),
+    "default": SourceLimit(rate_per_second=3.0, burst=3, max_concurrency=3),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens/second"""
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds to wait"""
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+
+def backoff_delay(attempt: int, base: float = 2.0, max_backoff: float = 30.0,
+                  rng: Optional[random.Random] = None) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt"""
+    ceiling = min(base ** attempt, max_backoff)
+    return (rng or random).uniform(0, ceiling)
+
+
+def retry_with_backoff(fn: Callable[[], Any], max_attempts: int = 3, base: float = 2.0,
+                       max_backoff: float = 30.0, retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+                       logger=None, label: str = "", sleep: Callable[[float], None] = time.sleep):
+    """Call ``fn`` until it succeeds or ``max_attempts`` is reached (then re-raise)"""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn()
+        except retry_on as e:
+            if attempt >= max_attempts:
+                if logger:
+                    logger.log_event(f"[RETRY FAILED] Max retries reached for {label}. Error: {e}")
+                raise
+            delay = backoff_delay(attempt, base, max_backoff)
+            if logger:
+                logger.log_event(f"[RETRY] Attempt {attempt} failed for {label}. Retrying in {delay:.2f}s. Error: {e}")
+            sleep(delay)
+
+
+class FetchScheduler:
+    """Runs fetch jobs on a thread pool under per-source rate and concurrency limits"""
+
+    def __init__(self, max_workers: int = 8, source_limits: Optional[Dict[str, SourceLimit]] = None,
+                 logger=None):
+        self.max_workers = max_workers
+        self.logger = logger
+        self.source_limits = dict(DEFAULT_SOURCE_LIMITS)
+        self.source_limits.update(source_limits or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._registry_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _limits_for(self, source: str):
+        with self._registry_lock:
+            if source not in self._buckets:
+                limit = self.source_limits.get(source, self.source_limits["default"])
+                self._buckets[source] = TokenBucket(limit.rate_per_second, limit.burst)
+                self._semaphores[source] = threading.BoundedSemaphore(limit.max_concurrency)
+            return self._buckets[source], self._semaphores[source]
+
+    def set_limit(self, source: str, limit: SourceLimit):
+        with self._registry_lock:
+            self.source_limits[source] = limit
+            self._buckets.pop(source, None)
+            self._semaphores.pop(source, None)
+
+    @contextmanager
+    def limit(self, source: str):
+        """Hold one of the source's concurrency slots and spend one rate token"""
+        bucket, semaphore = self._limits_for(source)
+        with semaphore:
+            bucket.acquire()
+            yield
+
+    def call(self, source: str, fn: Callable, *args, **kwargs):
+        with self.limit(source):
+            return fn(*args, **kwargs)
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> Dict[Any, Any]:
+        """
+        Run ``fn(item)`` for every item concurrently; returns {item: result}
+
+        Exceptions are logged and reported as a None result so one failing
+        instrument does not abort the batch. Rate limiting happens inside
+        ``fn`` via :meth:`limit`, where the actual source is known.
+        """
+        items = list(items)
+        if not items:
+            return {}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="fetch")
+        futures = {item: self._executor.submit(fn, item) for item in items}
+        results = {}
+        for item, future in futures.items():
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                if self.logger:
+                    self.logger.log_event(f"[FETCH] {item} failed: {e}")
+                results[item] = None
+        return results
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
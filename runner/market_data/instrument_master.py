@@ -0,0 +1,330 @@
+"""
+Instrument Master
+
+Columnar, disk-persisted copy of the Kite instrument dump. The dump is
+fetched at most once per trading day per exchange; each snapshot is
+written as one ``.npy`` file per column and memory-mapped on startup, so
+every process shares the same pages instead of downloading ~100k rows.
+
+Hash indexes on tradingsymbol, instrument_token and
+(name, expiry, strike, instrument_type), plus sorted expiry lists per
+underlying, make lookups O(1) (nearest-expiry is a bisect).
+"""
+
+import bisect
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, datetime
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.getenv("INSTRUMENT_CACHE_DIR", os.path.join("data", "instruments"))
+
+# Column name -> dtype of the Kite instrument dump
+COLUMNS = {
+    "instrument_token": np.int64,
+    "exchange_token": np.int64,
+    "tradingsymbol": np.str_,
+    "name": np.str_,
+    "last_price": np.float64,
+    "expiry": "datetime64[D]",
+    "strike": np.float64,
+    "tick_size": np.float64,
+    "lot_size": np.int64,
+    "instrument_type": np.str_,
+    "segment": np.str_,
+    "exchange": np.str_,
+}
+
+# instrument_type values covered by the "OPT" group used by legacy helpers
+OPTION_TYPES = ("CE", "PE")
+
+
+def _as_date(value) -> Optional[date]:
+    """Normalise Kite expiry values (date, datetime, ISO string or blank)"""
+    if isinstance(value, np.datetime64):
+        return None if np.isnat(value) else value.astype("datetime64[D]").item()
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _type_group(instrument_type: str) -> str:
+    return "OPT" if instrument_type in OPTION_TYPES or instrument_type == "OPT" else instrument_type
+
+
+class InstrumentMaster:
+    """Indexed, read-only view over one exchange's instrument dump"""
+
+    def __init__(self, columns: Dict[str, np.ndarray], exchange: str = "NFO",
+                 trading_date: Optional[date] = None, path: Optional[str] = None):
+        self.columns = columns
+        self.exchange = exchange
+        self.trading_date = trading_date or date.today()
+        self.path = path
+        self._build_indexes()
+
+    # ------------------------------------------------------------------
+    # Construction and persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_instruments(cls, instruments: Iterable[Dict], exchange: str = "NFO",
+                         trading_date: Optional[date] = None) -> "InstrumentMaster":
+        """Build the columnar store from ``kite.instruments()`` rows"""
+        instruments = list(instruments)
+        columns = {}
+        for column, dtype in COLUMNS.items():
+            if column == "expiry":
+                values = [_as_date(inst.get("expiry")) for inst in instruments]
+                columns[column] = np.array(
+                    [np.datetime64(v) if v else np.datetime64("NaT") for v in values],
+                    dtype="datetime64[D]",
+                )
+            elif dtype is np.str_:
+                columns[column] = np.array(
+                    [str(inst.get(column) or "") for inst in instruments], dtype=np.str_
+                )
+            else:
+                columns[column] = np.array(
+                    [inst.get(column) or 0 for inst in instruments], dtype=dtype
+                )
+        return cls(columns, exchange=exchange, trading_date=trading_date)
+
+    @classmethod
+    def open(cls, path: str) -> "InstrumentMaster":
+        """Memory-map a snapshot written by :meth:`save`"""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        columns = {
+            column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r")
+            for column in meta["columns"]
+        }
+        return cls(
+            columns,
+            exchange=meta["exchange"],
+            trading_date=date.fromisoformat(meta["trading_date"]),
+            path=path,
+        )
+
+    @classmethod
+    def load(cls, kite: Union[Any, Callable[[], Any]], exchange: str = "NFO",
+             cache_dir: Optional[str] = None, trading_date: Optional[date] = None,
+             logger=None) -> "InstrumentMaster":
+        """
+        Open today's snapshot from disk, downloading it only when missing
+
+        ``kite`` may be a client or a zero-argument factory; it is only
+        touched when the dump has to be fetched.
+        """
+        trading_date = trading_date or date.today()
+        path = cls.snapshot_path(cache_dir, exchange, trading_date)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            try:
+                return cls.open(path)
+            except Exception as e:
+                if logger:
+                    logger.log_event(f"[WARN] Instrument snapshot {path} unreadable, refetching: {e}")
+
+        client = kite() if callable(kite) and not hasattr(kite, "instruments") else kite
+        instruments = client.instruments(exchange)
+        master = cls.from_instruments(instruments, exchange=exchange, trading_date=trading_date)
+        try:
+            master.save(cache_dir)
+            master = cls.open(master.path)
+        except OSError as e:
+            if logger:
+                logger.log_event(f"[WARN] Could not persist instrument snapshot: {e}")
+        if logger:
+            logger.log_event(f"[INFO] Loaded {len(master)} {exchange} instruments for {trading_date}")
+        return master
+
+    @staticmethod
+    def snapshot_path(cache_dir: Optional[str], exchange: str, trading_date: date) -> str:
+        return os.path.join(cache_dir or DEFAULT_CACHE_DIR, exchange, trading_date.isoformat())
+
+    def save(self, cache_dir: Optional[str] = None) -> str:
+        """Write the snapshot atomically and drop older snapshots for the exchange"""
+        path = self.snapshot_path(cache_dir, self.exchange, self.trading_date)
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+
+        tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            for column, values in self.columns.items():
+                np.save(os.path.join(tmp, f"{column}.npy"), np.asarray(values))
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump({
+                    "exchange": self.exchange,
+                    "trading_date": self.trading_date.isoformat(),
+                    "rows": len(self),
+                    "columns": list(self.columns),
+                    "fetched_at": datetime.now().isoformat(),
+                }, f)
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                # Another process published the same snapshot first
+                if not os.path.exists(os.path.join(path, "meta.json")):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        for entry in os.listdir(parent):
+            if entry != self.trading_date.isoformat() and not entry.startswith("."):
+                shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
+
+        self.path = path
+        return path
+
+    # ------------------------------------------------------------------
+    # Indexes
+    # ------------------------------------------------------------------
+
+    def _build_indexes(self):
+        symbols = self.columns["tradingsymbol"].tolist()
+        names = self.columns["name"].tolist()
+        types = self.columns["instrument_type"].tolist()
+        strikes = self.columns["strike"].tolist()
+        expiries = self.columns["expiry"].tolist()  # datetime.date or None
+
+        self._by_symbol = {symbol: row for row, symbol in enumerate(symbols)}
+        self._by_token = {
+            token: row for row, token in enumerate(self.columns["instrument_token"].tolist())
+        }
+        self._by_contract = {}
+        chains: Dict[tuple, List[int]] = {}
+        expiry_sets: Dict[tuple, set] = {}
+
+        for row, (name, expiry, strike, inst_type) in enumerate(zip(names, expiries, strikes, types)):
+            self._by_contract[(name, expiry, strike, inst_type)] = row
+            chains.setdefault((name, expiry), []).append(row)
+            if expiry is not None:
+                group = _type_group(inst_type)
+                expiry_sets.setdefault((name, group), set()).add(expiry)
+                expiry_sets.setdefault((None, group), set()).add(expiry)
+
+        self._chains = {key: np.array(rows, dtype=np.int64) for key, rows in chains.items()}
+        self._expiries = {key: sorted(values) for key, values in expiry_sets.items()}
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.columns["instrument_token"])
+
+    def __contains__(self, tradingsymbol: str) -> bool:
+        return tradingsymbol in self._by_symbol
+
+    def is_current(self, today: Optional[date] = None) -> bool:
+        return self.trading_date == (today or date.today())
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Row as a dict shaped like a ``kite.instruments()`` entry"""
+        out = {}
+        for column, values in self.columns.items():
+            value = values[row]
+            if column == "expiry":
+                out[column] = _as_date(value)
+            else:
+                out[column] = value.item()
+        return out
+
+    def records(self, rows: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        rows = range(len(self)) if rows is None else rows
+        return [self.record(row) for row in rows]
+
+    def get(self, tradingsymbol: str) -> Optional[Dict[str, Any]]:
+        row = self._by_symbol.get(tradingsymbol)
+        return None if row is None else self.record(row)
+
+    def token(self, tradingsymbol: str) -> Optional[int]:
+        row = self._by_symbol.get(tradingsymbol)
+        return None if row is None else int(self.columns["instrument_token"][row])
+
+    def by_token(self, instrument_token: int) -> Optional[Dict[str, Any]]:
+        row = self._by_token.get(int(instrument_token))
+        return None if row is None else self.record(row)
+
+    def find(self, name: str, expiry, strike: float = 0.0,
+             instrument_type: str = "FUT") -> Optional[Dict[str, Any]]:
+        """Contract by (name, expiry, strike, instrument_type)"""
+        row = self._by_contract.get((name, _as_date(expiry), float(strike), instrument_type))
+        return None if row is None else self.record(row)
+
+    def expiries(self, name: Optional[str] = None, instrument_type: str = "OPT") -> List[date]:
+        """Sorted expiries for an underlying (all underlyings when ``name`` is None)"""
+        return self._expiries.get((name, _type_group(instrument_type)), [])
+
+    def nearest_expiry(self, name: Optional[str] = None, instrument_type: str = "OPT",
+                       on_or_after: Optional[date] = None) -> Optional[date]:
+        expiries = self.expiries(name, instrument_type)
+        i = bisect.bisect_left(expiries, on_or_after or date.today())
+        return expiries[i] if i < len(expiries) else None
+
+    def future(self, name: str, expiry=None) -> Optional[Dict[str, Any]]:
+        """Future for ``name``; the nearest live expiry when none is given"""
+        expiry = _as_date(expiry) or self.nearest_expiry(name, "FUT")
+        return self.find(name, expiry, 0.0, "FUT") if expiry else None
+
+    def chain_rows(self, name: str, expiry, instrument_type: Optional[str] = None) -> np.ndarray:
+        rows = self._chains.get((name, _as_date(expiry)))
+        if rows is None:
+            return np.empty(0, dtype=np.int64)
+        types = self.columns["instrument_type"][rows]
+        if instrument_type is None:
+            keep = np.isin(types, OPTION_TYPES)
+        else:
+            keep = types == instrument_type
+        return rows[keep]
+
+    def chain(self, name: str, expiry, instrument_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Options for one underlying and expiry (CE and PE unless filtered)"""
+        return self.records(self.chain_rows(name, expiry, instrument_type))
+
+    def options(self, name: str, instrument_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Options for an underlying across every listed expiry"""
+        rows = [
+            self.chain_rows(name, expiry, instrument_type)
+            for expiry in self.expiries(name, "OPT")
+        ]
+        return self.records(np.concatenate(rows)) if rows else []
+
+
+_masters: Dict[str, InstrumentMaster] = {}
+_masters_lock = Lock()
+
+
+def get_instrument_master(kite=None, exchange: str = "NFO", cache_dir: Optional[str] = None,
+                          logger=None) -> InstrumentMaster:
+    """
+    Process-wide instrument master, refreshed once per trading day
+
+    ``kite`` (a client or a factory returning one) is only used when no
+    snapshot for today exists on disk.
+    """
+    with _masters_lock:
+        master = _masters.get(exchange)
+        if master is None or not master.is_current():
+            if kite is None:
+                path = InstrumentMaster.snapshot_path(cache_dir, exchange, date.today())
+                if not os.path.exists(os.path.join(path, "meta.json")):
+                    raise RuntimeError(f"No {exchange} instrument snapshot for today and no Kite client given")
+            master = InstrumentMaster.load(kite, exchange=exchange, cache_dir=cache_dir, logger=logger)
+            _masters[exchange] = master
+        return master
+
+
+def reset_instrument_masters():
+    """Forget loaded masters (the on-disk snapshots are kept)"""
+    with _masters_lock:
+        _masters.clear()
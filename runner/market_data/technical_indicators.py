@@ -1,64 +1,45 @@
 import numpy as np
 from typing import Dict, List, Any
 
+from runner.indicators.batch_indicators import adx as adx_series, wilder_smooth
+
 class TechnicalIndicators:
     """Advanced technical indicators for trend vs range classification"""
     
+    @staticmethod
+    def wilder_smooth(values, period: int) -> np.ndarray:
+        """Wilder smoothing (alpha = 1/period, seeded with the first value) as a recursive filter"""
+        return wilder_smooth(values, period)
+
     @staticmethod
     def calculate_adx(high_prices: List[float], low_prices: List[float], close_prices: List[float], 
-                      period: int = 14) -> Dict[str, float]:
-        """Calculate Average Directional Index (ADX)"""
+                      period: int = 14, full_series: bool = False) -> Dict[str, Any]:
+        """
+        Calculate Average Directional Index (ADX)
+
+        With ``full_series`` the values are numpy arrays aligned to the input
+        bars (the first bar is NaN) instead of the latest value only.
+        """
         if len(high_prices) < period + 1:
+            if full_series:
+                nan = np.full(len(high_prices), np.nan)
+                return {"adx": nan, "di_plus": nan.copy(), "di_minus": nan.copy()}
             return {"adx": np.nan, "di_plus": np.nan, "di_minus": np.nan}
         
-        # Convert to numpy arrays
-        high = np.array(high_prices)
-        low = np.array(low_prices)
-        close = np.array(close_prices)
-        
-        # Calculate True Range (TR)
-        tr1 = high[1:] - low[1:]
-        tr2 = np.abs(high[1:] - close[:-1])
-        tr3 = np.abs(low[1:] - close[:-1])
-        tr = np.maximum(tr1, np.maximum(tr2, tr3))
+        adx, di_plus, di_minus = adx_series(
+            np.asarray(high_prices, dtype=np.float64),
+            np.asarray(low_prices, dtype=np.float64),
+            np.asarray(close_prices, dtype=np.float64),
+            period,
+        )
+        if full_series:
+            return {"adx": adx, "di_plus": di_plus, "di_minus": di_minus}
         
-        # Calculate Directional Movement
-        dm_plus = np.where((high[1:] - high[:-1]) > (low[:-1] - low[1:]), 
-                          np.maximum(high[1:] - high[:-1], 0), 0)
-        dm_minus = np.where((low[:-1] - low[1:]) > (high[1:] - high[:-1]), 
-                           np.maximum(low[:-1] - low[1:], 0), 0)
-        
-        # Smooth the values
-        def wilder_smooth(values, period):
-            alpha = 1.0 / period
-            smoothed = np.zeros_like(values)
-            smoothed[0] = values[0]
-            for i in range(1, len(values)):
-                smoothed[i] = alpha * values[i] + (1 - alpha) * smoothed[i-1]
-            return smoothed
-        
-        if len(tr) >= period:
-            atr = wilder_smooth(tr, period)
-            dm_plus_smooth = wilder_smooth(dm_plus, period)
-            dm_minus_smooth = wilder_smooth(dm_minus, period)
-            
-            # Calculate DI+ and DI-
-            di_plus = 100 * dm_plus_smooth / atr
-            di_minus = 100 * dm_minus_smooth / atr
-            
-            # Calculate DX
-            dx = 100 * np.abs(di_plus - di_minus) / (di_plus + di_minus + 1e-10)
-            
-            # Calculate ADX
-            adx = wilder_smooth(dx, period)
-            
-            return {
-                "adx": adx[-1] if len(adx) > 0 else np.nan,
-                "di_plus": di_plus[-1] if len(di_plus) > 0 else np.nan,
-                "di_minus": di_minus[-1] if len(di_minus) > 0 else np.nan
-            }
-        
-        return {"adx": np.nan, "di_plus": np.nan, "di_minus": np.nan}
+        return {
+            "adx": adx[-1],
+            "di_plus": di_plus[-1],
+            "di_minus": di_minus[-1]
+        }
     
     @staticmethod
     def calculate_bollinger_bands(prices: List[float], period: int = 20, std_dev: float = 2) -> Dict[str, float]:
@@ -93,10 +74,12 @@ class TechnicalIndicators:
         closes = np.array(close_prices[-lookback:])
         
         # Higher highs and higher lows analysis
-        higher_highs = sum(1 for i in range(1, len(highs)) if highs[i] > highs[i-1])
-        lower_lows = sum(1 for i in range(1, len(lows)) if lows[i] < lows[i-1])
-        higher_lows = sum(1 for i in range(1, len(lows)) if lows[i] > lows[i-1])
-        lower_highs = sum(1 for i in range(1, len(highs)) if highs[i] < highs[i-1])
+        high_changes = np.diff(highs)
+        low_changes = np.diff(lows)
+        higher_highs = int(np.count_nonzero(high_changes > 0))
+        lower_lows = int(np.count_nonzero(low_changes < 0))
+        higher_lows = int(np.count_nonzero(low_changes > 0))
+        lower_highs = int(np.count_nonzero(high_changes < 0))
         
         # Trend strength calculation
         uptrend_strength = (higher_highs + higher_lows) / (2 * (lookback - 1))
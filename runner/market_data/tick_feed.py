@@ -0,0 +1,400 @@
+"""
+Tick Feed
+
+Streaming price ticks in place of LTP polling. A single
+``TickSubscriptionManager`` owns the connection to a feed and fans ticks
+out to its subscribers (position monitor, paper trader, strategies);
+each subscriber only receives ticks for the symbols it subscribed to,
+and the feed itself is subscribed to the union of those symbols.
+
+Feeds:
+- KiteTickerFeed: Kite WebSocket (KiteTicker) in LTP/quote mode
+- ReplayFeed: replays recorded ticks or candles locally, for offline tests
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+try:
+    from kiteconnect import KiteTicker
+
+    KITECONNECT_AVAILABLE = True
+except ImportError:
+    KITECONNECT_AVAILABLE = False
+
+from runner.market_data.candle_cache import _naive
+
+
+@dataclass
+class Tick:
+    """A single price update"""
+    symbol: str
+    last_price: float
+    timestamp: Optional[datetime] = None
+    instrument_token: Optional[int] = None
+    volume: Optional[int] = None
+
+
+TickCallback = Callable[[Tick], None]
+TickHandler = Callable[[List[Tick]], None]
+
+
+class TickFeed(ABC):
+    """Base class for tick sources; ticks are delivered in batches to ``handler``"""
+
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.handler: Optional[TickHandler] = None
+
+    def set_handler(self, handler: TickHandler):
+        self.handler = handler
+
+    @abstractmethod
+    def subscribe(self, symbols: Iterable[str]):
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, symbols: Iterable[str]):
+        pass
+
+    @abstractmethod
+    def start(self):
+        pass
+
+    @abstractmethod
+    def stop(self):
+        pass
+
+    def _emit(self, ticks: List[Tick]):
+        if ticks and self.handler is not None:
+            self.handler(ticks)
+
+
+class TickSubscriptionManager:
+    """Single owner of a feed that routes each tick to the subscribers of its symbol"""
+
+    def __init__(self, feed: TickFeed, logger=None):
+        self.feed = feed
+        self.logger = logger
+        self._callbacks: Dict[str, TickCallback] = {}
+        self._symbols_by_subscriber: Dict[str, Set[str]] = defaultdict(set)
+        self._subscribers_by_symbol: Dict[str, Set[str]] = defaultdict(set)
+        self._last_ticks: Dict[str, Tick] = {}
+        self._lock = Lock()
+        self._counters = {"ticks": 0, "deliveries": 0, "callback_errors": 0}
+        feed.set_handler(self.dispatch)
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, subscriber_id: str, symbols: Iterable[str], callback: Optional[TickCallback] = None):
+        """Add symbols for a subscriber; the callback is set on first use and may be replaced"""
+        added = []
+        with self._lock:
+            if callback is not None:
+                self._callbacks[subscriber_id] = callback
+            if subscriber_id not in self._callbacks:
+                raise ValueError(f"No tick callback registered for {subscriber_id}")
+            for symbol in symbols:
+                if symbol in self._symbols_by_subscriber[subscriber_id]:
+                    continue
+                self._symbols_by_subscriber[subscriber_id].add(symbol)
+                if not self._subscribers_by_symbol[symbol]:
+                    added.append(symbol)
+                self._subscribers_by_symbol[symbol].add(subscriber_id)
+        if added:
+            self.feed.subscribe(added)
+
+    def unsubscribe(self, subscriber_id: str, symbols: Optional[Iterable[str]] = None):
+        """Drop some (or all) of a subscriber's symbols; the feed drops symbols nobody wants"""
+        removed = []
+        with self._lock:
+            owned = self._symbols_by_subscriber.get(subscriber_id, set())
+            for symbol in list(owned if symbols is None else symbols):
+                if symbol not in owned:
+                    continue
+                owned.discard(symbol)
+                watchers = self._subscribers_by_symbol[symbol]
+                watchers.discard(subscriber_id)
+                if not watchers:
+                    del self._subscribers_by_symbol[symbol]
+                    self._last_ticks.pop(symbol, None)
+                    removed.append(symbol)
+            if symbols is None:
+                self._symbols_by_subscriber.pop(subscriber_id, None)
+                self._callbacks.pop(subscriber_id, None)
+        if removed:
+            self.feed.unsubscribe(removed)
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._subscribers_by_symbol)
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def dispatch(self, ticks: List[Tick]):
+        """Feed handler: deliver each tick to the subscribers of its symbol only"""
+        deliveries = []
+        with self._lock:
+            self._counters["ticks"] += len(ticks)
+            for tick in ticks:
+                watchers = self._subscribers_by_symbol.get(tick.symbol)
+                if not watchers:
+                    continue
+                self._last_ticks[tick.symbol] = tick
+                deliveries.extend((self._callbacks[sid], tick) for sid in watchers)
+            self._counters["deliveries"] += len(deliveries)
+
+        # Callbacks run outside the lock so they may (un)subscribe
+        for callback, tick in deliveries:
+            try:
+                callback(tick)
+            except Exception as e:
+                with self._lock:
+                    self._counters["callback_errors"] += 1
+                if self.logger:
+                    self.logger.log_event(f"[TICK] Subscriber callback failed for {tick.symbol}: {e}")
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        with self._lock:
+            tick = self._last_ticks.get(symbol)
+            return tick.last_price if tick else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "symbols": len(self._subscribers_by_symbol),
+                "subscribers": len(self._callbacks),
+            }
+
+    def start(self):
+        self.feed.start()
+
+    def stop(self):
+        self.feed.stop()
+
+
+class KiteTickerFeed(TickFeed):
+    """
+    Kite WebSocket feed
+
+    Symbols are tradingsymbols; ``token_for`` maps one to its instrument
+    token (by default through the NSE/NFO instrument masters).
+    """
+
+    def __init__(self, api_key: str, access_token: str, kite=None,
+                 token_for: Optional[Callable[[str], Optional[int]]] = None,
+                 exchanges: Iterable[str] = ("NSE", "NFO"), mode: str = "ltp", logger=None):
+        super().__init__(logger)
+        if not KITECONNECT_AVAILABLE:
+            raise ImportError("kiteconnect is required for KiteTickerFeed")
+        self.api_key = api_key
+        self.access_token = access_token
+        self.kite = kite
+        self.exchanges = tuple(exchanges)
+        self.mode = mode
+        self._token_for = token_for or self._master_token
+        self._tokens: Dict[str, int] = {}
+        self._symbols: Dict[int, str] = {}
+        self._ticker = None
+        self._connected = False
+        self._lock = Lock()
+
+    def _master_token(self, symbol: str) -> Optional[int]:
+        from runner.market_data.instrument_master import get_instrument_master
+
+        for exchange in self.exchanges:
+            token = get_instrument_master(self.kite, exchange=exchange, logger=self.logger).token(symbol)
+            if token is not None:
+                return token
+        return None
+
+    def subscribe(self, symbols: Iterable[str]):
+        tokens = []
+        with self._lock:
+            for symbol in symbols:
+                token = self._tokens.get(symbol) or self._token_for(symbol)
+                if token is None:
+                    if self.logger:
+                        self.logger.log_event(f"[TICK] No instrument token for {symbol}; not streaming it")
+                    continue
+                self._tokens[symbol] = int(token)
+                self._symbols[int(token)] = symbol
+                tokens.append(int(token))
+            connected = self._connected
+        if tokens and connected:
+            self._ticker.subscribe(tokens)
+            self._ticker.set_mode(self.mode, tokens)
+
+    def unsubscribe(self, symbols: Iterable[str]):
+        tokens = []
+        with self._lock:
+            for symbol in symbols:
+                token = self._tokens.pop(symbol, None)
+                if token is not None:
+                    self._symbols.pop(token, None)
+                    tokens.append(token)
+            connected = self._connected
+        if tokens and connected:
+            self._ticker.unsubscribe(tokens)
+
+    def start(self):
+        if self._ticker is not None:
+            return
+        self._ticker = KiteTicker(self.api_key, self.access_token)
+        self._ticker.on_connect = self._on_connect
+        self._ticker.on_close = self._on_close
+        self._ticker.on_error = self._on_error
+        self._ticker.on_ticks = self._on_ticks
+        self._ticker.connect(threaded=True)
+
+    def stop(self):
+        if self._ticker is not None:
+            self._ticker.close()
+            self._ticker = None
+        self._connected = False
+
+    def _on_connect(self, ws, response):
+        # Also runs after every reconnect, so the full token set is re-sent
+        with self._lock:
+            self._connected = True
+            tokens = list(self._symbols)
+        if tokens:
+            ws.subscribe(tokens)
+            ws.set_mode(self.mode, tokens)
+        if self.logger:
+            self.logger.log_event(f"[TICK] KiteTicker connected, streaming {len(tokens)} instruments")
+
+    def _on_close(self, ws, code, reason):
+        self._connected = False
+        if self.logger:
+            self.logger.log_event(f"[TICK] KiteTicker closed: {code} {reason}")
+
+    def _on_error(self, ws, code, reason):
+        if self.logger:
+            self.logger.log_event(f"[TICK] KiteTicker error: {code} {reason}")
+
+    def _on_ticks(self, ws, ticks):
+        out = []
+        for raw in ticks:
+            symbol = self._symbols.get(raw.get("instrument_token"))
+            if symbol is None:
+                continue
+            out.append(Tick(
+                symbol=symbol,
+                last_price=raw["last_price"],
+                timestamp=raw.get("exchange_timestamp") or raw.get("last_trade_time") or datetime.now(),
+                instrument_token=raw["instrument_token"],
+                volume=raw.get("volume_traded"),
+            ))
+        self._emit(out)
+
+
+class ReplayFeed(TickFeed):
+    """
+    Replays recorded ticks, for offline testing
+
+    Ticks sharing a timestamp are delivered as one batch. ``speed`` scales
+    the recorded gaps (2.0 replays twice as fast); 0 replays without waiting.
+    """
+
+    def __init__(self, ticks: Iterable[Any], speed: float = 0.0, logger=None):
+        super().__init__(logger)
+        self.ticks = sorted(
+            (t if isinstance(t, Tick) else Tick(**t) for t in ticks),
+            key=lambda t: _naive(t.timestamp) if t.timestamp is not None else datetime.min,
+        )
+        self.speed = speed
+        self._subscribed: Set[str] = set()
+        self._lock = Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_jsonl(cls, path: str, speed: float = 0.0, logger=None) -> "ReplayFeed":
+        """One JSON object per line: symbol, last_price and optionally timestamp (ISO), volume"""
+        ticks = []
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row.get("timestamp"):
+                    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                ticks.append(Tick(**row))
+        return cls(ticks, speed=speed, logger=logger)
+
+    @classmethod
+    def from_candles(cls, symbol: str, candles: Iterable[Dict[str, Any]], speed: float = 0.0,
+                     logger=None) -> "ReplayFeed":
+        """Four ticks per candle: open, then the nearer extreme, the other extreme, close"""
+        ticks = []
+        for candle in candles:
+            stamp = _naive(candle["date"])
+            o, h, l, c = candle["open"], candle["high"], candle["low"], candle["close"]
+            path = (o, l, h, c) if abs(o - l) <= abs(h - o) else (o, h, l, c)
+            ticks.extend(
+                Tick(symbol=symbol, last_price=price, timestamp=stamp.replace(microsecond=i))
+                for i, price in enumerate(path)
+            )
+        return cls(ticks, speed=speed, logger=logger)
+
+    def subscribe(self, symbols: Iterable[str]):
+        with self._lock:
+            self._subscribed.update(symbols)
+
+    def unsubscribe(self, symbols: Iterable[str]):
+        with self._lock:
+            self._subscribed.difference_update(symbols)
+
+    def run(self) -> int:
+        """Replay synchronously; returns the number of ticks delivered"""
+        delivered, batch = 0, []
+        for tick in self.ticks:
+            if self._stop.is_set():
+                break
+            if batch and tick.timestamp != batch[0].timestamp:
+                delivered += self._deliver(batch)
+                self._pace(batch[0].timestamp, tick.timestamp)
+                batch = []
+            batch.append(tick)
+        if batch and not self._stop.is_set():
+            delivered += self._deliver(batch)
+        return delivered
+
+    def _deliver(self, batch: List[Tick]) -> int:
+        with self._lock:
+            ticks = [t for t in batch if t.symbol in self._subscribed]
+        self._emit(ticks)
+        return len(ticks)
+
+    def _pace(self, current, upcoming):
+        if self.speed > 0 and current is not None and upcoming is not None:
+            gap = (_naive(upcoming) - _naive(current)).total_seconds() / self.speed
+            if gap > 0:
+                self._stop.wait(gap)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True, name="replay-feed")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -10,6 +10,10 @@ import os
 from typing import Dict, Any, Optional, List
 from collections import defaultdict
 
+from runner.market_data.candle_cache import CandleCache
+from runner.market_data.candle_store import CandleStore, PYARROW_AVAILABLE
+from runner.market_data.fetch_scheduler import FetchScheduler, SourceLimit, retry_with_backoff
+
 # 🚀 NEW: Real historical data imports
 try:
     import yfinance as yf
@@ -31,18 +35,41 @@ class MarketDataFetcher:
         # 🚀 NEW: Historical Data Configuration
         self.historical_config = {
             'cache_ttl_minutes': 15,
+            'cache_max_mb': 64,
             'max_retry_attempts': 3,
             'batch_size': 10,
-            'rate_limit_delay': 1.0,
+            'rate_limit_delay': 1.0,  # spacing for sources without an explicit limit
+            'max_concurrency': 8,
+            'source_rate_limits': {},  # source -> SourceLimit overriding the defaults
             'exponential_backoff_base': 2.0,
             'max_backoff_seconds': 30,
             'use_real_data': True,
+            'use_candle_store': True,
             'alpha_vantage_api_key': os.getenv('ALPHA_VANTAGE_API_KEY'),
             'data_source_priority': ['yfinance', 'alpha_vantage', 'investpy', 'kite', 'mock']
         }
         
-        # 🚀 NEW: In-memory cache for historical data
-        self.data_cache = {}
+        # Byte-bounded LRU cache of candle segments with per-interval TTLs
+        self.data_cache = CandleCache(
+            max_bytes=int(self.historical_config['cache_max_mb'] * 1024 * 1024),
+            default_ttl=self.historical_config['cache_ttl_minutes'] * 60,
+            logger=logger,
+        )
+        
+        # On-disk candle warehouse consulted before any network source
+        self.candle_store = None
+        if self.historical_config['use_candle_store'] and PYARROW_AVAILABLE:
+            self.candle_store = CandleStore(logger=logger)
+        
+        # Per-source token buckets and concurrency caps shared by every fetch
+        self.scheduler = FetchScheduler(
+            max_workers=self.historical_config['max_concurrency'],
+            source_limits={
+                'default': SourceLimit(rate_per_second=1.0 / self.historical_config['rate_limit_delay']),
+                **self.historical_config['source_rate_limits'],
+            },
+            logger=logger,
+        )
 
     def fetch_latest_candle(self, instrument_token, interval="5minute"):
         try:
@@ -50,14 +77,15 @@ class MarketDataFetcher:
             from_time = now - datetime.timedelta(minutes=10)
             to_time = now
 
-            candles = self.kite.historical_data(
-                instrument_token,
-                from_time,
-                to_time,
-                interval,
-                continuous=False,
-                oi=True,
-            )
+            with self.scheduler.limit('kite'):
+                candles = self.kite.historical_data(
+                    instrument_token,
+                    from_time,
+                    to_time,
+                    interval,
+                    continuous=False,
+                    oi=True,
+                )
 
             if candles:
                 latest_candle = candles[-1]
@@ -77,41 +105,9 @@ class MarketDataFetcher:
             self.logger.log_event(f"Error fetching latest candle: {e}")
             return None
 
-    def _generate_cache_key(self, instrument_token, from_date, to_date, interval):
-        """Generate a unique cache key for the data request"""
-        return f"{instrument_token}_{from_date.strftime('%Y%m%d_%H%M')}_{to_date.strftime('%Y%m%d_%H%M')}_{interval}"
-
-    def _is_cache_valid(self, cache_entry):
-        """Check if cached data is still valid based on TTL"""
-        if not cache_entry or 'timestamp' not in cache_entry:
-            return False
-        
-        cache_age_minutes = (datetime.now() - cache_entry['timestamp']).total_seconds() / 60
-        return cache_age_minutes < self.historical_config['cache_ttl_minutes']
-
-    def _get_from_cache(self, cache_key):
-        """Retrieve data from cache if valid"""
-        if cache_key in self.data_cache:
-            cache_entry = self.data_cache[cache_key]
-            if self._is_cache_valid(cache_entry):
-                if self.logger:
-                    self.logger.log_event(f"[CACHE HIT] Retrieved data for {cache_key}")
-                return cache_entry['data']
-            else:
-                del self.data_cache[cache_key]
-                if self.logger:
-                    self.logger.log_event(f"[CACHE EXPIRED] Removed expired data for {cache_key}")
-        
-        return None
-
-    def _store_in_cache(self, cache_key, data):
-        """Store data in cache with timestamp"""
-        self.data_cache[cache_key] = {
-            'data': data,
-            'timestamp': datetime.now()
-        }
-        if self.logger:
-            self.logger.log_event(f"[CACHE STORE] Cached data for {cache_key}")
+    def get_cache_statistics(self):
+        """Hit/miss/eviction and byte counters of the historical data cache"""
+        return self.data_cache.stats()
 
     def _get_nifty_symbol_mapping(self, instrument_token):
         """Map instrument tokens to real data source symbols"""
@@ -272,11 +268,14 @@ class MarketDataFetcher:
         for source in self.historical_config['data_source_priority']:
             data = None
             if source == 'yfinance' and YFINANCE_AVAILABLE:
-                data = self._fetch_yfinance_data(instrument_token, from_date, to_date, interval)
+                with self.scheduler.limit(source):
+                    data = self._fetch_yfinance_data(instrument_token, from_date, to_date, interval)
             elif source == 'alpha_vantage' and self.historical_config.get('alpha_vantage_api_key'):
-                data = self._fetch_alpha_vantage_data(instrument_token, from_date, to_date, interval)
+                with self.scheduler.limit(source):
+                    data = self._fetch_alpha_vantage_data(instrument_token, from_date, to_date, interval)
             elif source == 'investpy' and INVESTPY_AVAILABLE:
-                data = self._fetch_investpy_data(instrument_token, from_date, to_date, interval)
+                with self.scheduler.limit(source):
+                    data = self._fetch_investpy_data(instrument_token, from_date, to_date, interval)
             
             if data:
                 if self.logger:
@@ -287,41 +286,30 @@ class MarketDataFetcher:
             self.logger.log_event(f"Failed to fetch real data from any source for token {instrument_token}")
         return None
 
-    def _fetch_with_retry(self, instrument_token, from_date, to_date, interval, attempt=1):
-        """Wrapper to fetch data with exponential backoff retry"""
+    def _fetch_with_retry(self, instrument_token, from_date, to_date, interval):
+        """Fetch with capped, fully jittered exponential backoff between attempts"""
         try:
-            return self._fetch_real_historical_data(instrument_token, from_date, to_date, interval)
-        except Exception as e:
-            if attempt >= self.historical_config['max_retry_attempts']:
-                if self.logger:
-                    self.logger.log_event(f"[RETRY FAILED] Max retries reached for {instrument_token}. Error: {e}")
-                return None
-            
-            backoff_time = min(
-                self.historical_config['exponential_backoff_base'] ** attempt,
-                self.historical_config['max_backoff_seconds']
+            return retry_with_backoff(
+                lambda: self._fetch_real_historical_data(instrument_token, from_date, to_date, interval),
+                max_attempts=self.historical_config['max_retry_attempts'],
+                base=self.historical_config['exponential_backoff_base'],
+                max_backoff=self.historical_config['max_backoff_seconds'],
+                logger=self.logger,
+                label=str(instrument_token),
             )
-            
-            if self.logger:
-                self.logger.log_event(f"[RETRY] Attempt {attempt} failed for {instrument_token}. Retrying in {backoff_time:.2f}s. Error: {e}")
-            
-            time.sleep(backoff_time)
-            return self._fetch_with_retry(instrument_token, from_date, to_date, interval, attempt + 1)
+        except Exception:
+            return None
 
     def _fetch_historical_data_batch(self, instruments_batch, from_date, to_date, interval):
-        """Fetch historical data for a batch of instruments"""
-        batch_data = {}
-        for token, symbol in instruments_batch.items():
-            if self.logger:
-                self.logger.log_event(f"Processing batch item: {symbol} ({token})")
-            
-            data = self.fetch_historical_data(token, from_date, to_date, interval)
-            batch_data[token] = data
-            
-            # Rate limiting
-            time.sleep(self.historical_config['rate_limit_delay'])
-            
-        return batch_data
+        """Fetch historical data for a batch of instruments concurrently"""
+        if self.logger:
+            self.logger.log_event(f"Processing batch of {len(instruments_batch)} instruments")
+        
+        # Requests are paced by the per-source token buckets, not a fixed sleep
+        return self.scheduler.map(
+            lambda token: self.fetch_historical_data(token, from_date, to_date, interval),
+            instruments_batch,
+        )
 
     def _generate_mock_data(self, from_date, to_date, interval):
         """Generate mock historical data for testing"""
@@ -345,38 +333,31 @@ class MarketDataFetcher:
 
     def fetch_historical_data(self, instrument_token, from_date, to_date, interval):
         """Public method to fetch historical data for a single instrument, with caching."""
-        cache_key = self._generate_cache_key(instrument_token, from_date, to_date, interval)
-        cached_data = self._get_from_cache(cache_key)
-        
-        if cached_data:
-            return cached_data
-            
-        if self.historical_config['use_real_data']:
-            data = self._fetch_with_retry(instrument_token, from_date, to_date, interval)
-        else:
-            data = None
-
+        # Cached segments are reused; only the uncovered part of the range is fetched
+        data = self.data_cache.get_range(
+            instrument_token, interval, from_date, to_date, self._fetch_uncached
+        )
         if not data:
+            # Mock candles are returned to the caller but never cached or stored
             if self.logger:
                 self.logger.log_event(f"Falling back to mock data for token {instrument_token}")
             data = self._generate_mock_data(from_date, to_date, interval)
-        
-        if data:
-            self._store_in_cache(cache_key, data)
-            
         return data
 
+    def _fetch_uncached(self, instrument_token, from_date, to_date, interval):
+        """Fetch from the candle store / configured sources; None when no real data is available"""
+        if self.historical_config['use_real_data']:
+            if self.candle_store is not None:
+                # Only ranges missing from disk reach the network; mock data is never stored
+                data = self.candle_store.get_range(
+                    instrument_token, interval, from_date, to_date, self._fetch_with_retry
+                )
+            else:
+                data = self._fetch_with_retry(instrument_token, from_date, to_date, interval)
+        else:
+            data = None
+        return data or None
+
     def fetch_multiple_instruments_data(self, instruments_dict, from_date, to_date, interval):
-        """Fetch historical data for multiple instruments using batching"""
-        all_data = {}
-        instrument_list = list(instruments_dict.items())
-        
-        for i in range(0, len(instrument_list), self.historical_config['batch_size']):
-            batch = dict(instrument_list[i:i + self.historical_config['batch_size']])
-            if self.logger:
-                self.logger.log_event(f"Fetching batch {i // self.historical_config['batch_size'] + 1}")
-            
-            batch_data = self._fetch_historical_data_batch(batch, from_date, to_date, interval)
-            all_data.update(batch_data)
-            
-        return all_data
+        """Fetch historical data for multiple instruments concurrently under the source rate limits"""
+        return self._fetch_historical_data_batch(instruments_dict, from_date, to_date, interval)
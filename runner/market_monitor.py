@@ -10,6 +10,7 @@ from collections import defaultdict
 
 # Import from new modular structure using absolute imports
 from runner.market_data import MarketDataFetcher, TechnicalIndicators
+from runner.market_data.fetch_scheduler import FetchScheduler
 
 # 🚀 NEW: Real historical data imports
 try:
@@ -198,12 +199,15 @@ class MarketMonitor:
             'max_retry_attempts': 3,
             'exponential_backoff_base': 2.0,
             'max_backoff_seconds': 10,
-            'rate_limit_delay': 1.0
+            'rate_limit_delay': 1.0,
+            'max_concurrency': 8
         }
         
-        # Cache for historical data
-        self._cache = {}
-        self._cache_timestamps = {}
+        # Historical data is cached (and stored on disk) by the data fetcher, which
+        # knows which candles are real; multi-instrument fetches share its scheduler
+        self.scheduler = getattr(self.data_fetcher, 'scheduler', None) or FetchScheduler(
+            max_workers=self.historical_config['max_concurrency'], logger=logger
+        )
 
     def get_enhanced_market_regime(self, instrument_token="NIFTY 50", instrument_id=256265) -> Dict[str, Any]:
         """Get comprehensive market regime analysis including volatility, trend, and correlations"""
@@ -494,7 +498,9 @@ class MarketMonitor:
             from_date = to_date - timedelta(days=5)
             
             start_time = time.time()
-            batch_data = self.data_fetcher.fetch_historical_data(target_instruments, from_date, to_date, "5minute")
+            batch_data = self.fetch_multiple_instruments_data(
+                target_instruments, from_date, to_date, "5minute"
+            )
             fetch_time = time.time() - start_time
             
             # Analyze each instrument
@@ -645,21 +651,12 @@ class MarketMonitor:
         return context
     
     def _fetch_historical_data(self, instrument_token, from_date, to_date, interval):
-        """Fetch historical data with caching and retry logic"""
+        """Fetch historical data through data_fetcher as a DataFrame"""
         try:
-            # Check cache first
-            cache_key = f"{instrument_token}_{from_date}_{to_date}_{interval}"
-            if cache_key in self._cache:
-                cache_time = self._cache_timestamps.get(cache_key, datetime.min)
-                if datetime.now() - cache_time < timedelta(minutes=self.historical_config['cache_ttl_minutes']):
-                    return self._cache[cache_key]
-            
-            # Fetch data using data_fetcher
             data = self.data_fetcher.fetch_historical_data(instrument_token, from_date, to_date, interval)
             
             # Convert to DataFrame if it's a list
             if isinstance(data, list) and data:
-                import pandas as pd
                 df = pd.DataFrame(data)
                 if 'date' in df.columns:
                     df['date'] = pd.to_datetime(df['date'])
@@ -668,10 +665,6 @@ class MarketMonitor:
             else:
                 df = pd.DataFrame()
             
-            # Cache the result
-            self._cache[cache_key] = df
-            self._cache_timestamps[cache_key] = datetime.now()
-            
             return df
             
         except Exception as e:
@@ -680,18 +673,16 @@ class MarketMonitor:
             return pd.DataFrame()
     
     def fetch_multiple_instruments_data(self, instruments, from_date, to_date, interval):
-        """Fetch data for multiple instruments in batch"""
+        """Fetch data for multiple instruments concurrently"""
         try:
-            batch_data = {}
-            
-            for name, token in instruments.items():
-                data = self._fetch_historical_data(token, from_date, to_date, interval)
-                batch_data[name] = data
-                
-                # Add delay to respect rate limits
-                time.sleep(self.historical_config['rate_limit_delay'])
-            
-            return batch_data
+            results = self.scheduler.map(
+                lambda name: self._fetch_historical_data(instruments[name], from_date, to_date, interval),
+                instruments,
+            )
+            return {
+                name: data if data is not None else pd.DataFrame()
+                for name, data in results.items()
+            }
             
         except Exception as e:
             if self.logger:
@@ -703,47 +694,28 @@ class MarketMonitor:
         for key, value in kwargs.items():
             if key in self.historical_config:
                 self.historical_config[key] = value
+                if key == 'cache_ttl_minutes' and hasattr(self.data_fetcher, 'data_cache'):
+                    self.data_fetcher.data_cache.set_ttl(value * 60)
                 if self.logger:
                     self.logger.log_event(f"Updated historical config: {key} = {value}")
     
     def get_cache_statistics(self):
-        """Get cache statistics"""
-        total_entries = len(self._cache)
-        cache_size_mb = 0
-        
-        # Estimate cache size
-        for df in self._cache.values():
-            if hasattr(df, 'memory_usage'):
-                cache_size_mb += df.memory_usage(deep=True).sum() / (1024 * 1024)
-        
-        # Calculate hit ratio (simplified)
-        cache_hit_ratio = 0.7 if total_entries > 0 else 0.0
-        
+        """Get the data fetcher's cache statistics"""
+        cache = getattr(self.data_fetcher, 'data_cache', None)
+        if cache is None:
+            return {'total_cached_entries': 0, 'cache_size_mb': 0.0, 'cache_hit_ratio': 0.0}
+        stats = cache.stats()
         return {
-            'total_cached_entries': total_entries,
-            'cache_size_mb': cache_size_mb,
-            'cache_hit_ratio': cache_hit_ratio
+            'total_cached_entries': stats['segments'],
+            'cache_size_mb': stats['bytes'] / (1024 * 1024),
+            'cache_hit_ratio': stats['hit_ratio'],
+            **stats
         }
     
     def clear_expired_cache(self):
         """Clear expired cache entries"""
-        expired_count = 0
-        ttl = timedelta(minutes=self.historical_config['cache_ttl_minutes'])
-        current_time = datetime.now()
-        
-        keys_to_remove = []
-        for key, timestamp in self._cache_timestamps.items():
-            if current_time - timestamp > ttl:
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            if key in self._cache:
-                del self._cache[key]
-            if key in self._cache_timestamps:
-                del self._cache_timestamps[key]
-            expired_count += 1
-        
-        return expired_count
+        cache = getattr(self.data_fetcher, 'data_cache', None)
+        return cache.purge_expired() if cache is not None else 0
     
     def _get_nifty_symbol_mapping(self):
         """Get NIFTY symbol mapping"""
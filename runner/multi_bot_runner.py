@@ -0,0 +1,56 @@
+"""
+Multi-Bot Runner
+
+Runs the stock, options and futures bots in one process on a single
+TradingLoop. Each trader contributes its ``build_pipeline()`` for the
+strategy it loaded. The traders are built with one shared PositionMonitor,
+which their trade managers register positions with and the loop drives, so
+every bot's exits are checked; stage latency is reported per bot.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from runner.trading_loop import run_trading_loop
+
+
+def run_all_bots(traders, position_monitor=None, logger=None, **loop_options):
+    """Run every trader's pipeline concurrently until all of them stop"""
+    if not traders:
+        raise ValueError("run_all_bots needs at least one trader")
+    monitor = position_monitor or getattr(traders[0], "position_monitor", None)
+    # The loop drives a single monitor; positions held by any other would never exit
+    unshared = [type(t).__name__ for t in traders if getattr(t, "position_monitor", monitor) is not monitor]
+    if unshared:
+        raise ValueError(f"Traders must share one PositionMonitor: {', '.join(unshared)}")
+    unloaded = [type(t).__name__ for t in traders if getattr(t, "strategy", None) is None]
+    if unloaded:
+        raise ValueError(f"No strategy loaded for: {', '.join(unloaded)}")
+    pipelines = [trader.build_pipeline() for trader in traders]
+    if logger:
+        logger.log_event(f"[MULTI] Running {', '.join(p.name for p in pipelines)} in one loop")
+    return run_trading_loop(pipelines, monitor, logger=logger, **loop_options)
+
+
+def main(paper_trade: bool = True):
+    from futures_trading.futures_runner import FuturesTrader
+    from options_trading.options_runner import OptionsTrader
+    from runner.kiteconnect_manager import KiteConnectManager
+    from runner.logger import TradingLogger
+    from runner.position_monitor import PositionMonitor
+    from stock_trading.stock_runner import StockTrader
+
+    logger = TradingLogger()
+    monitor = PositionMonitor(logger=logger, kite_manager=KiteConnectManager(logger=logger))
+    traders = [
+        StockTrader(strategy_name="vwap", paper_trade=paper_trade, position_monitor=monitor),
+        OptionsTrader(strategy_name="scalp", paper_trade=paper_trade, position_monitor=monitor),
+        FuturesTrader(strategy_name="orb", paper_trade=paper_trade, position_monitor=monitor),
+    ]
+    run_all_bots(traders, position_monitor=monitor, logger=logger)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Supports both paper trading (mock pricing) and live trading (real Black-Scholes
 import math
 import numpy as np
 from config.config_manager import get_trading_config
+from runner.market_data.instrument_master import get_instrument_master
 import asyncio
 from datetime import datetime, timedelta
 from dataclasses import dataclass
@@ -15,6 +16,7 @@ from threading import Lock
 try:
     from scipy.stats import norm
     from scipy.optimize import brentq
+    from scipy.special import ndtr
 
     SCIPY_AVAILABLE = True
 except ImportError:
@@ -46,6 +48,232 @@ class GreeksData:
     is_mock: bool = False
 
 
+@dataclass
+class OptionChainAnalytics:
+    """Column-oriented pricing results for a whole option chain"""
+
+    strikes: np.ndarray
+    option_types: np.ndarray
+    time_to_expiry: np.ndarray
+    market_prices: np.ndarray
+    iv: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    theta: np.ndarray
+    vega: np.ndarray
+    rho: np.ndarray
+    converged: np.ndarray
+    is_mock: bool = False
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+    def greeks_at(self, i: int) -> GreeksData:
+        return GreeksData(
+            delta=float(self.delta[i]),
+            gamma=float(self.gamma[i]),
+            theta=float(self.theta[i]),
+            vega=float(self.vega[i]),
+            rho=float(self.rho[i]),
+            is_mock=self.is_mock,
+        )
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            "strike": self.strikes,
+            "option_type": self.option_types,
+            "time_to_expiry": self.time_to_expiry,
+            "market_price": self.market_prices,
+            "iv": self.iv,
+            "delta": self.delta,
+            "gamma": self.gamma,
+            "theta": self.theta,
+            "vega": self.vega,
+            "rho": self.rho,
+            "converged": self.converged,
+        }
+
+
+# Vectorized Black-Scholes kernels used for whole-chain pricing. All inputs
+# broadcast against each other; ``is_call`` is a boolean array.
+
+if SCIPY_AVAILABLE:
+    _ndtr = ndtr
+else:
+    _erf = np.frompyfunc(math.erf, 1, 1)
+
+    def _ndtr(x):
+        x = np.asarray(x, dtype=np.float64)
+        return 0.5 * (1.0 + _erf(x / math.sqrt(2.0)).astype(np.float64))
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / math.sqrt(2.0 * math.pi)
+
+
+def _d1_d2(S, K, T, r, sigma):
+    sqrt_t = np.sqrt(T)
+    d1 = (np.log(S / K) + (r + sigma**2 / 2) * T) / (sigma * sqrt_t)
+    return d1, d1 - sigma * sqrt_t
+
+
+def black_scholes_prices(S, K, T, r, sigma, is_call) -> np.ndarray:
+    """Black-Scholes prices for arrays of options (intrinsic value once expired)"""
+    S, K, T, sigma = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (S, K, T, sigma))
+    )
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+    intrinsic = np.where(is_call, np.maximum(S - K, 0), np.maximum(K - S, 0))
+
+    live = T > 0
+    T_safe = np.where(live, T, 1.0)
+    sigma = np.maximum(sigma, 0.01)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(S, K, T_safe, r, sigma)
+        discount = K * np.exp(-r * T_safe)
+        call = S * _ndtr(d1) - discount * _ndtr(d2)
+        put = discount * _ndtr(-d2) - S * _ndtr(-d1)
+    return np.where(live, np.where(is_call, call, put), intrinsic)
+
+
+def black_scholes_greeks(S, K, T, r, sigma, is_call) -> Dict[str, np.ndarray]:
+    """Greeks for arrays of options, in the same units as ``calculate_greeks``"""
+    S, K, T, sigma = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (S, K, T, sigma))
+    )
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+
+    live = (T > 0) & (sigma > 0)
+    T_safe = np.where(live, T, 1.0)
+    sigma_safe = np.where(live, sigma, 1.0)
+    sqrt_t = np.sqrt(T_safe)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(S, K, T_safe, r, sigma_safe)
+        pdf_d1 = _norm_pdf(d1)
+        cdf_d1 = _ndtr(d1)
+        discount = K * np.exp(-r * T_safe)
+        call_d2 = _ndtr(d2)
+        put_d2 = _ndtr(-d2)
+
+        delta = np.where(is_call, cdf_d1, cdf_d1 - 1)
+        gamma = pdf_d1 / (S * sigma_safe * sqrt_t)
+        decay = -S * pdf_d1 * sigma_safe / (2 * sqrt_t)
+        theta = (decay + np.where(is_call, -r * discount * call_d2, r * discount * put_d2)) / 365
+        vega = S * pdf_d1 * sqrt_t / 100
+        rho = np.where(is_call, discount * T_safe * call_d2, -discount * T_safe * put_d2) / 100
+
+    return {
+        name: np.where(live, values, 0.0)
+        for name, values in (
+            ("delta", delta),
+            ("gamma", gamma),
+            ("theta", theta),
+            ("vega", vega),
+            ("rho", rho),
+        )
+    }
+
+
+def implied_volatilities(
+    market_prices,
+    S,
+    K,
+    T,
+    r,
+    is_call,
+    lower: float = 0.01,
+    upper: float = 5.0,
+    tol: float = 1e-8,
+    max_iter: int = 100,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve implied volatility for arrays of options at once.
+
+    Each option runs a Halley iteration inside its own [lower, upper]
+    bracket; any step that leaves the bracket, hits a vanishing vega or
+    fails to halve the previous step becomes a bisection step, so every
+    option whose price is attainable converges. Returns ``(iv, converged)``; options that cannot be
+    solved (expired, non-positive or out-of-bounds prices) are NaN.
+    """
+    price, S, K, T = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (market_prices, S, K, T))
+    )
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    shape = price.shape
+    price, S, K, T, is_call = (a.ravel() for a in (price, S, K, T, is_call))
+
+    iv = np.full(price.shape, np.nan)
+    converged = np.zeros(price.shape, dtype=bool)
+
+    # Only prices strictly inside the attainable range have a root
+    candidates = np.flatnonzero((T > 0) & (price > 0))
+    args = (S[candidates], K[candidates], T[candidates], r)
+    calls = is_call[candidates]
+    low_price = black_scholes_prices(*args, lower, calls)
+    high_price = black_scholes_prices(*args, upper, calls)
+    target = price[candidates]
+    solvable = (target >= low_price) & (target <= high_price)
+    idx = candidates[solvable]
+
+    s, k, t, p, c = S[idx], K[idx], T[idx], price[idx], is_call[idx]
+    lo = np.full(idx.size, lower)
+    hi = np.full(idx.size, upper)
+    last_step = hi - lo
+    # Brenner-Subrahmanyam guess on the time value
+    forward_strike = k * np.exp(-r * t)
+    intrinsic = np.where(
+        c, np.maximum(s - forward_strike, 0), np.maximum(forward_strike - s, 0)
+    )
+    sigma = np.sqrt(2 * math.pi / t) * np.maximum(p - intrinsic, 1e-8) / s
+    sigma = np.clip(sigma, lower, upper)
+    active = np.arange(idx.size)
+
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        sa, ka, ta, ca = s[active], k[active], t[active], c[active]
+        sig = sigma[active]
+        diff = black_scholes_prices(sa, ka, ta, r, sig, ca) - p[active]
+
+        lo[active] = np.where(diff < 0, sig, lo[active])
+        hi[active] = np.where(diff > 0, sig, hi[active])
+
+        d1, d2 = _d1_d2(sa, ka, ta, r, sig)
+        vega = sa * _norm_pdf(d1) * np.sqrt(ta)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = diff / vega
+            volga_ratio = d1 * d2 / sig  # vega' / vega
+            halley = newton / (1 - 0.5 * newton * volga_ratio)
+            step = np.where(np.isfinite(halley), halley, newton)
+            proposal = sig - step
+
+        bisect = (
+            ~np.isfinite(proposal)
+            | (proposal <= lo[active])
+            | (proposal >= hi[active])
+            | (np.abs(step) > 0.5 * last_step[active])
+        )
+        proposal = np.where(bisect, 0.5 * (lo[active] + hi[active]), proposal)
+        proposal = np.where(diff == 0, sig, proposal)
+        last_step[active] = np.abs(proposal - sig)
+        sigma[active] = proposal
+
+        done = (
+            (diff == 0)
+            | (np.abs(proposal - sig) < tol)
+            | (hi[active] - lo[active] < tol)
+        )
+        converged[idx[active[done]]] = True
+        active = active[~done]
+
+    iv[idx] = np.clip(sigma, lower, upper)
+    return iv.reshape(shape), converged.reshape(shape)
+
+
+# Instruments per kite.ltp() call (the API accepts up to 1000)
+LTP_BATCH_SIZE = 500
+
+
 class OptionsEngine:
     """Enterprise options pricing and Greeks engine with paper trade support"""
 
@@ -222,6 +450,52 @@ class OptionsEngine:
             print(f"Greeks calculation error: {e}, using approximation")
             return self._approximate_greeks(S, K, T, r, sigma, option_type)
 
+    def price_option_chain(
+        self,
+        spot: float,
+        strikes,
+        market_prices,
+        option_types,
+        expiries,
+        fallback_iv: Optional[float] = None,
+    ) -> OptionChainAnalytics:
+        """
+        Solve IV and Greeks for a whole chain in one vectorized pass
+
+        ``expiries`` may be year fractions or expiry dates (``datetime``,
+        ``date`` or ``YYYY-MM-DD`` strings), so several expiries can be
+        priced together. Options whose IV cannot be solved get
+        ``fallback_iv`` (NaN when not given) and ``converged=False``.
+        """
+        strikes = np.asarray(strikes, dtype=np.float64)
+        market_prices = np.asarray(market_prices, dtype=np.float64)
+        option_types = np.asarray(option_types)
+        T = self._years_to_expiry(expiries, len(strikes))
+        is_call = option_types == "CE"
+
+        if self.paper_trade:
+            return self._mock_chain_analytics(
+                spot, strikes, market_prices, option_types, T
+            )
+
+        iv, converged = implied_volatilities(
+            market_prices, spot, strikes, T, self.rf_rate, is_call
+        )
+        if fallback_iv is not None:
+            iv = np.where(converged, iv, fallback_iv)
+
+        greeks = black_scholes_greeks(spot, strikes, T, self.rf_rate, iv, is_call)
+        return OptionChainAnalytics(
+            strikes=strikes,
+            option_types=option_types,
+            time_to_expiry=T,
+            market_prices=market_prices,
+            iv=iv,
+            converged=converged,
+            is_mock=False,
+            **greeks,
+        )
+
     async def analyze_option_chain(
         self, kite, symbol: str, spot_price: float, expiry_date: str = None
     ) -> List[OptionData]:
@@ -231,87 +505,73 @@ class OptionsEngine:
             return self._mock_option_chain(symbol, spot_price, expiry_date)
 
         try:
-            # Get instruments from Kite
-            instruments = kite.instruments("NFO")
+            # Instruments come from the shared, once-a-day instrument master
+            master = get_instrument_master(kite, "NFO")
 
             # Determine expiry date
             if not expiry_date:
                 expiry_date = self._get_next_expiry()
 
-            # Filter options for the symbol and expiry
-            options = [
-                inst
-                for inst in instruments
-                if inst["name"] == symbol.upper()
-                and inst["expiry"] == expiry_date
-                and inst["instrument_type"] in ["CE", "PE"]
-            ]
+            # Options for the symbol and expiry (CE and PE)
+            options = master.chain(symbol.upper(), expiry_date)
 
             if not options:
                 print(f"No options found for {symbol} expiry {expiry_date}")
                 return self._mock_option_chain(symbol, spot_price, expiry_date)
 
-            option_data = []
-
-            # Get LTP for all options
-            symbols_list = [
-                f"NFO:{opt['tradingsymbol']}" for opt in options[:50]
-            ]  # Limit to avoid rate limits
-            ltp_data = kite.ltp(symbols_list)
+            # Get LTP for the full chain in as few calls as the API allows
+            ltp_data = {}
+            for start in range(0, len(options), LTP_BATCH_SIZE):
+                batch = options[start : start + LTP_BATCH_SIZE]
+                ltp_data.update(
+                    kite.ltp([f"NFO:{opt['tradingsymbol']}" for opt in batch])
+                )
 
             expiry_datetime = datetime.strptime(expiry_date, "%Y-%m-%d")
             T = max(
                 (expiry_datetime.date() - datetime.now().date()).days / 365.0, 0.001
             )
 
-            for opt in options[:50]:  # Process limited options to avoid timeouts
+            # Only process options with meaningful price
+            priced = []
+            for opt in options:
                 symbol_key = f"NFO:{opt['tradingsymbol']}"
                 market_price = ltp_data.get(symbol_key, {}).get("last_price", 0)
+                if market_price > 0.5:
+                    priced.append((opt, market_price))
+
+            if not priced:
+                return []
+
+            strikes = np.array([opt["strike"] for opt, _ in priced], dtype=np.float64)
+            prices = np.array([price for _, price in priced], dtype=np.float64)
+            chain = self.price_option_chain(
+                spot_price,
+                strikes,
+                prices,
+                [opt["instrument_type"] for opt, _ in priced],
+                T,
+                fallback_iv=self.mock_iv_base,
+            )
 
-                if market_price > 0.5:  # Only process options with meaningful price
-                    try:
-                        # Calculate IV
-                        iv = self.implied_volatility(
-                            market_price,
-                            spot_price,
-                            opt["strike"],
-                            T,
-                            self.rf_rate,
-                            opt["instrument_type"],
-                        )
-
-                        # Calculate Greeks
-                        greeks = self.calculate_greeks(
-                            spot_price,
-                            opt["strike"],
-                            T,
-                            self.rf_rate,
-                            iv,
-                            opt["instrument_type"],
-                        )
-
-                        # Calculate liquidity score (simplified)
-                        liquidity_score = min(
-                            market_price / (abs(spot_price - opt["strike"]) + 1), 1.0
-                        )
-
-                        option_data.append(
-                            OptionData(
-                                symbol=opt["tradingsymbol"],
-                                strike=opt["strike"],
-                                expiry=expiry_datetime,
-                                option_type=opt["instrument_type"],
-                                spot=spot_price,
-                                market_price=market_price,
-                                iv=iv,
-                                greeks=greeks.__dict__,
-                                is_mock=False,
-                                liquidity_score=liquidity_score,
-                            )
-                        )
-                    except Exception as e:
-                        print(f"Error processing option {opt['tradingsymbol']}: {e}")
-                        continue
+            # Calculate liquidity score (simplified)
+            liquidity = np.minimum(prices / (np.abs(spot_price - strikes) + 1), 1.0)
+
+            option_data = [
+                OptionData(
+                    symbol=opt["tradingsymbol"],
+                    strike=opt["strike"],
+                    expiry=expiry_datetime,
+                    option_type=opt["instrument_type"],
+                    spot=spot_price,
+                    market_price=market_price,
+                    iv=float(chain.iv[i]),
+                    greeks=chain.greeks_at(i).__dict__,
+                    is_mock=False,
+                    liquidity_score=float(liquidity[i]),
+                )
+                for i, (opt, market_price) in enumerate(priced)
+            ]
 
             return option_data
 
@@ -562,6 +822,46 @@ class OptionsEngine:
             delta=delta, gamma=gamma, theta=theta, vega=vega, rho=rho, is_mock=True
         )
 
+    def _mock_chain_analytics(
+        self,
+        S: float,
+        K: np.ndarray,
+        market_prices: np.ndarray,
+        option_types: np.ndarray,
+        T: np.ndarray,
+    ) -> OptionChainAnalytics:
+        """Vectorized equivalent of _mock_implied_volatility/_mock_greeks"""
+        is_call = option_types == "CE"
+        moneyness = np.where(K > 0, S / np.where(K > 0, K, 1), 1.0)
+
+        itm = np.where(is_call, moneyness > 1.02, moneyness < 0.98)
+        otm = np.where(is_call, moneyness < 0.98, moneyness > 1.02)
+        iv = np.select(
+            [itm, otm], [self.mock_iv_base * 0.9, self.mock_iv_base * 1.2],
+            self.mock_iv_base,
+        )
+
+        delta = np.where(
+            is_call,
+            np.clip(0.5 + (moneyness - 1) * 2, 0.1, 0.9),
+            np.clip(-0.5 + (1 - moneyness) * 2, -0.9, -0.1),
+        )
+        T = np.broadcast_to(T, K.shape)
+        return OptionChainAnalytics(
+            strikes=K,
+            option_types=option_types,
+            time_to_expiry=T,
+            market_prices=market_prices,
+            iv=iv,
+            delta=delta,
+            gamma=self.mock_greeks_base["gamma"] * (1 - np.abs(moneyness - 1)),
+            theta=self.mock_greeks_base["theta"] * T,
+            vega=self.mock_greeks_base["vega"] * np.sqrt(T),
+            rho=self.mock_greeks_base["rho"] * T,
+            converged=np.ones(K.shape, dtype=bool),
+            is_mock=True,
+        )
+
     def _mock_option_chain(
         self, symbol: str, spot_price: float, expiry_date: str = None
     ) -> List[OptionData]:
@@ -603,6 +903,32 @@ class OptionsEngine:
 
         return option_data
 
+    @staticmethod
+    def _years_to_expiry(expiries, size: int) -> np.ndarray:
+        """Year fractions for numeric expiries or expiry dates (min 0.001)"""
+        values = np.asarray(expiries)
+        if values.dtype.kind in "fiu":
+            return np.broadcast_to(values.astype(np.float64), (size,))
+        if values.dtype.kind == "M":
+            values = values.astype("datetime64[D]").astype(object)
+
+        today = datetime.now().date()
+
+        def years(expiry):
+            if isinstance(expiry, str):
+                expiry = datetime.strptime(expiry, "%Y-%m-%d")
+            if isinstance(expiry, datetime):
+                expiry = expiry.date()
+            return max((expiry - today).days / 365.0, 0.001)
+
+        if values.ndim == 0:
+            return np.full(size, years(values.item()))
+        cache = {}
+        return np.array(
+            [cache[e] if e in cache else cache.setdefault(e, years(e)) for e in values],
+            dtype=np.float64,
+        )
+
     def _get_next_expiry(self) -> str:
         """Get next Thursday expiry date"""
         today = datetime.now().date()
@@ -672,6 +998,7 @@ class OptionsEngine:
             "cache_size": len(self.iv_cache),
             "mock_iv_base": self.mock_iv_base if self.paper_trade else None,
             "available_strategies": ["scalp", "momentum", "swing", "default"],
+            "chain_pricing": "vectorized",
         }
 
 
@@ -0,0 +1,520 @@
+"""
+Order Pipeline
+
+Bounded, parallel order placement for Kite. Orders are queued (the queue
+has a fixed size, so a runaway signal source blocks instead of piling up
+orders) and dispatched by a fixed number of worker threads under Kite's
+order rate limit. Each order carries a client-side ID sent as the Kite
+``tag``: a retry after an ambiguous failure (timeout, dropped
+connection) first looks the tag up in the order book, so an order that
+did reach the exchange is never placed twice.
+
+Baskets (multi-leg option entries, emergency exits) are dispatched
+together, so N orders cost about one round trip rather than N. With
+``all_or_none`` a partially placed basket is flattened again: legs still
+open are cancelled and only the quantity that actually filled is offset
+with a market order, so a resting LIMIT leg cannot fill after its
+reversal and leave a naked position.
+
+Latency is recorded per stage as histograms: signal -> order sent,
+order sent -> ack (place_order returned), ack -> fill (order update or
+order book poll reports COMPLETE).
+"""
+
+import bisect
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future, wait as wait_for_futures
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from runner.market_data.fetch_scheduler import TokenBucket, backoff_delay
+
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError)
+try:
+    from kiteconnect.exceptions import NetworkException
+    if isinstance(NetworkException, type) and issubclass(NetworkException, BaseException):
+        RETRYABLE_ERRORS += (NetworkException,)
+except ImportError:
+    pass
+
+# Kite allows 10 orders/second per user
+KITE_ORDER_RATE = 10.0
+
+LATENCY_STAGES = ("signal_to_order", "order_to_ack", "ack_to_fill")
+
+FILLED_STATUSES = {"COMPLETE"}
+DEAD_STATUSES = {"REJECTED", "CANCELLED"}
+
+# place_basket never waits longer than this unless told otherwise
+DEFAULT_BASKET_TIMEOUT = 30.0
+# How long a flattened basket waits for its cancelled legs to settle in the order book
+SETTLE_TIMEOUT = 5.0
+SETTLE_POLL_INTERVAL = 0.2
+# Idle workers re-check for shutdown this often (the stop sentinel may not fit a full queue)
+WORKER_IDLE_POLL = 0.5
+
+
+def new_client_order_id() -> str:
+    """Client order ID usable as a Kite tag (alphanumeric, max 20 chars)"""
+    return uuid.uuid4().hex[:20]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        ms = max(seconds, 0.0) * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the q-th quantile"""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if seen >= rank and n:
+                    return float(self.BOUNDS_MS[i]) if i < len(self.BOUNDS_MS) else self.max_ms
+            return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        buckets = {f"<={b}ms": n for b, n in zip(self.BOUNDS_MS, self.counts) if n}
+        if self.counts[-1]:
+            buckets[f">{self.BOUNDS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms if self.count else None,
+            "buckets": buckets,
+        }
+
+
+@dataclass
+class OrderRequest:
+    """One order; ``params`` are KiteConnect.place_order keyword arguments"""
+    params: Dict[str, Any]
+    client_order_id: str = field(default_factory=new_client_order_id)
+    signal_time: Optional[float] = None  # time.monotonic() when the signal fired
+    label: str = ""
+
+    def __post_init__(self):
+        self.params = dict(self.params)
+        self.params.setdefault("variety", "regular")
+        self.params["tag"] = self.client_order_id
+        if not self.label:
+            self.label = self.params.get("tradingsymbol", "")
+
+
+@dataclass
+class OrderResult:
+    """Outcome of placing one order"""
+    client_order_id: str
+    order_id: Optional[str] = None
+    status: str = "PENDING"  # ACK, FILLED, REJECTED, FAILED
+    error: Optional[str] = None
+    attempts: int = 0
+    label: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.order_id is not None and self.status in ("ACK", "FILLED")
+
+
+class OrderPipeline:
+    """Bounded queue of orders placed by a capped pool of worker threads"""
+
+    def __init__(self, place_fn: Callable[..., Any], orders_fn: Optional[Callable[[], List[Dict]]] = None,
+                 cancel_fn: Optional[Callable[[str, str], Any]] = None, max_in_flight: int = 4, max_queue: int = 100, max_attempts: int = 3,
+                 orders_per_second: float = KITE_ORDER_RATE, retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+                 backoff_base: float = 0.5, max_backoff: float = 5.0, logger=None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.place_fn = place_fn
+        self.orders_fn = orders_fn
+        self.cancel_fn = cancel_fn  # cancel_fn(variety, order_id)
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.retry_on = retry_on
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.logger = logger
+        self.clock = clock
+        self.sleep = sleep
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._bucket = TokenBucket(orders_per_second, max(1, int(orders_per_second)), clock=clock, sleep=sleep)
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._awaiting_fill: Dict[str, Tuple[OrderResult, float]] = {}  # order_id -> (result, ack time)
+        self._early_updates: Dict[str, Tuple[str, str]] = {}  # client_order_id -> (order_id, status)
+        self._closed = False
+
+        self.latency = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+        self.counters = {"submitted": 0, "placed": 0, "failed": 0, "retries": 0, "recovered": 0, "filled": 0, "rejected": 0}
+
+    @classmethod
+    def for_kite_manager(cls, kite_manager, **kwargs) -> "OrderPipeline":
+        """Pipeline placing orders through a KiteConnectManager's client"""
+        def place(**params):
+            return kite_manager.get_kite_client().place_order(**params)
+
+        def orders():
+            return kite_manager.get_kite_client().orders()
+
+        def cancel(variety, order_id):
+            return kite_manager.get_kite_client().cancel_order(variety=variety, order_id=order_id)
+
+        kwargs.setdefault("logger", getattr(kite_manager, "logger", None))
+        return cls(place, orders_fn=orders, cancel_fn=cancel, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit(self, request: OrderRequest, block: bool = True, timeout: Optional[float] = None) -> Future:
+        """
+        Queue an order and return a Future resolving to its OrderResult.
+
+        Submitting the same client_order_id again returns the original
+        Future instead of placing a second order. Raises queue.Full when
+        the queue stays full (non-blocking or after ``timeout``).
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("OrderPipeline is shut down")
+            existing = self._futures.get(request.client_order_id)
+            if existing is not None:
+                return existing
+            future: Future = Future()
+            self._futures[request.client_order_id] = future
+            self.counters["submitted"] += 1
+            self._ensure_workers()
+        if request.signal_time is None:
+            request.signal_time = self.clock()
+        try:
+            self._queue.put((request, future), block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._futures.pop(request.client_order_id, None)
+                self.counters["submitted"] -= 1
+            raise
+        return future
+
+    def place(self, request: OrderRequest, timeout: Optional[float] = None) -> OrderResult:
+        """Submit one order and wait for its result"""
+        return self.submit(request).result(timeout=timeout)
+
+    def submit_basket(self, requests: Sequence[OrderRequest]) -> List[Future]:
+        """Queue every leg at once; legs are dispatched in parallel"""
+        return [self.submit(request) for request in requests]
+
+    def place_basket(self, requests: Sequence[OrderRequest], all_or_none: bool = False,
+                     timeout: float = DEFAULT_BASKET_TIMEOUT) -> List[OrderResult]:
+        """
+        Place all legs concurrently and wait up to ``timeout`` seconds for
+        them. A leg still queued at the deadline is withdrawn; one already
+        being sent comes back PENDING. With ``all_or_none``, if any leg
+        failed the placed legs are cancelled and whatever filled is offset.
+        """
+        futures = self.submit_basket(requests)
+        wait_for_futures(futures, timeout=timeout)
+        results = []
+        for request, future in zip(requests, futures):
+            if not future.done() and future.cancel():
+                status = "FAILED"  # withdrawn before a worker sent it
+            elif future.done():
+                results.append(future.result())
+                continue
+            else:
+                status = "PENDING"  # a worker is sending it, so it may still be placed
+                if all_or_none:
+                    future.add_done_callback(partial(self._flatten_late_leg, request))
+            results.append(OrderResult(request.client_order_id, status=status,
+                                       error=f"no result within {timeout}s", label=request.label))
+        if all_or_none and not all(result.ok for result in results):
+            placed = [(request, result) for request, result in zip(requests, results) if result.ok]
+            if placed:
+                self._log(f"[ORDERS] Basket leg failed, flattening {len(placed)} placed leg(s)")
+                self._flatten(placed, timeout)
+        return results
+
+    # ------------------------------------------------------------------
+    # Fills
+    # ------------------------------------------------------------------
+
+    def on_order_update(self, update: Dict[str, Any]):
+        """Feed a Kite order update (KiteTicker on_order_update or an order book row)"""
+        order_id = str(update.get("order_id"))
+        status = str(update.get("status", "")).upper()
+        if status not in FILLED_STATUSES and status not in DEAD_STATUSES:
+            return
+        with self._lock:
+            pending = self._awaiting_fill.pop(order_id, None)
+            if pending is None:
+                # The update can beat place_order's response; keep it for _acked
+                for tag in update.get("tags") or [update.get("tag")]:
+                    future = self._futures.get(tag)
+                    if future is not None and not future.done():
+                        self._early_updates[tag] = (order_id, status)
+                return
+            result, acked_at = pending
+            if status in FILLED_STATUSES:
+                self.counters["filled"] += 1
+            else:
+                self.counters["rejected"] += 1
+        if status in FILLED_STATUSES:
+            self.latency["ack_to_fill"].record(self.clock() - acked_at)
+        result.status = "FILLED" if status in FILLED_STATUSES else "REJECTED"
+
+    def poll_fills(self) -> int:
+        """One order book call for every order still awaiting a fill; returns fills seen"""
+        if self.orders_fn is None or not self._awaiting_fill:
+            return 0
+        before = self.counters["filled"]
+        for row in self.orders_fn() or []:
+            self.on_order_update(row)
+        return self.counters["filled"] - before
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _ensure_workers(self):
+        # Caller holds the lock
+        while len(self._workers) < self.max_in_flight:
+            worker = threading.Thread(target=self._worker, name=f"order-worker-{len(self._workers)}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _worker(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=WORKER_IDLE_POLL)
+            except queue.Empty:
+                if self._closed:
+                    return
+                continue
+            if item is None:
+                self._queue.task_done()
+                return
+            request, future = item
+            if not future.set_running_or_notify_cancel():
+                # Withdrawn by a basket that stopped waiting; never sent
+                with self._lock:
+                    self._futures.pop(request.client_order_id, None)
+                self._queue.task_done()
+                continue
+            try:
+                future.set_result(self._dispatch(request))
+            except Exception as e:  # _dispatch reports failures as results; this is a bug guard
+                future.set_result(OrderResult(request.client_order_id, status="FAILED", error=str(e), label=request.label))
+            finally:
+                self._queue.task_done()
+
+    def _dispatch(self, request: OrderRequest) -> OrderResult:
+        result = OrderResult(request.client_order_id, label=request.label)
+        self.latency["signal_to_order"].record(self.clock() - request.signal_time)
+
+        last_sent_at = None  # send time of the previous attempt, for recovered acks
+        ambiguous = False  # the last attempt may have reached the exchange
+        for attempt in range(1, self.max_attempts + 1):
+            result.attempts = attempt
+            if ambiguous:
+                order_id = self._find_by_tag(request.client_order_id)
+                if order_id is not None:
+                    self.counters["recovered"] += 1
+                    return self._acked(result, order_id, last_sent_at)
+            self._bucket.acquire()
+            last_sent_at = self.clock()
+            try:
+                order_id = self.place_fn(**request.params)
+                return self._acked(result, order_id, last_sent_at)
+            except self.retry_on as e:
+                result.error = str(e)
+                ambiguous = True
+                if attempt < self.max_attempts:
+                    self.counters["retries"] += 1
+                    self._log(f"[ORDERS] {request.label} attempt {attempt} failed ({e}), retrying")
+                    self.sleep(backoff_delay(attempt, self.backoff_base, self.max_backoff))
+            except Exception as e:
+                result.error = str(e)
+                ambiguous = False
+                break
+
+        if ambiguous:
+            # The final attempt may also have been placed before it failed
+            order_id = self._find_by_tag(request.client_order_id)
+            if order_id is not None:
+                self.counters["recovered"] += 1
+                return self._acked(result, order_id, last_sent_at)
+
+        with self._lock:
+            self._early_updates.pop(request.client_order_id, None)
+        result.status = "FAILED"
+        self.counters["failed"] += 1
+        self._log(f"[ORDERS] {request.label} failed after {result.attempts} attempt(s): {result.error}")
+        return result
+
+    def _acked(self, result: OrderResult, order_id, sent_at: float) -> OrderResult:
+        acked_at = self.clock()
+        self.latency["order_to_ack"].record(acked_at - sent_at)
+        result.order_id = str(order_id)
+        result.status = "ACK"
+        result.error = None
+        with self._lock:
+            self.counters["placed"] += 1
+            self._awaiting_fill[result.order_id] = (result, acked_at)
+            early = self._early_updates.pop(result.client_order_id, None)
+        if early is not None and early[0] == result.order_id:
+            self.on_order_update({"order_id": early[0], "status": early[1]})
+        return result
+
+    def _find_by_tag(self, client_order_id: str) -> Optional[str]:
+        if self.orders_fn is None:
+            return None
+        try:
+            for row in self.orders_fn() or []:
+                tags = row.get("tags") or [row.get("tag")]
+                if client_order_id in tags and str(row.get("status", "")).upper() not in DEAD_STATUSES:
+                    return str(row.get("order_id"))
+        except Exception as e:
+            self._log(f"[ORDERS] Order book lookup failed for {client_order_id}: {e}")
+        return None
+
+    # ------------------------------------------------------------------
+    # Flattening a failed basket
+    # ------------------------------------------------------------------
+
+    def _flatten(self, placed: Sequence[Tuple[OrderRequest, OrderResult]], timeout: float):
+        """Cancel placed legs that may still be open, then offset only what filled"""
+        for request, result in placed:
+            if result.status != "FILLED":
+                self._cancel(request, result)
+        filled = self._filled_quantities([result.order_id for _, result in placed])
+
+        reversals = []
+        for request, result in placed:
+            quantity = filled.get(result.order_id)
+            if quantity is None:
+                # Not in the order book: only a reported fill tells us anything
+                quantity = request.params.get("quantity", 0) if result.status == "FILLED" else 0
+                if result.status != "FILLED":
+                    self._log(f"[ORDERS] Fill of {result.label} ({result.order_id}) unknown, not offset")
+            if quantity > 0:
+                reversals.append(self._reverse(request, quantity))
+        if not reversals:
+            return
+        try:
+            for result in self.place_basket(reversals, timeout=timeout):
+                if not result.ok:
+                    self._log(f"[ORDERS] Basket reversal failed for {result.label}: {result.error}")
+        except Exception as e:
+            self._log(f"[ORDERS] Basket reversal failed: {e}")
+
+    def _flatten_late_leg(self, request: OrderRequest, future: Future):
+        # Done callback of a leg that was still being sent when its basket gave up
+        if future.cancelled() or not future.result().ok:
+            return
+        self._log(f"[ORDERS] Late basket leg {request.label} placed, flattening it")
+        threading.Thread(target=self._flatten, args=([(request, future.result())], DEFAULT_BASKET_TIMEOUT),
+                         name="order-flatten", daemon=True).start()
+
+    def _cancel(self, request: OrderRequest, result: OrderResult):
+        if self.cancel_fn is None:
+            self._log(f"[ORDERS] No cancel_fn, {result.label} ({result.order_id}) left open")
+            return
+        try:
+            self.cancel_fn(request.params["variety"], result.order_id)
+        except Exception as e:  # typically the leg already filled or was rejected
+            self._log(f"[ORDERS] Cancel of {result.label} ({result.order_id}) failed: {e}")
+
+    def _filled_quantities(self, order_ids: Sequence[str]) -> Dict[str, int]:
+        """Filled quantity per order once the order book shows each one settled (or time runs out)"""
+        if self.orders_fn is None:
+            return {}
+        wanted = set(order_ids)
+        polls = int(SETTLE_TIMEOUT / SETTLE_POLL_INTERVAL)
+        for poll in range(polls + 1):
+            try:
+                rows = [row for row in self.orders_fn() or [] if str(row.get("order_id")) in wanted]
+            except Exception as e:
+                self._log(f"[ORDERS] Order book lookup failed while flattening: {e}")
+                return {}
+            for row in rows:
+                self.on_order_update(row)
+            open_ids = [str(row.get("order_id")) for row in rows
+                        if str(row.get("status", "")).upper() not in FILLED_STATUSES | DEAD_STATUSES]
+            if not open_ids or poll == polls:
+                if open_ids:
+                    self._log(f"[ORDERS] Order(s) {open_ids} still open after cancel; offsetting fills so far")
+                return {str(row.get("order_id")): self._filled_quantity(row) for row in rows}
+            self.sleep(SETTLE_POLL_INTERVAL)
+
+    @staticmethod
+    def _filled_quantity(row: Dict[str, Any]) -> int:
+        filled = row.get("filled_quantity")
+        if filled is None and str(row.get("status", "")).upper() in FILLED_STATUSES:
+            filled = row.get("quantity")
+        return int(filled or 0)
+
+    @staticmethod
+    def _reverse(request: OrderRequest, quantity: int) -> OrderRequest:
+        params = {k: v for k, v in request.params.items() if k not in ("tag", "price", "trigger_price")}
+        params["transaction_type"] = "SELL" if params.get("transaction_type") == "BUY" else "BUY"
+        params["order_type"] = "MARKET"
+        params["quantity"] = quantity
+        return OrderRequest(params, label=f"{request.label} (reverse)")
+
+    # ------------------------------------------------------------------
+    # Reporting / lifecycle
+    # ------------------------------------------------------------------
+
+    def latency_report(self) -> Dict[str, Dict[str, Any]]:
+        return {stage: hist.summary() for stage, hist in self.latency.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "queued": self._queue.qsize(),
+            "awaiting_fill": len(self._awaiting_fill),
+            "latency": self.latency_report(),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting orders; workers finish what is queued, then exit"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        for _ in workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break  # workers see _closed once they have drained the queue
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.log_event(message)
@@ -7,6 +7,8 @@ with realistic margin calculations, SL/Target tracking, and Firestore logging
 import datetime
 import time
 import logging
+import threading
+from collections import Counter
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -17,6 +19,7 @@ from strategies.vwap_strategy import vwap_strategy, vwap_exit_strategy
 from strategies.scalp_strategy import scalp_strategy
 from strategies.opening_range_strategy import opening_range_strategy
 from runner.config import get_config, is_paper_trade
+from runner.exit_trigger_book import ExitTriggerBook, ABOVE, BELOW
 
 
 class TradeStatus(Enum):
@@ -105,6 +108,16 @@ class PaperTrader:
         # Track active trades
         self.active_trades: List[PaperTrade] = []
         self.completed_trades: List[PaperTrade] = []
+        self._trades_lock = threading.RLock()
+        
+        # SL/Target levels of active trades, indexed by symbol and price
+        self.trigger_book = ExitTriggerBook()
+        self._trades_by_id: Dict[str, PaperTrade] = {}
+        self._open_per_symbol: Counter = Counter()
+        
+        # Optional streaming prices (TickSubscriptionManager)
+        self.tick_subscriptions = None
+        self.tick_subscriber_id = "paper_trader"
         
         # Performance tracking
         self.daily_pnl = 0.0
@@ -250,6 +263,9 @@ class PaperTrader:
             
             # Create paper trade
             trade_id = f"{symbol}_{strategy}_{int(time.time())}"
+            if trade_id in self._trades_by_id:
+                # Same symbol/strategy within a second: keep exit triggers apart
+                trade_id = f"{trade_id}_{len(self._trades_by_id)}"
             
             paper_trade = PaperTrade(
                 trade_id=trade_id,
@@ -270,7 +286,11 @@ class PaperTrader:
             self._allocate_margin(segment, required_margin)
             
             # Add to active trades
-            self.active_trades.append(paper_trade)
+            with self._trades_lock:
+                self.active_trades.append(paper_trade)
+                self._arm_exit_triggers(paper_trade)
+            if self.tick_subscriptions is not None:
+                self.tick_subscriptions.subscribe(self.tick_subscriber_id, [symbol])
             
             # Log trade to Firestore
             trade_data = asdict(paper_trade)
@@ -318,84 +338,109 @@ class PaperTrader:
     def monitor_and_exit_trades(self, current_market_data: Dict[str, float]):
         """Monitor active trades and exit based on SL/Target or market conditions"""
         
-        trades_to_close = []
-        
-        for trade in self.active_trades:
-            try:
-                current_price = current_market_data.get(trade.symbol, trade.entry_price)
-                should_exit, exit_reason = self._should_exit_trade(trade, current_price)
-                
-                if should_exit:
+        with self._trades_lock:
+            # Only trades whose SL/Target is crossed by the new prices are touched
+            trades_to_close = []
+            for symbol, current_price in current_market_data.items():
+                for trade, exit_reason in self._crossed_trades(symbol, current_price):
                     trades_to_close.append((trade, current_price, exit_reason))
-                    
-            except Exception as e:
-                self.logger.error(f"Error monitoring trade {trade.trade_id}: {e}")
-        
-        # Close identified trades
+            
+            # End of day square-off applies to every remaining trade
+            if datetime.datetime.now().time() >= datetime.time(15, 20):  # 3:20 PM
+                closing = {trade.trade_id for trade, _, _ in trades_to_close}
+                for trade in self.active_trades:
+                    if trade.trade_id not in closing:
+                        current_price = current_market_data.get(trade.symbol, trade.entry_price)
+                        trades_to_close.append((trade, current_price, "End of day square-off"))
+            
+        # Close outside the lock: each close makes a Firestore call
         for trade, exit_price, exit_reason in trades_to_close:
             self.close_paper_trade(trade, exit_price, exit_reason)
 
-    def _should_exit_trade(self, trade: PaperTrade, current_price: float) -> tuple[bool, str]:
-        """Determine if a trade should be exited"""
-        
-        if trade.direction == "bullish":
-            # Check target
-            if current_price >= trade.target:
-                return True, "Target reached"
-            # Check stop loss
-            if current_price <= trade.stop_loss:
-                return True, "Stop loss hit"
-        else:  # bearish
-            # Check target
-            if current_price <= trade.target:
-                return True, "Target reached"
-            # Check stop loss
-            if current_price >= trade.stop_loss:
-                return True, "Stop loss hit"
-        
-        # Check time-based exit (end of day)
-        current_time = datetime.datetime.now().time()
-        if current_time >= datetime.time(15, 20):  # 3:20 PM
-            return True, "End of day square-off"
-        
-        return False, ""
+    def _arm_exit_triggers(self, trade: PaperTrade):
+        bullish = trade.direction == "bullish"
+        self._trades_by_id[trade.trade_id] = trade
+        self._open_per_symbol[trade.symbol] += 1
+        self.trigger_book.set(trade.trade_id, "target", trade.symbol, trade.target, ABOVE if bullish else BELOW)
+        self.trigger_book.set(trade.trade_id, "stop_loss", trade.symbol, trade.stop_loss, BELOW if bullish else ABOVE)
+
+    def _crossed_trades(self, symbol: str, price: float) -> List[tuple]:
+        """(trade, exit_reason) for trades whose SL/Target the price crossed"""
+        fired: Dict[str, set] = {}
+        for trigger in self.trigger_book.cross(symbol, price):
+            fired.setdefault(trigger.owner, set()).add(trigger.name)
+        crossed = []
+        for trade_id, names in fired.items():
+            trade = self._trades_by_id.get(trade_id)
+            if trade is not None:
+                crossed.append((trade, "Target reached" if "target" in names else "Stop loss hit"))
+        return crossed
+
+    def attach_tick_feed(self, subscriptions):
+        """Evaluate SL/Target on every tick for the symbols of active trades"""
+        self.tick_subscriptions = subscriptions
+        with self._trades_lock:
+            symbols = {trade.symbol for trade in self.active_trades}
+        subscriptions.subscribe(self.tick_subscriber_id, symbols, self.on_tick)
+
+    def on_tick(self, tick):
+        """Close trades whose SL/Target the tick crossed; end of day is left to monitor_and_exit_trades"""
+        with self._trades_lock:
+            crossed = self._crossed_trades(tick.symbol, tick.last_price)
+        for trade, exit_reason in crossed:
+            self.close_paper_trade(trade, tick.last_price, exit_reason)
+        with self._trades_lock:
+            still_open = self._open_per_symbol[tick.symbol] > 0
+        if not still_open and self.tick_subscriptions is not None:
+            self.tick_subscriptions.unsubscribe(self.tick_subscriber_id, [tick.symbol])
 
     def close_paper_trade(self, trade: PaperTrade, exit_price: float, exit_reason: str):
         """Close a paper trade and calculate PnL"""
         
         try:
-            # Calculate PnL
-            if trade.direction == "bullish":
-                pnl = (exit_price - trade.entry_price) * trade.quantity
-            else:  # bearish
-                pnl = (trade.entry_price - exit_price) * trade.quantity
-            
-            # Update trade details
-            trade.exit_price = exit_price
-            trade.exit_time = datetime.datetime.now()
-            trade.pnl = pnl
-            trade.exit_reason = exit_reason
-            
-            # Determine status based on exit reason
-            if "target" in exit_reason.lower():
-                trade.status = TradeStatus.CLOSED_TARGET
-            elif "stop loss" in exit_reason.lower():
-                trade.status = TradeStatus.CLOSED_SL
-            elif "end of day" in exit_reason.lower():
-                trade.status = TradeStatus.CLOSED_EOD
-            else:
-                trade.status = TradeStatus.CLOSED_MANUAL
-            
-            # Release margin
-            self._release_margin(trade.segment, trade.margin_used)
-            
-            # Move to completed trades
-            self.active_trades.remove(trade)
-            self.completed_trades.append(trade)
-            
-            # Update PnL tracking
-            self.daily_pnl += pnl
+            with self._trades_lock:
+                # Claiming the trade first means a concurrent tick or EOD sweep
+                # that collected it as well cannot close it twice
+                if self._trades_by_id.pop(trade.trade_id, None) is None:
+                    return
+                self._open_per_symbol[trade.symbol] -= 1
+                if self._open_per_symbol[trade.symbol] <= 0:
+                    del self._open_per_symbol[trade.symbol]
+                self.trigger_book.cancel_owner(trade.trade_id)
+                
+                # Calculate PnL
+                if trade.direction == "bullish":
+                    pnl = (exit_price - trade.entry_price) * trade.quantity
+                else:  # bearish
+                    pnl = (trade.entry_price - exit_price) * trade.quantity
+                
+                # Update trade details
+                trade.exit_price = exit_price
+                trade.exit_time = datetime.datetime.now()
+                trade.pnl = pnl
+                trade.exit_reason = exit_reason
+                
+                # Determine status based on exit reason
+                if "target" in exit_reason.lower():
+                    trade.status = TradeStatus.CLOSED_TARGET
+                elif "stop loss" in exit_reason.lower():
+                    trade.status = TradeStatus.CLOSED_SL
+                elif "end of day" in exit_reason.lower():
+                    trade.status = TradeStatus.CLOSED_EOD
+                else:
+                    trade.status = TradeStatus.CLOSED_MANUAL
+                
+                # Release margin
+                self._release_margin(trade.segment, trade.margin_used)
+                
+                # Move to completed trades
+                self.active_trades.remove(trade)
+                self.completed_trades.append(trade)
+                
+                # Update PnL tracking
+                self.daily_pnl += pnl
             
+            # Firestore is written after the lock is released so ticks are not held up
             # Log trade exit to Firestore
             exit_data = {
                 "exit_price": exit_price,
@@ -13,6 +13,7 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import threading
+from collections import defaultdict
 from threading import Lock
 
 from runner.firestore_client import FirestoreClient
@@ -20,6 +21,9 @@ from runner.kiteconnect_manager import KiteConnectManager
 from runner.enhanced_logger import EnhancedLogger, LogLevel, LogCategory, create_enhanced_logger
 from runner.capital.portfolio_manager import PortfolioManager
 from runner.risk_governor import RiskGovernor
+from runner.market_data.tick_feed import Tick, TickSubscriptionManager
+from runner.exit_trigger_book import ExitTriggerBook, ABOVE, BELOW
+from runner.order_pipeline import OrderPipeline, OrderRequest
 from config.config_manager import get_trading_config
 
 
@@ -102,11 +106,15 @@ class PositionMonitor:
     """Real-time position monitoring and exit management system"""
     
     def __init__(self, logger: EnhancedLogger = None, firestore: FirestoreClient = None, 
-                 kite_manager: KiteConnectManager = None, portfolio_manager: PortfolioManager = None):
+                 kite_manager: KiteConnectManager = None, portfolio_manager: PortfolioManager = None,
+                 order_pipeline: OrderPipeline = None):
         self.logger = logger
         self.firestore = firestore
         self.kite_manager = kite_manager
         self.portfolio_manager = portfolio_manager
+        self.order_pipeline = order_pipeline
+        if self.order_pipeline is None and kite_manager is not None:
+            self.order_pipeline = OrderPipeline.for_kite_manager(kite_manager, logger=logger)
         
         # Initialize enhanced logger
         self.enhanced_logger = create_enhanced_logger(
@@ -121,6 +129,15 @@ class PositionMonitor:
         # Position tracking
         self.positions: Dict[str, Position] = {}
         self.positions_lock = Lock()
+        self._symbol_positions: Dict[str, set] = defaultdict(set)
+        
+        # Price-level exits (SL/target/trailing/max loss/partials) per symbol
+        self.trigger_book = ExitTriggerBook()
+        self._symbol_prices: Dict[str, float] = {}
+        
+        # Streaming prices (replaces LTP polling once a feed is attached)
+        self.tick_subscriptions: Optional[TickSubscriptionManager] = None
+        self.tick_subscriber_id = "position_monitor"
         
         # Monitoring control
         self.monitoring_active = False
@@ -130,6 +147,9 @@ class PositionMonitor:
         # Exit execution
         self.exit_queue = asyncio.Queue()
         self.exit_executor_active = False
+        self._exit_loop = None
+        self._pending_exits = set()
+        self._exit_tasks = set()
         
         # Recovery system
         self.crash_recovery_file = "data/position_recovery.json"
@@ -209,6 +229,7 @@ class PositionMonitor:
             
             with self.positions_lock:
                 self.positions[position_id] = position
+            self._track_position(position)
             
             # Save to recovery file
             self.save_positions_for_recovery()
@@ -285,6 +306,7 @@ class PositionMonitor:
         
         # Start exit executor
         asyncio.create_task(self._exit_executor())
+        self._exit_loop = asyncio.get_running_loop()
         
         # Load positions from recovery file
         self.load_positions_from_recovery()
@@ -292,6 +314,21 @@ class PositionMonitor:
         if self.logger:
             self.logger.log_event("Position monitoring started")
     
+    def start_async(self) -> "asyncio.Task":
+        """
+        Start exit execution on the running event loop without the polling thread.
+
+        Used by TradingLoop, which calls run_exit_pass() itself; returns the
+        exit executor task.
+        """
+        self._exit_loop = asyncio.get_running_loop()
+        self.monitoring_active = True
+        self.load_positions_from_recovery()
+        
+        if self.logger:
+            self.logger.log_event("Position monitoring started (event loop)")
+        return asyncio.create_task(self._exit_executor())
+    
     def stop_monitoring(self):
         """Stop the position monitoring system"""
         self.monitoring_active = False
@@ -310,14 +347,23 @@ class PositionMonitor:
         """Main monitoring loop"""
         while self.monitoring_active:
             try:
-                self._update_all_positions()
-                self._check_exit_conditions()
+                self.run_exit_pass()
                 time.sleep(self.update_interval)
             except Exception as e:
                 if self.logger:
                     self.logger.log_event(f"Error in monitoring loop: {e}")
                 time.sleep(self.update_interval)
     
+    def run_exit_pass(self):
+        """One monitoring pass: refresh prices and queue any exits"""
+        # With a tick feed, prices and price-based exits arrive via on_tick;
+        # the periodic pass only covers time-based exits
+        if self.tick_subscriptions is None:
+            self._update_all_positions()
+        else:
+            self._mark_to_market()
+        self._check_exit_conditions()
+    
     def _update_all_positions(self):
         """Update current prices for all positions"""
         if not self.positions:
@@ -339,14 +385,16 @@ class PositionMonitor:
                 kite = self.kite_manager.get_kite_client()
                 ltp_data = kite.ltp(symbols)
                 
-                # Update positions
+                # Fire crossed exit triggers, then mark the rest to market
+                exits = []
                 with self.positions_lock:
-                    for position in self.positions.values():
-                        if position.status == TradeStatus.OPEN:
-                            symbol_key = f"NSE:{position.symbol}"
-                            if symbol_key in ltp_data:
-                                new_price = ltp_data[symbol_key]['last_price']
-                                self._update_position_price(position, new_price)
+                    for symbol_key, quote in ltp_data.items():
+                        symbol = symbol_key.split(':', 1)[-1]
+                        if symbol in self._symbol_positions:
+                            exits.extend(self._apply_price(symbol, quote['last_price']))
+                    self._mark_to_market_locked()
+                for position, exit_signal in exits:
+                    self._submit_exit(position, exit_signal)
             
         except Exception as e:
             if self.logger:
@@ -364,12 +412,14 @@ class PositionMonitor:
                 # Update trailing stop if enabled
                 if position.exit_strategy.trailing_stop_enabled:
                     self._update_trailing_stop(position)
+                    self._arm_trailing_triggers(position)
         else:  # bearish
             if new_price < position.lowest_price:
                 position.lowest_price = new_price
                 # Update trailing stop if enabled
                 if position.exit_strategy.trailing_stop_enabled:
                     self._update_trailing_stop(position)
+                    self._arm_trailing_triggers(position)
         
         # Calculate unrealized P&L
         if position.direction == 'bullish':
@@ -396,77 +446,171 @@ class PositionMonitor:
                 position.trailing_stop_price = new_trailing_stop
     
     def _check_exit_conditions(self):
-        """Check exit conditions for all positions"""
+        """
+        Periodic check of the time-based exits for all positions
+        
+        Price-level exits are not scanned here; they fire from the trigger
+        book as prices arrive (see _apply_price).
+        """
+        exits = []
         with self.positions_lock:
             for position in list(self.positions.values()):
-                if position.status == TradeStatus.OPEN:
-                    exit_signal = self._evaluate_exit_conditions(position)
+                if position.status == TradeStatus.OPEN and position.id not in self._pending_exits:
+                    exit_signal = self._evaluate_time_exits(position)
                     if exit_signal:
-                        asyncio.create_task(self._queue_exit(position, exit_signal))
+                        self._pending_exits.add(position.id)
+                        exits.append((position, exit_signal))
+        for position, exit_signal in exits:
+            self._submit_exit(position, exit_signal)
     
-    def _evaluate_exit_conditions(self, position: Position) -> Optional[Tuple[ExitReason, float, float]]:
-        """
-        Evaluate exit conditions for a position
+    def attach_tick_feed(self, subscriptions: TickSubscriptionManager):
+        """Stream prices for open positions from a tick feed instead of polling LTP"""
+        self.tick_subscriptions = subscriptions
+        with self.positions_lock:
+            symbols = list(self._symbol_positions)
+        subscriptions.subscribe(self.tick_subscriber_id, symbols, self.on_tick)
+    
+    def _track_position(self, position: Position):
+        with self.positions_lock:
+            self._symbol_positions[position.symbol].add(position.id)
+            self._arm_exit_triggers(position)
+        if self.tick_subscriptions is not None:
+            self.tick_subscriptions.subscribe(self.tick_subscriber_id, [position.symbol])
+    
+    def _untrack_position(self, position: Position):
+        with self.positions_lock:
+            self.trigger_book.cancel_owner(position.id)
+            position_ids = self._symbol_positions.get(position.symbol)
+            if position_ids is None:
+                return
+            position_ids.discard(position.id)
+            drained = not position_ids
+            if drained:
+                del self._symbol_positions[position.symbol]
+                self._symbol_prices.pop(position.symbol, None)
+        if drained and self.tick_subscriptions is not None:
+            self.tick_subscriptions.unsubscribe(self.tick_subscriber_id, [position.symbol])
+    
+    def _arm_exit_triggers(self, position: Position):
+        """(Re)arm every price-level exit of an open position in the trigger book"""
+        self.trigger_book.cancel_owner(position.id)
+        if position.status != TradeStatus.OPEN:
+            return
         
-        Returns:
-            Tuple of (exit_reason, exit_price, exit_percentage) or None
-        """
-        current_price = position.current_price
+        book, strategy = self.trigger_book, position.exit_strategy
+        bullish = position.direction == 'bullish'
+        loss_side, gain_side = (BELOW, ABOVE) if bullish else (ABOVE, BELOW)
         
-        # 1. Stop Loss Check
-        if position.direction == 'bullish':
-            if current_price <= position.exit_strategy.stop_loss:
-                return (ExitReason.STOP_LOSS_HIT, position.exit_strategy.stop_loss, 100.0)
-        else:
-            if current_price >= position.exit_strategy.stop_loss:
-                return (ExitReason.STOP_LOSS_HIT, position.exit_strategy.stop_loss, 100.0)
+        book.set(position.id, 'stop_loss', position.symbol, strategy.stop_loss, loss_side)
+        book.set(position.id, 'target', position.symbol, strategy.target, gain_side)
         
-        # 2. Target Check
-        if position.direction == 'bullish':
-            if current_price >= position.exit_strategy.target:
-                return (ExitReason.TARGET_HIT, position.exit_strategy.target, 100.0)
-        else:
-            if current_price <= position.exit_strategy.target:
-                return (ExitReason.TARGET_HIT, position.exit_strategy.target, 100.0)
+        # Loss of max_loss_pct of the entry value
+        loss_fraction = strategy.max_loss_pct / 100
+        max_loss_level = position.entry_price * (1 - loss_fraction if bullish else 1 + loss_fraction)
+        book.set(position.id, 'max_loss', position.symbol, max_loss_level, loss_side)
         
-        # 3. Trailing Stop Check
+        for i, (price_level, _) in enumerate(strategy.partial_exit_levels or []):
+            book.set(position.id, f'partial_{i}', position.symbol, price_level, gain_side)
+        
+        self._arm_trailing_triggers(position)
+    
+    def _arm_trailing_triggers(self, position: Position):
+        """Trailing stop level plus a watermark trigger that ratchets it on a new extreme"""
+        if not position.exit_strategy.trailing_stop_enabled or position.status != TradeStatus.OPEN:
+            return
+        bullish = position.direction == 'bullish'
+        loss_side, gain_side = (BELOW, ABOVE) if bullish else (ABOVE, BELOW)
         if position.trailing_stop_price is not None:
-            if position.direction == 'bullish':
-                if current_price <= position.trailing_stop_price:
-                    return (ExitReason.TRAILING_STOP_HIT, position.trailing_stop_price, 100.0)
-            else:
-                if current_price >= position.trailing_stop_price:
-                    return (ExitReason.TRAILING_STOP_HIT, position.trailing_stop_price, 100.0)
+            self.trigger_book.set(position.id, 'trailing_stop', position.symbol,
+                                  position.trailing_stop_price, loss_side)
+        extreme = position.highest_price if bullish else position.lowest_price
+        self.trigger_book.set(position.id, 'watermark', position.symbol, extreme, gain_side)
+    
+    def _apply_price(self, symbol: str, price: float) -> List[Tuple[Position, Tuple[ExitReason, float, float]]]:
+        """
+        Feed one price into the trigger book (caller holds positions_lock)
         
-        # 4. Time-based Exit
-        if position.exit_strategy.time_based_exit_minutes > 0:
-            time_held = (datetime.now() - position.entry_time).total_seconds() / 60
-            if time_held >= position.exit_strategy.time_based_exit_minutes:
-                return (ExitReason.TIME_BASED_EXIT, current_price, 100.0)
+        Only positions with a crossed trigger are touched; returns the exits to queue.
+        When several triggers of a position fire on the same price, the exit is
+        taken in priority order: stop loss, target, trailing stop, max loss, then
+        the first partial exit level. Time-based exits are checked separately by
+        _evaluate_time_exits.
+        """
+        self._symbol_prices[symbol] = price
+        fired: Dict[str, set] = defaultdict(set)
+        for trigger in self.trigger_book.cross(symbol, price):
+            fired[trigger.owner].add(trigger.name)
         
-        # 5. Max Hold Time
+        exits = []
+        for position_id, names in fired.items():
+            position = self.positions.get(position_id)
+            if position is None or position.status != TradeStatus.OPEN:
+                continue
+            self._update_position_price(position, price)
+            names.discard('watermark')
+            if not names or position_id in self._pending_exits:
+                continue
+            self._pending_exits.add(position_id)
+            exits.append((position, self._trigger_exit_signal(position, names)))
+        return exits
+    
+    def _trigger_exit_signal(self, position: Position, names: set) -> Tuple[ExitReason, float, float]:
+        """Exit signal for fired triggers, in the priority order described in _apply_price"""
+        strategy = position.exit_strategy
+        if 'stop_loss' in names:
+            return (ExitReason.STOP_LOSS_HIT, strategy.stop_loss, 100.0)
+        if 'target' in names:
+            return (ExitReason.TARGET_HIT, strategy.target, 100.0)
+        if 'trailing_stop' in names:
+            return (ExitReason.TRAILING_STOP_HIT, position.trailing_stop_price, 100.0)
+        if 'max_loss' in names:
+            return (ExitReason.RISK_MANAGEMENT_EXIT, position.current_price, 100.0)
+        first = min(int(name.split('_', 1)[1]) for name in names if name.startswith('partial_'))
+        price_level, exit_pct = strategy.partial_exit_levels[first]
+        return (ExitReason.PARTIAL_EXIT, price_level, exit_pct)
+    
+    def _mark_to_market(self):
+        with self.positions_lock:
+            self._mark_to_market_locked()
+    
+    def _mark_to_market_locked(self):
+        """Bring current price and P&L of every open position up to the last seen price"""
+        for position in self.positions.values():
+            if position.status == TradeStatus.OPEN and position.symbol in self._symbol_prices:
+                self._update_position_price(position, self._symbol_prices[position.symbol])
+    
+    def on_tick(self, tick: Tick):
+        """Fire only the exit triggers crossed by the tick's price"""
+        with self.positions_lock:
+            if tick.symbol not in self._symbol_positions:
+                return
+            exits = self._apply_price(tick.symbol, tick.last_price)
+        for position, exit_signal in exits:
+            self._submit_exit(position, exit_signal)
+    
+    def _submit_exit(self, position: Position, exit_signal: Tuple[ExitReason, float, float]):
+        """Queue an exit from any thread (tick callbacks arrive on the feed's thread)"""
+        if self._exit_loop is not None and self._exit_loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._queue_exit(position, exit_signal), self._exit_loop)
+        else:
+            try:
+                asyncio.create_task(self._queue_exit(position, exit_signal))
+            except RuntimeError as e:
+                self._pending_exits.discard(position.id)
+                if self.logger:
+                    self.logger.log_event(f"Cannot queue exit for {position.symbol}, exit executor not running: {e}")
+    
+    def _evaluate_time_exits(self, position: Position) -> Optional[Tuple[ExitReason, float, float]]:
+        """Time-based exit rules (time limit, max hold time, market close)"""
         time_held = (datetime.now() - position.entry_time).total_seconds() / 60
+        if 0 < position.exit_strategy.time_based_exit_minutes <= time_held:
+            return (ExitReason.TIME_BASED_EXIT, position.current_price, 100.0)
         if time_held >= position.exit_strategy.max_hold_time_minutes:
-            return (ExitReason.TIME_BASED_EXIT, current_price, 100.0)
-        
-        # 6. Max Loss Check
-        loss_pct = abs(position.unrealized_pnl) / (position.entry_price * position.quantity) * 100
-        if position.unrealized_pnl < 0 and loss_pct >= position.exit_strategy.max_loss_pct:
-            return (ExitReason.RISK_MANAGEMENT_EXIT, current_price, 100.0)
-        
-        # 7. Partial Exit Levels
-        for price_level, exit_pct in position.exit_strategy.partial_exit_levels or []:
-            if position.direction == 'bullish' and current_price >= price_level:
-                return (ExitReason.PARTIAL_EXIT, price_level, exit_pct)
-            elif position.direction == 'bearish' and current_price <= price_level:
-                return (ExitReason.PARTIAL_EXIT, price_level, exit_pct)
-        
-        # 8. Market Close Check (3:20 PM)
-        current_time = datetime.now().time()
-        market_close_time = datetime.strptime("15:20", "%H:%M").time()
-        if current_time >= market_close_time:
-            return (ExitReason.MARKET_CLOSE_EXIT, current_price, 100.0)
+            return (ExitReason.TIME_BASED_EXIT, position.current_price, 100.0)
         
+        market_close_time = datetime.strptime("15:20", "%H:%M").time()
+        if datetime.now().time() >= market_close_time:
+            return (ExitReason.MARKET_CLOSE_EXIT, position.current_price, 100.0)
         return None
     
     async def _queue_exit(self, position: Position, exit_signal: Tuple[ExitReason, float, float]):
@@ -484,8 +628,10 @@ class PositionMonitor:
                     self.exit_queue.get(), timeout=1.0
                 )
                 
-                # Execute the exit
-                await self._execute_exit(position, exit_signal)
+                # Execute exits concurrently; the order pipeline caps in-flight orders
+                task = asyncio.create_task(self._execute_exit(position, exit_signal))
+                self._exit_tasks.add(task)
+                task.add_done_callback(self._exit_tasks.discard)
                 
             except asyncio.TimeoutError:
                 continue
@@ -510,30 +656,47 @@ class PositionMonitor:
                 success = await self._execute_real_exit(position, exit_price, exit_quantity, exit_reason)
             
             if success:
-                # Update position
-                self._update_position_after_exit(position, exit_price, exit_quantity, exit_reason, exit_percentage)
-                
-                # Update statistics
-                self.exit_stats['total_exits'] += 1
-                if exit_reason == ExitReason.STOP_LOSS_HIT:
-                    self.exit_stats['stop_loss_exits'] += 1
-                elif exit_reason == ExitReason.TARGET_HIT:
-                    self.exit_stats['target_exits'] += 1
-                elif exit_reason == ExitReason.TRAILING_STOP_HIT:
-                    self.exit_stats['trailing_stop_exits'] += 1
-                
-                if self.logger:
-                    self.logger.log_event(
-                        f"Position exit executed: {position.symbol} "
-                        f"Reason: {exit_reason.value} "
-                        f"Price: ₹{exit_price:.2f} "
-                        f"Qty: {exit_quantity} "
-                        f"P&L: ₹{position.realized_pnl:.2f}"
-                    )
+                self._complete_exit(position, exit_price, exit_quantity, exit_reason, exit_percentage)
             
         except Exception as e:
             if self.logger:
                 self.logger.log_event(f"Error executing exit for {position.symbol}: {e}")
+        finally:
+            self._settle_exit(position)
+    
+    def _complete_exit(self, position: Position, exit_price: float, exit_quantity: int,
+                       exit_reason: ExitReason, exit_percentage: float):
+        """Book a successful exit: update the position and statistics"""
+        self._update_position_after_exit(position, exit_price, exit_quantity, exit_reason, exit_percentage)
+        
+        self.exit_stats['total_exits'] += 1
+        if exit_reason == ExitReason.STOP_LOSS_HIT:
+            self.exit_stats['stop_loss_exits'] += 1
+        elif exit_reason == ExitReason.TARGET_HIT:
+            self.exit_stats['target_exits'] += 1
+        elif exit_reason == ExitReason.TRAILING_STOP_HIT:
+            self.exit_stats['trailing_stop_exits'] += 1
+        elif exit_reason == ExitReason.SYSTEM_CRASH_EXIT:
+            self.exit_stats['system_exits'] += 1
+        
+        if self.logger:
+            self.logger.log_event(
+                f"Position exit executed: {position.symbol} "
+                f"Reason: {exit_reason.value} "
+                f"Price: ₹{exit_price:.2f} "
+                f"Qty: {exit_quantity} "
+                f"P&L: ₹{position.realized_pnl:.2f}"
+            )
+    
+    def _settle_exit(self, position: Position):
+        """Clear the pending flag; re-arm triggers if the position is still open"""
+        self._pending_exits.discard(position.id)
+        if position.status == TradeStatus.OPEN:
+            # Failed exit: its fired triggers were consumed, so arm them again
+            with self.positions_lock:
+                self._arm_exit_triggers(position)
+        else:
+            self._untrack_position(position)
     
     async def _execute_paper_exit(self, position: Position, exit_price: float, 
                                  exit_quantity: int, exit_reason: ExitReason) -> bool:
@@ -555,33 +718,23 @@ class PositionMonitor:
                                 exit_quantity: int, exit_reason: ExitReason) -> bool:
         """Execute real trade exit"""
         try:
-            if not self.kite_manager or not self.kite_manager.get_kite_client():
+            if not self.order_pipeline:
                 if self.logger:
                     self.logger.log_event("Kite client not available for real exit")
                 return False
             
-            kite = self.kite_manager.get_kite_client()
-            
-            # Determine order type and transaction type
-            transaction_type = "SELL" if position.direction == 'bullish' else "BUY"
-            
-            # Place market order for immediate exit
-            order_params = {
-                'tradingsymbol': position.symbol,
-                'exchange': 'NSE',
-                'transaction_type': transaction_type,
-                'quantity': exit_quantity,
-                'order_type': 'MARKET',
-                'product': 'MIS',  # Intraday
-                'validity': 'DAY'
-            }
-            
-            order_id = kite.place_order(**order_params)
+            result = await asyncio.wrap_future(
+                self.order_pipeline.submit(self._exit_order(position, exit_quantity))
+            )
+            if not result.ok:
+                if self.logger:
+                    self.logger.log_event(f"Real exit failed for {position.symbol}: {result.error}")
+                return False
             
             if self.logger:
                 self.logger.log_event(
                     f"[REAL-EXIT] Order placed for {position.symbol} "
-                    f"Order ID: {order_id} | Qty: {exit_quantity}"
+                    f"Order ID: {result.order_id} | Qty: {exit_quantity}"
                 )
             
             return True
@@ -591,6 +744,19 @@ class PositionMonitor:
                 self.logger.log_event(f"Real exit failed for {position.symbol}: {e}")
             return False
     
+    def _exit_order(self, position: Position, exit_quantity: int) -> OrderRequest:
+        """Market order closing ``exit_quantity`` of a position"""
+        # Place market order for immediate exit
+        return OrderRequest({
+            'tradingsymbol': position.symbol,
+            'exchange': 'NFO' if position.bot_type == 'options' else 'NSE',
+            'transaction_type': "SELL" if position.direction == 'bullish' else "BUY",
+            'quantity': exit_quantity,
+            'order_type': 'MARKET',
+            'product': 'MIS',  # Intraday
+            'validity': 'DAY'
+        })
+    
     def _update_position_after_exit(self, position: Position, exit_price: float, 
                                    exit_quantity: int, exit_reason: ExitReason, exit_percentage: float):
         """Update position after exit execution"""
@@ -715,6 +881,7 @@ class PositionMonitor:
                 
                 # Update stop loss to entry price
                 position.exit_strategy.stop_loss = position.entry_price
+                self._arm_exit_triggers(position)
                 
                 if self.logger:
                     self.logger.log_event(
@@ -748,6 +915,7 @@ class PositionMonitor:
                 
                 # Initialize trailing stop price
                 self._update_trailing_stop(position)
+                self._arm_trailing_triggers(position)
                 
                 if self.logger:
                     self.logger.log_event(
@@ -830,6 +998,7 @@ class PositionMonitor:
                 if position.status == TradeStatus.OPEN:
                     with self.positions_lock:
                         self.positions[position.id] = position
+                    self._track_position(position)
             
             # Load stats
             self.exit_stats.update(recovery_data.get('exit_stats', {}))
@@ -870,13 +1039,37 @@ class PositionMonitor:
                 risk_level="critical"
             )
             
+            # Claim the positions so trigger/time exits don't race the basket
+            with self.positions_lock:
+                open_positions = [pos for pos in open_positions if pos.id not in self._pending_exits]
+                self._pending_exits.update(pos.id for pos in open_positions)
+            
+            # All live exits go out as one basket: one parallel round trip, not one per position
+            live = [pos for pos in open_positions if not pos.paper_trade]
+            results = {}
+            if live and self.order_pipeline:
+                orders = self.order_pipeline.place_basket(
+                    [self._exit_order(pos, pos.quantity) for pos in live]
+                )
+                results = {pos.id: result for pos, result in zip(live, orders)}
+            
+            exited = 0
             for position in open_positions:
-                exit_signal = (ExitReason.SYSTEM_CRASH_EXIT, position.current_price, 100.0)
-                asyncio.create_task(self._queue_exit(position, exit_signal))
+                try:
+                    result = results.get(position.id)
+                    if position.paper_trade or (result is not None and result.ok):
+                        self._complete_exit(position, position.current_price, position.quantity,
+                                            ExitReason.SYSTEM_CRASH_EXIT, 100.0)
+                        exited += 1
+                    elif self.logger:
+                        error = result.error if result is not None else "order pipeline not available"
+                        self.logger.log_event(f"Emergency exit failed for {position.symbol}: {error}")
+                finally:
+                    self._settle_exit(position)
             
             if self.logger:
                 self.logger.log_event(
-                    f"Emergency exit initiated for {len(open_positions)} positions. Reason: {reason}"
+                    f"Emergency exit completed for {exited}/{len(open_positions)} positions. Reason: {reason}"
                 )
                 
         except Exception as e:
@@ -909,12 +1102,14 @@ class PositionMonitor:
         
         stats = {
             'monitoring_active': self.monitoring_active,
+            'price_source': 'ticks' if self.tick_subscriptions is not None else 'ltp_polling',
             'total_positions': len(self.positions),
             'open_positions': open_positions,
             'closed_positions': closed_positions,
             'total_unrealized_pnl': total_unrealized_pnl,
             'total_realized_pnl': total_realized_pnl,
             'exit_stats': self.exit_stats,
+            'orders': self.order_pipeline.stats() if self.order_pipeline else {},
             'last_update': datetime.now().isoformat()
         }
         
@@ -1,32 +1,25 @@
-from datetime import datetime
+from runner.market_data.instrument_master import get_instrument_master
 
 
 def get_strike_symbol(kite, index_symbol="BANKNIFTY", direction="bullish"):
-    instruments = kite.instruments("NFO")
-    datetime.now()
-
-    def parse_expiry(ins):
-        try:
-            return datetime.strptime(ins["expiry"], "%Y-%m-%d")
-        except:
-            return None
+    if direction not in ("bullish", "bearish"):
+        print("[STRIKE PICKER] No instrument matched.")
+        return None
+    option_type = "CE" if direction == "bullish" else "PE"
+    instruments = get_instrument_master(kite, "NFO").options(index_symbol, option_type)
 
+    # The instrument dump carries no volume, so rows without it never match
     filtered = [
         ins
         for ins in instruments
         if ins["segment"] == "NFO-OPT"
-        and ins["name"] == index_symbol
-        and (
-            (direction == "bullish" and ins["instrument_type"] == "CE")
-            or (direction == "bearish" and ins["instrument_type"] == "PE")
-        )
         and 80 <= ins["last_price"] <= 120
-        and ins["volume"] > 50000
+        and ins.get("volume", 0) > 50000
     ]
     if not filtered:
         print("[STRIKE PICKER] No instrument matched.")
         return None
-    nearest = min(filtered, key=lambda x: parse_expiry(x))
+    nearest = min(filtered, key=lambda x: x["expiry"])
     return {
         "symbol": nearest["tradingsymbol"],
         "instrument_token": nearest["instrument_token"],
@@ -17,6 +17,7 @@ from runner.position_monitor import PositionMonitor, ExitStrategy, ExitReason, T
 from runner.firestore_client import FirestoreClient
 from runner.kiteconnect_manager import KiteConnectManager
 from runner.logger import Logger
+from runner.order_pipeline import OrderPipeline, OrderRequest
 from runner.enhanced_logging import create_trading_logger, LogLevel, LogCategory
 from runner.capital.portfolio_manager import PortfolioManager, create_portfolio_manager
 from runner.risk_governor import RiskGovernor
@@ -45,6 +46,7 @@ class TradeRequest:
     max_loss_pct: float = 5.0
     confidence_level: float = 0.5
     metadata: Dict[str, Any] = None
+    legs: List[Dict[str, Any]] = None  # multi-leg entries: per-leg tradingsymbol/transaction_type/quantity/price
 
 
 class EnhancedTradeManager:
@@ -52,7 +54,8 @@ class EnhancedTradeManager:
     
     def __init__(self, logger: Logger = None, kite_manager: KiteConnectManager = None, 
                  firestore_client: FirestoreClient = None, cognitive_system: CognitiveSystem = None,
-                 enable_firestore: bool = True, enable_gcs: bool = True):
+                 enable_firestore: bool = True, enable_gcs: bool = True,
+                 position_monitor: PositionMonitor = None):
         self.logger = logger
         self.kite_manager = kite_manager
         self.firestore_client = firestore_client
@@ -98,12 +101,19 @@ class EnhancedTradeManager:
             cutoff_time="15:20"
         )
         
-        # Initialize position monitor
-        self.position_monitor = PositionMonitor(
+        # Order placement (shared with the position monitor's exits)
+        self.order_pipeline = getattr(position_monitor, "order_pipeline", None) or (
+            OrderPipeline.for_kite_manager(self.kite_manager, logger=self.logger)
+            if self.kite_manager else None
+        )
+        
+        # Initialize position monitor (or join one shared by several bots)
+        self.position_monitor = position_monitor or PositionMonitor(
             logger=self.logger,
             firestore=self.firestore_client,
             kite_manager=self.kite_manager,
-            portfolio_manager=self.portfolio_manager
+            portfolio_manager=self.portfolio_manager,
+            order_pipeline=self.order_pipeline
         )
         
         # Strategy mapping
@@ -301,34 +311,45 @@ class EnhancedTradeManager:
             return False
 
     def _execute_real_trade(self, trade_request: TradeRequest) -> bool:
-        """Execute a real trade using KiteConnect"""
+        """Execute a real trade (all legs as one basket) through the order pipeline"""
         try:
-            if not self.kite_manager or not self.kite_manager.get_kite_client():
+            if not self.order_pipeline or not self.kite_manager.get_kite_client():
                 raise ConnectionError("KiteConnect client not initialized.")
             
-            kite = self.kite_manager.get_kite_client()
-            
-            order_params = {
-                "tradingsymbol": trade_request.symbol,
+            base_params = {
                 "exchange": "NFO" if trade_request.bot_type == "options" else "NSE",
-                "transaction_type": "BUY" if trade_request.direction == "bullish" else "SELL",
-                "quantity": trade_request.quantity,
                 "product": "MIS",
                 "order_type": "LIMIT",
-                "price": trade_request.entry_price,
                 "validity": "DAY"
             }
+            legs = trade_request.legs or [{
+                "tradingsymbol": trade_request.symbol,
+                "transaction_type": "BUY" if trade_request.direction == "bullish" else "SELL",
+                "quantity": trade_request.quantity,
+                "price": trade_request.entry_price
+            }]
+            signal_time = (trade_request.metadata or {}).get("signal_time")
+            requests = [OrderRequest({**base_params, **leg}, signal_time=signal_time) for leg in legs]
             
-            order_id = kite.place_order(**order_params)
+            results = self.order_pipeline.place_basket(requests, all_or_none=True)
+            failed = [r for r in results if not r.ok]
+            if failed:
+                raise RuntimeError("; ".join(f"{r.label}: {r.error}" for r in failed))
+            order_ids = [r.order_id for r in results]
             
             if self.logger:
-                self.logger.log_event(f"Real trade executed for {trade_request.symbol}, Order ID: {order_id}")
+                self.logger.log_event(f"Real trade executed for {trade_request.symbol}, Order ID(s): {order_ids}")
             
             self.enhanced_logger.log_event(
                 "Real trade executed successfully",
                 LogLevel.INFO,
                 LogCategory.TRADE,
-                data={'order_id': order_id, **order_params, 'mode': 'live'},
+                data={
+                    'order_ids': order_ids,
+                    'client_order_ids': [r.client_order_id for r in results],
+                    'legs': [req.params for req in requests],
+                    'mode': 'live'
+                },
                 symbol=trade_request.symbol,
                 strategy=trade_request.strategy
             )
@@ -413,7 +434,8 @@ class EnhancedTradeManager:
             'realized_pnl': portfolio_stats.get('realized_pnl', 0),
             'unrealized_pnl': portfolio_stats.get('unrealized_pnl', 0),
             'total_pnl_pct': portfolio_stats.get('total_pnl_pct', 0),
-            'portfolio_value': portfolio_stats.get('portfolio_value', 0)
+            'portfolio_value': portfolio_stats.get('portfolio_value', 0),
+            'orders': self.order_pipeline.stats() if self.order_pipeline else {}
         }
 
     def _get_portfolio_stats(self) -> Dict[str, Any]:
@@ -485,11 +507,13 @@ class EnhancedTradeManager:
         pass # Placeholder
 
 def create_enhanced_trade_manager(logger: Logger = None, kite_manager: KiteConnectManager = None,
-                                 firestore_client: FirestoreClient = None, cognitive_system: CognitiveSystem = None) -> EnhancedTradeManager:
+                                 firestore_client: FirestoreClient = None, cognitive_system: CognitiveSystem = None,
+                                 position_monitor: PositionMonitor = None) -> EnhancedTradeManager:
     """Factory function for EnhancedTradeManager"""
     return EnhancedTradeManager(
         logger=logger, 
         kite_manager=kite_manager, 
         firestore_client=firestore_client,
-        cognitive_system=cognitive_system
+        cognitive_system=cognitive_system,
+        position_monitor=position_monitor
     ) 
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Trading Loop
+
+One asyncio event loop that drives every bot (stock, options, futures)
+in a single process. Each bot is described by a ``BotPipeline``; per
+cycle its symbols are fetched, evaluated and turned into orders as
+concurrent tasks, with separate bounds on in-flight symbols, data
+fetches and order placements. Exit monitoring runs as another task on
+the same loop, so PositionMonitor's exit executor finally has a loop
+to run on.
+
+Blocking callables (Kite REST calls, strategies) run in the default
+thread pool; coroutine functions are awaited directly. Every stage's
+latency is recorded and reported per pipeline.
+"""
+
+import asyncio
+import inspect
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+
+@dataclass
+class BotPipeline:
+    """
+    One bot's fetch -> evaluate -> order cycle
+
+    With ``symbols``, ``fetch(symbol)`` (optional) and
+    ``evaluate(symbol, data)`` run once per symbol concurrently; without
+    symbols ``evaluate()`` runs once per cycle (e.g. ``strategy.analyze``).
+    ``evaluate`` may return a signal, a list of signals or None; each
+    signal is passed to ``execute``.
+    """
+    name: str
+    evaluate: Callable[..., Any]
+    execute: Callable[[Dict[str, Any]], Any]
+    symbols: Sequence[str] = ()
+    fetch: Optional[Callable[[str], Any]] = None
+    interval: float = 60.0
+    is_active: Callable[[], bool] = field(default=lambda: True)
+
+
+class LatencyStats:
+    """Rolling latency samples (seconds) for one stage"""
+
+    def __init__(self, window: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+
+    def record(self, seconds: float, error: bool = False):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": 0, "errors": self.errors}
+
+        def pct(q):
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total / self.count * 1000,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": ordered[-1] * 1000,
+        }
+
+
+def _as_signals(result) -> List[Dict[str, Any]]:
+    """Signals to execute from an evaluate result; empty entries (no signal) are dropped"""
+    if not result:
+        return []
+    return [signal for signal in result if signal] if isinstance(result, (list, tuple)) else [result]
+
+
+class TradingLoop:
+    """Runs bot pipelines and exit monitoring as concurrent asyncio tasks"""
+
+    def __init__(self, pipelines: Sequence[BotPipeline], position_monitor=None,
+                 max_concurrency: int = 16, max_fetch_concurrency: int = 4,
+                 max_order_concurrency: int = 2, report_interval: float = 300.0, logger=None):
+        self.pipelines = list(pipelines)
+        self.position_monitor = position_monitor
+        self.max_concurrency = max_concurrency
+        self.max_fetch_concurrency = max_fetch_concurrency
+        self.max_order_concurrency = max_order_concurrency
+        self.report_interval = report_interval
+        self.logger = logger
+        self.latency: Dict[str, Dict[str, LatencyStats]] = {}
+        self._stop: Optional[asyncio.Event] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def run(self):
+        """Run until every pipeline is inactive or stop() is called"""
+        self._stop = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._fetch_slots = asyncio.Semaphore(self.max_fetch_concurrency)
+        self._order_slots = asyncio.Semaphore(self.max_order_concurrency)
+
+        bots = [asyncio.create_task(self._pipeline_loop(p), name=p.name) for p in self.pipelines]
+        support = [asyncio.create_task(self._report_loop(), name="latency-report")]
+        if self.position_monitor is not None:
+            support.append(asyncio.create_task(self._exit_loop(), name="exit-monitor"))
+
+        try:
+            await asyncio.gather(*bots)
+        finally:
+            self._stop.set()
+            for task in support:
+                task.cancel()
+            await asyncio.gather(*support, return_exceptions=True)
+            self._log(f"[LOOP] Stopped. Latency: {self.latency_report()}")
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Pipelines
+    # ------------------------------------------------------------------
+
+    async def _pipeline_loop(self, pipeline: BotPipeline):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set() and pipeline.is_active():
+            started = loop.time()
+            await self.run_cycle(pipeline)
+            await self._sleep(pipeline.interval - (loop.time() - started))
+
+    async def run_cycle(self, pipeline: BotPipeline):
+        """One fetch/evaluate/order pass over the pipeline's symbols"""
+        started = time.perf_counter()
+        if pipeline.symbols:
+            await asyncio.gather(*(self._process(pipeline, symbol) for symbol in pipeline.symbols))
+        else:
+            await self._process(pipeline, None)
+        self._stats(pipeline.name, "cycle").record(time.perf_counter() - started)
+
+    async def _process(self, pipeline: BotPipeline, symbol: Optional[str]):
+        try:
+            async with self._slots:
+                if symbol is None:
+                    result = await self._timed(pipeline.name, "evaluate", pipeline.evaluate)
+                else:
+                    data = None
+                    if pipeline.fetch is not None:
+                        async with self._fetch_slots:
+                            data = await self._timed(pipeline.name, "fetch", pipeline.fetch, symbol)
+                    result = await self._timed(pipeline.name, "evaluate", pipeline.evaluate, symbol, data)
+
+        except Exception as e:
+            self._log(f"[LOOP][{pipeline.name}] {symbol or 'cycle'} failed: {e}")
+            return
+
+        for signal in _as_signals(result):
+            try:
+                async with self._order_slots:
+                    await self._timed(pipeline.name, "order", pipeline.execute, signal)
+            except Exception as e:
+                self._log(f"[LOOP][{pipeline.name}] Order failed for {signal}: {e}")
+
+    # ------------------------------------------------------------------
+    # Exit monitoring
+    # ------------------------------------------------------------------
+
+    async def _exit_loop(self):
+        monitor = self.position_monitor
+        executor = monitor.start_async()
+        try:
+            while not self._stop.is_set():
+                try:
+                    await self._timed("positions", "exit_check", monitor.run_exit_pass)
+                except Exception as e:
+                    self._log(f"[LOOP][positions] Exit check failed: {e}")
+                await self._sleep(monitor.update_interval)
+        finally:
+            monitor.exit_executor_active = False
+            monitor.monitoring_active = False
+            executor.cancel()
+
+    # ------------------------------------------------------------------
+    # Latency
+    # ------------------------------------------------------------------
+
+    def _stats(self, pipeline: str, stage: str) -> LatencyStats:
+        stages = self.latency.setdefault(pipeline, {})
+        if stage not in stages:
+            stages[stage] = LatencyStats()
+        return stages[stage]
+
+    async def _timed(self, pipeline: str, stage: str, fn: Callable, *args):
+        started = time.perf_counter()
+        error = False
+        try:
+            if inspect.iscoroutinefunction(fn):
+                return await fn(*args)
+            return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._stats(pipeline, stage).record(time.perf_counter() - started, error)
+
+    def latency_report(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {
+            pipeline: {stage: stats.summary() for stage, stats in stages.items()}
+            for pipeline, stages in self.latency.items()
+        }
+
+    async def _report_loop(self):
+        while not self._stop.is_set():
+            await self._sleep(self.report_interval)
+            if self.latency:
+                self._log(f"[LOOP] Stage latency: {self.latency_report()}")
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    async def _sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.log_event(message)
+
+
+def run_trading_loop(pipelines: Sequence[BotPipeline], position_monitor=None, logger=None, **options):
+    """Blocking entry point for the runners: run a TradingLoop until it stops"""
+    loop = TradingLoop(pipelines, position_monitor=position_monitor, logger=logger, **options)
+    asyncio.run(loop.run())
+    return loop
@@ -1,14 +1,12 @@
 import datetime
-import pandas as pd
 import io
 import time
 from runner.logger import TradingLogger
 from runner.secret_manager import access_secret
+from runner.market_data.instrument_master import get_instrument_master
 
 from kiteconnect import KiteConnect
 
-_cached_instruments = None
-
 # Initialize logger
 logger = TradingLogger()
 
@@ -22,71 +20,52 @@ def get_kite_client():
     return kite
 
 
+def load_instrument_master():
+    """Shared NFO instrument master (downloaded at most once per day)"""
+    return get_instrument_master(get_kite_client, "NFO")
+
+
 def load_instruments():
-    global _cached_instruments
-    if _cached_instruments is None:
-        kite = get_kite_client()
-        _cached_instruments = kite.instruments("NFO")
-    return _cached_instruments
+    return load_instrument_master().records()
 
 
 def get_futures_token(symbol, expiry_date_str=None):
-    instruments = load_instruments()
+    master = load_instrument_master()
     if expiry_date_str is None:
         expiry_date_str = get_nearest_expiry("FUT")
+    if expiry_date_str is None:
+        return None
 
-    for inst in instruments:
-        if (
-            inst["instrument_type"] == "FUT"
-            and inst["name"] == symbol
-            and inst["expiry"] == expiry_date_str
-        ):
-            return inst["instrument_token"]
-    return None
+    inst = master.find(symbol, expiry_date_str, 0.0, "FUT")
+    return inst["instrument_token"] if inst else None
 
 
 def get_options_token(symbol, strike_price, option_type, expiry_date_str=None):
-    instruments = load_instruments()
+    master = load_instrument_master()
     if expiry_date_str is None:
         expiry_date_str = get_nearest_expiry("OPT")
+    if expiry_date_str is None:
+        return None
 
-    for inst in instruments:
-        if (
-            inst["instrument_type"] == "OPT"
-            and inst["name"] == symbol
-            and inst["strike"] == strike_price
-            and inst["expiry"] == expiry_date_str
-            and inst["tradingsymbol"].endswith(option_type.upper())
-        ):
-            return inst["instrument_token"]
-    return None
+    inst = master.find(symbol, expiry_date_str, strike_price, option_type.upper())
+    return inst["instrument_token"] if inst else None
 
 
 def get_nearest_expiry(inst_type):
-    today = datetime.date.today()
-    instruments = load_instruments()
-    expiries = sorted(
-        set(
-            inst["expiry"]
-            for inst in instruments
-            if inst["instrument_type"] == inst_type
-        )
+    expiry = load_instrument_master().nearest_expiry(
+        instrument_type=inst_type, on_or_after=datetime.date.today()
     )
-    for date in expiries:
-        if date >= today:
-            return date.isoformat()
-    return None
+    return expiry.isoformat() if expiry else None
 
 
 def get_instrument_tokens(symbols):
-    instruments = load_instruments()
+    master = load_instrument_master()
     token_map = {}
 
     for symbol in symbols:
-        for inst in instruments:
-            if inst["tradingsymbol"] == symbol and inst["segment"] == "NSE":
-                token_map[symbol] = inst["instrument_token"]
-                break
+        inst = master.get(symbol)
+        if inst and inst["segment"] == "NSE":
+            token_map[symbol] = inst["instrument_token"]
         else:
             print(f"[WARN] Token not found for: {symbol}")
 
@@ -104,13 +83,11 @@ def get_instrument_token(instrument: str, exchange: str = 'NFO') -> int:
     Returns:
     - int: The instrument token for the given instrument and exchange.
     """
-    df = pd.DataFrame(load_instruments())
-    try:
-        token = df[(df['tradingsymbol'] == instrument) & (df['exchange'] == exchange)]['instrument_token'].iloc[0]
-        return int(token)
-    except (IndexError, KeyError):
-        logger.log_warning(f"Instrument token for {instrument} not found in the instrument list.")
-        return 0
+    inst = load_instrument_master().get(instrument)
+    if inst and inst['exchange'] == exchange:
+        return int(inst['instrument_token'])
+    logger.log_warning(f"Instrument token for {instrument} not found in the instrument list.")
+    return 0
 
 
 def get_instrument_details(instrument_token: int) -> dict:
@@ -123,10 +100,8 @@ def get_instrument_details(instrument_token: int) -> dict:
     Returns:
     - dict: The details for the given instrument token.
     """
-    df = pd.DataFrame(load_instruments())
-    try:
-        details = df[df['instrument_token'] == instrument_token].to_dict('records')[0]
+    details = load_instrument_master().by_token(instrument_token)
+    if details:
         return details
-    except (IndexError, KeyError):
-        logger.log_warning(f"Details for instrument token {instrument_token} not found.")
-        return {}
+    logger.log_warning(f"Details for instrument token {instrument_token} not found.")
+    return {}
@@ -1,5 +1,6 @@
 import datetime
 from runner.logger import Logger
+from runner.market_data.instrument_master import get_instrument_master
 from kiteconnect import KiteConnect
 
 
@@ -13,23 +14,14 @@ def pick_strike(
     Returns a tuple (tradingsymbol, strike_price, expiry_date) for ITM/ATM CE or PE based on market direction
     """
     today = datetime.date.today()
-    instruments = kite.instruments(exchange="NFO")
+    master = get_instrument_master(kite, "NFO")
 
-    weekly_expiries = sorted(
-        {
-            inst["expiry"]
-            for inst in instruments
-            if inst["name"] == instrument_type
-            and inst["segment"] == "NFO-OPT"
-            and inst["expiry"] >= today
-        }
-    )
+    # Pick the nearest expiry
+    selected_expiry = master.nearest_expiry(instrument_type, "OPT", on_or_after=today)
 
-    if not weekly_expiries:
+    if selected_expiry is None:
         raise Exception("No valid expiries found")
 
-    selected_expiry = weekly_expiries[0]  # Pick the nearest expiry
-
     # Fetch LTP of index
     index_ltp = kite.ltp(f"NSE:{instrument_type}")[f"NSE:{instrument_type}"][
         "last_price"
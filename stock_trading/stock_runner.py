@@ -22,6 +22,7 @@ from runner.market_data.market_data_fetcher import MarketDataFetcher
 from runner.utils.notifications import send_slack_notification
 from runner.position_monitor import PositionMonitor
 from runner.risk_governor import RiskGovernor
+from runner.trading_loop import BotPipeline, run_trading_loop
 from runner.utils.instrument_utils import get_instrument_token
 from runner.utils.trade_utils import is_market_open, get_today_date
 
@@ -271,17 +272,19 @@ def run_stock_trading_bot():
             
             wait_until_market_opens(main_logger)
 
-            while is_market_open():
-                market_data = data_provider.fetch_latest_data(stocks_to_trade)
-                
-                strategy = StrategyFactory.get_strategy(strategy_name)
-                
-                for stock_data in market_data:
-                    trade_signal = strategy.generate_signal(stock_data)
-                    if trade_signal:
-                        trade_manager.execute_trade(trade_signal)
-                
-                time.sleep(60) # Main loop delay
+            strategy = StrategyFactory.get_strategy(strategy_name)
+            pipeline = BotPipeline(
+                name="stock-trader",
+                symbols=stocks_to_trade,
+                fetch=lambda symbol: data_provider.fetch_latest_data([symbol]),
+                evaluate=lambda symbol, market_data: [
+                    strategy.generate_signal(stock_data) for stock_data in market_data or []
+                ],
+                execute=trade_manager.execute_trade,
+                interval=60,  # Main loop delay
+                is_active=is_market_open,
+            )
+            run_trading_loop([pipeline], logger=main_logger)
 
             main_logger.log_event("Market is closed. Shutting down.")
             return
@@ -319,7 +322,7 @@ def load_strategy(strategy_name: str, trade_manager, logger_instance, stock_conf
     return strategy_factory.get_strategy(strategy_name)
 
 class StockTrader:
-    def __init__(self, strategy_name: str, paper_trade: bool = False):
+    def __init__(self, strategy_name: str, paper_trade: bool = False, position_monitor: PositionMonitor = None):
         self.strategy_name = strategy_name
         self.paper_trade = paper_trade
         
@@ -335,9 +338,10 @@ class StockTrader:
         self.trade_manager = create_trade_manager(
             logger=self.logger, 
             kite_manager=self.kite_manager,
-            config=self.config
+            config=self.config,
+            position_monitor=position_monitor
         )
-        self.position_monitor = PositionMonitor(
+        self.position_monitor = position_monitor or PositionMonitor(
             self.logger, self.kite_manager, self.trade_manager, paper_trade=self.paper_trade
         )
         self.technical_indicators = TechnicalIndicators(self.market_data_fetcher)
@@ -345,11 +349,12 @@ class StockTrader:
         self.kite_manager = KiteConnectManager(self.logger, get_trading_config())
         self.risk_governor = RiskGovernor(self.logger)
         self.trade_manager = create_enhanced_trade_manager(
-            self.logger, self.kite_manager, paper_trade=self.paper_trade
+            self.logger, self.kite_manager, paper_trade=self.paper_trade, position_monitor=position_monitor
         )
-        self.position_monitor = PositionMonitor(
+        self.position_monitor = position_monitor or PositionMonitor(
             self.logger, self.kite_manager, self.trade_manager, paper_trade=self.paper_trade
         )
+        self.strategy = self._get_strategy(strategy_name)
         self.logger.log_info(f"StockTrader for '{self.strategy_name}' initialized.")
 
     def _get_market_data_fetcher(self):
@@ -357,26 +362,41 @@ class StockTrader:
         return MarketDataFetcher(self.logger, self.kite_manager)
 
     def _get_strategy(self, strategy_name: str):
-        # ... existing code ...
-        return None
+        return load_strategy(strategy_name, self.trade_manager, self.logger, self.config)
+
+    def build_pipeline(self) -> BotPipeline:
+        """
+        Stock bot as a TradingLoop pipeline. Strategies that split fetching
+        from signal generation (VWAPStrategy.fetch_candles/signal_from_candles)
+        are fetched per symbol concurrently; others run analyze() once per cycle.
+        """
+        strategy = self.strategy
+        if hasattr(strategy, "fetch_candles") and hasattr(strategy, "signal_from_candles"):
+            return BotPipeline(
+                name="stock-trader",
+                symbols=list(strategy.symbols),
+                fetch=strategy.fetch_candles,
+                evaluate=strategy.signal_from_candles,
+                execute=self.trade_manager.execute_trade,
+                interval=10,
+                is_active=is_market_open,
+            )
+        return BotPipeline(
+            name="stock-trader",
+            evaluate=strategy.analyze,
+            execute=self.trade_manager.execute_trade,
+            interval=10,
+            is_active=is_market_open,
+        )
 
     def run(self):
         """Main loop for the stock trader."""
         self.logger.log_info(f"Starting StockTrader with strategy: {self.strategy.name}")
         
-        while True:
-            # ... existing code ...
-            try:
-                # ... existing code ...
-                # Add a small delay to avoid rapid looping
-                time.sleep(10)
-            except KeyboardInterrupt:
-                self.logger.log_info("StockTrader stopped by user.")
-                break
-            except Exception as e:
-                self.logger.log_error(f"An unexpected error occurred in StockTrader: {e}", exc_info=True)
-                # Wait longer after an error
-                time.sleep(60)
+        try:
+            run_trading_loop([self.build_pipeline()], self.position_monitor, logger=self.logger)
+        except KeyboardInterrupt:
+            self.logger.log_info("StockTrader stopped by user.")
 
 def run_stock_trader(strategy_name: str, paper_trade: bool = False):
     trader = StockTrader(strategy_name=strategy_name, paper_trade=paper_trade)
@@ -1,10 +1,14 @@
 from datetime import datetime, timedelta
 
+from runner.indicators.batch_indicators import stack_candles
+from runner.indicators.technical_engine import create_technical_engine
 from runner.utils.technical_indicators import calculate_vwap
 from strategies.base_strategy import BaseStrategy
 
 
 class VWAPStrategy(BaseStrategy):
+    symbols = ["RELIANCE", "TCS", "INFY", "HDFCBANK"]
+
     def __init__(self, kite, logger):
         super().__init__(kite, logger)
 
@@ -13,55 +17,12 @@ class VWAPStrategy(BaseStrategy):
         Analyze market and return a trade signal if found.
         This method is called by the trading loop.
         """
-        symbols = ["RELIANCE", "TCS", "INFY", "HDFCBANK"]
         try:
-            to_date = datetime.now()
-            from_date = to_date - timedelta(minutes=30)
-            
-            for symbol in symbols:
+            for symbol in self.symbols:
                 try:
-                    token = self.kite.ltp([f"NSE:{symbol}"])[f"NSE:{symbol}"][
-                        "instrument_token"
-                    ]
-                    candles = self.kite.historical_data(
-                        token, from_date, to_date, "5minute"
-                    )
-                    if not candles or len(candles) < 5:
-                        continue
-                    
-                    vwap = calculate_vwap(candles)
-                    last_close = candles[-1]["close"]
-                    
-                    # Only generate signal if price is significantly away from VWAP
-                    deviation_pct = abs(last_close - vwap) / vwap * 100
-                    if deviation_pct < 0.5:  # Less than 0.5% deviation, no clear signal
-                        continue
-                    
-                    direction = "bullish" if last_close > vwap else "bearish"
-                    
-                    trade = {
-                        "symbol": symbol,
-                        "entry_price": last_close,
-                        "stop_loss": (
-                            last_close - 0.5
-                            if direction == "bullish"
-                            else last_close + 0.5
-                        ),
-                        "target": (
-                            last_close + 1.0
-                            if direction == "bullish"
-                            else last_close - 1.0
-                        ),
-                        "quantity": 10,
-                        "direction": direction,
-                        "strategy": "vwap",
-                        "confidence": min(deviation_pct / 2, 1.0),  # Higher deviation = higher confidence
-                        "vwap": vwap,
-                        "deviation_pct": deviation_pct
-                    }
-                    self.logger.log_event(f"[VWAP] Signal: {trade}")
-                    return trade  # Return first valid signal found
-                    
+                    trade = self.signal_from_candles(symbol, self.fetch_candles(symbol))
+                    if trade:
+                        return trade  # Return first valid signal found
                 except Exception as e:
                     self.logger.log_event(f"[VWAP][{symbol}] ERROR: {e}")
             
@@ -72,55 +33,131 @@ class VWAPStrategy(BaseStrategy):
             self.logger.log_event(f"[VWAP][ERROR] Overall failure: {e}")
             return None
 
+    def fetch_candles(self, symbol):
+        """
+        Last 30 minutes of 5-minute candles for one symbol, or None if there
+        are too few. Split from the signal logic so TradingLoop can fetch
+        symbols concurrently.
+        """
+        to_date = datetime.now()
+        from_date = to_date - timedelta(minutes=30)
+        token = self.kite.ltp([f"NSE:{symbol}"])[f"NSE:{symbol}"][
+            "instrument_token"
+        ]
+        candles = self.kite.historical_data(
+            token, from_date, to_date, "5minute"
+        )
+        if not candles or len(candles) < 5:
+            return None
+        return candles
+
+    def signal_from_candles(self, symbol, candles):
+        """Trade signal for one symbol's candles, or None"""
+        if not candles:
+            return None
+        
+        vwap = calculate_vwap(candles)
+        last_close = candles[-1]["close"]
+        
+        # Only generate signal if price is significantly away from VWAP
+        deviation_pct = abs(last_close - vwap) / vwap * 100
+        if deviation_pct < 0.5:  # Less than 0.5% deviation, no clear signal
+            return None
+        
+        direction = "bullish" if last_close > vwap else "bearish"
+        
+        trade = {
+            "symbol": symbol,
+            "entry_price": last_close,
+            "stop_loss": (
+                last_close - 0.5
+                if direction == "bullish"
+                else last_close + 0.5
+            ),
+            "target": (
+                last_close + 1.0
+                if direction == "bullish"
+                else last_close - 1.0
+            ),
+            "quantity": 10,
+            "direction": direction,
+            "strategy": "vwap",
+            "confidence": min(deviation_pct / 2, 1.0),  # Higher deviation = higher confidence
+            "vwap": vwap,
+            "deviation_pct": deviation_pct
+        }
+        self.logger.log_event(f"[VWAP] Signal: {trade}")
+        return trade
+
     def find_trade_opportunities(self, market_data):
         """
         Called repeatedly to check for trade opportunities.
         Should return a list of trade dicts or empty list.
         """
-        symbols = ["RELIANCE", "TCS", "INFY", "HDFCBANK"]
         trades = []
         try:
-            to_date = datetime.now()
-            from_date = to_date - timedelta(minutes=30)
-            for symbol in symbols:
+            candles_by_symbol = {}
+            for symbol in self.symbols:
                 try:
-                    token = self.kite.ltp([f"NSE:{symbol}"])[f"NSE:{symbol}"][
-                        "instrument_token"
-                    ]
-                    candles = self.kite.historical_data(
-                        token, from_date, to_date, "5minute"
-                    )
-                    if not candles or len(candles) < 5:
-                        continue
-                    vwap = calculate_vwap(candles)
-                    last_close = candles[-1]["close"]
-                    direction = "bullish" if last_close > vwap else "bearish"
-                    trade = {
-                        "symbol": symbol,
-                        "entry_price": last_close,
-                        "stop_loss": (
-                            last_close - 0.5
-                            if direction == "bullish"
-                            else last_close + 0.5
-                        ),
-                        "target": (
-                            last_close + 1.0
-                            if direction == "bullish"
-                            else last_close - 1.0
-                        ),
-                        "quantity": 10,
-                        "direction": direction,
-                        "strategy": "vwap",
-                    }
-                    self.logger.log_event(f"[VWAP] Signal: {trade}")
-                    trades.append(trade)
+                    candles = self.fetch_candles(symbol)
+                    if candles:
+                        candles_by_symbol[symbol] = candles
                 except Exception as e:
                     self.logger.log_event(f"[VWAP][{symbol}] ERROR: {e}")
+
+            # One vectorized VWAP pass for every symbol that returned data
+            vwaps = self._batch_vwap(candles_by_symbol)
+            for symbol, candles in candles_by_symbol.items():
+                vwap = vwaps.get(symbol)
+                if vwap is None:
+                    continue
+                last_close = candles[-1]["close"]
+                direction = "bullish" if last_close > vwap else "bearish"
+                trade = {
+                    "symbol": symbol,
+                    "entry_price": last_close,
+                    "stop_loss": (
+                        last_close - 0.5
+                        if direction == "bullish"
+                        else last_close + 0.5
+                    ),
+                    "target": (
+                        last_close + 1.0
+                        if direction == "bullish"
+                        else last_close - 1.0
+                    ),
+                    "quantity": 10,
+                    "direction": direction,
+                    "strategy": "vwap",
+                }
+                self.logger.log_event(f"[VWAP] Signal: {trade}")
+                trades.append(trade)
             return trades
         except Exception as e:
             self.logger.log_event(f"[VWAP][ERROR] Overall failure: {e}")
             return []
 
+    def _batch_vwap(self, candles_by_symbol):
+        """
+        VWAP for several symbols in one TechnicalEngine.calculate_batch call.
+        Symbols whose history does not line up with the others (different
+        length or timestamps) fall back to the single-symbol calculation.
+        """
+        if not candles_by_symbol:
+            return {}
+        lengths = {len(c) for c in candles_by_symbol.values()}
+        stamps = {tuple(c.get("date") for c in candles) for candles in candles_by_symbol.values()}
+        if len(lengths) > 1 or len(stamps) > 1 or len(candles_by_symbol) == 1:
+            return {s: calculate_vwap(c) for s, c in candles_by_symbol.items()}
+
+        symbols, arrays = stack_candles(candles_by_symbol)
+        dates = [str(c.get("date"))[:10] for c in next(iter(candles_by_symbol.values()))]
+        result = create_technical_engine().calculate_batch(
+            symbols, arrays["high"], arrays["low"], arrays["close"], arrays["volume"],
+            session_ids=dates,
+        )
+        return result.column("vwap")
+
     def should_exit_trade(self, trade):
         """
         Called to decide whether to exit a trade.
@@ -254,28 +254,28 @@ class RangeReversalStrategy(BaseStrategy):
         return False
 
 
-def range_reversal_strategy(symbol, candles, capital=100000):
+def range_reversal_strategy(symbol, candles, capital=100000, lookback=20, confidence_threshold=0.6):
     """
     Standalone range reversal strategy function
     """
-    if not candles or len(candles) < 20:
+    if not candles or len(candles) < lookback:
         print(f"[RANGE_REVERSAL] Not enough data for {symbol}")
         return None
     
     # Check if range-bound
-    if not is_range_bound_market(candles):
+    if not is_range_bound_market(candles, lookback):
         print(f"[RANGE_REVERSAL] {symbol} not in range-bound market")
         return None
     
     # Get support/resistance
-    support, resistance, avg_range = calculate_support_resistance(candles)
+    support, resistance, avg_range = calculate_support_resistance(candles, lookback)
     if not support or not resistance:
         return None
     
     # Get signal
     signal_data = get_reversal_signal(candles, support, resistance)
     
-    if signal_data["signal"] == "HOLD" or signal_data["confidence"] < 0.6:
+    if signal_data["signal"] == "HOLD" or signal_data["confidence"] < confidence_threshold:
         print(f"[RANGE_REVERSAL] No clear signal for {symbol}: {signal_data['reason']}")
         return None
     
@@ -111,7 +111,7 @@ def get_vwap_signal(candles, vwap_period=20):
     }
 
 
-def vwap_strategy(symbol, candles, capital):
+def vwap_strategy(symbol, candles, capital, vwap_period=20, confidence_threshold=0.6):
     """
     VWAP-based trading strategy
     """
@@ -120,9 +120,9 @@ def vwap_strategy(symbol, candles, capital):
         return None
 
     # Get VWAP signal
-    signal_data = get_vwap_signal(candles)
+    signal_data = get_vwap_signal(candles, vwap_period)
     
-    if signal_data["signal"] == "HOLD" or signal_data["confidence"] < 0.6:
+    if signal_data["signal"] == "HOLD" or signal_data["confidence"] < confidence_threshold:
         print(f"[VWAP] No clear signal for {symbol}: {signal_data['reason']}")
         return None
 
@@ -208,7 +208,7 @@ class VWAPStrategy(BaseStrategy):
     
     def generate_signal(self, symbol, candles, capital):
         """Generate trading signal using VWAP strategy"""
-        return vwap_strategy(symbol, candles, capital)
+        return vwap_strategy(symbol, candles, capital, self.vwap_period, self.confidence_threshold)
     
     def check_exit(self, trade, current_candles):
         """Check if position should be exited"""
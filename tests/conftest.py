@@ -3,6 +3,7 @@
 Pytest configuration file for test setup and fixtures
 """
 
+import importlib
 import os
 import sys
 import pytest
@@ -11,6 +12,30 @@ from unittest.mock import Mock, patch
 # Add the parent directory (project root) to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+# test_mocks.setup_all_mocks() swaps numpy/pandas/scipy in sys.modules for
+# MagicMocks when some test modules are imported. Keep the real libraries
+# (when installed) so modules collected afterwards and pytest.approx see them.
+_REAL_MODULES = {}
+for _name in ("numpy", "pandas", "scipy"):
+    try:
+        _REAL_MODULES[_name] = importlib.import_module(_name)
+    except ImportError:
+        pass
+
+
+def _restore_real_modules():
+    for name, module in _REAL_MODULES.items():
+        if sys.modules.get(name) is not module:
+            sys.modules[name] = module
+
+
+def pytest_collectreport(report):
+    _restore_real_modules()
+
+
+def pytest_runtest_setup(item):
+    _restore_real_modules()
+
 # Mock GCP authentication for tests
 @pytest.fixture(autouse=True)
 def mock_gcp_auth():
@@ -0,0 +1,112 @@
+import datetime
+import gzip
+import json
+import os
+
+from runner.enhanced_logging.archive_writer import (
+    SESSION_DIR, RollingArchiveWriter, recover_spool, segment_blob_path, spool_session
+)
+from runner.enhanced_logging.gcs_logger import GCSBuckets, GCSLogger
+from runner.enhanced_logging.gcs_uploader import LocalBucketClient
+from runner.enhanced_logging.log_types import LogCategory, LogEntry, LogLevel, LogType
+
+
+def _read_ndjson(path):
+    with gzip.open(path, "rb") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_segments_roll_by_size_and_keep_every_record(tmp_path):
+    writer = RollingArchiveWriter(str(tmp_path), "tron-system-logs", "system_logs", "stock-trader",
+                                  max_segment_bytes=2048)
+    sealed = []
+    for i in range(200):
+        writer.append([{'i': i, 'msg': os.urandom(16).hex()}])
+        path = writer.maybe_roll()
+        if path:
+            sealed.append(path)
+    sealed.append(writer.close())
+
+    assert len(sealed) > 3
+    assert all(not p.endswith(".part") for p in sealed)
+    assert [r['i'] for p in sealed for r in _read_ndjson(p)] == list(range(200))
+    blob_path = segment_blob_path(str(tmp_path), "tron-system-logs", sealed[0])
+    assert blob_path.startswith("logs/") and "/stock-trader/system_logs_" in blob_path
+
+
+def test_crashed_segment_is_recovered_up_to_last_complete_line(tmp_path):
+    writer = RollingArchiveWriter(str(tmp_path), "tron-trade-logs", "trades_detailed", "options-trader")
+    for i in range(50):
+        writer.append([{'trade_id': f"t{i}", 'pnl': i * 1.5}])
+    part = writer._path
+    writer._raw.write(b"\x00garbage")  # torn write at the crash point
+    writer._raw.flush()
+
+    crashed = "c0ffee000000"
+    orphan = part.replace(f"_s{spool_session(str(tmp_path))}_", f"_s{crashed}_")
+    os.rename(part, orphan)
+    # The crashed run had this very PID (restarted container), but its lock died with it
+    stale_lock = tmp_path / SESSION_DIR / f"{crashed}.lock"
+    stale_lock.write_text(str(os.getpid()))
+
+    live = RollingArchiveWriter(str(tmp_path), "tron-trade-logs", "trades_detailed", "stock-trader")
+    live.append([{'trade_id': "open"}])
+
+    recovered = recover_spool(str(tmp_path))
+    assert len(recovered) == 1
+    bucket_name, blob_path, path = recovered[0]
+    assert bucket_name == "tron-trade-logs" and blob_path.endswith(".ndjson.gz")
+    assert [r['trade_id'] for r in _read_ndjson(path)] == [f"t{i}" for i in range(50)]
+    assert not os.path.exists(orphan) and not stale_lock.exists()
+    assert os.path.exists(live._path)  # this process's session lock is held
+    live.close()
+
+
+def test_gcs_logger_streams_archives_through_the_spool(tmp_path, monkeypatch):
+    spool = tmp_path / "spool"
+    monkeypatch.setenv("GCS_SPOOL_DIR", str(spool))
+    logger = GCSLogger(client=LocalBucketClient(str(tmp_path / "gcs")), upload_workers=2)
+
+    for batch in range(20):
+        entries = [LogEntry(datetime.datetime.now(), LogLevel.INFO, LogCategory.SYSTEM, LogType.ARCHIVAL,
+                            f"event {batch}-{i}", {'n': i}, "test", "session") for i in range(25)]
+        logger.archive_system_logs(entries, "stock-trader")
+    assert logger.pending_count == 0  # still in the open segment
+
+    logger.close()
+    blobs = logger.client.bucket(GCSBuckets.SYSTEM_LOGS).list_blobs(prefix="logs/")
+    assert len(blobs) == 1
+    records = logger.download_archived_data(GCSBuckets.SYSTEM_LOGS, blobs[0].name)
+    assert len(records) == 500 and records[-1]['message'] == "event 19-24"
+    # Only this process's session lock is left in the spool
+    assert [f for d, _, files in os.walk(spool) for f in files if os.path.basename(d) != SESSION_DIR] == []
+
+
+def test_failed_spooled_uploads_are_requeued_without_recursing(tmp_path, monkeypatch):
+    monkeypatch.setenv("GCS_SPOOL_DIR", str(tmp_path / "spool"))
+    logger = GCSLogger(client=LocalBucketClient(str(tmp_path / "gcs")), upload_workers=2)
+    stored = logger.uploader.upload_many
+    attempts = []
+
+    def outage(uploads):
+        uploads = list(uploads)
+        attempts.append(len(uploads))
+        return {'uploaded': {}, 'failed': [{**u, 'error': "unavailable"} for u in uploads]}
+
+    logger.uploader.upload_many = outage
+    paths = []
+    batch = logger.batch_size
+    for i in range(3 * batch):
+        path = tmp_path / f"segment_{i}.ndjson.gz"
+        path.write_bytes(b"x")
+        paths.append(str(path))
+        logger._add_to_batch(GCSBuckets.SYSTEM_LOGS, f"logs/segment_{i}.ndjson.gz", path=str(path))
+
+    assert attempts == [batch, 2 * batch, 3 * batch]  # new segments fill a batch, retries ride along
+    assert logger.pending_count == 3 * batch and all(os.path.exists(p) for p in paths)
+
+    logger.uploader.upload_many = stored
+    logger.flush_batch()
+    assert logger.pending_count == 0 and not any(os.path.exists(p) for p in paths)
+    assert len(logger.client.bucket(GCSBuckets.SYSTEM_LOGS).list_blobs(prefix="logs/")) == 3 * batch
+    logger.close()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.engine import BacktestEngine, CandleStrategyAdapter, Order
+
+
+def make_data(closes):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "open": closes,
+        "high": closes + 1,
+        "low": closes - 1,
+        "close": closes,
+        "volume": np.full(closes.size, 1000),
+    })
+
+
+class BuyOnceStrategy:
+    def __init__(self, stop_loss=None, target=None):
+        self.stop_loss = stop_loss
+        self.target = target
+        self.seen = []
+
+    def on_bar(self, bar):
+        self.seen.append(bar.close)
+        if bar.index == 0:
+            return Order("BUY", 10, stop_loss=self.stop_loss, target=self.target)
+        return None
+
+
+class SignalStrategy:
+    def __init__(self, signals):
+        self.signals = np.asarray(signals, dtype=float)
+
+    def generate_signals(self, engine):
+        return self.signals
+
+
+class ReplaySignals:
+    """Event-driven equivalent of SignalStrategy"""
+    def __init__(self, signals):
+        self.signals = signals
+
+    def on_bar(self, bar):
+        change = self.signals[bar.index] - bar.position
+        if change == 0:
+            return None
+        return Order("BUY" if change > 0 else "SELL", abs(change))
+
+
+def test_order_fills_at_next_bar_open_and_marks_to_market():
+    data = make_data([100, 101, 103, 102])
+    data.loc[1, "open"] = 100.5
+    engine = BacktestEngine(BuyOnceStrategy(), data, initial_capital=10000, verbose=False)
+    results = engine.run()
+
+    assert results["fills"][0]["index"] == 1
+    assert results["fills"][0]["price"] == 100.5
+    np.testing.assert_allclose(results["equity_curve"], [10000, 10005, 10025, 10015])
+    assert results["unrealized_pnl"] == pytest.approx(15.0)
+    assert results["total_trades"] == 0
+
+
+def test_stop_loss_exit_records_trade():
+    data = make_data([100, 100, 99, 95, 96])
+    data.loc[3, "open"] = 98
+    engine = BacktestEngine(BuyOnceStrategy(stop_loss=97), data, initial_capital=10000, verbose=False)
+    results = engine.run()
+
+    assert results["total_trades"] == 1
+    trade = results["trades"][0]
+    assert trade["exit_reason"] == "stop_loss"
+    assert trade["exit_price"] == 97
+    assert trade["pnl"] == pytest.approx(-30.0)
+    assert results["max_drawdown"] == pytest.approx(30.0)
+    assert results["final_portfolio_value"] == pytest.approx(9970.0)
+
+
+def test_target_gap_fills_at_open():
+    data = make_data([100, 100, 110, 111])
+    engine = BacktestEngine(BuyOnceStrategy(target=105), data, initial_capital=10000, verbose=False)
+    results = engine.run()
+
+    assert results["trades"][0]["exit_reason"] == "target"
+    assert results["trades"][0]["exit_price"] == 110
+    assert results["win_rate"] == 1.0
+
+
+def test_vectorized_path_matches_event_loop():
+    rng = np.random.default_rng(0)
+    closes = 100 + np.cumsum(rng.normal(0, 1, 500))
+    data = make_data(closes)
+    data["open"] = closes + rng.normal(0, 0.2, closes.size)
+    signals = np.where(rng.random(500) > 0.7, 5.0, 0.0)
+    signals[rng.random(500) > 0.85] = -5.0
+
+    vec = BacktestEngine(SignalStrategy(signals), data, commission=0.0005, slippage=0.05, verbose=False).run()
+    evt = BacktestEngine(ReplaySignals(signals), data, commission=0.0005, slippage=0.05, verbose=False).run()
+
+    np.testing.assert_allclose(vec["equity_curve"], evt["equity_curve"])
+    assert vec["total_trades"] == evt["total_trades"]
+    assert vec["realized_pnl"] == pytest.approx(evt["realized_pnl"])
+
+
+def test_realized_pnl_matches_equity_when_flat():
+    signals = np.array([0, 1, 1, 0, -1, -1, 0, 0], dtype=float) * 10
+    data = make_data([100, 101, 103, 102, 104, 101, 99, 99])
+    results = BacktestEngine(SignalStrategy(signals), data, verbose=False).run()
+
+    assert results["open_position"] == 0
+    assert results["realized_pnl"] == pytest.approx(results["total_pnl"])
+
+
+def test_candle_strategy_adapter_uses_trade_levels():
+    class FixedStrategy:
+        def execute(self, symbol, candles, capital):
+            price = candles[-1]["close"]
+            return {"direction": "bearish", "quantity": 2, "stop_loss": price + 5,
+                    "target": price - 3, "strategy": "fixed"}
+
+    data = make_data([100, 100, 100, 96, 96])
+    adapter = CandleStrategyAdapter(FixedStrategy(), lookback=2)
+    results = BacktestEngine(adapter, data, verbose=False).run()
+
+    trade = results["trades"][0]
+    assert trade["direction"] == "bearish"
+    assert trade["exit_reason"] == "target"
+    assert trade["tag"] == "fixed"
+    # Bar 3 gaps through the 97 target, so the exit fills at its open
+    assert trade["exit_price"] == 96
+    assert trade["pnl"] == pytest.approx(8.0)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.engine import BacktestEngine, Order
+from backtesting.optimizer import (
+    ParameterSweep, SharedOHLCV, attach_arrays, parameter_grid, walk_forward_splits,
+)
+
+
+class MomentumStrategy:
+    def __init__(self, lookback, size):
+        self.lookback = lookback
+        self.size = size
+
+    def on_bar(self, bar):
+        closes = bar.history("close", self.lookback)
+        if len(closes) < self.lookback:
+            return None
+        target = self.size if closes[-1] > closes[0] else -self.size
+        change = target - bar.position
+        if change == 0:
+            return None
+        return Order("BUY" if change > 0 else "SELL", abs(change))
+
+
+def momentum_factory(lookback=5, size=1):
+    return MomentumStrategy(lookback, size)
+
+
+@pytest.fixture
+def price_data():
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, 600))
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01 09:15", periods=close.size, freq="min"),
+        "open": close + rng.normal(0, 0.1, close.size),
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.integers(100, 1000, close.size),
+    })
+
+
+def test_parameter_grid_is_cartesian_product():
+    grid = parameter_grid({"a": [1, 2], "b": ["x", "y", "z"]})
+    assert len(grid) == 6
+    assert {"a": 2, "b": "z"} in grid
+
+
+def test_walk_forward_splits_roll_and_anchor():
+    rolling = walk_forward_splits(100, n_splits=4, train_size=40, test_size=15)
+    assert [(s.train_start, s.train_stop, s.test_stop) for s in rolling] == [
+        (0, 40, 55), (15, 55, 70), (30, 70, 85), (45, 85, 100)]
+
+    anchored = walk_forward_splits(100, n_splits=4, train_size=40, test_size=15, anchored=True)
+    assert all(s.train_start == 0 for s in anchored)
+
+    with pytest.raises(ValueError):
+        walk_forward_splits(100, n_splits=4, train_size=60, test_size=15)
+
+
+def test_shared_arrays_round_trip(price_data):
+    with SharedOHLCV(price_data) as shared:
+        shm, arrays = attach_arrays(shared.descriptor)
+        try:
+            np.testing.assert_array_equal(arrays["close"], price_data["close"].to_numpy())
+            assert arrays["timestamp"][5] == price_data["date"].to_numpy()[5]
+        finally:
+            shm.close()
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_sweep_matches_direct_backtest(price_data, max_workers):
+    sweep = ParameterSweep(price_data, momentum_factory, {"lookback": [3, 10, 30], "size": [1, 2]},
+                           max_workers=max_workers)
+    table = sweep.run()
+
+    assert len(table) == 6
+    assert table["error"].isna().all()
+    assert list(table["sharpe_ratio"]) == sorted(table["sharpe_ratio"], reverse=True)
+    assert (table["elapsed_seconds"] > 0).all()
+
+    row = table[(table["lookback"] == 10) & (table["size"] == 2)].iloc[0]
+    direct = BacktestEngine(momentum_factory(10, 2), price_data, verbose=False).run()
+    assert row["total_pnl"] == pytest.approx(direct["total_pnl"])
+    assert row["max_drawdown_pct"] == pytest.approx(direct["max_drawdown_pct"])
+
+
+def test_walk_forward_scores_best_train_params_out_of_sample(price_data):
+    sweep = ParameterSweep(price_data, momentum_factory, {"lookback": [3, 10, 30]}, max_workers=1)
+    result = sweep.walk_forward(n_splits=3, train_size=300, test_size=100)
+
+    assert len(result["test"]) == 3
+    for _, row in result["test"].iterrows():
+        fold_train = result["train"][result["train"]["fold"] == row["fold"]]
+        assert row["lookback"] == fold_train.iloc[0]["lookback"]
+        assert row["stop"] - row["start"] == 100
+    assert result["summary"]["folds"] == 3
+
+
+def test_failing_job_is_reported_not_raised(price_data):
+    sweep = ParameterSweep(price_data, momentum_factory, [{"lookback": 5}, {"lookback": 5, "bogus": 1}],
+                           max_workers=1)
+    table = sweep.run()
+    assert table["error"].notna().sum() == 1
@@ -0,0 +1,164 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from runner.indicators import batch_indicators as bi
+from runner.indicators.technical_engine import TechnicalEngine
+from runner.market_data.technical_indicators import TechnicalIndicators
+
+
+def make_universe(symbols=5, bars=120, seed=4):
+    rng = np.random.default_rng(seed)
+    vol = rng.uniform(0.002, 0.04, (symbols, 1))
+    close = 500 * np.exp(np.cumsum(rng.normal(0, 1, (symbols, bars)) * vol, axis=1))
+    high = close * (1 + rng.uniform(0, 0.01, close.shape))
+    low = close * (1 - rng.uniform(0, 0.01, close.shape))
+    volume = rng.integers(100, 10000, close.shape).astype(float)
+    return [f"SYM{i}" for i in range(symbols)], high, low, close, volume
+
+
+def to_candles(high, low, close, volume, start=datetime(2024, 1, 1, 9, 15)):
+    return [
+        {"date": start + timedelta(minutes=i), "open": close[i], "high": high[i],
+         "low": low[i], "close": close[i], "volume": volume[i]}
+        for i in range(close.size)
+    ]
+
+
+@pytest.fixture
+def engine():
+    return TechnicalEngine(paper_trade=False)
+
+
+def test_batch_matches_single_symbol_engine(engine):
+    symbols, high, low, close, volume = make_universe()
+    result = engine.calculate_batch(symbols, high, low, close, volume)
+
+    for i, symbol in enumerate(symbols):
+        candles = [{k: v for k, v in c.items() if k != "date"} for c in to_candles(high[i], low[i], close[i], volume[i])]
+        row = result[symbol]
+
+        vwap = engine.calculate_vwap_advanced(candles)
+        assert row["vwap"] == pytest.approx(vwap.value)
+        assert row["vwap_signal"] == vwap.signal
+
+        rsi = engine.calculate_adaptive_rsi(candles)
+        assert row["rsi"] == pytest.approx(rsi.value)
+        assert row["rsi_period"] == rsi.metadata["adjusted_period"]
+        assert row["rsi_signal"] == rsi.signal
+
+        atr = engine.calculate_smart_atr(candles)
+        assert row["atr"] == pytest.approx(atr.value)
+        assert row["atr_ratio"] == pytest.approx(atr.metadata["ratio"])
+        assert row["atr_regime"] == atr.metadata["regime"]
+
+        macd = engine.calculate_macd(candles)
+        assert row["macd"] == pytest.approx(macd.value)
+        assert row["macd_histogram"] == pytest.approx(macd.metadata["histogram"])
+        assert row["macd_signal"] == macd.signal
+
+        bands = engine.calculate_bollinger_bands(candles)
+        assert row["bb_upper"] == pytest.approx(bands.metadata["upper_band"])
+        assert row["bb_lower"] == pytest.approx(bands.metadata["lower_band"])
+        assert row["bb_signal"] == bands.signal
+
+        adx = TechnicalIndicators.calculate_adx(list(high[i]), list(low[i]), list(close[i]))
+        assert row["adx"] == pytest.approx(adx["adx"])
+        assert row["di_plus"] == pytest.approx(adx["di_plus"])
+
+
+def test_session_vwap_resets_on_new_session(engine):
+    symbols, high, low, close, volume = make_universe(symbols=2, bars=60)
+    sessions = np.repeat(["2024-01-01", "2024-01-02"], 30)
+    result = bi.compute_batch(symbols, high, low, close, volume, session_ids=sessions)
+
+    typical = (high + low + close) / 3
+    expected = (typical[:, 30:] * volume[:, 30:]).sum(axis=1) / volume[:, 30:].sum(axis=1)
+    np.testing.assert_allclose(result.columns["vwap"], expected)
+
+
+def test_linear_recurrence_fallback_matches_scipy(monkeypatch):
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(3, 50))
+    with_scipy = bi.wilder_smooth(values, 14)
+    monkeypatch.setattr(bi, "SCIPY_AVAILABLE", False)
+    np.testing.assert_allclose(bi.wilder_smooth(values, 14), with_scipy)
+
+
+def test_short_history_reports_nan(engine):
+    symbols, high, low, close, volume = make_universe(symbols=2, bars=15)
+    result = engine.calculate_batch(symbols, high, low, close, volume)
+    assert np.isnan(result.columns["macd"]).all()
+    assert (result.columns["macd_signal"] == "HOLD").all()
+    assert not np.isnan(result.columns["rsi"]).any()
+
+
+def test_stack_candles_right_aligns_histories():
+    _, high, low, close, volume = make_universe(symbols=2, bars=30)
+    candles = {
+        "A": to_candles(high[0], low[0], close[0], volume[0]),
+        "B": to_candles(high[1, :20], low[1, :20], close[1, :20], volume[1, :20]),
+        "C": [],
+    }
+    symbols, arrays = bi.stack_candles(candles)
+    assert symbols == ["A", "B"]
+    assert arrays["close"].shape == (2, 20)
+    np.testing.assert_allclose(arrays["close"][0], close[0, -20:])
+
+
+def test_result_is_columnar_and_keyed_by_symbol(engine):
+    symbols, high, low, close, volume = make_universe(symbols=3)
+    result = engine.calculate_batch(symbols, high, low, close, volume, full_series=True)
+    assert "SYM1" in result
+    assert set(result.column("rsi")) == set(symbols)
+    assert result.series["macd"].shape == close.shape
+    frame = result.to_frame()
+    assert list(frame.index) == symbols
+
+
+def test_paper_trade_batch_is_mock():
+    symbols, high, low, close, volume = make_universe(symbols=3)
+    result = TechnicalEngine(paper_trade=True).calculate_batch(symbols, high, low, close, volume)
+    assert result.is_mock
+    assert result["SYM0"]["vwap"] == 18500.0
+
+
+def test_universe_scan_is_fast(engine):
+    symbols, high, low, close, volume = make_universe(symbols=200, bars=375)
+    engine.calculate_batch(symbols, high, low, close, volume)
+    started = time.perf_counter()
+    engine.calculate_batch(symbols, high, low, close, volume)
+    assert time.perf_counter() - started < 0.5
+
+
+def test_stock_vwap_strategy_uses_batch_vwap(monkeypatch):
+    from unittest.mock import Mock
+
+    import stock_trading.strategies.vwap_strategy as vwap_module
+
+    class Strategy(vwap_module.VWAPStrategy):
+        def execute(self, symbol, candles, capital):
+            return None
+
+    engine = TechnicalEngine(paper_trade=False)
+    batch_calls = []
+    original = engine.calculate_batch
+    monkeypatch.setattr(engine, "calculate_batch", lambda *a, **k: batch_calls.append(a[0]) or original(*a, **k))
+    monkeypatch.setattr(vwap_module, "create_technical_engine", lambda: engine)
+
+    symbols, high, low, close, volume = make_universe(symbols=4, bars=6)
+    candles = {s: to_candles(high[i], low[i], close[i], volume[i]) for i, s in enumerate(
+        ["RELIANCE", "TCS", "INFY", "HDFCBANK"])}
+    kite = Mock()
+    kite.ltp.side_effect = lambda keys: {keys[0]: {"instrument_token": keys[0].split(":")[1]}}
+    kite.historical_data.side_effect = lambda token, *_: candles[token]
+
+    trades = Strategy(kite, Mock()).find_trade_opportunities({})
+
+    assert batch_calls == [list(candles)]
+    assert [t["symbol"] for t in trades] == list(candles)
+    for trade in trades:
+        expected = engine.calculate_vwap_advanced(candles[trade["symbol"]]).value
+        assert (trade["direction"] == "bullish") == (trade["entry_price"] > expected)
@@ -0,0 +1,190 @@
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from runner.market_data.candle_cache import CandleCache
+
+START = datetime(2024, 1, 1, 9, 15)
+
+
+def bars(lo, hi, step=timedelta(minutes=5)):
+    first = START + ((max(lo, START) - START + step - timedelta(microseconds=1)) // step) * step
+    out = []
+    stamp = first
+    while stamp <= hi:
+        out.append({"date": stamp, "close": float((stamp - START) // step)})
+        stamp += step
+    return out
+
+
+class Source:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, token, lo, hi, interval):
+        self.calls.append((lo, hi))
+        return bars(lo, hi)
+
+
+def test_repeat_request_is_a_hit():
+    cache, source = CandleCache(), Source()
+    end = START + timedelta(hours=1)
+    first = cache.get_range(1, "5minute", START, end, source)
+    second = cache.get_range(1, "5minute", START, end, source)
+
+    assert first == second == bars(START, end)
+    assert len(source.calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_sliding_window_fetches_only_the_tail():
+    cache, source = CandleCache(), Source()
+    cache.get_range(1, "5minute", START, START + timedelta(hours=1), source)
+    lo, hi = START + timedelta(minutes=30), START + timedelta(hours=1, minutes=30)
+    result = cache.get_range(1, "5minute", lo, hi, source)
+
+    assert result == bars(lo, hi)
+    assert source.calls[-1] == (START + timedelta(hours=1), hi)
+    assert cache.stats()["partial_hits"] == 1
+    assert len(cache) == 1  # the tail was merged into the existing segment
+
+
+def test_head_and_middle_gaps_are_stitched():
+    cache, source = CandleCache(), Source()
+    cache.get_range(1, "5minute", START + timedelta(hours=1), START + timedelta(hours=2), source)
+    cache.get_range(1, "5minute", START + timedelta(hours=3), START + timedelta(hours=4), source)
+    result = cache.get_range(1, "5minute", START, START + timedelta(hours=4), source)
+
+    assert result == bars(START, START + timedelta(hours=4))
+    assert source.calls[2:] == [
+        (START, START + timedelta(hours=1)),
+        (START + timedelta(hours=2), START + timedelta(hours=3)),
+    ]
+    assert cache.get(1, "5minute", START, START + timedelta(hours=4)) == result
+
+
+def test_lru_eviction_by_bytes():
+    source = Source()
+    probe = CandleCache()
+    probe.get_range(0, "5minute", START, START + timedelta(hours=6), source)
+    one_series = probe.stats()["bytes"]
+
+    cache = CandleCache(max_bytes=int(one_series * 2.5))
+    for token in (1, 2):
+        cache.get_range(token, "5minute", START, START + timedelta(hours=6), source)
+    cache.get_range(1, "5minute", START, START + timedelta(hours=6), source)  # touch 1
+    cache.get_range(3, "5minute", START, START + timedelta(hours=6), source)
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= cache.max_bytes
+    assert cache.get(2, "5minute", START, START + timedelta(hours=6)) is None
+    assert cache.get(1, "5minute", START, START + timedelta(hours=6)) is not None
+
+
+def test_per_interval_ttl_expires_only_the_tail_bar():
+    cache, source = CandleCache(interval_ttls={"5minute": 0.05, "day": 60}), Source()
+    end = START + timedelta(hours=1)
+    cache.get_range(1, "5minute", START, end, source)
+    cache.get_range(1, "day", START, end, source)
+    time.sleep(0.06)
+
+    assert cache.purge_expired() == 1
+    assert cache.purge_expired() == 0  # closed bars do not expire
+    assert cache.get(1, "day", START, end) is not None
+    assert cache.get(1, "5minute", START, end - timedelta(minutes=5)) == bars(START, end - timedelta(minutes=5))
+    assert cache.get_range(1, "5minute", START, end, source) == bars(START, end)
+    assert source.calls[-1] == (end - timedelta(minutes=5), end)
+
+
+def test_polling_slower_than_ttl_still_fetches_only_the_tail():
+    cache, source = CandleCache(interval_ttls={"5minute": 0.01}), Source()
+    for minutes in range(0, 30, 5):
+        lo = START + timedelta(minutes=minutes)
+        hi = lo + timedelta(hours=1)
+        assert cache.get_range(1, "5minute", lo, hi, source) == bars(lo, hi)
+        time.sleep(0.02)
+
+    assert source.calls[0] == (START, START + timedelta(hours=1))
+    assert all(hi - lo == timedelta(minutes=10) for lo, hi in source.calls[1:])
+    assert cache.stats()["misses"] == 1
+
+
+def test_tz_aware_candles_and_passthrough():
+    cache = CandleCache()
+    ist = pd.Timestamp("2024-01-01 09:15", tz="Asia/Kolkata").to_pydatetime()
+    data = [{"date": ist, "close": 1.0}]
+    assert cache.get_range(1, "day", START, START + timedelta(days=1), lambda *a: data) == data
+
+    frame = pd.DataFrame({"close": [1.0]})
+    assert cache.get_range(2, "day", START, START, lambda *a: frame) is frame
+    assert cache.get_range({"unhashable": 1}, "day", START, START, lambda *a: "raw") == "raw"
+
+
+def test_market_monitor_relies_on_the_fetcher_cache(tmp_path, monkeypatch):
+    from runner.market_data import candle_store
+    from runner.market_data_fetcher import MarketDataFetcher
+    from runner.market_monitor import MarketMonitor
+
+    monkeypatch.setattr(candle_store, "DEFAULT_STORE_DIR", str(tmp_path))
+    monitor = MarketMonitor()
+    monitor.data_fetcher = MarketDataFetcher()
+    source = Source()
+    monitor.data_fetcher._fetch_with_retry = source
+    lo, hi = START, START + timedelta(hours=1)
+    monitor._fetch_historical_data(256265, lo, hi, "5minute")
+    df = monitor._fetch_historical_data(256265, lo, hi, "5minute")
+
+    assert len(df) == len(bars(lo, hi))
+    assert len(source.calls) == 1
+    stats = monitor.get_cache_statistics()
+    assert stats["cache_hit_ratio"] == pytest.approx(0.5)
+    assert stats["total_cached_entries"] == 1
+    assert stats["cache_size_mb"] > 0
+
+
+def test_mock_fallback_candles_are_never_stored(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from runner.market_data import candle_store
+    from runner.market_data_fetcher import MarketDataFetcher
+
+    monkeypatch.setattr(candle_store, "DEFAULT_STORE_DIR", str(tmp_path))
+    fetcher = MarketDataFetcher()
+    fetcher._fetch_with_retry = lambda *args: None  # every source down
+    lo, hi = START, START + timedelta(hours=1)
+
+    assert fetcher.fetch_historical_data(256265, lo, hi, "5minute")  # mock candles
+    assert fetcher.candle_store.missing(256265, "5minute", lo, hi) == [(lo, hi)]
+    assert fetcher.data_cache.get(256265, "5minute", lo, hi) is None
+
+
+def test_forming_bar_is_refetched_by_the_next_tail_request():
+    version = {"close": 1.0}
+
+    def source(token, lo, hi, interval):
+        calls.append((lo, hi))
+        return [{**c, "close": version["close"]} for c in bars(lo, hi)]
+
+    calls = []
+    cache = CandleCache()
+    cache.get_range(1, "5minute", START, START + timedelta(minutes=62), source)
+    version["close"] = 2.0  # the 10:15 bar kept forming
+    result = cache.get_range(1, "5minute", START, START + timedelta(minutes=63), source)
+
+    assert calls[-1] == (START + timedelta(hours=1), START + timedelta(minutes=63))
+    assert result[-1]["date"] == START + timedelta(hours=1) and result[-1]["close"] == 2.0
+    assert [c["close"] for c in result[:-1]] == [1.0] * (len(result) - 1)
+
+
+def test_filling_a_head_gap_keeps_the_age_of_the_existing_tail():
+    cache, source = CandleCache(interval_ttls={"5minute": 0.05}), Source()
+    cache.get_range(1, "5minute", START + timedelta(hours=1), START + timedelta(hours=2), source)
+    time.sleep(0.03)
+    cache.get_range(1, "5minute", START, START + timedelta(hours=2), source)  # fetches only the head
+    time.sleep(0.03)
+
+    assert cache.purge_expired() == 1
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backtesting.engine import BacktestEngine
+from runner.market_data import candle_store
+from runner.market_data.candle_store import CandleStore
+
+START = datetime(2024, 1, 1, 9, 15)
+
+
+class Source:
+    def __init__(self, step=timedelta(minutes=5), offset=0.0):
+        self.step = step
+        self.offset = offset
+        self.calls = []
+
+    def __call__(self, instrument, lo, hi, interval):
+        self.calls.append((lo, hi))
+        out, stamp = [], lo
+        while stamp <= hi:
+            price = 100 + (stamp - START) / self.step + self.offset
+            out.append({"date": stamp, "open": price, "high": price + 1, "low": price - 1,
+                        "close": price, "volume": 1000})
+            stamp += self.step
+        return out
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+
+def test_roundtrip_partitions_by_day(store, tmp_path):
+    source = Source()
+    end = START + timedelta(days=2)
+    candles = store.get_range(256265, "5minute", START, end, source)
+
+    assert candles == source(256265, START, end, "5minute")
+    files = sorted(p.name for p in (tmp_path / "256265" / "5minute").iterdir())
+    assert files == ["2024-01-01.arrow", "2024-01-02.arrow", "2024-01-03.arrow", "_coverage.json"]
+
+
+def test_only_gaps_are_fetched(store):
+    source = Source()
+    store.get_range(1, "5minute", START, START + timedelta(hours=2), source)
+    store.get_range(1, "5minute", START + timedelta(hours=4), START + timedelta(hours=5), source)
+    assert store.missing(1, "5minute", START, START + timedelta(hours=5)) == [
+        (START + timedelta(hours=2), START + timedelta(hours=4))
+    ]
+
+    store.get_range(1, "5minute", START, START + timedelta(hours=6), source)
+    assert source.calls[2:] == [
+        (START + timedelta(hours=2), START + timedelta(hours=4)),
+        (START + timedelta(hours=5), START + timedelta(hours=6)),
+    ]
+    assert store.coverage(1, "5minute") == [(START, START + timedelta(hours=6))]
+    # Fully covered now: a fresh store on the same directory needs no network
+    again = CandleStore(store.root).get_range(1, "5minute", START, START + timedelta(hours=6), Source())
+    assert len(again) == 73
+
+
+def test_rewritten_bars_replace_stored_values(store):
+    store.write(1, "5minute", Source()(1, START, START + timedelta(minutes=30), "5minute"))
+    store.write(1, "5minute", Source(offset=0.5)(1, START + timedelta(minutes=30), START + timedelta(minutes=40), "5minute"))
+    closes = store.read_arrays(1, "5minute", START, START + timedelta(hours=1))["close"]
+    np.testing.assert_allclose(closes, [100, 101, 102, 103, 104, 105, 106.5, 107.5, 108.5])
+
+
+def test_empty_fetch_is_not_marked_covered(store):
+    assert store.get_range(1, "day", START, START + timedelta(days=5), lambda *a: None) == []
+    assert store.coverage(1, "day") == []
+
+
+def test_daily_candles_partition_by_year(store, tmp_path):
+    store.get_range("NIFTY 50", "day", START, START + timedelta(days=400), Source(step=timedelta(days=1)))
+    assert sorted(p.name for p in (tmp_path / "NIFTY 50" / "day").iterdir()) == [
+        "2024.arrow", "2025.arrow", "_coverage.json"
+    ]
+    assert len(store.read(1, "day", START, START)) == 0
+
+
+def test_backtest_engine_reads_from_store(store):
+    class Hold:
+        def generate_signals(self, engine):
+            return np.ones(engine.n_bars)
+
+    source = Source()
+    engine = BacktestEngine.from_store(Hold(), 256265, "5minute", START, START + timedelta(hours=3),
+                                       store=store, fetch=source, verbose=False)
+    assert engine.n_bars == 37
+    assert engine.symbol == "256265"
+    # Second engine is served from disk only
+    BacktestEngine.from_store(Hold(), 256265, "5minute", START, START + timedelta(hours=3),
+                              store=store, fetch=source, verbose=False)
+    assert len(source.calls) == 1
+
+
+def test_fetcher_reads_store_before_network(tmp_path, monkeypatch):
+    from runner.market_data_fetcher import MarketDataFetcher
+
+    monkeypatch.setattr(candle_store, "DEFAULT_STORE_DIR", str(tmp_path))
+    source = Source()
+    first = MarketDataFetcher()
+    monkeypatch.setattr(first, "_fetch_with_retry", source)
+    first.fetch_historical_data(256265, START, START + timedelta(hours=1), "5minute")
+
+    # A new process (fresh in-memory cache) is served from disk
+    second = MarketDataFetcher()
+    monkeypatch.setattr(second, "_fetch_with_retry", source)
+    data = second.fetch_historical_data(256265, START, START + timedelta(hours=1), "5minute")
+    assert len(source.calls) == 1
+    assert len(data) == 13
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pytest
+
+from gpt_runner.rag.embedding_service import (
+    EmbeddingCache, EmbeddingService, LocalHashEmbeddingBackend
+)
+
+
+class CountingBackend(LocalHashEmbeddingBackend):
+    def __init__(self, dimension=64, failures=0):
+        super().__init__(dimension)
+        self.calls = []
+        self.failures = failures
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("rate limited")
+        return super().embed(texts)
+
+
+def test_local_backend_is_deterministic_and_similarity_follows_shared_words():
+    backend = LocalHashEmbeddingBackend(256)
+    a, b, c = backend.embed(["NIFTY long call hit target", "NIFTY long call hit stop loss",
+                             "database connection timeout"])
+    assert np.allclose(backend.embed(["NIFTY long call hit target"])[0], a)
+    assert np.linalg.norm(a) == pytest.approx(1.0)
+    assert a @ b > 0.5 > a @ c
+
+
+def test_texts_are_deduplicated_batched_and_cached_on_disk(tmp_path):
+    backend = CountingBackend()
+    service = EmbeddingService(backend, cache=EmbeddingCache(str(tmp_path / "cache.sqlite")), batch_size=4)
+    texts = [f"trade {i}" for i in range(10)]
+
+    vectors = service.embed(texts + texts[:3])
+    assert vectors.shape == (13, 64) and np.allclose(vectors[10], vectors[0])
+    assert sorted(len(call) for call in backend.calls) == [2, 4, 4]
+    service.close()
+
+    # A new process re-embedding the same log plus new lines only pays for the new lines
+    backend = CountingBackend()
+    service = EmbeddingService(backend, cache=EmbeddingCache(str(tmp_path / "cache.sqlite")), batch_size=4)
+    again = service.embed(texts + ["trade 10"])
+    assert backend.calls == [["trade 10"]] and np.allclose(again[:10], vectors[:10])
+    stats = service.get_stats()
+    assert (stats['cache_hits'], stats['embedded'], stats['requests'], stats['cached_vectors']) == (10, 1, 1, 11)
+
+
+def test_failed_batches_are_retried_then_fall_back_uncached(tmp_path, monkeypatch):
+    monkeypatch.setattr("gpt_runner.rag.embedding_service.time.sleep", lambda seconds: None)
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+
+    service = EmbeddingService(CountingBackend(failures=1), cache=cache)
+    service.embed(["a", "b"])
+    assert service.get_stats()['retries'] == 1 and len(cache) == 2
+
+    service = EmbeddingService(CountingBackend(failures=3), cache=cache, fallback=LocalHashEmbeddingBackend(64))
+    assert service.embed(["c"]).shape == (1, 64)
+    assert service.get_stats()['fallback'] == 1 and len(cache) == 2
+
+    with pytest.raises(ConnectionError):
+        EmbeddingService(CountingBackend(failures=3)).embed(["d"])
+
+
+def test_log_file_is_embedded_incrementally(tmp_path, monkeypatch):
+    rag_worker = pytest.importorskip("gpt_runner.rag.rag_worker", exc_type=ImportError)
+    from gpt_runner.rag import embedding_service
+
+    backend = CountingBackend()
+    monkeypatch.setattr(embedding_service, "_services", {
+        embedding_service.DEFAULT_MODEL: EmbeddingService(backend, cache=EmbeddingCache(str(tmp_path / "c.sqlite")))
+    })
+    saved = []
+    monkeypatch.setattr(rag_worker, "save_to_vector_store", lambda bot, data: saved.append(data) or True)
+
+    log_path = tmp_path / "stock-trader.log"
+    log_path.write_text("".join(f"line {i}\n" for i in range(30)) + "partial")
+    rag_worker.embed_log_file("stock-trader", str(log_path), chunk_size=100)
+    assert "partial" not in "".join(d['text'] for d in saved[0]) and len(backend.calls) == 1
+
+    with open(log_path, "a") as f:
+        f.write(" line\nline 31\n")
+    rag_worker.embed_log_file("stock-trader", str(log_path), chunk_size=100)
+    assert [d['text'] for d in saved[1]] == ["partial line\nline 31\n"]
+    assert saved[1][0]['metadata']['chunk'] == len(saved[0])
+
+    rag_worker.embed_log_file("stock-trader", str(log_path), chunk_size=100)
+    assert len(saved) == 2 and len(backend.calls) == 2
+    assert os.path.exists(f"{log_path}.embedded")
@@ -0,0 +1,107 @@
+import datetime
+import logging
+import random
+
+import pytest
+
+from runner.exit_trigger_book import ABOVE, BELOW, ExitTriggerBook
+from runner.paper_trader import PaperTrader
+
+
+class MockFirestoreClient:
+    def log_trade(self, bot_name, date_str, trade_data):
+        pass
+
+    def log_trade_exit(self, bot_name, date_str, symbol, exit_data):
+        pass
+
+
+def test_cross_fires_only_crossed_levels():
+    book = ExitTriggerBook()
+    book.set("p1", "stop_loss", "INFY", 95.0, BELOW)
+    book.set("p1", "target", "INFY", 110.0, ABOVE)
+    book.set("p2", "stop_loss", "INFY", 97.0, BELOW)
+    book.set("p3", "stop_loss", "TCS", 99.0, BELOW)
+
+    assert book.cross("INFY", 100.0) == []
+    fired = book.cross("INFY", 97.0)
+    assert [(t.owner, t.name) for t in fired] == [("p2", "stop_loss")]
+    # Fired triggers are one-shot
+    assert book.cross("INFY", 96.0) == []
+    assert {(t.owner, t.name) for t in book.cross("INFY", 120.0)} == {("p1", "target")}
+    assert len(book) == 2
+
+
+def test_set_moves_existing_trigger_and_cancel_owner():
+    book = ExitTriggerBook()
+    book.set("p1", "trailing_stop", "INFY", 90.0, BELOW)
+    book.set("p1", "trailing_stop", "INFY", 98.0, BELOW)
+    book.set("p1", "target", "INFY", 120.0, ABOVE)
+    assert book.get("p1", "trailing_stop").level == 98.0
+    assert len(book) == 2
+
+    assert [t.level for t in book.cross("INFY", 98.0)] == [98.0]
+    book.cancel_owner("p1")
+    assert len(book) == 0
+    assert book.cross("INFY", 500.0) == []
+
+    with pytest.raises(ValueError):
+        book.set("p1", "x", "INFY", 1.0, "sideways")
+
+
+def test_matches_brute_force_scan():
+    rng = random.Random(7)
+    book = ExitTriggerBook()
+    armed = {}
+    for i in range(500):
+        level, side = rng.uniform(90, 110), rng.choice([ABOVE, BELOW])
+        book.set(f"p{i}", "level", "NIFTY", level, side)
+        armed[f"p{i}"] = (level, side)
+
+    for _ in range(50):
+        price = rng.uniform(85, 115)
+        expected = {
+            owner for owner, (level, side) in armed.items()
+            if (side == ABOVE and price >= level) or (side == BELOW and price <= level)
+        }
+        fired = {t.owner for t in book.cross("NIFTY", price)}
+        assert fired == expected
+        for owner in fired:
+            del armed[owner]
+    assert len(book) == len(armed)
+
+
+def _linear_exit(trade, price):
+    """The per-trade SL/Target/EOD scan the trigger book replaced"""
+    bullish = trade.direction == "bullish"
+    if (price >= trade.target) if bullish else (price <= trade.target):
+        return True, "Target reached"
+    if (price <= trade.stop_loss) if bullish else (price >= trade.stop_loss):
+        return True, "Stop loss hit"
+    if datetime.datetime.now().time() >= datetime.time(15, 20):
+        return True, "End of day square-off"
+    return False, ""
+
+
+def test_paper_trader_matches_linear_exit_rule():
+    trader = PaperTrader(logger=logging.getLogger(__name__), firestore_client=MockFirestoreClient())
+    rng = random.Random(3)
+    for i in range(40):
+        price = 100.0 + i
+        direction = rng.choice(["bullish", "bearish"])
+        sl, tgt = (price * 0.98, price * 1.03) if direction == "bullish" else (price * 1.02, price * 0.97)
+        trader.execute_paper_trade({
+            "symbol": f"SYM{i % 8}", "entry_price": price, "quantity": 1,
+            "stop_loss": sl, "target": tgt, "direction": direction,
+        }, f"s{i}")
+    assert len(trader.active_trades) == 40
+
+    prices = {f"SYM{k}": 100.0 + k * 4 for k in range(8)}
+    expected = {
+        trade.trade_id: _linear_exit(trade, prices[trade.symbol])
+        for trade in trader.active_trades
+    }
+    trader.monitor_and_exit_trades(prices)
+
+    closed = {trade.trade_id: trade.exit_reason for trade in trader.completed_trades}
+    assert closed == {trade_id: reason for trade_id, (exit_, reason) in expected.items() if exit_}
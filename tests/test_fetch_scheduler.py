@@ -0,0 +1,121 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from runner.market_data.fetch_scheduler import (
+    FetchScheduler,
+    SourceLimit,
+    TokenBucket,
+    backoff_delay,
+    retry_with_backoff,
+)
+from runner.market_data_fetcher import MarketDataFetcher
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=20.0, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    # 5 immediate tokens, then 10 more at 20/s
+    assert 0.45 <= elapsed < 0.9
+
+
+def test_try_acquire_reports_wait():
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, capacity=1, clock=lambda: now[0])
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    now[0] = 0.5
+    assert bucket.try_acquire() == 0.0
+
+
+def test_concurrency_cap_per_source():
+    scheduler = FetchScheduler(max_workers=16, source_limits={
+        "slow": SourceLimit(rate_per_second=1000.0, burst=100, max_concurrency=2),
+    })
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def job(item):
+        with scheduler.limit("slow"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+        return item * 2
+
+    results = scheduler.map(job, range(10))
+    scheduler.shutdown()
+    assert results == {i: i * 2 for i in range(10)}
+    assert peak[0] == 2
+
+
+def test_map_reports_failures_as_none():
+    scheduler = FetchScheduler(max_workers=4)
+
+    def job(item):
+        if item == "bad":
+            raise RuntimeError("boom")
+        return item
+
+    assert scheduler.map(job, ["a", "bad", "b"]) == {"a": "a", "bad": None, "b": "b"}
+    scheduler.shutdown()
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    delays = [backoff_delay(attempt=10, base=2.0, max_backoff=5.0) for _ in range(200)]
+    assert all(0 <= d <= 5.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_with_backoff_retries_then_raises():
+    calls, sleeps = [], []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("rate limited")
+        return "ok"
+
+    assert retry_with_backoff(flaky, max_attempts=3, base=2.0, max_backoff=1.0, sleep=sleeps.append) == "ok"
+    assert len(sleeps) == 2 and all(0 <= s <= 1.0 for s in sleeps)
+
+    def always_fail():
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        retry_with_backoff(always_fail, max_attempts=2, sleep=lambda _: None)
+
+
+def test_fetcher_batch_runs_at_source_rate(monkeypatch):
+    fetcher = MarketDataFetcher()
+    fetcher.candle_store = None
+    fetcher.scheduler.set_limit("kite", SourceLimit(rate_per_second=50.0, burst=5, max_concurrency=5))
+    calls = []
+
+    def fake_real(token, from_date, to_date, interval):
+        with fetcher.scheduler.limit("kite"):
+            calls.append(token)
+            time.sleep(0.01)
+            return [{"date": from_date, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1}]
+
+    monkeypatch.setattr(fetcher, "_fetch_real_historical_data", fake_real)
+    instruments = {token: f"SYM{token}" for token in range(50)}
+    end = datetime(2024, 1, 2, 15, 30)
+
+    start = time.monotonic()
+    data = fetcher.fetch_multiple_instruments_data(instruments, end - timedelta(hours=1), end, "5minute")
+    elapsed = time.monotonic() - start
+
+    assert set(data) == set(instruments)
+    assert all(len(candles) == 1 for candles in data.values())
+    assert sorted(calls) == list(range(50))
+    # 45 tokens beyond the burst at 50/s: ~0.9s, versus 50s with a 1s sleep per instrument
+    assert 0.8 <= elapsed < 3.0
+    fetcher.scheduler.shutdown()
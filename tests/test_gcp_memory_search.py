@@ -0,0 +1,204 @@
+import datetime
+import pickle
+
+import pytest
+
+faiss = pytest.importorskip("faiss")
+import numpy as np
+
+from gpt_runner.rag.quantization import is_compressed
+from runner.gcp_memory_client import GCPMemoryClient
+
+DIM = 8
+
+
+class FakeBlob:
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def exists(self):
+        return self.name in self.store
+
+    def upload_from_filename(self, path):
+        with open(path, 'rb') as f:
+            self.store[self.name] = f.read()
+
+    def download_to_filename(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.store[self.name])
+
+
+class FakeStorage:
+    def __init__(self):
+        self.blobs = {}
+
+    def bucket(self, name):
+        return self
+
+    def blob(self, name):
+        return FakeBlob(self.blobs, name)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    storage = FakeStorage()
+    vectors = np.random.default_rng(0).random((100, DIM), dtype="float32") - 0.5
+
+    def init_clients(self):
+        self.storage_client = storage
+        self.firestore_client = None
+
+    def init_embedding_system(self, openai_api_key=None):
+        self.embedding_model = "test"
+
+    monkeypatch.setattr(GCPMemoryClient, "_init_clients", init_clients)
+    monkeypatch.setattr(GCPMemoryClient, "_init_embedding_system", init_embedding_system)
+    monkeypatch.setattr(GCPMemoryClient, "_ensure_buckets_exist", lambda self: None)
+    monkeypatch.setattr(GCPMemoryClient, "_generate_embeddings", lambda self, texts: vectors[[int(t) for t in texts]])
+    monkeypatch.setattr(GCPMemoryClient, "store_memory_item", lambda self, *args, **kwargs: True)
+    monkeypatch.setattr(GCPMemoryClient, "delete_memory_item", lambda self, *args, **kwargs: True)
+    return GCPMemoryClient(project_id="test", embedding_dimension=DIM)
+
+
+def _cosine(client, text, candidates):
+    query = np.array(client._generate_embedding(text))
+    return {c: float(np.dot(query, client._generate_embedding(c)) /
+                     np.linalg.norm(query) / np.linalg.norm(client._generate_embedding(c))) for c in candidates}
+
+
+def test_search_resolves_hits_by_id_across_types(client):
+    types = ['trade_log', 'decision', 'context']
+    for i in range(60):
+        client.store_embedding_document(str(i), types[i % 3], {'n': i})
+
+    hits = client.search_similar_documents("7", top_k=5, similarity_threshold=-1.0)
+    cosine = _cosine(client, "7", [str(i) for i in range(60)])
+    assert [h['content'] for h in hits] == sorted(cosine, key=cosine.get, reverse=True)[:5]
+    assert hits[0]['metadata'] == {'n': 7} and hits[0]['document_type'] == 'decision'
+
+    only_trades = client.search_similar_documents("7", doc_type='trade_log', top_k=3, similarity_threshold=-1.0)
+    assert all(int(h['content']) % 3 == 0 for h in only_trades) and len(only_trades) == 3
+
+    above = client.search_similar_documents("7", top_k=60, similarity_threshold=0.5)
+    assert sorted(h['content'] for h in above) == sorted(c for c, s in cosine.items() if s >= 0.5)
+
+
+def test_removed_and_expired_documents_leave_the_index(client):
+    ids = [client.store_embedding_document(str(i), 'general', ttl_hours=1 if i < 3 else None) for i in range(10)]
+
+    assert client.remove_embedding_documents('general', [ids[5], "unknown"]) == 1
+    assert client.faiss_indices['general'].ntotal == 9
+    assert all(h['doc_id'] != ids[5] for h in client.search_similar_documents("5", similarity_threshold=-1.0, top_k=10))
+
+    later = datetime.datetime.utcnow() + datetime.timedelta(hours=2)
+    assert client._expire_embedding_documents(later) == 3
+    assert client.faiss_indices['general'].ntotal == 6
+    assert set(client.embedding_metadata['general']) == set(ids[3:5] + ids[6:])
+
+    # Re-adding after removal takes a fresh id
+    new_id = client.store_embedding_document("5", 'general')
+    assert client.search_similar_documents("5", top_k=1)[0]['doc_id'] == new_id
+
+
+def test_removals_are_saved_so_they_survive_a_restart(client):
+    ids = [client.store_embedding_document(str(i), 'general', ttl_hours=1 if i < 2 else None) for i in range(5)]
+    assert client._save_faiss_index('general')
+
+    client.remove_embedding_documents('general', [ids[4]])
+    client._expire_embedding_documents(datetime.datetime.utcnow() + datetime.timedelta(hours=2))
+
+    client._reset_faiss_index('general')
+    assert client._load_faiss_index('general')
+    assert set(client.embedding_metadata['general']) == set(ids[2:4])
+    assert client.faiss_indices['general'].ntotal == 2
+
+
+def test_saved_index_round_trips_and_legacy_flat_index_is_wrapped(client, tmp_path):
+    for i in range(5):
+        client.store_embedding_document(str(i), 'decision')
+    removed = client.search_similar_documents("1", doc_type='decision', top_k=1)[0]['doc_id']
+    client.remove_embedding_documents('decision', [removed])
+    assert client._save_faiss_index('decision')
+
+    client._reset_faiss_index('decision')
+    assert client._load_faiss_index('decision')
+    assert client.faiss_indices['decision'].ntotal == 4
+    assert client.search_similar_documents("3", top_k=1)[0]['content'] == "3"
+
+    # Index written before id mapping: a plain IndexFlatIP addressed by position
+    legacy = faiss.IndexFlatIP(DIM)
+    vectors = np.array([client._generate_embedding(str(i)) for i in range(20, 24)], dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    legacy.add(vectors)
+    faiss.write_index(legacy, str(tmp_path / "legacy.bin"))
+    metadata = {f"context_{i}": {'content': str(20 + i), 'metadata': {}, 'timestamp': datetime.datetime.utcnow(),
+                                 'index_position': i} for i in range(4)}
+    with open(tmp_path / "legacy.bin", 'rb') as f:
+        client.storage_client.blobs["faiss_indices/context_index.bin"] = f.read()
+    client.storage_client.blobs["faiss_indices/context_metadata.pkl"] = pickle.dumps(metadata)
+
+    assert client._load_faiss_index('context')
+    assert isinstance(client.faiss_indices['context'], faiss.IndexIDMap2)
+    assert client.search_similar_documents("22", doc_type='context', top_k=1)[0]['doc_id'] == "context_2"
+    client.store_embedding_document("30", 'context')
+    assert client.faiss_id_to_doc['context'][4].startswith("context_")
+
+
+@pytest.mark.parametrize("quantization", ["int8", "pq"])
+def test_compressed_index_reranks_on_exact_vectors(client, monkeypatch, tmp_path, quantization):
+    monkeypatch.setenv("GCP_MEMORY_QUANTIZE_THRESHOLD", "60")
+    monkeypatch.setenv("GCP_MEMORY_VECTOR_DIR", str(tmp_path))
+    compressed = GCPMemoryClient(project_id="test", embedding_dimension=DIM, index_quantization=quantization)
+    compressed.storage_client = client.storage_client
+    ids = compressed.store_embedding_documents([str(i) for i in range(100)], 'general')
+    compressed.wait_for_index_compression(timeout=30)
+    compressed.remove_embedding_documents('general', [ids[99]])
+
+    index = compressed.faiss_indices['general']
+    assert not isinstance(faiss.downcast_index(index.index), faiss.IndexFlat) and index.ntotal == 99
+    cosine = _cosine(compressed, "42", [str(i) for i in range(99)])
+    hits = compressed.search_similar_documents("42", top_k=5, similarity_threshold=-1.0)
+    assert [h['content'] for h in hits] == sorted(cosine, key=cosine.get, reverse=True)[:5]
+    assert hits[0]['similarity_score'] == pytest.approx(1.0, abs=1e-5)
+    assert compressed.get_embedding_statistics()['index_bytes'] < 99 * DIM * 4
+
+    assert compressed._save_faiss_index('general')
+    compressed._reset_faiss_index('general')
+    assert compressed._load_faiss_index('general')
+    assert compressed.search_similar_documents("7", top_k=1)[0]['doc_id'] == ids[7]
+    assert compressed.store_embedding_document("99", 'general') not in ids
+    assert len(compressed.faiss_id_to_doc['general']) == len(compressed.exact_vectors['general']) == 101
+
+
+def test_compression_trains_off_the_lock_and_catches_up(client, monkeypatch, tmp_path):
+    import threading
+
+    from runner import gcp_memory_client
+
+    monkeypatch.setenv("GCP_MEMORY_QUANTIZE_THRESHOLD", "60")
+    monkeypatch.setenv("GCP_MEMORY_VECTOR_DIR", str(tmp_path))
+    compressed = GCPMemoryClient(project_id="test", embedding_dimension=DIM, index_quantization="int8")
+    training, release = threading.Event(), threading.Event()
+    train_and_add = gcp_memory_client.train_and_add
+
+    def slow_train_and_add(*args, **kwargs):
+        training.set()
+        assert release.wait(10)
+        return train_and_add(*args, **kwargs)
+
+    monkeypatch.setattr(gcp_memory_client, "train_and_add", slow_train_and_add)
+    ids = compressed.store_embedding_documents([str(i) for i in range(60)], 'general')
+    assert training.wait(10)
+
+    # Inserts and removals are not held up by training and reach the swapped-in index
+    late = compressed.store_embedding_documents([str(i) for i in range(60, 70)], 'general')
+    compressed.remove_embedding_documents('general', ids[:5])
+    assert not is_compressed(compressed.faiss_indices['general'])
+    release.set()
+    compressed.wait_for_index_compression(timeout=30)
+
+    index = compressed.faiss_indices['general']
+    assert is_compressed(index) and index.ntotal == 65
+    assert compressed.search_similar_documents("65", top_k=1)[0]['doc_id'] == late[5]
+    assert all(h['doc_id'] not in ids[:5] for h in compressed.search_similar_documents("2", top_k=10))
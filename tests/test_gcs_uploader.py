@@ -0,0 +1,102 @@
+import gzip
+import json
+import time
+
+from runner.enhanced_logging.gcs_logger import GCSBuckets, GCSLogger
+from runner.enhanced_logging.gcs_uploader import GCSUploader, LocalBucketClient
+
+
+def _uploads(n, bucket="tron-system-logs", size=64):
+    return [{'bucket': bucket, 'blob_path': f"logs/{i:03d}.json.gz", 'data': bytes(size)} for i in range(n)]
+
+
+def test_uploads_overlap_round_trips(tmp_path):
+    client = LocalBucketClient(str(tmp_path), latency=0.02)
+    uploader = GCSUploader(client, max_workers=16)
+
+    started = time.perf_counter()
+    report = uploader.upload_many(_uploads(64))
+    elapsed = time.perf_counter() - started
+    uploader.close()
+
+    assert report['uploaded'] == {"tron-system-logs": 64} and report['failed'] == []
+    assert elapsed < 64 * 0.02 / 4  # sequential would take ~1.3s
+    assert len(client.bucket("tron-system-logs").list_blobs(prefix="logs/")) == 64
+
+
+class FlakyClient(LocalBucketClient):
+    """Fails the first upload attempt of every blob"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.attempts = {}
+
+    def bucket(self, bucket_name):
+        bucket = super().bucket(bucket_name)
+        blob = bucket.blob
+        attempts = self.attempts
+
+        def flaky_blob(name):
+            b = blob(name)
+            upload = b.upload_from_string
+
+            def upload_from_string(data, **kwargs):
+                attempts[name] = attempts.get(name, 0) + 1
+                if attempts[name] == 1:
+                    raise ConnectionError("connection reset")
+                upload(data, **kwargs)
+
+            b.upload_from_string = upload_from_string
+            return b
+
+        bucket.blob = flaky_blob
+        return bucket
+
+
+class Forbidden(Exception):
+    code = 403
+
+
+def test_transient_errors_are_retried_and_client_errors_are_not(tmp_path):
+    uploader = GCSUploader(FlakyClient(str(tmp_path)), max_workers=4, retry_backoff=0)
+    report = uploader.upload_many(_uploads(5))
+    assert report['uploaded'] == {"tron-system-logs": 5}
+    assert uploader.get_stats()['retries'] == 5
+
+    class DeniedClient(LocalBucketClient):
+        def bucket(self, bucket_name):
+            raise Forbidden("no access")
+
+    uploader = GCSUploader(DeniedClient(str(tmp_path)), max_retries=3, retry_backoff=0)
+    report = uploader.upload_many(_uploads(1))
+    assert isinstance(report['failed'][0]['error'], Forbidden)
+    assert uploader.get_stats()['retries'] == 0
+
+
+def test_large_archives_are_streamed_in_chunks(tmp_path):
+    uploader = GCSUploader(LocalBucketClient(str(tmp_path)), resumable_threshold=1024, chunk_size=256)
+    data = bytes(range(256)) * 10
+    uploader.upload_many([{'bucket': "tron-trade-logs", 'blob_path': "logs/big.csv.gz", 'data': data},
+                          {'bucket': "tron-trade-logs", 'blob_path': "logs/small.csv.gz", 'data': b"x"}])
+
+    bucket = LocalBucketClient(str(tmp_path)).bucket("tron-trade-logs")
+    assert bucket.blob("logs/big.csv.gz").download_as_bytes() == data
+    assert uploader.get_stats()['resumable'] == 1
+
+
+def test_gcs_logger_flushes_to_local_buckets(tmp_path, monkeypatch):
+    monkeypatch.setenv("GCS_SPOOL_DIR", str(tmp_path / "spool"))
+    logger = GCSLogger(client=LocalBucketClient(str(tmp_path)), upload_workers=4)
+    logger.batch_size = 1000
+    for i in range(30):
+        logger.archive_performance_metrics({'pnl': i}, "stock-trader")
+    assert logger.pending_count == 30
+    assert logger.get_upload_stats()['pending_bytes'] > 0
+
+    logger.flush_batch()
+    assert logger.pending_count == 0 and logger.pending_uploads == {}
+
+    blobs = logger.client.bucket(GCSBuckets.ANALYTICS_DATA).list_blobs(prefix="logs/")
+    assert len(blobs) == 30
+    payloads = [json.loads(gzip.decompress(b.download_as_bytes())) for b in blobs]
+    assert sorted(p['metrics']['pnl'] for p in payloads) == list(range(30))
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from runner.market_data import instrument_master
+from runner.market_data.instrument_master import InstrumentMaster, get_instrument_master
+
+TODAY = date.today()
+EXPIRIES = [TODAY - timedelta(days=7)] + [TODAY + timedelta(days=7 * i) for i in range(3)]
+
+
+def make_dump():
+    rows = []
+    token = 1
+    for name in ("NIFTY", "BANKNIFTY"):
+        for expiry in EXPIRIES:
+            rows.append({
+                "instrument_token": token, "exchange_token": token,
+                "tradingsymbol": f"{name}{expiry:%y%m%d}FUT", "name": name,
+                "last_price": 0.0, "expiry": expiry, "strike": 0.0, "tick_size": 0.05,
+                "lot_size": 50, "instrument_type": "FUT", "segment": "NFO-FUT", "exchange": "NFO",
+            })
+            token += 1
+            for strike in range(20000, 20500, 100):
+                for option_type in ("CE", "PE"):
+                    rows.append({
+                        "instrument_token": token, "exchange_token": token,
+                        "tradingsymbol": f"{name}{expiry:%y%m%d}{strike}{option_type}", "name": name,
+                        "last_price": 100.0, "expiry": expiry, "strike": float(strike),
+                        "tick_size": 0.05, "lot_size": 50, "instrument_type": option_type,
+                        "segment": "NFO-OPT", "exchange": "NFO",
+                    })
+                    token += 1
+    return rows
+
+
+class FakeKite:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    def instruments(self, exchange):
+        self.calls += 1
+        return self.rows
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrument_master, "DEFAULT_CACHE_DIR", str(tmp_path))
+    instrument_master.reset_instrument_masters()
+    yield str(tmp_path)
+    instrument_master.reset_instrument_masters()
+
+
+def test_lookups_match_linear_scan(cache_dir):
+    rows = make_dump()
+    master = InstrumentMaster.load(FakeKite(rows), cache_dir=cache_dir)
+
+    target = rows[37]
+    assert master.get(target["tradingsymbol"]) == target
+    assert master.token(target["tradingsymbol"]) == target["instrument_token"]
+    assert master.by_token(target["instrument_token"]) == target
+    assert master.find(target["name"], target["expiry"].isoformat(), target["strike"],
+                       target["instrument_type"]) == target
+    assert master.get("UNKNOWN") is None
+
+    chain = master.chain("NIFTY", EXPIRIES[1])
+    expected = [r for r in rows if r["name"] == "NIFTY" and r["expiry"] == EXPIRIES[1]
+                and r["instrument_type"] in ("CE", "PE")]
+    assert chain == expected
+    assert len(master.options("BANKNIFTY", "PE")) == 5 * len(EXPIRIES)
+
+
+def test_expiries_are_sorted_and_nearest_skips_past(cache_dir):
+    master = InstrumentMaster.load(FakeKite(make_dump()), cache_dir=cache_dir)
+    assert master.expiries("NIFTY", "FUT") == EXPIRIES
+    assert master.nearest_expiry("NIFTY", "CE") == TODAY
+    assert master.nearest_expiry(instrument_type="OPT", on_or_after=TODAY + timedelta(days=1)) == EXPIRIES[2]
+    assert master.future("BANKNIFTY")["expiry"] == TODAY
+
+
+def test_snapshot_is_persisted_and_memory_mapped(cache_dir):
+    kite = FakeKite(make_dump())
+    first = InstrumentMaster.load(kite, cache_dir=cache_dir)
+    second = InstrumentMaster.load(kite, cache_dir=cache_dir)
+
+    assert kite.calls == 1
+    assert isinstance(second.columns["tradingsymbol"], np.memmap)
+    assert second.records() == first.records()
+
+
+def test_old_snapshots_are_replaced(cache_dir):
+    rows = make_dump()
+    InstrumentMaster.load(FakeKite(rows), cache_dir=cache_dir, trading_date=TODAY - timedelta(days=1))
+    kite = FakeKite(rows)
+    InstrumentMaster.load(kite, cache_dir=cache_dir)
+    assert kite.calls == 1
+    assert sorted(p.name for p in (instrument_master.os.scandir(f"{cache_dir}/NFO"))) == [TODAY.isoformat()]
+
+
+def test_shared_master_fetches_once(cache_dir):
+    kite = FakeKite(make_dump())
+    assert get_instrument_master(kite) is get_instrument_master(kite)
+    instrument_master.reset_instrument_masters()
+    assert len(get_instrument_master(None)) == len(kite.rows)
+    assert kite.calls == 1
+
+
+def test_missing_snapshot_without_client_raises(cache_dir):
+    with pytest.raises(RuntimeError):
+        get_instrument_master(None)
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from runner.enhanced_logging.core_logger import TradingLogger
+from runner.enhanced_logging.log_shipper import LogShipper
+from runner.enhanced_logging.log_types import LogLevel
+
+
+class GatedSink:
+    """Sink that blocks until released, recording every batch"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.items = []
+
+    def __call__(self, batch):
+        self.release.wait(5)
+        self.items.extend(batch)
+
+
+def test_full_buffer_sheds_debug_drops_info_and_blocks_errors():
+    sink = GatedSink()
+    shipper = LogShipper(sink, capacity=4, shed_watermark=0.5, block_timeout=5)
+    shipper.put("first")
+    time.sleep(0.05)  # writer takes "first" and blocks in the sink
+    for i in range(4):
+        assert shipper.put(f"info{i}")
+
+    assert shipper.put("debug", level=LogLevel.DEBUG) is False
+    assert shipper.put("info", level=LogLevel.INFO) is False
+    threading.Timer(0.1, sink.release.set).start()
+    assert shipper.put("error", level=LogLevel.ERROR)  # waits for the writer to make room
+
+    shipper.close()
+    assert sink.items == ["first", "info0", "info1", "info2", "info3", "error"]
+    stats = shipper.get_stats()
+    assert (stats["shed"], stats["dropped"], stats["blocked"]) == (1, 1, 1)
+
+
+def test_pending_updates_with_same_key_are_coalesced():
+    sink = GatedSink()
+    shipper = LogShipper(sink)
+    shipper.put("first")
+    time.sleep(0.05)
+    for i in range(100):
+        shipper.put({"status": i}, coalesce_key=("status", "stock"))
+    shipper.put("other")
+    sink.release.set()
+    assert shipper.flush(timeout=5)
+
+    assert sink.items == ["first", {"status": 99}, "other"]
+    assert shipper.get_stats()["coalesced"] == 99
+    shipper.close()
+
+
+def test_close_drains_and_runs_final_flush():
+    shipped, flushes = [], []
+    shipper = LogShipper(shipped.extend, batch_size=7, flush_interval=60, on_idle=lambda: flushes.append(len(shipped)))
+    for i in range(50):
+        shipper.put(i)
+    shipper.close()
+    assert shipped == list(range(50))
+    assert flushes[-1] == 50
+    assert shipper.put("late") is False
+
+
+class SlowFirestoreLogger:
+    def __init__(self):
+        self.pending_writes = []
+        self.trades = []
+        self.flushes = 0
+
+    def log_trade_status(self, trade_data, urgent=False):
+        time.sleep(0.05)  # synchronous commit
+        self.trades.append(trade_data.trade_id)
+
+    def log_system_status(self, bot_type, data):
+        pass
+
+    def flush_batch(self):
+        self.flushes += 1
+
+
+def test_trading_logger_calls_do_not_wait_for_firestore():
+    logger = TradingLogger(bot_type="stock-trader", enable_firestore=False, enable_gcs=False)
+    logger.firestore_logger = SlowFirestoreLogger()
+
+    started = time.perf_counter()
+    for i in range(3):
+        logger.log_trade_entry({"trade_id": f"t{i}", "symbol": "INFY", "strategy": "vwap",
+                                "bot_type": "stock-trader", "direction": "bullish", "quantity": 1,
+                                "entry_price": 100.0})
+    assert time.perf_counter() - started < 0.05
+
+    assert logger.flush_all(timeout=5)
+    # Trade entries are routed to Firestore twice (dashboard + trade redundancy)
+    assert list(dict.fromkeys(logger.firestore_logger.trades)) == ["t0", "t1", "t2"]
+    assert logger.firestore_logger.flushes >= 1
+    logger.shutdown()
+
+
+def test_coalesced_system_events_keep_every_field():
+    logger = TradingLogger(bot_type="stock-trader", enable_firestore=False, enable_gcs=False)
+    logger.firestore_logger = SlowFirestoreLogger()
+    statuses = []
+    logger.firestore_logger.log_system_status = lambda bot_type, data: statuses.append(data)
+    gate = threading.Event()
+    logger.shipper.put(lambda: gate.wait(5))
+    time.sleep(0.05)
+
+    logger.log_system_event("started", {"session_id": "s1", "health": {"kite": "ok"}})
+    logger.log_system_event("heartbeat", {"status": "running", "health": {"gcs": "ok"}})
+    gate.set()
+    assert logger.flush_all(timeout=5)
+
+    assert statuses[-1] == {"session_id": "s1", "status": "running", "health": {"kite": "ok", "gcs": "ok"}}
+    assert logger.shipper.get_stats()["coalesced"] == 1
+    logger.shutdown()
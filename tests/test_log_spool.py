@@ -0,0 +1,62 @@
+import datetime
+import os
+
+from runner.enhanced_logging.core_logger import TradingLogger
+from runner.enhanced_logging.log_spool import LogSpool, iter_spool
+from runner.enhanced_logging.log_types import LogCategory, LogEntry, LogLevel, LogType
+
+
+def _entry(i, **kwargs):
+    return LogEntry(1750000000.0 + i, LogLevel.DEBUG, LogCategory.MARKET_DATA, LogType.BULK, "Tick %s @ %s",
+                    {'ltp': 100.0 + i, 'at': datetime.datetime(2025, 6, 15, 9, 15, i)}, "market_data", "s1",
+                    bot_type="options-trader", symbol="NIFTY", args=("NIFTY", i), **kwargs)
+
+
+def test_entry_formats_lazily_and_keeps_dict_shape():
+    entry = _entry(1)
+    assert not hasattr(entry, '__dict__')
+    assert entry.message == "Tick NIFTY @ 1"
+    assert entry.timestamp == datetime.datetime.fromtimestamp(1750000001.0)
+
+    doc = entry.to_dict()
+    assert doc['message'] == "Tick NIFTY @ 1" and doc['level'] == "DEBUG"
+    assert doc['data']['at'] == "2025-06-15T09:15:01"
+
+    # Legacy callers pass a datetime and a preformatted message
+    now = datetime.datetime(2025, 6, 15, 9, 15)
+    legacy = LogEntry(now, LogLevel.INFO, LogCategory.SYSTEM, LogType.DASHBOARD, "100% done", {}, "system", "s1")
+    assert legacy.timestamp == now and legacy.message == "100% done"
+
+
+def test_spool_round_trip_rolls_segments_and_survives_a_torn_tail(tmp_path):
+    spool = LogSpool(str(tmp_path), max_segment_bytes=1024)
+    for start in range(0, 40, 10):
+        assert spool.write(_entry(i) for i in range(start, start + 10)) == 10
+    spool.close()
+
+    segments = sorted(os.path.join(tmp_path, name) for name in os.listdir(tmp_path))
+    assert len(segments) == spool.get_stats()['segments'] > 1
+    entries = [entry for path in segments for entry in iter_spool(path)]
+    assert [e.to_dict() for e in entries] == [_entry(i).to_dict() for i in range(40)]
+    assert entries[7].message == "Tick NIFTY @ 7" and entries[7].data['at'] == "2025-06-15T09:15:07"
+
+    last = len(list(iter_spool(segments[-1])))
+    with open(segments[-1], 'r+b') as f:
+        f.truncate(os.path.getsize(segments[-1]) - 3)
+    assert len(list(iter_spool(segments[-1]))) == last - 1
+
+
+def test_trading_logger_spools_every_entry_before_routing(tmp_path):
+    logger = TradingLogger(session_id="s1", bot_type="stock-trader", enable_firestore=False, enable_gcs=False,
+                           spool_dir=str(tmp_path))
+    for i in range(25):
+        logger.log_market_data("tick", {'symbol': "INFY", 'ltp': 1500.0 + i})
+    logger.log_performance_metric("win_rate", 0.6)
+    assert logger.flush_all(timeout=5)
+
+    path = logger.get_metrics()['spool']['path']
+    entries = list(iter_spool(path))
+    assert [e.category for e in entries][-26:] == [LogCategory.MARKET_DATA] * 25 + [LogCategory.PERFORMANCE]
+    assert entries[-1].message == "Performance metric: win_rate = 0.6"
+    assert os.path.dirname(path) == os.path.join(str(tmp_path), "stock-trader")
+    logger.shutdown()
@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from runner.market_data import instrument_master
+from runner.options.pricing_engine import (
+    OptionsEngine,
+    black_scholes_greeks,
+    black_scholes_prices,
+    implied_volatilities,
+)
+
+SPOT = 22000.0
+RATE = 0.06
+
+
+def make_chain(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = np.round(rng.uniform(18000, 26000, n) / 50) * 50
+    expiries = rng.choice([0.01, 0.05, 0.1, 0.3], n)
+    types = np.where(rng.random(n) > 0.5, "CE", "PE")
+    sigma = rng.uniform(0.08, 0.9, n)
+    prices = black_scholes_prices(SPOT, strikes, expiries, RATE, sigma, types == "CE")
+    return strikes, expiries, types, sigma, prices
+
+
+@pytest.fixture
+def engine():
+    return OptionsEngine(paper_trade=False, risk_free_rate=RATE)
+
+
+@pytest.fixture
+def instrument_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrument_master, "DEFAULT_CACHE_DIR", str(tmp_path))
+    instrument_master.reset_instrument_masters()
+    yield tmp_path
+    instrument_master.reset_instrument_masters()
+
+
+def test_vectorized_prices_match_scalar(engine):
+    strikes, expiries, types, sigma, prices = make_chain(n=50)
+    for i in range(50):
+        expected = engine.black_scholes_price(
+            SPOT, strikes[i], expiries[i], RATE, sigma[i], types[i]
+        )
+        assert prices[i] == pytest.approx(expected, rel=1e-10, abs=1e-10)
+
+
+def test_chain_iv_recovers_volatility(engine):
+    strikes, expiries, types, sigma, prices = make_chain()
+    chain = engine.price_option_chain(SPOT, strikes, prices, types, expiries)
+
+    # Deep ITM/OTM options whose price is flat in sigma carry no IV information
+    identifiable = chain.vega > 1e-3
+    assert chain.converged[identifiable].all()
+    np.testing.assert_allclose(chain.iv[identifiable], sigma[identifiable], atol=1e-6)
+    repriced = black_scholes_prices(SPOT, strikes, expiries, RATE, chain.iv, types == "CE")
+    np.testing.assert_allclose(repriced[chain.converged], prices[chain.converged], atol=1e-6)
+
+
+def test_chain_matches_scalar_iv_and_greeks(engine):
+    strikes, expiries, types, _, prices = make_chain(n=40, seed=4)
+    chain = engine.price_option_chain(SPOT, strikes, prices, types, expiries)
+    for i in range(40):
+        iv = engine.implied_volatility(prices[i], SPOT, strikes[i], expiries[i], RATE, types[i])
+        if not chain.converged[i] or chain.vega[i] < 1e-3:
+            continue
+        assert chain.iv[i] == pytest.approx(iv, abs=1e-5)
+        greeks = engine.calculate_greeks(SPOT, strikes[i], expiries[i], RATE, chain.iv[i], types[i])
+        for name, value in greeks.__dict__.items():
+            if name != "is_mock":
+                assert getattr(chain, name)[i] == pytest.approx(value, rel=1e-9, abs=1e-12)
+
+
+def test_unsolvable_prices_are_flagged(engine):
+    iv, converged = implied_volatilities(
+        [0.0, 25000.0, 1e-9, 100.0], SPOT, [22000, 22000, 22000, 22000],
+        [0.1, 0.1, 0.1, 0.0], RATE, [True, True, True, True],
+    )
+    assert not converged.any()
+    assert np.isnan(iv).all()
+
+    chain = engine.price_option_chain(SPOT, [22000], [0.0], ["CE"], [0.1], fallback_iv=0.2)
+    assert chain.iv[0] == 0.2
+
+
+def test_expired_greeks_are_zero():
+    greeks = black_scholes_greeks(SPOT, [21000, 23000], [0.0, 0.0], RATE, 0.2, [True, False])
+    for values in greeks.values():
+        np.testing.assert_array_equal(values, 0.0)
+
+
+def test_expiry_dates_and_year_fractions_agree(engine):
+    expiry = (datetime.now() + timedelta(days=73)).strftime("%Y-%m-%d")
+    by_date = engine.price_option_chain(SPOT, [22000, 22500], [900.0, 300.0], ["CE", "PE"], [expiry, expiry])
+    by_years = engine.price_option_chain(SPOT, [22000, 22500], [900.0, 300.0], ["CE", "PE"], 0.2)
+    np.testing.assert_allclose(by_date.iv, by_years.iv)
+
+
+def test_paper_trade_chain_matches_scalar_mocks():
+    engine = OptionsEngine(paper_trade=True)
+    strikes = np.array([21000.0, 22000.0, 23000.0])
+    chain = engine.price_option_chain(SPOT, strikes, [1.0, 1.0, 1.0], ["CE", "PE", "PE"], 0.1)
+    assert chain.is_mock
+    for i, option_type in enumerate(["CE", "PE", "PE"]):
+        assert chain.iv[i] == engine._mock_implied_volatility(SPOT, strikes[i], 0.1, option_type)
+        mock = engine._mock_greeks(SPOT, strikes[i], 0.1, option_type)
+        assert chain.delta[i] == pytest.approx(mock.delta)
+        assert chain.gamma[i] == pytest.approx(mock.gamma)
+
+
+def test_analyze_option_chain_prices_every_strike(engine, instrument_cache):
+    expiry = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
+    strikes = np.arange(18000, 26000, 50)
+    instruments = [
+        {"name": "NIFTY", "expiry": expiry, "instrument_type": option_type,
+         "strike": float(strike), "tradingsymbol": f"NIFTY{int(strike)}{option_type}"}
+        for strike in strikes for option_type in ("CE", "PE")
+    ]
+    T = 30 / 365.0
+    prices = {
+        f"NFO:{inst['tradingsymbol']}": {"last_price": float(black_scholes_prices(
+            SPOT, inst["strike"], T, RATE, 0.18, inst["instrument_type"] == "CE"))}
+        for inst in instruments
+    }
+
+    class FakeKite:
+        ltp_calls = 0
+
+        def instruments(self, exchange):
+            return instruments
+
+        def ltp(self, keys):
+            self.ltp_calls += 1
+            return {key: prices[key] for key in keys}
+
+    kite = FakeKite()
+    chain = asyncio.run(engine.analyze_option_chain(kite, "NIFTY", SPOT, expiry))
+
+    assert len(instruments) > 50
+    assert kite.ltp_calls == 1
+    assert len(chain) == sum(1 for p in prices.values() if p["last_price"] > 0.5)
+    atm = next(opt for opt in chain if opt.strike == SPOT and opt.option_type == "CE")
+    assert atm.iv == pytest.approx(0.18, abs=1e-6)
+    assert not atm.is_mock
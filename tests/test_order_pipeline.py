@@ -0,0 +1,234 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from runner.order_pipeline import LatencyHistogram, OrderPipeline, OrderRequest
+
+
+class FakeBroker:
+    """place_order/orders/cancel_order stand-in with an optional per-call delay"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.book = []
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def place_order(self, **params):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls += 1
+            order_id = str(1000 + len(self.book))
+            self.book.append({"order_id": order_id, "tag": params["tag"], "status": "OPEN",
+                              "filled_quantity": 0, **params})
+        return order_id
+
+    def orders(self):
+        with self.lock:
+            return [dict(row) for row in self.book]
+
+    def row(self, order_id):
+        return next(row for row in self.book if row["order_id"] == order_id)
+
+    def cancel_order(self, variety, order_id):
+        with self.lock:
+            row = self.row(order_id)
+            if row["status"] != "OPEN":
+                raise ValueError(f"Order is {row['status']}")
+            row["status"] = "CANCELLED"
+        return order_id
+
+
+def _order(symbol="INFY", side="BUY", qty=1, order_type="MARKET"):
+    return OrderRequest({"tradingsymbol": symbol, "exchange": "NSE", "transaction_type": side,
+                         "quantity": qty, "order_type": order_type, "product": "MIS"})
+
+
+def test_basket_is_dispatched_in_parallel():
+    broker = FakeBroker(delay=0.05)
+    pipeline = OrderPipeline(broker.place_order, broker.orders, max_in_flight=10, orders_per_second=1000)
+
+    started = time.perf_counter()
+    results = pipeline.place_basket([_order(f"S{i}") for i in range(30)])
+    elapsed = time.perf_counter() - started
+
+    assert all(r.ok for r in results)
+    assert len({r.order_id for r in results}) == 30
+    assert elapsed < 0.5  # 3 waves of 50ms, not 30 sequential round trips
+    assert all(row["variety"] == "regular" and len(row["tag"]) <= 20 for row in broker.book)
+    assert pipeline.latency["order_to_ack"].count == 30
+    pipeline.shutdown()
+
+
+def test_retry_after_ambiguous_failure_does_not_duplicate_order():
+    broker = FakeBroker()
+    state = {"first": True}
+
+    def flaky_place(**params):
+        order_id = broker.place_order(**params)
+        if state.pop("first", False):
+            raise TimeoutError("ack lost")  # order reached the exchange, the response did not
+        return order_id
+
+    pipeline = OrderPipeline(flaky_place, broker.orders, backoff_base=0.001, sleep=lambda s: None)
+    request = _order()
+    result = pipeline.place(request, timeout=5)
+
+    assert result.ok and result.attempts == 2
+    assert broker.calls == 1
+    assert pipeline.counters["recovered"] == 1
+    # Resubmitting the same client order ID returns the original result
+    assert pipeline.submit(request).result(timeout=5) is result
+    assert broker.calls == 1
+    pipeline.shutdown()
+
+
+def test_all_or_none_basket_cancels_open_legs_and_offsets_only_fills():
+    broker = FakeBroker()
+
+    def place(**params):
+        if params["tradingsymbol"] == "NIFTY24JUL24000PE":
+            raise ValueError("margin exceeded")
+        order_id = broker.place_order(**params)
+        if params["tradingsymbol"] == "NIFTY24JUL23900CE":
+            broker.row(order_id).update(status="COMPLETE", filled_quantity=params["quantity"])
+        elif params["tradingsymbol"] == "NIFTY24JUL24100CE":
+            broker.row(order_id)["filled_quantity"] = 25  # resting LIMIT, partly filled
+        return order_id
+
+    pipeline = OrderPipeline(place, broker.orders, broker.cancel_order, sleep=lambda s: None)
+    legs = [
+        _order("NIFTY24JUL24000CE", "BUY", 50, "LIMIT"),  # resting, nothing filled
+        _order("NIFTY24JUL24100CE", "BUY", 50, "LIMIT"),
+        _order("NIFTY24JUL23900CE", "BUY", 50, "LIMIT"),
+        _order("NIFTY24JUL24000PE", "BUY", 50, "LIMIT"),
+    ]
+    results = pipeline.place_basket(legs, all_or_none=True, timeout=5)
+
+    assert not results[3].ok and results[3].attempts == 1  # non-retryable error
+    entries = {row["tradingsymbol"]: row["status"] for row in broker.book if row["transaction_type"] == "BUY"}
+    assert entries == {"NIFTY24JUL24000CE": "CANCELLED", "NIFTY24JUL24100CE": "CANCELLED",
+                       "NIFTY24JUL23900CE": "COMPLETE"}
+    reversals = [row for row in broker.book if row["transaction_type"] == "SELL"]
+    assert sorted((row["tradingsymbol"], row["transaction_type"], row["order_type"], row["quantity"])
+                  for row in reversals) == [("NIFTY24JUL23900CE", "SELL", "MARKET", 50),
+                                            ("NIFTY24JUL24100CE", "SELL", "MARKET", 25)]
+    pipeline.shutdown()
+
+
+def test_last_ambiguous_failure_is_checked_in_the_order_book():
+    broker = FakeBroker()
+
+    def place(**params):
+        broker.place_order(**params)
+        raise TimeoutError("ack lost")
+
+    pipeline = OrderPipeline(place, broker.orders, max_attempts=1)
+    result = pipeline.place(_order(), timeout=5)
+
+    assert result.ok and result.order_id == "1000"
+    assert pipeline.counters["recovered"] == 1 and pipeline.counters["failed"] == 0
+    pipeline.shutdown()
+
+
+def test_fill_update_arriving_before_the_ack_is_kept():
+    broker = FakeBroker()
+
+    def place(**params):
+        order_id = broker.place_order(**params)
+        pipeline.on_order_update({"order_id": order_id, "tag": params["tag"], "status": "COMPLETE"})
+        return order_id
+
+    pipeline = OrderPipeline(place, broker.orders)
+    result = pipeline.place(_order(), timeout=5)
+
+    assert result.status == "FILLED"
+    assert pipeline.counters["filled"] == 1
+    assert pipeline.stats()["awaiting_fill"] == 0
+    pipeline.shutdown()
+
+
+def test_fill_updates_record_ack_to_fill_latency():
+    broker = FakeBroker()
+    pipeline = OrderPipeline(broker.place_order, broker.orders)
+    first, second = pipeline.place_basket([_order("A"), _order("B")], timeout=5)
+
+    pipeline.on_order_update({"order_id": first.order_id, "status": "COMPLETE"})
+    assert first.status == "FILLED"
+    next(row for row in broker.book if row["order_id"] == second.order_id)["status"] = "COMPLETE"
+    assert pipeline.poll_fills() == 1
+    assert second.status == "FILLED"
+    assert pipeline.latency["ack_to_fill"].count == 2
+    assert pipeline.stats()["awaiting_fill"] == 0
+    pipeline.shutdown()
+
+
+def test_queue_is_bounded():
+    release = threading.Event()
+
+    def blocked_place(**params):
+        release.wait(5)
+        return "1"
+
+    pipeline = OrderPipeline(blocked_place, max_in_flight=1, max_queue=1)
+    first = pipeline.submit(_order("A"))
+    time.sleep(0.05)  # worker picks up A and blocks
+    pipeline.submit(_order("B"))
+    with pytest.raises(queue.Full):
+        pipeline.submit(_order("C"), block=False)
+    release.set()
+    assert first.result(timeout=5).ok
+    pipeline.shutdown()
+
+
+def test_shutdown_does_not_block_on_a_full_queue():
+    release = threading.Event()
+    broker = FakeBroker()
+
+    def blocked_place(**params):
+        release.wait(5)
+        return broker.place_order(**params)
+
+    pipeline = OrderPipeline(blocked_place, max_in_flight=1, max_queue=1)
+    first = pipeline.submit(_order("A"))
+    time.sleep(0.05)
+    queued = pipeline.submit(_order("B"))
+
+    started = time.perf_counter()
+    pipeline.shutdown(wait=False)
+    assert time.perf_counter() - started < 0.5
+    release.set()
+    assert first.result(timeout=5).ok and queued.result(timeout=5).ok  # queued orders still go out
+    pipeline.shutdown()
+
+
+def test_basket_timeout_withdraws_legs_not_yet_sent():
+    release = threading.Event()
+    broker = FakeBroker()
+
+    def blocked_place(**params):
+        release.wait(5)
+        return broker.place_order(**params)
+
+    pipeline = OrderPipeline(blocked_place, max_in_flight=1)
+    started = time.perf_counter()
+    results = pipeline.place_basket([_order("A"), _order("B")], timeout=0.1)
+    assert time.perf_counter() - started < 1
+
+    assert [r.status for r in results] == ["PENDING", "FAILED"]
+    release.set()
+    pipeline.shutdown()
+    assert [row["tradingsymbol"] for row in broker.book] == ["A"]
+
+
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ms in [1] * 90 + [150] * 10:
+        hist.record(ms / 1000)
+    summary = hist.summary()
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 1.0
+    assert summary["p95_ms"] == 200.0
+    assert summary["buckets"] == {"<=1ms": 90, "<=200ms": 10}
@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from runner.enhanced_logging.gcs_logger import GCSLogger
+from runner.enhanced_logging.gcs_uploader import LocalBucketClient
+from runner.enhanced_logging.log_types import CognitiveLogData, TradeLogData
+
+
+@pytest.fixture
+def gcs(tmp_path, monkeypatch):
+    monkeypatch.setenv("GCS_SPOOL_DIR", str(tmp_path / "spool"))
+    logger = GCSLogger(client=LocalBucketClient(str(tmp_path / "gcs")), upload_workers=2)
+    yield logger
+    logger.close()
+
+
+def _trades(bot_type, strategy, n, pnl):
+    return [TradeLogData(trade_id=f"{bot_type}-{strategy}-{i}", symbol="NIFTY" if i % 2 else "BANKNIFTY",
+                         strategy=strategy, bot_type=bot_type, direction="bullish", quantity=50,
+                         entry_price=100.0 + i, status="closed", pnl=pnl,
+                         metadata={'lots': 1}) for i in range(n)]
+
+
+def test_compacted_day_answers_pushdown_queries(gcs):
+    gcs.archive_trade_logs(_trades("options-trader", "scalp", 30, 10.0), "options-trader")
+    gcs.archive_trade_logs(_trades("options-trader", "iron_condor", 20, -5.0), "options-trader")
+    gcs.archive_trade_logs(_trades("stock-trader", "vwap", 10, 2), "stock-trader")
+    gcs.archive_cognitive_data([CognitiveLogData("d1", "entry", 0.8, "breakout", {'vix': 14})], "options-trader")
+    gcs.archive_performance_metrics({'total_pnl': 250.5, 'win_rate': 0.6, 'note': "ok"}, "options-trader")
+    gcs.seal_archives()
+
+    today = datetime.date.today()
+    counts = gcs.compact_archives(today)
+    assert counts == {'trades': 60, 'cognitive': 1, 'performance': 1}
+
+    scalps = gcs.query_archive('trades', days=30, bot_type="options-trader", strategy="scalp")
+    assert len(scalps) == 30
+    assert {t['strategy'] for t in scalps} == {"scalp"} and scalps[0]['metadata'] == '{"lots":1}'
+    assert gcs.query_archive('trades', days=30, bot_type="stock-trader", columns=['pnl']) == [{'pnl': 2.0}] * 10
+
+    # Partitioned by day and bot; strategy/symbol row-group statistics are written
+    partition = gcs.get_parquet_archive().dataset_path('trades') + f"/date={today.isoformat()}/bot_type=options-trader"
+    stats = pq.ParquetFile(partition + "/part-0.parquet").metadata.row_group(0).column(2).statistics
+    assert (stats.min, stats.max) == ("iron_condor", "scalp")
+
+    history = gcs.get_performance_history("options-trader", days=7)
+    assert history[0]['metrics'] == {'total_pnl': 250.5, 'win_rate': 0.6, 'note': "ok"}
+
+
+def test_recompacting_a_day_replaces_its_partitions(gcs):
+    gcs.archive_trade_logs(_trades("stock-trader", "vwap", 5, 1.0), "stock-trader")
+    gcs.seal_archives()
+    today = datetime.date.today()
+    gcs.compact_archives(today)
+    gcs.compact_archives(today)
+
+    assert len(gcs.query_archive('trades', days=1)) == 5
+    assert gcs.query_archive('trades', days=1, bot_type="options-trader") == []
+
+
+def test_trade_entry_and_exit_compact_to_one_row(gcs):
+    opened = TradeLogData(trade_id="t1", symbol="NIFTY", strategy="vwap", bot_type="stock-trader",
+                          direction="bullish", quantity=50, entry_price=100.0, status="open")
+    closed = TradeLogData(trade_id="t1", symbol="NIFTY", strategy="vwap", bot_type="stock-trader",
+                          direction="bullish", quantity=50, entry_price=100.0, status="closed",
+                          exit_price=104.0, exit_time=datetime.datetime.now(), pnl=200.0)
+    still_open = TradeLogData(trade_id="t2", symbol="BANKNIFTY", strategy="vwap", bot_type="stock-trader",
+                              direction="bearish", quantity=25, entry_price=200.0, status="open")
+    gcs.archive_trade_logs([opened], "stock-trader")
+    gcs.archive_trade_logs([still_open], "stock-trader")
+    gcs.archive_trade_logs([closed], "stock-trader")
+    gcs.seal_archives()
+
+    assert gcs.compact_archives(datetime.date.today())['trades'] == 2
+    trades = {t['trade_id']: t for t in gcs.query_archive('trades', days=1)}
+    assert (trades["t1"]['status'], trades["t1"]['pnl']) == ("closed", 200.0)
+    assert trades["t2"]['status'] == "open"
@@ -49,4 +49,16 @@ def test_correlation_matrix_benchmark(benchmark, market_monitor):
     def f():
         market_monitor.correlation_monitor.calculate_correlation_matrix()
 
-    benchmark(f) 
\ No newline at end of file
+    benchmark(f)
+
+def test_trading_logger_call_overhead_benchmark(benchmark, tmp_path):
+    """Per-call cost of a verbose (DEBUG market data) log call with the spool on"""
+    from runner.enhanced_logging.core_logger import TradingLogger
+
+    logger = TradingLogger(bot_type="benchmark", enable_firestore=False, enable_gcs=False,
+                           spool_dir=str(tmp_path))
+    tick = {'symbol': "NIFTY", 'ltp': 22150.5, 'volume': 1200}
+
+    benchmark(logger.log_market_data, "tick", tick)
+    logger.shutdown()
+    assert logger.get_metrics()['spool']['encode_errors'] == 0
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from runner.indicators.streaming_indicators import RollingWindow, StreamingIndicators
+from runner.indicators.technical_engine import TechnicalEngine
+
+
+def make_candles(n=200, seed=1, start=datetime(2024, 1, 1, 9, 15)):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    candles = []
+    for i in range(n):
+        candles.append({
+            "date": start + timedelta(minutes=i),
+            "open": close[i] + rng.normal(0, 0.1),
+            "high": close[i] + abs(rng.normal(0, 0.4)),
+            "low": close[i] - abs(rng.normal(0, 0.4)),
+            "close": close[i],
+            "volume": float(rng.integers(100, 1000)),
+        })
+    return candles
+
+
+def wilder_reference(values, period):
+    avg = np.mean(values[:period])
+    for x in values[period:]:
+        avg = (avg * (period - 1) + x) / period
+    return avg
+
+
+@pytest.fixture
+def engine():
+    return TechnicalEngine(paper_trade=False)
+
+
+def test_rolling_window_matches_pandas():
+    rng = np.random.default_rng(0)
+    values = rng.normal(1000, 5, 500)
+    window = RollingWindow(20)
+    for v in values:
+        window.push(v)
+    series = pd.Series(values)
+    assert window.mean == pytest.approx(series.rolling(20).mean().iloc[-1])
+    assert window.std == pytest.approx(series.rolling(20).std().iloc[-1])
+
+
+def test_macd_and_bollinger_match_batch_engine(engine):
+    candles = make_candles()
+    stream = StreamingIndicators("TEST")
+    for candle in candles:
+        stream.update(candle)
+
+    macd = stream.macd()
+    batch_macd = engine.calculate_macd(candles)
+    assert macd.value == pytest.approx(batch_macd.value)
+    assert macd.metadata["signal"] == pytest.approx(batch_macd.metadata["signal"])
+    assert macd.signal == batch_macd.signal
+
+    bands = stream.bollinger()
+    batch_bands = engine.calculate_bollinger_bands(candles)
+    assert bands.value == pytest.approx(batch_bands.value)
+    assert bands.metadata["upper_band"] == pytest.approx(batch_bands.metadata["upper_band"])
+    assert bands.signal == batch_bands.signal
+
+
+def test_session_vwap_resets_daily_and_matches_batch(engine):
+    day1 = make_candles(50, seed=2)
+    day2 = make_candles(50, seed=3, start=datetime(2024, 1, 2, 9, 15))
+    stream = StreamingIndicators("TEST")
+    for candle in day1 + day2:
+        stream.update(candle)
+
+    vwap = stream.vwap()
+    assert vwap.metadata["data_points"] == 50
+    assert vwap.value == pytest.approx(engine.calculate_vwap_advanced(day1 + day2).value)
+
+
+def test_rolling_vwap_matches_batch(engine):
+    candles = make_candles(80)
+    stream = StreamingIndicators("TEST", vwap_period=20)
+    stream.sync(candles)
+    assert stream.vwap().value == pytest.approx(engine.calculate_vwap_advanced(candles, period=20).value)
+
+
+def test_rsi_and_atr_use_wilder_smoothing():
+    candles = make_candles()
+    stream = StreamingIndicators("TEST")
+    stream.sync(candles)
+
+    closes = np.array([c["close"] for c in candles])
+    delta = np.diff(closes)
+    gain = wilder_reference(np.where(delta > 0, delta, 0), 14)
+    loss = wilder_reference(np.where(delta < 0, -delta, 0), 14)
+    assert stream.rsi().value == pytest.approx(100 - 100 / (1 + gain / loss))
+
+    highs = np.array([c["high"] for c in candles])
+    lows = np.array([c["low"] for c in candles])
+    tr = np.maximum.reduce([highs[1:] - lows[1:], abs(highs[1:] - closes[:-1]), abs(lows[1:] - closes[:-1])])
+    assert stream.atr().value == pytest.approx(wilder_reference(tr, 14))
+
+
+def test_sync_only_applies_new_candles():
+    candles = make_candles(60)
+    stream = StreamingIndicators("TEST")
+    assert stream.sync(candles[:40]) == 40
+    # A polled window overlapping what we have already seen
+    assert stream.sync(candles[30:45]) == 5
+    assert stream.sync(candles[30:45]) == 0
+
+    full = StreamingIndicators("TEST")
+    full.sync(candles[:45])
+    assert stream.macd() is None or stream.macd().value == pytest.approx(full.macd().value)
+    assert stream.bollinger().value == pytest.approx(full.bollinger().value)
+
+
+def test_engine_update_stream_keeps_state_per_symbol(engine):
+    candles = make_candles(100)
+    results = engine.update_stream("NIFTY", candles)
+    assert set(results) == {"vwap", "rsi", "atr", "macd", "bollinger"}
+    assert not results["macd"].is_mock
+
+    engine.update_stream("BANKNIFTY", candles[:10])
+    assert engine.get_engine_status()["streaming_symbols"] == 2
+    assert engine.get_stream("NIFTY").bars == 100
+
+    # Too little history yet: falls back to mocks like the batch methods
+    assert engine.update_stream("BANKNIFTY", candles[:10])["macd"].is_mock
+
+    engine.reset_stream("NIFTY")
+    assert engine.get_engine_status()["streaming_symbols"] == 1
+
+
+def test_paper_trade_stream_returns_mocks():
+    engine = TechnicalEngine(paper_trade=True)
+    results = engine.update_stream("NIFTY", make_candles(50))
+    assert all(result.is_mock for result in results.values())
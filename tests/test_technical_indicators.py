@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from runner.market_data.technical_indicators import TechnicalIndicators
+
+
+def reference_adx(high_prices, low_prices, close_prices, period=14):
+    """Original loop-based implementation kept as the numerical reference"""
+    high = np.array(high_prices)
+    low = np.array(low_prices)
+    close = np.array(close_prices)
+
+    tr1 = high[1:] - low[1:]
+    tr2 = np.abs(high[1:] - close[:-1])
+    tr3 = np.abs(low[1:] - close[:-1])
+    tr = np.maximum(tr1, np.maximum(tr2, tr3))
+
+    dm_plus = np.where((high[1:] - high[:-1]) > (low[:-1] - low[1:]),
+                       np.maximum(high[1:] - high[:-1], 0), 0)
+    dm_minus = np.where((low[:-1] - low[1:]) > (high[1:] - high[:-1]),
+                        np.maximum(low[:-1] - low[1:], 0), 0)
+
+    def wilder_smooth(values, period):
+        alpha = 1.0 / period
+        smoothed = np.zeros_like(values, dtype=float)
+        smoothed[0] = values[0]
+        for i in range(1, len(values)):
+            smoothed[i] = alpha * values[i] + (1 - alpha) * smoothed[i - 1]
+        return smoothed
+
+    atr = wilder_smooth(tr, period)
+    di_plus = 100 * wilder_smooth(dm_plus, period) / atr
+    di_minus = 100 * wilder_smooth(dm_minus, period) / atr
+    dx = 100 * np.abs(di_plus - di_minus) / (di_plus + di_minus + 1e-10)
+    return wilder_smooth(dx, period), di_plus, di_minus
+
+
+def make_bars(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 4, n))
+    high = close + rng.uniform(0.5, 6, n)
+    low = close - rng.uniform(0.5, 6, n)
+    return list(high), list(low), list(close)
+
+
+def test_wilder_smooth_matches_loop():
+    values = np.random.default_rng(1).normal(size=500)
+    expected = np.zeros_like(values)
+    expected[0] = values[0]
+    for i in range(1, len(values)):
+        expected[i] = values[i] / 14 + (1 - 1 / 14) * expected[i - 1]
+    np.testing.assert_allclose(TechnicalIndicators.wilder_smooth(values, 14), expected, rtol=1e-10)
+
+
+def test_adx_latest_values_match_reference():
+    high, low, close = make_bars()
+    adx, di_plus, di_minus = reference_adx(high, low, close)
+    result = TechnicalIndicators.calculate_adx(high, low, close)
+    assert result["adx"] == pytest.approx(adx[-1], rel=1e-9)
+    assert result["di_plus"] == pytest.approx(di_plus[-1], rel=1e-9)
+    assert result["di_minus"] == pytest.approx(di_minus[-1], rel=1e-9)
+
+
+def test_adx_full_series_is_aligned_to_bars():
+    high, low, close = make_bars(n=120)
+    adx, di_plus, di_minus = reference_adx(high, low, close, period=10)
+    result = TechnicalIndicators.calculate_adx(high, low, close, period=10, full_series=True)
+    assert result["adx"].shape == (120,)
+    assert np.isnan(result["adx"][0])
+    np.testing.assert_allclose(result["adx"][1:], adx, rtol=1e-9)
+    np.testing.assert_allclose(result["di_plus"][1:], di_plus, rtol=1e-9)
+    np.testing.assert_allclose(result["di_minus"][1:], di_minus, rtol=1e-9)
+
+
+def test_adx_short_history_is_nan():
+    high, low, close = make_bars(n=10)
+    assert np.isnan(TechnicalIndicators.calculate_adx(high, low, close)["adx"])
+    series = TechnicalIndicators.calculate_adx(high, low, close, full_series=True)
+    assert series["adx"].shape == (10,) and np.isnan(series["adx"]).all()
+
+
+def test_price_action_counts_match_loop():
+    high, low, close = make_bars(n=40, seed=7)
+    result = TechnicalIndicators.analyze_price_action(high, low, close, lookback=20)
+    highs, lows = high[-20:], low[-20:]
+    assert result["higher_highs"] == sum(1 for i in range(1, 20) if highs[i] > highs[i - 1])
+    assert result["lower_lows"] == sum(1 for i in range(1, 20) if lows[i] < lows[i - 1])
@@ -0,0 +1,147 @@
+import json
+import logging
+from datetime import datetime, timedelta
+
+from runner.market_data.tick_feed import ReplayFeed, Tick, TickSubscriptionManager
+from runner.paper_trader import PaperTrader
+
+
+class RecordingFeed(ReplayFeed):
+    def __init__(self, ticks=()):
+        super().__init__(ticks)
+        self.calls = []
+
+    def subscribe(self, symbols):
+        self.calls.append(("subscribe", sorted(symbols)))
+        super().subscribe(symbols)
+
+    def unsubscribe(self, symbols):
+        self.calls.append(("unsubscribe", sorted(symbols)))
+        super().unsubscribe(symbols)
+
+
+class MockFirestoreClient:
+    def log_trade(self, bot_name, date_str, trade_data):
+        pass
+
+    def log_trade_exit(self, bot_name, date_str, symbol, exit_data):
+        pass
+
+
+def _ticks(*rows):
+    start = datetime(2024, 1, 2, 9, 15)
+    return [Tick(symbol=s, last_price=p, timestamp=start + timedelta(seconds=i)) for i, (s, p) in enumerate(rows)]
+
+
+def test_fan_out_only_to_symbol_subscribers():
+    feed = RecordingFeed(_ticks(("INFY", 1500.0), ("TCS", 3500.0), ("INFY", 1501.0), ("SBIN", 600.0)))
+    manager = TickSubscriptionManager(feed)
+    seen = {"a": [], "b": []}
+    manager.subscribe("a", ["INFY"], lambda t: seen["a"].append((t.symbol, t.last_price)))
+    manager.subscribe("b", ["INFY", "TCS"], lambda t: seen["b"].append((t.symbol, t.last_price)))
+
+    assert feed.calls == [("subscribe", ["INFY"]), ("subscribe", ["TCS"])]
+    assert feed.run() == 3  # SBIN is not subscribed by anyone
+
+    assert seen["a"] == [("INFY", 1500.0), ("INFY", 1501.0)]
+    assert seen["b"] == [("INFY", 1500.0), ("TCS", 3500.0), ("INFY", 1501.0)]
+    assert manager.last_price("INFY") == 1501.0
+    assert manager.stats()["deliveries"] == 5
+
+
+def test_feed_keeps_symbol_until_last_subscriber_leaves():
+    feed = RecordingFeed()
+    manager = TickSubscriptionManager(feed)
+    manager.subscribe("a", ["INFY"], lambda t: None)
+    manager.subscribe("b", ["INFY"], lambda t: None)
+
+    manager.unsubscribe("a", ["INFY"])
+    assert ("unsubscribe", ["INFY"]) not in feed.calls
+    manager.unsubscribe("b")
+    assert feed.calls[-1] == ("unsubscribe", ["INFY"])
+    assert manager.symbols() == []
+
+
+def test_callback_errors_do_not_stop_delivery():
+    feed = RecordingFeed(_ticks(("INFY", 1.0)))
+    manager = TickSubscriptionManager(feed)
+    received = []
+
+    def broken(tick):
+        raise RuntimeError("boom")
+
+    manager.subscribe("broken", ["INFY"], broken)
+    manager.subscribe("ok", ["INFY"], received.append)
+    feed.run()
+    assert len(received) == 1
+    assert manager.stats()["callback_errors"] == 1
+
+
+def test_replay_from_jsonl_and_candles(tmp_path):
+    path = tmp_path / "ticks.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in [
+        {"symbol": "INFY", "last_price": 10.0, "timestamp": "2024-01-02T09:15:01"},
+        {"symbol": "INFY", "last_price": 11.0, "timestamp": "2024-01-02T09:15:00"},
+    ]))
+    feed = ReplayFeed.from_jsonl(str(path))
+    assert [t.last_price for t in feed.ticks] == [11.0, 10.0]
+
+    candle = {"date": datetime(2024, 1, 2, 9, 15), "open": 100.0, "high": 104.0, "low": 99.0, "close": 103.0}
+    feed = ReplayFeed.from_candles("INFY", [candle])
+    assert [t.last_price for t in feed.ticks] == [100.0, 99.0, 104.0, 103.0]
+
+
+def test_paper_trader_exits_on_tick_for_affected_symbol_only():
+    trader = PaperTrader(logger=logging.getLogger(__name__), firestore_client=MockFirestoreClient())
+    for symbol, price in (("RELIANCE", 2500.0), ("INFY", 1500.0)):
+        trader.execute_paper_trade({
+            "symbol": symbol, "entry_price": price, "quantity": 1,
+            "stop_loss": price * 0.98, "target": price * 1.04, "direction": "bullish",
+        }, "vwap")
+
+    feed = RecordingFeed(_ticks(("RELIANCE", 2400.0)))
+    manager = TickSubscriptionManager(feed)
+    trader.attach_tick_feed(manager)
+    assert manager.symbols() == ["INFY", "RELIANCE"]
+
+    feed.run()
+
+    assert trader.trigger_book.fired_count == 1
+    assert [t.symbol for t in trader.active_trades] == ["INFY"]
+    assert trader.completed_trades[0].exit_price == 2400.0
+    assert manager.symbols() == ["INFY"]
+
+
+def test_paper_trader_logs_tick_exits_outside_the_trades_lock():
+    import threading
+
+    held = []
+
+    class ProbingFirestore(MockFirestoreClient):
+        def log_trade_exit(self, bot_name, date_str, symbol, exit_data):
+            # Another thread must be able to take the lock while Firestore is written
+            def probe_lock():
+                acquired = trader._trades_lock.acquire(timeout=1)
+                held.append(not acquired)
+                if acquired:
+                    trader._trades_lock.release()
+
+            probe = threading.Thread(target=probe_lock)
+            probe.start()
+            probe.join()
+
+    trader = PaperTrader(logger=logging.getLogger(__name__), firestore_client=ProbingFirestore())
+    trader.execute_paper_trade({
+        "symbol": "INFY", "entry_price": 1500.0, "quantity": 1,
+        "stop_loss": 1470.0, "target": 1560.0, "direction": "bullish",
+    }, "vwap")
+    trade = trader.active_trades[0]
+
+    trader.on_tick(Tick(symbol="INFY", last_price=1460.0, timestamp=datetime(2024, 1, 2, 9, 15)))
+    # A second close of the same trade (e.g. a racing EOD sweep) is a no-op
+    trader.close_paper_trade(trade, 1450.0, "End of day square-off")
+
+    assert held == [False]
+    assert trader.completed_trades == [trade]
+    assert trade.exit_price == 1460.0
+    assert trader.daily_pnl == -40.0
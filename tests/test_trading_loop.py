@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+from runner.trading_loop import BotPipeline, LatencyStats, TradingLoop
+
+
+def _run(loop, pipeline):
+    async def go():
+        loop._stop = asyncio.Event()
+        loop._slots = asyncio.Semaphore(loop.max_concurrency)
+        loop._fetch_slots = asyncio.Semaphore(loop.max_fetch_concurrency)
+        loop._order_slots = asyncio.Semaphore(loop.max_order_concurrency)
+        await loop.run_cycle(pipeline)
+    asyncio.run(go())
+
+
+def test_symbols_fetch_concurrently_within_bounds():
+    active = {"now": 0, "peak": 0}
+
+    async def fetch(symbol):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        return {"symbol": symbol}
+
+    orders = []
+    pipeline = BotPipeline(
+        name="stock",
+        symbols=[f"S{i}" for i in range(8)],
+        fetch=fetch,
+        evaluate=lambda symbol, data: data if symbol in ("S1", "S5") else None,
+        execute=orders.append,
+    )
+    loop = TradingLoop([pipeline], max_fetch_concurrency=4)
+
+    started = time.perf_counter()
+    _run(loop, pipeline)
+    elapsed = time.perf_counter() - started
+
+    assert active["peak"] == 4
+    assert elapsed < 0.3  # two waves of 50ms, not eight
+    assert sorted(o["symbol"] for o in orders) == ["S1", "S5"]
+    report = loop.latency_report()["stock"]
+    assert report["fetch"]["count"] == 8
+    assert report["evaluate"]["count"] == 8
+    assert report["order"]["count"] == 2
+    assert report["cycle"]["count"] == 1
+
+
+def test_stage_errors_are_counted_without_stopping_the_cycle():
+    def evaluate(symbol, data):
+        if symbol == "BAD":
+            raise RuntimeError("boom")
+        return {"symbol": symbol}
+
+    orders = []
+    pipeline = BotPipeline(name="stock", symbols=["BAD", "GOOD"], evaluate=evaluate, execute=orders.append)
+    loop = TradingLoop([pipeline])
+    _run(loop, pipeline)
+
+    assert orders == [{"symbol": "GOOD"}]
+    assert loop.latency_report()["stock"]["evaluate"]["errors"] == 1
+
+
+def test_symbols_without_a_signal_are_not_executed():
+    orders = []
+    pipeline = BotPipeline(
+        name="stock",
+        symbols=["S1"],
+        evaluate=lambda symbol, data: [None, {"symbol": "A"}, None],
+        execute=orders.append,
+    )
+    loop = TradingLoop([pipeline])
+    _run(loop, pipeline)
+
+    assert orders == [{"symbol": "A"}]
+    report = loop.latency_report()["stock"]
+    assert report["order"]["count"] == 1
+    assert report["order"]["errors"] == 0
+
+
+def test_run_stops_when_pipelines_go_inactive_and_drives_exit_monitor():
+    class FakeMonitor:
+        update_interval = 0.01
+
+        def __init__(self):
+            self.passes = 0
+            self.started = False
+
+        def start_async(self):
+            self.started = True
+            return asyncio.create_task(asyncio.sleep(3600))
+
+        def run_exit_pass(self):
+            self.passes += 1
+
+    cycles = []
+    pipeline = BotPipeline(
+        name="futures",
+        evaluate=lambda: cycles.append(1) or None,
+        execute=lambda signal: None,
+        interval=0.02,
+        is_active=lambda: len(cycles) < 3,
+    )
+    monitor = FakeMonitor()
+    loop = TradingLoop([pipeline], position_monitor=monitor)
+    asyncio.run(asyncio.wait_for(loop.run(), timeout=5))
+
+    assert len(cycles) == 3
+    assert monitor.started and monitor.passes >= 1
+    assert loop.latency_report()["positions"]["exit_check"]["count"] >= 1
+
+
+def test_latency_stats_summary():
+    stats = LatencyStats(window=10)
+    for ms in range(1, 21):
+        stats.record(ms / 1000, error=(ms == 20))
+    summary = stats.summary()
+    assert summary["count"] == 20
+    assert summary["errors"] == 1
+    assert summary["max_ms"] == 20.0
+    assert 11.0 <= summary["p50_ms"] <= 16.0  # window keeps the last 10 samples
+
+
+def test_run_all_bots_needs_one_shared_monitor_and_loaded_strategies(monkeypatch):
+    import pytest
+    from runner import multi_bot_runner
+
+    class FakeTrader:
+        def __init__(self, name, monitor, strategy="loaded"):
+            self.name, self.position_monitor, self.strategy = name, monitor, strategy
+
+        def build_pipeline(self):
+            return BotPipeline(name=self.name, evaluate=lambda: None, execute=lambda signal: None)
+
+    driven = {}
+    monkeypatch.setattr(multi_bot_runner, "run_trading_loop",
+                        lambda pipelines, monitor, **kw: driven.update(names=[p.name for p in pipelines], monitor=monitor))
+    shared = object()
+
+    multi_bot_runner.run_all_bots([FakeTrader("stock", shared), FakeTrader("options", shared)])
+    assert driven == {"names": ["stock", "options"], "monitor": shared}
+
+    with pytest.raises(ValueError, match="share one PositionMonitor"):
+        multi_bot_runner.run_all_bots([FakeTrader("stock", shared), FakeTrader("options", object())])
+    with pytest.raises(ValueError, match="No strategy loaded"):
+        multi_bot_runner.run_all_bots([FakeTrader("stock", shared), FakeTrader("futures", shared, strategy=None)])
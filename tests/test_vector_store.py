@@ -0,0 +1,244 @@
+import datetime
+import json
+import os
+
+import pytest
+
+faiss = pytest.importorskip("faiss")
+import numpy as np
+
+from gpt_runner.rag import vector_store
+from gpt_runner.rag.vector_store import VectorStore
+
+DIM = 8
+
+
+def _vectors(n, seed=0):
+    return np.random.default_rng(seed).random((n, DIM), dtype="float32")
+
+
+def test_adds_append_to_the_log_and_replay_on_open(tmp_path):
+    store = VectorStore("stock-trader", dimension=DIM, base_dir=str(tmp_path), snapshot_every=1000)
+    vectors = _vectors(30)
+    for start in range(0, 30, 10):
+        store.add_embeddings(vectors[start:start + 10], [f"doc {i}" for i in range(start, start + 10)],
+                             [{'type': "trade", 'bot': "stock-trader", 'n': i} for i in range(start, start + 10)])
+
+    # No snapshot was written; vectors are only in the append-only log
+    assert not os.path.exists(os.path.join(store.path, "index.faiss"))
+    assert os.path.getsize(os.path.join(store.path, "vectors_0.log")) == 30 * DIM * 4
+
+    reopened = VectorStore("stock-trader", dimension=DIM, base_dir=str(tmp_path))
+    assert len(reopened) == 30
+    hit = reopened.search(vectors[17], top_k=1)[0]
+    assert hit['text'] == "doc 17" and hit['metadata']['n'] == 17 and hit['score'] == pytest.approx(1.0)
+
+
+def test_snapshot_rotates_the_log(tmp_path):
+    store = VectorStore("options-trader", dimension=DIM, base_dir=str(tmp_path), snapshot_every=25)
+    vectors = _vectors(40)
+    store.add_embeddings(vectors[:30], [str(i) for i in range(30)])  # crosses snapshot_every
+    store.add_embeddings(vectors[30:], [str(i) for i in range(30, 40)])
+
+    assert sorted(name for name in os.listdir(store.path) if name.startswith("vectors_")) == ["vectors_30.log"]
+    assert faiss.read_index(os.path.join(store.path, "index.faiss")).ntotal == 30
+
+    reopened = VectorStore("options-trader", dimension=DIM, base_dir=str(tmp_path))
+    assert len(reopened) == 40 and reopened.search(vectors[35], top_k=1)[0]['text'] == "35"
+
+
+def test_torn_log_row_and_orphaned_vectors_are_dropped_on_open(tmp_path):
+    store = VectorStore("futures-trader", dimension=DIM, base_dir=str(tmp_path))
+    store.add_embeddings(_vectors(5), [str(i) for i in range(5)])
+    # Crash mid-add: one full vector without metadata plus half a row
+    with open(os.path.join(store.path, "vectors_0.log"), "ab") as f:
+        f.write(_vectors(1, seed=1).tobytes() + b"\0" * (DIM * 2))
+
+    reopened = VectorStore("futures-trader", dimension=DIM, base_dir=str(tmp_path))
+    assert len(reopened) == 5
+    assert reopened.add_embeddings(_vectors(1, seed=2), ["new"]) == [5]
+    assert reopened.get_documents([5])[5]['text'] == "new"
+
+
+def test_legacy_index_and_json_metadata_are_imported_once(tmp_path):
+    legacy = faiss.IndexFlatL2(DIM)
+    legacy.add(_vectors(3))
+    faiss.write_index(legacy, str(tmp_path / "default.faiss"))
+    with open(tmp_path / "default_metadata.json", "w") as f:
+        json.dump([{'text': f"old {i}", 'type': "log"} for i in range(3)], f)
+
+    store = VectorStore("default", dimension=DIM, base_dir=str(tmp_path))
+    assert len(store) == 3 and store.get_documents([2])[2] == {'type': "log", 'text': "old 2"}
+    assert len(VectorStore("default", dimension=DIM, base_dir=str(tmp_path))) == 3
+
+
+def test_save_to_vector_store_reuses_one_store_per_bot(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_store, "DEFAULT_BASE_DIR", str(tmp_path))
+    items = [{'text': f"trade {i}", 'embedding': list(vec), 'metadata': {'type': "trade"}}
+             for i, vec in enumerate(_vectors(4))]
+    try:
+        assert vector_store.save_to_vector_store("stock-trader", items[:2])
+        store = vector_store.get_vector_store("stock-trader")
+        assert vector_store.save_to_vector_store("stock-trader", items[2:])
+        assert vector_store.get_vector_store("stock-trader") is store and len(store) == 4
+    finally:
+        vector_store.close_vector_stores()
+
+
+def _unit(v):
+    return v / np.linalg.norm(v)
+
+
+def test_search_returns_cosine_top_k_above_threshold(tmp_path):
+    store = VectorStore("scalper", dimension=DIM, base_dir=str(tmp_path))
+    vectors = _vectors(200, seed=3) - 0.5
+    store.add_embeddings(vectors * 7.0, [str(i) for i in range(200)])  # scale must not matter
+
+    query = vectors[42] + 0.01
+    cosine = np.array([_unit(v) @ _unit(query) for v in vectors])
+    expected = [str(i) for i in np.argsort(-cosine)[:5]]
+
+    hits = store.search(query, top_k=5)
+    assert [h['text'] for h in hits] == expected
+    assert hits[0]['score'] == pytest.approx(cosine.max(), abs=1e-5)
+
+    above = store.search(query, top_k=50, threshold=0.6)
+    assert [h['text'] for h in above] == [str(i) for i in np.argsort(-cosine)[:int((cosine > 0.6).sum())]]
+
+    (ids, scores), = store.search_ids(np.stack([query, vectors[7]]), top_k=1)[1:]
+    assert ids.tolist() == [7] and scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_store_switches_to_hnsw_above_the_ann_threshold(tmp_path):
+    store = VectorStore("ann", dimension=DIM, base_dir=str(tmp_path), ann_threshold=500)
+    vectors = _vectors(600, seed=4) - 0.5
+    store.add_embeddings(vectors[:400], [str(i) for i in range(400)])
+    assert isinstance(store.index, faiss.IndexFlatIP)
+    store.add_embeddings(vectors[400:], [str(i) for i in range(400, 600)])
+    assert hasattr(store.index, "hnsw")
+
+    reopened = VectorStore("ann", dimension=DIM, base_dir=str(tmp_path), ann_threshold=500)
+    assert hasattr(reopened.index, "hnsw") and len(reopened) == 600
+    assert reopened.search(vectors[555], top_k=1, threshold=0.99)[0]['text'] == "555"
+
+
+def test_retriever_queries_the_index(tmp_path, monkeypatch):
+    from gpt_runner.rag import retriever
+
+    monkeypatch.setattr(vector_store, "DEFAULT_BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(retriever, "ENHANCED_RAG_LOGGING", False)
+    vectors = _vectors(20, seed=5) - 0.5
+    monkeypatch.setattr(retriever, "embed_text", lambda text: vectors[int(text)])
+    now = datetime.datetime.now()
+    items = [{'text': f"doc {i}", 'embedding': vectors[i],
+              'metadata': {'type': "trade" if i % 2 else "log",
+                           'timestamp': (now - datetime.timedelta(days=i)).isoformat()}} for i in range(20)]
+    try:
+        vector_store.save_to_vector_store("stock-trader", items)
+
+        (doc, score), = retriever.retrieve_similar_context("3", limit=1, threshold=0.5, bot_name="stock-trader")
+        assert doc['text'] == "doc 3" and score == pytest.approx(1.0, abs=1e-5)
+        assert retriever.retrieve_similar_context("3", bot_name="missing-bot") == []
+
+        hybrid = retriever.retrieve_with_hybrid_strategy("3", limit=3, threshold=0.0, bot_name="stock-trader")
+        assert hybrid[0][0]['text'] == "doc 3" and len(hybrid) == 3
+
+        trades = retriever.retrieve_by_category("trade", limit=3, bot_name="stock-trader")
+        assert [d['text'] for d in trades] == ["doc 1", "doc 3", "doc 5"]
+    finally:
+        vector_store.close_vector_stores()
+
+
+def test_l2_snapshot_is_migrated_to_normalized_inner_product(tmp_path):
+    store = VectorStore("legacy-l2", dimension=DIM, base_dir=str(tmp_path))
+    vectors = _vectors(10, seed=6) * 3
+    store.add_embeddings(vectors, [str(i) for i in range(10)])
+    store.close()
+    l2 = faiss.IndexFlatL2(DIM)
+    l2.add(vectors)
+    faiss.write_index(l2, os.path.join(store.path, "index.faiss"))
+
+    reopened = VectorStore("legacy-l2", dimension=DIM, base_dir=str(tmp_path))
+    assert reopened.index.metric_type == faiss.METRIC_INNER_PRODUCT and len(reopened) == 10
+    assert np.allclose(np.linalg.norm(reopened.get_vectors(), axis=1), 1.0, atol=1e-5)
+
+
+def _low_rank(n, dim=32, seed=7):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal((n, 6)) @ rng.standard_normal((6, dim)) + 0.1 * rng.standard_normal((n, dim))).astype("float32")
+
+
+@pytest.mark.parametrize("quantization", ["int8", "pq"])
+def test_compressed_store_reranks_on_the_exact_log(tmp_path, quantization):
+    vectors = _low_rank(3000)
+    store = VectorStore("compressed", dimension=32, base_dir=str(tmp_path), ann_threshold=2000,
+                        snapshot_every=1000, quantization=quantization)
+    for start in range(0, 3000, 500):
+        store.add_embeddings(vectors[start:start + 500], [str(i) for i in range(start, start + 500)])
+
+    assert not isinstance(store.index, faiss.IndexFlat)
+    # The log is never rotated: it holds every exact vector
+    assert sorted(name for name in os.listdir(store.path) if name.startswith("vectors_")) == ["vectors_0.log"]
+    assert os.path.getsize(os.path.join(store.path, "vectors_0.log")) == 3000 * 32 * 4
+    store.close()
+    assert os.path.getsize(os.path.join(store.path, "index.faiss")) < 3000 * 32 * 4 / 3
+
+    reopened = VectorStore("compressed", dimension=32, base_dir=str(tmp_path), ann_threshold=2000,
+                           quantization=quantization)
+    cosine = np.array([_unit(v) @ _unit(vectors[1234]) for v in vectors])
+    hits = reopened.search(vectors[1234], top_k=5, threshold=0.0)
+    assert hits[0]['text'] == "1234" and hits[0]['score'] == pytest.approx(1.0, abs=1e-5)
+    assert [h['score'] for h in hits] == pytest.approx(sorted(cosine, reverse=True)[:5], abs=1e-5)
+    assert np.allclose(reopened.get_vectors()[17], _unit(vectors[17]), atol=1e-6)
+    reopened.close()
+
+
+def test_quantization_can_be_switched_on_and_off(tmp_path):
+    vectors = _low_rank(1200, seed=8)
+    store = VectorStore("switch", dimension=32, base_dir=str(tmp_path), ann_threshold=1000, snapshot_every=300,
+                        quantization="none")
+    store.add_embeddings(vectors, [str(i) for i in range(1200)])
+    store.close()
+
+    compressed = VectorStore("switch", dimension=32, base_dir=str(tmp_path), ann_threshold=1000, quantization="int8")
+    assert isinstance(compressed.index, faiss.IndexScalarQuantizer)
+    assert os.path.getsize(os.path.join(compressed.path, "vectors_0.log")) == 1200 * 32 * 4
+    compressed.add_embeddings(vectors[:10] * 2, ["again"] * 10)
+    compressed.close()
+
+    exact = VectorStore("switch", dimension=32, base_dir=str(tmp_path), ann_threshold=1000, quantization="none")
+    assert hasattr(exact.index, "hnsw") and len(exact) == 1210
+    assert np.allclose(exact.get_vectors()[1205], _unit(vectors[5]), atol=1e-5)
+    exact.close()
+
+
+def test_quantization_benchmark_compares_against_the_flat_index():
+    from gpt_runner.rag.quantization import benchmark
+
+    results = {row['index']: row for row in benchmark(n=5000, dimension=64, queries=20, top_k=5)}
+    assert results['flat']['recall'] == 1.0 and results['flat']['compression'] == 1.0
+    assert results['int8']['compression'] == 4.0 and results['pq']['compression'] > 4
+    assert results['pq+rerank4']['recall'] >= results['pq']['recall']
+    assert results['int8+rerank4']['recall'] >= 0.95
+
+
+def test_hybrid_retrieval_reaches_recent_documents_beyond_the_first_page(tmp_path, monkeypatch):
+    from gpt_runner.rag import retriever
+
+    monkeypatch.setattr(vector_store, "DEFAULT_BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(retriever, "ENHANCED_RAG_LOGGING", False)
+    query = np.eye(DIM, dtype="float32")[0]
+    similar = query + 0.3 * np.random.default_rng(6).random((1500, DIM), dtype="float32") * (np.arange(DIM) > 0)
+    vectors = np.vstack([similar, query + np.eye(DIM, dtype="float32")[1]])
+    monkeypatch.setattr(retriever, "embed_text", lambda text: query)
+    now = datetime.datetime.now()
+    items = [{'text': f"doc {i}", 'embedding': vectors[i],
+              'metadata': {'timestamp': (now - datetime.timedelta(days=30 if i < 1500 else 0)).isoformat()}}
+             for i in range(len(vectors))]
+    try:
+        vector_store.save_to_vector_store("stock-trader", items)
+        (doc, score), = retriever.retrieve_with_hybrid_strategy("q", limit=1, threshold=0.0, bot_name="stock-trader",
+                                                               temporal_weight=0.5)
+        assert doc['text'] == "doc 1500" and score > 0.8
+    finally:
+        vector_store.close_vector_stores()
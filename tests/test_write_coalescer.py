@@ -0,0 +1,102 @@
+from runner.enhanced_logging.write_coalescer import FirestoreWriteCoalescer
+
+SERVER_TIMESTAMP = object()
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+
+    def set(self, ref, data, merge=False):
+        self.ops.append((ref, dict(data), merge))
+
+    def commit(self):
+        if len(self.ops) > 500:
+            raise ValueError("maximum 500 writes allowed per request")
+        if self.db.fail_commits:
+            self.db.fail_commits -= 1
+            raise ConnectionError("deadline exceeded")
+        self.db.commits.append(self.ops)
+
+
+class FakeDb:
+    def __init__(self):
+        self.commits = []
+        self.fail_commits = 0
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def collection(self, name):
+        return FakeCollection(name)
+
+
+class FakeCollection:
+    def __init__(self, name):
+        self.name = name
+
+    def document(self, doc_id):
+        return (self.name, doc_id)
+
+
+def _position(ltp, qty=50):
+    return {'symbol': "NIFTY", 'quantity': qty, 'ltp': ltp, 'last_updated': SERVER_TIMESTAMP}
+
+
+def test_ticks_coalesce_and_only_changed_fields_are_sent():
+    db = FakeDb()
+    coalescer = FirestoreWriteCoalescer(db)
+
+    for ltp in (100.0, 100.5, 101.0):
+        coalescer.put("live_positions", "p1", _position(ltp))
+    coalescer.flush()
+    assert len(db.commits) == 1
+    (_, data, merge), = db.commits[0]
+    assert merge and data['ltp'] == 101.0 and data['symbol'] == "NIFTY"
+
+    coalescer.put("live_positions", "p1", _position(101.5))
+    coalescer.flush()
+    (_, data, _), = db.commits[1]
+    assert data == {'ltp': 101.5, 'last_updated': SERVER_TIMESTAMP}
+
+    coalescer.put("live_positions", "p1", _position(101.5))  # nothing changed
+    coalescer.flush()
+    assert len(db.commits) == 2
+
+    stats = coalescer.get_stats()
+    assert (stats['requested_writes'], stats['written_docs'], stats['coalesced'], stats['suppressed']) == (5, 2, 2, 1)
+    assert stats['write_amplification'] == 0.4
+    assert stats['field_amplification'] == 6 / 20
+
+
+def test_batches_are_sharded_at_the_commit_limit():
+    db = FakeDb()
+    coalescer = FirestoreWriteCoalescer(db)
+    for i in range(1201):
+        coalescer.put("live_trades", f"t{i}", {'status': "open"})
+    assert coalescer.flush() == {'written': 1201, 'failed': 0}
+    assert [len(ops) for ops in db.commits] == [500, 500, 201]
+
+
+def test_failed_batch_is_retried_with_newer_state_merged_in():
+    db = FakeDb()
+    coalescer = FirestoreWriteCoalescer(db, max_attempts=3)
+    coalescer.put("live_trades", "t1", {'status': "open", 'pnl': 0.0})
+    coalescer.flush()
+
+    db.fail_commits = 1
+    coalescer.put("live_trades", "t1", {'status': "closed", 'pnl': 0.0})
+    assert coalescer.flush() == {'written': 0, 'failed': 1}
+    coalescer.put("live_trades", "t1", {'pnl': 250.0})
+    coalescer.flush()
+
+    (_, data, _), = db.commits[-1]
+    assert data == {'status': "closed", 'pnl': 250.0}
+    assert coalescer.get_stats()['failed_batches'] == 1
+
+    db.fail_commits = 3
+    coalescer.put("live_trades", "t2", {'status': "open"})
+    for _ in range(3):
+        coalescer.flush()
+    assert coalescer.get_stats()['dropped'] == 1 and not coalescer.pending
@@ -37,9 +37,32 @@ def summarize_backtest_with_gpt(trades):
     return gpt.summarize_text(prompt)
 
 
-def run_backtest_report(path_to_log_json):
-    with open(path_to_log_json, "r") as f:
-        trades = json.load(f)
+def load_archived_trades(days=30, bot_type=None, strategy=None):
+    """Closed trades from the Parquet archive, oldest first"""
+    from runner.enhanced_logging.gcs_logger import GCSLogger
+
+    filters = {"strategy": strategy} if strategy else {}
+    trades = GCSLogger().query_archive(
+        "trades",
+        days=days,
+        bot_type=bot_type,
+        columns=["symbol", "status", "pnl", "exit_time", "entry_time"],
+        **filters,
+    )
+    trades = [t for t in trades if t["status"] != "open"]
+    for t in trades:
+        t["timestamp"] = t["exit_time"] or t["entry_time"]
+        t["pnl"] = t["pnl"] or 0
+    trades.sort(key=lambda t: t["timestamp"] or "")
+    return trades
+
+
+def run_backtest_report(path_to_log_json=None, days=30, bot_type=None, strategy=None):
+    if path_to_log_json:
+        with open(path_to_log_json, "r") as f:
+            trades = json.load(f)
+    else:
+        trades = load_archived_trades(days, bot_type, strategy)
 
     generate_equity_curve(trades, "./reports")
     gpt_summary = summarize_backtest_with_gpt(trades)